@@ -4,15 +4,16 @@ import click
 import ipaddress
 import json
 import syslog
-import operator
 
 import openconfig_acl
 import tabulate
 import pyangbind.lib.pybindJSON as pybindJSON
 from natsort import natsorted
 from sonic_py_common import multi_asic
-from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
+from swsscommon.swsscommon import SonicV2Connector, ConfigDBPipeConnector
+from utilities_common.bulk_db import get_pipeline_client
 from utilities_common.general import load_db_config
+from utilities_common.multi_asic import run_in_namespaces
 
 def info(msg):
     click.echo(click.style("Info: ", fg='cyan') + click.style(str(msg), fg='green'))
@@ -124,6 +125,8 @@ class AclLoader(object):
         self.tables_db_info = {}
         self.tables_type_info = {}
         self.rules_db_info = {}
+        # Rules of rules_db_info read from APPL_DB, not from CONFIG_DB
+        self.appl_db_rule_keys = set()
         self.rules_info = {}
         self.tables_state_info = None
         self.rules_state_info = None
@@ -135,7 +138,7 @@ class AclLoader(object):
         self.acl_table_status = {}
         self.acl_rule_status = {}
 
-        self.configdb = ConfigDBConnector()
+        self.configdb = ConfigDBPipeConnector()
         self.configdb.connect()
         self.statedb = SonicV2Connector(host="127.0.0.1")
         self.statedb.connect(self.statedb.STATE_DB)
@@ -162,7 +165,7 @@ class AclLoader(object):
 
         namespaces = multi_asic.get_all_namespaces()
         for front_asic_namespaces in namespaces['front_ns']:
-            self.per_npu_configdb[front_asic_namespaces] = ConfigDBConnector(namespace=front_asic_namespaces)
+            self.per_npu_configdb[front_asic_namespaces] = ConfigDBPipeConnector(namespace=front_asic_namespaces)
             self.per_npu_configdb[front_asic_namespaces].connect()
             self.per_npu_statedb[front_asic_namespaces] = SonicV2Connector(namespace=front_asic_namespaces)
             self.per_npu_statedb[front_asic_namespaces].connect(self.per_npu_statedb[front_asic_namespaces].STATE_DB)
@@ -262,6 +265,7 @@ class AclLoader(object):
                 # Shouldn't be hit, table is either programmed to APPL or CONFIG DB
                 continue
             self.rules_db_info[(tid, rid)] = self.appldb.get_all(self.appldb.APPL_DB, app_acl_rule)
+            self.appl_db_rule_keys.add((tid, rid))
 
     def get_rules_db_info(self):
         return self.rules_db_info
@@ -906,80 +910,102 @@ class AclLoader(object):
         for namespace_configdb in self.per_npu_configdb.values():
             namespace_configdb.mod_config({self.ACL_RULE: self.rules_info})
 
-    def incremental_update(self):
+    @staticmethod
+    def rule_db_fields(rule):
+        """
+        Fields of a rule as Config DB stores them, values as strings and list fields
+        named with the '@' suffix, as ConfigDBConnector.typed_to_raw() writes them
+        :param rule: Rule fields in Config DB schema
+        :return: dict of field to string value
+        """
+        fields = {}
+        for field, value in rule.items():
+            if isinstance(value, list):
+                fields[field + '@'] = ','.join(str(v) for v in value)
+            else:
+                fields[field] = str(value)
+        return fields
+
+    def get_rules_diff(self):
+        """
+        Compare rules loaded from file with rules in Config DB, field by field.
+        A rule whose priority alone changed is modified.
+        :return: tuple of sorted lists of rule keys (added, modified, removed)
+        """
+        new_rules = {key: self.rule_db_fields(rule) for key, rule in self.rules_info.items()}
+        current_rules = {key: self.rule_db_fields(rule) for key, rule in self.rules_db_info.items()
+                         if key not in self.appl_db_rule_keys}
+
+        added = natsorted(new_rules.keys() - current_rules.keys())
+        removed = natsorted(current_rules.keys() - new_rules.keys())
+        modified = natsorted(key for key in new_rules.keys() & current_rules.keys()
+                             if new_rules[key] != current_rules[key])
+        return added, modified, removed
+
+    def update_rules(self, configdb, rules, trimmed_rules):
+        """
+        Write rules to a Config DB in one transaction, so that a modified rule is never seen with only
+        part of its new fields
+        :param configdb: Config DB connector
+        :param rules: dict of rule key to rule fields, None to remove the rule
+        :param trimmed_rules: keys of modified rules that lost fields
+        :return:
+        """
+        client = get_pipeline_client(configdb, configdb.CONFIG_DB)
+        if client is None:
+            # mod_config only writes fields, the fields a rule lost are removed by set_entry
+            configdb.mod_config({self.ACL_RULE: rules})
+            for key in trimmed_rules:
+                configdb.set_entry(self.ACL_RULE, key, rules[key])
+            return
+
+        trimmed_rules = set(trimmed_rules)
+        pipe = client.pipeline(transaction=True)
+        for key, rule in rules.items():
+            redis_key = self.ACL_RULE + configdb.KEY_SEPARATOR + configdb.serialize_key(key)
+            if rule is None:
+                pipe.delete(redis_key)
+                continue
+            fields = self.rule_db_fields(rule)
+            if key in trimmed_rules:
+                lost_fields = self.rule_db_fields(self.rules_db_info[key]).keys() - fields.keys()
+                for field in sorted(lost_fields):
+                    pipe.hdel(redis_key, field)
+            for field, value in fields.items():
+                pipe.hset(redis_key, field, value)
+        pipe.execute()
+
+    def incremental_update(self, dry_run=False):
         """
         Perform incremental ACL rules configuration update. Get existing rules from
-        Config DB. Compare with rules specified in file and perform corresponding
-        modifications.
+        Config DB. Compare with rules specified in file and write only the rules
+        added, modified or removed, the other rules stay programmed.
+        :param dry_run: Print the changes instead of writing them
         :return:
         """
+        added, modified, removed = self.get_rules_diff()
 
-        # TODO: Until we test ASIC behavior, we cannot assume that we can insert
-        # dataplane ACLs and shift existing ACLs. Therefore, we perform a full
-        # update on dataplane ACLs, and only perform an incremental update on
-        # control plane ACLs.
+        if dry_run:
+            for action, keys in (("Add", added), ("Modify", modified), ("Delete", removed)):
+                for key in keys:
+                    click.echo("{} {}|{}".format(action, *key))
+            click.echo("{} to add, {} to modify, {} to delete".format(len(added), len(modified), len(removed)))
+            return
 
-        new_rules = set(self.rules_info.keys())
-        new_dataplane_rules = set()
-        new_controlplane_rules = set()
-        current_rules = set(self.rules_db_info.keys())
-        current_dataplane_rules = set()
-        current_controlplane_rules = set()
+        if not (added or modified or removed):
+            return
 
-        for key in new_rules:
-            table_name = key[0]
-            if self.tables_db_info[table_name]['type'].upper() == self.ACL_TABLE_TYPE_CTRLPLANE:
-                new_controlplane_rules.add(key)
-            else:
-                new_dataplane_rules.add(key)
+        rules = {key: None for key in removed}
+        for key in added + modified:
+            rules[key] = self.rules_info[key]
+        trimmed_rules = [key for key in modified
+                         if self.rule_db_fields(self.rules_db_info[key]).keys() -
+                         self.rule_db_fields(self.rules_info[key]).keys()]
 
-        for key in current_rules:
-            table_name = key[0]
-            if self.tables_db_info[table_name]['type'].upper() == self.ACL_TABLE_TYPE_CTRLPLANE:
-                current_controlplane_rules.add(key)
-            else:
-                current_dataplane_rules.add(key)
-
-        # Remove all existing dataplane rules
-        for key in current_dataplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, None)
-            # Program for per-asic namespace also if present
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
-
-        # Add all new dataplane rules
-        for key in new_dataplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-            # Program for per-asic namespace corresponding to front asic also if present.
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-
-        added_controlplane_rules = new_controlplane_rules.difference(current_controlplane_rules)
-        removed_controlplane_rules = current_controlplane_rules.difference(new_controlplane_rules)
-        existing_controlplane_rules = new_rules.intersection(current_controlplane_rules)
-
-        for key in added_controlplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-            # Program for per-asic namespace corresponding to front asic also if present.
-            # For control plane ACL it's not needed but to keep all db in sync program everywhere
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-
-        for key in removed_controlplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, None)
-            # Program for per-asic namespace corresponding to front asic also if present.
-            # For control plane ACL it's not needed but to keep all db in sync program everywhere
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
-        for key in existing_controlplane_rules:
-            if not operator.eq(self.rules_info[key], self.rules_db_info[key]):
-                self.configdb.set_entry(self.ACL_RULE, key, self.rules_info[key])
-                # Program for per-asic namespace corresponding to front asic also if present.
-                # For control plane ACL it's not needed but to keep all db in sync program everywhere
-                for namespace_configdb in self.per_npu_configdb.values():
-                    namespace_configdb.set_entry(self.ACL_RULE, key, self.rules_info[key])
+        # Program for per-asic namespaces also if present.
+        # For control plane ACL it's not needed but to keep all db in sync program everywhere
+        configdbs = [self.configdb] + list((self.per_npu_configdb or {}).values())
+        run_in_namespaces(self.update_rules, [(configdb, rules, trimmed_rules) for configdb in configdbs])
 
     def delete(self, table=None, rule=None):
         """
@@ -1278,8 +1304,9 @@ def full(ctx, filename, table_name, session_name, mirror_stage, max_priority, sk
 @click.option('--session_name', type=click.STRING, required=False)
 @click.option('--mirror_stage', type=click.Choice(["ingress", "egress"]), default="ingress")
 @click.option('--max_priority', type=click.INT, required=False)
+@click.option('--dry-run', is_flag=True, default=False, help="Print the rules to add, modify and delete")
 @click.pass_context
-def incremental(ctx, filename, session_name, mirror_stage, max_priority):
+def incremental(ctx, filename, session_name, mirror_stage, max_priority, dry_run):
     """
     Incremental update of ACL rule configuration.
     """
@@ -1294,7 +1321,7 @@ def incremental(ctx, filename, session_name, mirror_stage, max_priority):
         acl_loader.set_max_priority(max_priority)
 
     acl_loader.load_rules_from_file(filename)
-    acl_loader.incremental_update()
+    acl_loader.incremental_update(dry_run)
 
 
 @cli.command()
@@ -40,40 +40,58 @@ from utilities_common.intf_filter import parse_interface_in_filter
 from utilities_common import bgp_util
 import utilities_common.cli as clicommon
 from utilities_common.helper import get_port_pbh_binding, get_port_acl_binding, update_config
-from utilities_common.general import load_db_config, load_module_from_source
+from utilities_common.general import atomic_write, load_db_config, load_module_from_source
 from .validated_config_db_connector import ValidatedConfigDBConnector
 import utilities_common.multi_asic as multi_asic_util
 from utilities_common.flock import try_lock
 from utilities_common import hft as hft_common
+from importlib import import_module
 
 from .utils import log
 
-from . import aaa
-from . import bmc
-from . import chassis_modules
-from . import liquid_cool
-from . import console
-from . import feature
-from . import fabric
-from . import flow_counters
-from . import hft
-from . import kdump
-from . import kube
-from . import muxcable
-from . import nat
-from . import sed
-from . import vlan
-from . import vxlan
 from . import plugins
 from .config_mgmt import ConfigMgmtDPB, ConfigMgmt, YANG_DIR
-from . import mclag
-from . import syslog
-from . import switchport
-from . import dns
 from . import bgp_cli
-from . import stp
-from . import evpn_mh
-from . import llr
+
+# Commands implemented in other modules, as 'module:attribute'. A module is
+# imported only when one of its commands is used.
+LAZY_COMMANDS = {
+    'aaa': 'config.aaa:aaa',
+    'bmc': 'config.bmc:bmc',
+    'chassis': 'config.chassis_modules:chassis',
+    'console': 'config.console:console',
+    'dns': 'config.dns:dns',
+    'evpn-mh': 'config.evpn_mh:evpn_mh',
+    'fabric': 'config.fabric:fabric',
+    'feature': 'config.feature:feature',
+    'flowcnt-route': 'config.flow_counters:flowcnt_route',
+    'hft': 'config.hft:hft',
+    'kdump': 'config.kdump:kdump',
+    'kubernetes': 'config.kube:kubernetes',
+    'liquid-cool': 'config.liquid_cool:liquid_cool',
+    'llr': 'config.llr:llr',
+    'mclag': 'config.mclag:mclag',
+    'member': 'config.mclag:mclag_member',
+    'muxcable': 'config.muxcable:muxcable',
+    'nat': 'config.nat:nat',
+    'radius': 'config.aaa:radius',
+    'sed': 'config.sed:sed',
+    'spanning-tree': 'config.stp:spanning_tree',
+    'switchport': 'config.switchport:switchport',
+    'syslog': 'config.syslog:syslog',
+    'tacacs': 'config.aaa:tacacs',
+    'unique-ip': 'config.mclag:mclag_unique_ip',
+    'vlan': 'config.vlan:vlan',
+    'vxlan': 'config.vxlan:vxlan',
+}
+LAZY_MODULES = {import_path.split(':')[0].rsplit('.', 1)[1] for import_path in LAZY_COMMANDS.values()}
+
+
+def __getattr__(name):
+    # The modules in LAZY_COMMANDS remain reachable as attributes of this module
+    if name in LAZY_MODULES:
+        return import_module('{}.{}'.format(__package__, name))
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
 
 # mock masic APIs for unit test
 try:
@@ -203,6 +221,12 @@ def write_json_file(json_input, fileName):
         raise Exception(str(e))
 
 
+# Atomically replace given JSON file, it never holds a partially written config
+def replace_json_file(json_input, fileName):
+    with atomic_write(fileName, fsync=True) as f:
+        json.dump(json_input, f, indent=4)
+
+
 def _get_breakout_options(ctx, param, incomplete):
     """ Provides dynamic mode option as per user argument i.e. interface name """
     all_mode_options = []
@@ -1583,6 +1607,30 @@ def multiasic_save_to_singlefile(db, filename):
         os.fsync(file.fileno())
 
 
+def save_config_db_to_file(namespace, filename):
+    """Read CONFIG_DB of the namespace, with pipelined HGETALLs, and atomically replace filename with it
+       sorted, as 'sonic-cfggen -d --print-data' would print it.
+    """
+    if namespace is None:
+        config_db = ConfigDBPipeConnector(use_unix_socket_path=True)
+    else:
+        config_db = ConfigDBPipeConnector(use_unix_socket_path=True, namespace=namespace)
+    config_db.connect()
+    current_config = config_db.get_config()
+    sonic_cfggen.FormatConverter.to_serialized(current_config)
+    replace_json_file(sort_dict(current_config), filename)
+
+
+def write_config_to_db(namespace, config):
+    """Write config, with deserialized keys, to CONFIG_DB of the namespace in one pipelined batch, as
+       'sonic-cfggen --write-to-db' would.
+    """
+    if namespace is DEFAULT_NAMESPACE:
+        config_db = ConfigDBPipeConnector(use_unix_socket_path=True)
+    else:
+        config_db = ConfigDBPipeConnector(use_unix_socket_path=True, namespace=namespace)
+    config_db.connect(False)
+    config_db.mod_config(sonic_cfggen.FormatConverter.output_to_db(config))
 
 
 def multiasic_validate_single_file(filename):
@@ -1653,44 +1701,123 @@ def migrate_db_to_lastest(namespace=DEFAULT_NAMESPACE):
         clicommon.run_command(command, display_cmd=True)
 
 
+def reload_namespace_config(namespace, file, file_format, load_sysinfo):
+    """Clear CONFIG_DB of the namespace and load the config file into it.
+    """
+    if file_format == 'config_db':
+        file_input = read_json_file(file)
+        if not load_sysinfo:
+            load_sysinfo = load_sysinfo_if_missing(file_input)
+
+    if load_sysinfo:
+        try:
+            command = [SONIC_CFGGEN_PATH, "-j", file, '-v', "DEVICE_METADATA.localhost.hwsku"]
+            proc = subprocess.Popen(command, text=True, stdout=subprocess.PIPE)
+            output, err = proc.communicate()
+
+        except FileNotFoundError as e:
+            click.echo("{}".format(str(e)), err=True)
+            raise click.Abort()
+        except Exception as e:
+            click.echo("{}\n{}".format(type(e), str(e)), err=True)
+            raise click.Abort()
+
+        if not output:
+            click.secho("Could not get the HWSKU from config file,  Exiting!!!", fg='magenta')
+            sys.exit(1)
+
+        cfg_hwsku = output.strip()
+
+    client, config_db = flush_configdb(namespace)
+
+    if load_sysinfo:
+        if namespace is DEFAULT_NAMESPACE:
+            command = [
+                str(SONIC_CFGGEN_PATH), '-H', '-k', str(cfg_hwsku), '--write-to-db']
+        else:
+            command = [
+                str(SONIC_CFGGEN_PATH), '-H', '-k', str(cfg_hwsku), '-n', str(namespace), '--write-to-db']
+        clicommon.run_command(command, display_cmd=True)
+
+    # For the database service running in linux host we use the file user gives as input
+    # or by default DEFAULT_CONFIG_DB_FILE. In the case of database service running in namespace,
+    # the default config_db<namespaceID>.json format is used.
+    if file_format == 'config_db':
+        cfg_inputs = []
+        if os.path.isfile(INIT_CFG_FILE):
+            cfg_inputs.append((INIT_CFG_FILE, read_json_file(INIT_CFG_FILE)))
+        cfg_inputs.append((file, file_input))
+
+        cfg_file_names = ", ".join(cfg_file for cfg_file, _ in cfg_inputs)
+        if namespace is DEFAULT_NAMESPACE:
+            click.echo("Loading {} to CONFIG_DB".format(cfg_file_names))
+        else:
+            click.echo("Loading {} to CONFIG_DB of {}".format(cfg_file_names, namespace))
+
+        # Merged in order, as 'sonic-cfggen -j <file> ... --write-to-db' would
+        config_input = {}
+        for _, cfg_input in cfg_inputs:
+            sonic_cfggen.deep_update(config_input, sonic_cfggen.FormatConverter.to_deserialized(cfg_input))
+        write_config_to_db(namespace, config_input)
+    else:
+        config_gen_opts = []
+        if os.path.isfile(INIT_CFG_FILE):
+            config_gen_opts += ['-j', str(INIT_CFG_FILE)]
+        config_gen_opts += ['-Y', str(file)]
+        if namespace is not DEFAULT_NAMESPACE:
+            config_gen_opts += ['-n', str(namespace)]
+
+        command = [SONIC_CFGGEN_PATH] + config_gen_opts + ['--write-to-db']
+        clicommon.run_command(command, display_cmd=True)
+    client.set(config_db.INIT_INDICATOR, 1)
+
+    if os.path.exists(file) and file.endswith("_configReloadStdin"):
+        # Remove tmpfile
+        try:
+            os.remove(file)
+        except OSError as e:
+            click.echo("An error occurred while removing the temporary file: {}".format(str(e)), err=True)
+
+    # Migrate DB contents to latest version
+    migrate_db_to_lastest(namespace)
+
+
 def multiasic_write_to_db(filename, load_sysinfo):
     file_input = read_json_file(filename)
+    asic_configs = []
     for ns in [DEFAULT_NAMESPACE, *multi_asic.get_namespace_list()]:
         asic_name = HOST_NAMESPACE if ns == DEFAULT_NAMESPACE else ns
-        asic_config = file_input[asic_name]
+        asic_configs.append((ns, file_input[asic_name], load_sysinfo))
 
-        asic_load_sysinfo = True if load_sysinfo else False
-        if not asic_load_sysinfo:
-            asic_load_sysinfo = load_sysinfo_if_missing(asic_config)
+    multi_asic_util.run_in_namespaces(write_asic_config_to_db, asic_configs)
 
-        if asic_load_sysinfo:
-            cfg_hwsku = asic_config.get("DEVICE_METADATA", {}).\
-                get("localhost", {}).get("hwsku")
-            if not cfg_hwsku:
-                click.secho("Could not get the HWSKU from config file,  Exiting!", fg='magenta')
-                sys.exit(1)
 
-        client, _ = flush_configdb(ns)
+def write_asic_config_to_db(ns, asic_config, load_sysinfo):
+    asic_load_sysinfo = True if load_sysinfo else False
+    if not asic_load_sysinfo:
+        asic_load_sysinfo = load_sysinfo_if_missing(asic_config)
 
-        if asic_load_sysinfo:
-            if ns is DEFAULT_NAMESPACE:
-                command = [str(SONIC_CFGGEN_PATH), '-H', '-k', str(cfg_hwsku), '--write-to-db']
-            else:
-                command = [str(SONIC_CFGGEN_PATH), '-H', '-k', str(cfg_hwsku), '-n', str(ns), '--write-to-db']
-            clicommon.run_command(command, display_cmd=True)
+    if asic_load_sysinfo:
+        cfg_hwsku = asic_config.get("DEVICE_METADATA", {}).\
+            get("localhost", {}).get("hwsku")
+        if not cfg_hwsku:
+            click.secho("Could not get the HWSKU from config file,  Exiting!", fg='magenta')
+            sys.exit(1)
+
+    client, config_db = flush_configdb(ns)
 
+    if asic_load_sysinfo:
         if ns is DEFAULT_NAMESPACE:
-            config_db = ConfigDBPipeConnector(use_unix_socket_path=True)
+            command = [str(SONIC_CFGGEN_PATH), '-H', '-k', str(cfg_hwsku), '--write-to-db']
         else:
-            config_db = ConfigDBPipeConnector(use_unix_socket_path=True, namespace=ns)
+            command = [str(SONIC_CFGGEN_PATH), '-H', '-k', str(cfg_hwsku), '-n', str(ns), '--write-to-db']
+        clicommon.run_command(command, display_cmd=True)
 
-        config_db.connect(False)
-        sonic_cfggen.FormatConverter.to_deserialized(asic_config)
-        data = sonic_cfggen.FormatConverter.output_to_db(asic_config)
-        config_db.mod_config(sonic_cfggen.FormatConverter.output_to_db(data))
-        client.set(config_db.INIT_INDICATOR, 1)
+    sonic_cfggen.FormatConverter.to_deserialized(asic_config)
+    write_config_to_db(ns, asic_config)
+    client.set(config_db.INIT_INDICATOR, 1)
 
-        migrate_db_to_lastest(ns)
+    migrate_db_to_lastest(ns)
 
 
 def config_file_yang_validation(filename):
@@ -1750,7 +1877,7 @@ def check_dhcpv4_relay_dependencies(db, object_name, object_type):
 
 
 # This is our main entrypoint - the main 'config' command
-@click.group(cls=clicommon.AbbreviationGroup, context_settings=CONTEXT_SETTINGS)
+@click.group(cls=clicommon.LazyAbbreviationGroup, context_settings=CONTEXT_SETTINGS)
 @click.pass_context
 def config(ctx):
     """SONiC command line - 'config' command"""
@@ -1783,48 +1910,7 @@ def config(ctx):
 
 
 # Add groups from other modules
-config.add_command(aaa.aaa)
-config.add_command(aaa.tacacs)
-config.add_command(aaa.radius)
-config.add_command(bmc.bmc)
-config.add_command(chassis_modules.chassis)
-config.add_command(liquid_cool.liquid_cool)
-config.add_command(console.console)
-config.add_command(fabric.fabric)
-config.add_command(feature.feature)
-config.add_command(flow_counters.flowcnt_route)
-if hft_common.is_supported_platform():
-    config.add_command(hft.hft)
-config.add_command(kdump.kdump)
-config.add_command(kube.kubernetes)
-config.add_command(muxcable.muxcable)
-config.add_command(nat.nat)
-config.add_command(vlan.vlan)
-config.add_command(vxlan.vxlan)
-config.add_command(evpn_mh.evpn_mh)
-
-# add stp commands
-config.add_command(stp.spanning_tree)
-
-# add llr commands
-config.add_command(llr.llr)
-
-# add mclag commands
-config.add_command(mclag.mclag)
-config.add_command(mclag.mclag_member)
-config.add_command(mclag.mclag_unique_ip)
-
-# syslog module
-config.add_command(syslog.syslog)
-
-# SED module
-config.add_command(sed.sed)
-
-# DNS module
-config.add_command(dns.dns)
-
-# Switchport module
-config.add_command(switchport.switchport)
+config.add_lazy_commands(LAZY_COMMANDS, conditions={'hft': hft_common.is_supported_platform})
 
 @config.command()
 @click.option('-y', '--yes', is_flag=True, callback=_abort_if_false,
@@ -1858,6 +1944,7 @@ def save(db, filename):
 
     # In case of multi-asic mode we have additional config_db{NS}.json files for
     # various namespaces created per ASIC. {NS} is the namespace index.
+    namespace_files = []
     for inst in range(-1, num_cfg_file-1):
         #inst = -1, refers to the linux host where there is no namespace.
         if inst == -1:
@@ -1875,18 +1962,13 @@ def save(db, filename):
                 file = "/etc/sonic/config_db{}.json".format(inst)
 
         if namespace is None:
-            command = "{} -d --print-data > {}".format(SONIC_CFGGEN_PATH, file)
+            click.echo("Saving CONFIG_DB to {}".format(file))
         else:
-            command = "{} -n {} -d --print-data > {}".format(SONIC_CFGGEN_PATH, namespace, file)
-
-        log.log_info("'save' executing...")
-        clicommon.run_command(command, display_cmd=True, shell=True)
+            click.echo("Saving CONFIG_DB of {} to {}".format(namespace, file))
+        namespace_files.append((namespace, file))
 
-        config_db = sort_dict(read_json_file(file))
-        with open(file, 'w') as config_db_file:
-            json.dump(config_db, config_db_file, indent=4)
-            config_db_file.flush()
-            os.fsync(config_db_file.fileno())
+    log.log_info("'save' executing...")
+    multi_asic_util.run_in_namespaces(save_config_db_to_file, namespace_files)
 
 @config.command()
 @click.option('-y', '--yes', is_flag=True)
@@ -1972,6 +2054,10 @@ def print_dry_run_message(dry_run):
     help='filename to write decision path trace for patch generation as JSON',
     hidden=True,
 )
+@click.option('-c', '--plan-cache', is_flag=True, default=False,
+              help='reuse and store sorted patch plans in the on-disk plan cache')
+@click.option('-l', '--report-latency', is_flag=True, default=False,
+              help='report how long each change took to apply and to be consumed')
 
 @click.pass_context
 def apply_patch(
@@ -1984,6 +2070,8 @@ def apply_patch(
     ignore_path,
     verbose,
     path_trace,
+    plan_cache,
+    report_latency,
 ):
     """Apply given patch of updates to Config. A patch is a JsonPatch which follows rfc6902.
        This command can be used do partial updates to the config with minimum disruption to running processes.
@@ -2007,6 +2095,8 @@ def apply_patch(
             ignore_non_yang_tables=ignore_non_yang_tables,
             ignore_path=ignore_path,
             trace_io=trace_io,
+            plan_cache=plan_cache,
+            report_latency=report_latency,
         )
 
         log.log_notice("Patch applied successfully.")
@@ -2264,6 +2354,7 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
         # service running in the host + DB services running in each ASIC namespace created per ASIC.
         # In the below logic, we get all namespaces in this platform and add an empty namespace ''
         # denoting the current namespace which we are in ( the linux host )
+        namespace_files = []
         for inst in range(-1, num_cfg_file-1):
             # Get the namespace name, for linux host it is DEFAULT_NAMESPACE
             if inst == -1:
@@ -2294,74 +2385,13 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
                 click.echo("The config file {} doesn't exist".format(file))
                 continue
 
-            if file_format == 'config_db':
-                file_input = read_json_file(file)
-                if not load_sysinfo:
-                    load_sysinfo = load_sysinfo_if_missing(file_input)
-
-            if load_sysinfo:
-                try:
-                    command = [SONIC_CFGGEN_PATH, "-j", file, '-v', "DEVICE_METADATA.localhost.hwsku"]
-                    proc = subprocess.Popen(command, text=True, stdout=subprocess.PIPE)
-                    output, err = proc.communicate()
-
-                except FileNotFoundError as e:
-                    click.echo("{}".format(str(e)), err=True)
-                    raise click.Abort()
-                except Exception as e:
-                    click.echo("{}\n{}".format(type(e), str(e)), err=True)
-                    raise click.Abort()
-
-                if not output:
-                    click.secho("Could not get the HWSKU from config file,  Exiting!!!", fg='magenta')
-                    sys.exit(1)
-
-                cfg_hwsku = output.strip()
+            namespace_files.append((namespace, file, file_format, load_sysinfo))
 
-            client, config_db = flush_configdb(namespace)
+        if namespace_files:
             delete_transceiver_tables()
             delete_bgp_peer_table()
-
-            if load_sysinfo:
-                if namespace is DEFAULT_NAMESPACE:
-                    command = [
-                        str(SONIC_CFGGEN_PATH), '-H', '-k', str(cfg_hwsku), '--write-to-db']
-                else:
-                    command = [
-                        str(SONIC_CFGGEN_PATH), '-H', '-k', str(cfg_hwsku), '-n', str(namespace), '--write-to-db']
-                clicommon.run_command(command, display_cmd=True)
-
-            # For the database service running in linux host we use the file user gives as input
-            # or by default DEFAULT_CONFIG_DB_FILE. In the case of database service running in namespace,
-            # the default config_db<namespaceID>.json format is used.
-
-            config_gen_opts = []
-
-            if os.path.isfile(INIT_CFG_FILE):
-                config_gen_opts += ['-j', str(INIT_CFG_FILE)]
-
-            if file_format == 'config_db':
-                config_gen_opts += ['-j', str(file)]
-            else:
-                config_gen_opts += ['-Y', str(file)]
-
-            if namespace is not DEFAULT_NAMESPACE:
-                config_gen_opts += ['-n', str(namespace)]
-
-            command = [SONIC_CFGGEN_PATH] + config_gen_opts + ['--write-to-db']
-
-            clicommon.run_command(command, display_cmd=True)
-            client.set(config_db.INIT_INDICATOR, 1)
-
-            if os.path.exists(file) and file.endswith("_configReloadStdin"):
-                # Remove tmpfile
-                try:
-                    os.remove(file)
-                except OSError as e:
-                    click.echo("An error occurred while removing the temporary file: {}".format(str(e)), err=True)
-
-            # Migrate DB contents to latest version
-            migrate_db_to_lastest(namespace)
+        # The namespaces have their own DB services and are reloaded concurrently
+        multi_asic_util.run_in_namespaces(reload_namespace_config, namespace_files)
 
     # Re-generate the environment variable in case config_db.json was edited
     update_sonic_environment()
@@ -10160,7 +10190,7 @@ def smoothing_interval(interval, rates_type):
 
 # Load plugins and register them
 helper = util_base.UtilHelper()
-helper.load_and_register_plugins(plugins, config)
+helper.load_and_register_plugins_lazily(plugins, config)
 
 #
 # 'subinterface' group ('config subinterface ...')
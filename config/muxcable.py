@@ -1,7 +1,6 @@
 import json
 import os
 import sys
-import time
 
 import click
 import re
@@ -13,11 +12,11 @@ from swsscommon import swsscommon
 from tabulate import tabulate
 from utilities_common import platform_sfputil_helper
 from utilities_common.general import get_optional_value_for_key_in_config_tbl 
+from utilities_common.xcvrd_channel import XcvrdCommandChannel, XCVRD_RSP_OK, XCVRD_CHANNEL_DEADLINE_TIMEOUTS
 
 platform_sfputil = None
 
 REDIS_TIMEOUT_MSECS = 0
-SELECT_TIMEOUT = 1000
 
 # The empty namespace refers to linux host namespace.
 EMPTY_NAMESPACE = ''
@@ -70,140 +69,95 @@ def delete_all_keys_in_db_table(db_type, table_name):
 
 def update_and_get_response_for_xcvr_cmd(cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name, rsp_table_name, port, cmd_timeout_secs, param_dict=None, arg=None):
 
-    res_dict = {}
-    state_db, appl_db = {}, {}
-    firmware_rsp_tbl, firmware_rsp_tbl_keys = {}, {}
-    firmware_rsp_sub_tbl = {}
-    firmware_cmd_tbl, firmware_cmd_arg_tbl = {}, {}
+    res_dicts = update_and_get_responses_for_xcvr_cmd(
+        cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name, rsp_table_name, [port],
+        cmd_timeout_secs, param_dict, arg)
 
-    CMD_TIMEOUT_SECS = cmd_timeout_secs
+    return res_dicts[port]
 
-    time_start = time.time()
 
-    sel = swsscommon.Select()
-    namespaces = multi_asic.get_front_end_namespaces()
-    for namespace in namespaces:
-        asic_id = multi_asic.get_asic_index_from_namespace(namespace)
-        state_db[asic_id] = db_connect("STATE_DB", namespace)
-        appl_db[asic_id] = db_connect("APPL_DB", namespace)
-        firmware_cmd_tbl[asic_id] = swsscommon.Table(appl_db[asic_id], cmd_table_name)
-        if cmd_arg_table_name is not None:
-            firmware_cmd_arg_tbl[asic_id] = swsscommon.Table(appl_db[asic_id], cmd_arg_table_name)
-        firmware_rsp_sub_tbl[asic_id] = swsscommon.SubscriberStateTable(state_db[asic_id], rsp_table_name)
-        firmware_rsp_tbl[asic_id] = swsscommon.Table(state_db[asic_id], rsp_table_name)
-        firmware_rsp_tbl_keys[asic_id] = firmware_rsp_tbl[asic_id].getKeys()
-        for key in firmware_rsp_tbl_keys[asic_id]:
-            firmware_rsp_tbl[asic_id]._del(key)
-        sel.addSelectable(firmware_rsp_sub_tbl[asic_id])
-
-    rc = CONFIG_FAIL
-    res_dict[0] = CONFIG_FAIL
-    res_dict[1] = 'unknown'
+def update_and_get_responses_for_xcvr_cmd(cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name,
+                                          rsp_table_name, ports, cmd_timeout_secs, param_dict=None, arg=None):
+    """
+    Issues the xcvrd command for all the ports at once and returns {port: res_dict},
+    a port timing out after cmd_timeout_secs without a response from xcvrd, and all
+    the ports at most XCVRD_CHANNEL_DEADLINE_TIMEOUTS timeouts after the commands.
+    """
+
+    res_dicts = {}
+    port_asics = {}
 
     logical_port_list = platform_sfputil_helper.get_logical_list()
-    if port not in logical_port_list:
-        click.echo("ERR: This is not a valid port, valid ports ({})".format(", ".join(logical_port_list)))
-        res_dict[0] = rc
-        return res_dict
-
-    asic_index = None
-    if platform_sfputil is not None:
-        asic_index = platform_sfputil_helper.get_asic_id_for_logical_port(port)
-    if asic_index is None:
-        # TODO this import is only for unit test purposes, and should be removed once sonic_platform_base
-        # is fully mocked
-        import sonic_platform_base.sonic_sfp.sfputilhelper
-        asic_index = sonic_platform_base.sonic_sfp.sfputilhelper.SfpUtilHelper().get_asic_id_for_logical_port(port)
-        if asic_index is None:
-            click.echo("Got invalid asic index for port {}, can't perform firmware cmd".format(port))
-            res_dict[0] = rc
-            return res_dict
+    for port in ports:
+        res_dicts[port] = {}
+        res_dicts[port][0] = CONFIG_FAIL
+        res_dicts[port][1] = 'unknown'
 
-    if arg is None:
-        cmd_arg = "null"
-    else:
-        cmd_arg = str(arg)
+        if port not in logical_port_list:
+            click.echo("ERR: This is not a valid port, valid ports ({})".format(", ".join(logical_port_list)))
+            continue
 
-    if param_dict is not None:
-        for key, value in param_dict.items():
-            fvs = swsscommon.FieldValuePairs([(str(key), str(value))])
-            firmware_cmd_arg_tbl[asic_index].set(port, fvs)
+        asic_index = None
+        if platform_sfputil is not None:
+            asic_index = platform_sfputil_helper.get_asic_id_for_logical_port(port)
+        if asic_index is None:
+            # TODO this import is only for unit test purposes, and should be removed once sonic_platform_base
+            # is fully mocked
+            import sonic_platform_base.sonic_sfp.sfputilhelper
+            asic_index = sonic_platform_base.sonic_sfp.sfputilhelper.SfpUtilHelper().get_asic_id_for_logical_port(port)
+            if asic_index is None:
+                click.echo("Got invalid asic index for port {}, can't perform firmware cmd".format(port))
+                continue
 
-    fvs = swsscommon.FieldValuePairs([(cmd_name, cmd_arg)])
-    firmware_cmd_tbl[asic_index].set(port, fvs)
+        port_asics[port] = asic_index
 
-    # Listen indefinitely for changes to the HW_MUX_CABLE_TABLE in the Application DB's
-    while True:
-        # Use timeout to prevent ignoring the signals we want to handle
-        # in signal_handler() (e.g. SIGTERM for graceful shutdown)
+    channel = XcvrdCommandChannel(cmd_table_name, rsp_table_name, cmd_arg_table_name, db_connect)
+    responses = channel.run(port_asics, cmd_name, rsp_name, arg, param_dict, cmd_timeout_secs,
+                            deadline=cmd_timeout_secs * XCVRD_CHANNEL_DEADLINE_TIMEOUTS)
+    for port, response in responses.items():
+        res_dicts[port][1] = response.value
+        if response.status == XCVRD_RSP_OK and response.value == exp_rsp:
+            res_dicts[port][0] = 0
 
-        (state, selectableObj) = sel.select(SELECT_TIMEOUT)
+    delete_all_keys_in_db_table("STATE_DB", rsp_table_name)
 
-        time_now = time.time()
-        time_diff = time_now - time_start
-        if time_diff >= CMD_TIMEOUT_SECS:
-            return res_dict
+    return res_dicts
 
-        if state == swsscommon.Select.TIMEOUT:
-            # Do not flood log when select times out
-            continue
-        if state != swsscommon.Select.OBJECT:
-            click.echo("sel.select() did not  return swsscommon.Select.OBJECT for sonic_y_cable updates")
-            continue
 
-        # Get the redisselect object  from selectable object
-        redisSelectObj = swsscommon.CastSelectableToRedisSelectObj(
-            selectableObj)
-        # Get the corresponding namespace from redisselect db connector object
-        namespace = redisSelectObj.getDbConnector().getNamespace()
-        asic_index = multi_asic.get_asic_index_from_namespace(namespace)
+def get_logical_ports_of_physical_ports():
+    """
+    Returns the logical ports each mapped to a physical port, the ports 'all' stands for.
+    """
 
-        (port_m, op_m, fvp_m) = firmware_rsp_sub_tbl[asic_index].pop()
+    ports = []
+    logical_port_list = platform_sfputil_helper.get_logical_list()
 
-        if not port_m:
-            click.echo("Did not receive a port response {}".format(port))
-            res_dict[1] = 'unknown'
-            res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
-            break
+    for port in logical_port_list:
 
-        if port_m != port:
+        if platform_sfputil is not None:
+            physical_port_list = platform_sfputil_helper.logical_port_name_to_physical_port_list(port)
 
-            res_dict[1] = 'unknown'
-            res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
+        if not isinstance(physical_port_list, list):
+            continue
+        if len(physical_port_list) != 1:
             continue
 
-        if fvp_m:
+        physical_port = physical_port_list[0]
+        logical_port_list_for_physical_port = platform_sfputil_helper.get_physical_to_logical()
 
-            fvp_dict = dict(fvp_m)
-            if rsp_name in fvp_dict:
-                # check if xcvrd got a probe command
-                result = fvp_dict[rsp_name]
+        logical_port_list_per_port = logical_port_list_for_physical_port.get(physical_port, None)
 
-                if result == exp_rsp:
-                    res_dict[1] = result
-                    res_dict[0] = 0
-                else:
-                    res_dict[1] = result
-                    res_dict[0] = CONFIG_FAIL
+        """ This check is required for checking whether or not this logical port is the one which is
+        actually mapped to physical port and by convention it is always the first port.
+        TODO: this should be removed with more logic to check which logical port maps to actual physical port
+        being used"""
 
-                firmware_rsp_tbl[asic_index]._del(port)
-                break
-            else:
-                res_dict[1] = 'unknown'
-                res_dict[0] = CONFIG_FAIL
-                firmware_rsp_tbl[asic_index]._del(port)
-                break
-        else:
-            res_dict[1] = 'unknown'
-            res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
-            break
+        if port != logical_port_list_per_port[0]:
+            continue
 
-    delete_all_keys_in_db_table("STATE_DB", rsp_table_name)
+        ports.append(port)
 
-    return res_dict
+    return ports
 
 def get_value_for_key_in_config_tbl(config_db, port, key, table):
     info_dict = {}
@@ -822,44 +776,18 @@ def state(db, state, port):
     elif port == "all":
         click.confirm(('Muxcable at all ports will be changed to {} state. Continue?'.format(state)), abort=True)
 
-        logical_port_list = platform_sfputil_helper.get_logical_list()
-
         rc_exit = 0
 
-        for port in logical_port_list:
-
-            if platform_sfputil is not None:
-                physical_port_list = platform_sfputil_helper.logical_port_name_to_physical_port_list(port)
-
-            if not isinstance(physical_port_list, list):
-                continue
-            if len(physical_port_list) != 1:
-                continue
-
-            physical_port = physical_port_list[0]
-            logical_port_list_for_physical_port = platform_sfputil_helper.get_physical_to_logical()
-
-            logical_port_list_per_port = logical_port_list_for_physical_port.get(physical_port, None)
+        ports = get_logical_ports_of_physical_ports()
+        res_dicts = update_and_get_responses_for_xcvr_cmd(
+            "config", "result", "True", "XCVRD_CONFIG_HWMODE_DIR_CMD", None, "XCVRD_CONFIG_HWMODE_DIR_RSP",
+            ports, 1, None, state)
 
-            """ This check is required for checking whether or not this logical port is the one which is
-            actually mapped to physical port and by convention it is always the first port.
-            TODO: this should be removed with more logic to check which logical port maps to actual physical port
-            being used"""
-
-            if port != logical_port_list_per_port[0]:
-                continue
-
-            res_dict = {}
-            res_dict[0] = CONFIG_FAIL
-            res_dict[1] = 'unknown'
-
-            res_dict = update_and_get_response_for_xcvr_cmd(
-                "config", "result", "True", "XCVRD_CONFIG_HWMODE_DIR_CMD", None, "XCVRD_CONFIG_HWMODE_DIR_RSP", port, 1, None, state)
-
-            rc = res_dict[0]
+        delete_all_keys_in_db_table("APPL_DB", "XCVRD_CONFIG_HWMODE_DIR_CMD")
+        delete_all_keys_in_db_table("STATE_DB", "XCVRD_CONFIG_HWMODE_DIR_RSP")
 
-            delete_all_keys_in_db_table("APPL_DB", "XCVRD_CONFIG_HWMODE_DIR_CMD")
-            delete_all_keys_in_db_table("STATE_DB", "XCVRD_CONFIG_HWMODE_DIR_RSP")
+        for port in ports:
+            rc = res_dicts[port][0]
 
             port = platform_sfputil_helper.get_interface_alias(port, db)
 
@@ -909,43 +837,18 @@ def setswitchmode(db, state, port):
     elif port == "all":
         click.confirm(('Muxcable at all ports will be changed to {} switching mode. Continue?'.format(state)), abort=True)
 
-        logical_port_list = platform_sfputil_helper.get_logical_list()
-
         rc_exit = 0
 
-        for port in logical_port_list:
-
-            if platform_sfputil is not None:
-                physical_port_list = platform_sfputil_helper.logical_port_name_to_physical_port_list(port)
-
-            if not isinstance(physical_port_list, list):
-                continue
-            if len(physical_port_list) != 1:
-                continue
-
-            physical_port = physical_port_list[0]
-            logical_port_list_for_physical_port = platform_sfputil_helper.get_physical_to_logical()
-
-            logical_port_list_per_port = logical_port_list_for_physical_port.get(physical_port, None)
+        ports = get_logical_ports_of_physical_ports()
+        res_dicts = update_and_get_responses_for_xcvr_cmd(
+            "config", "result", "True", "XCVRD_CONFIG_HWMODE_SWMODE_CMD", None, "XCVRD_CONFIG_HWMODE_SWMODE_RSP",
+            ports, 1, None, state)
 
-            """ This check is required for checking whether or not this logical port is the one which is
-            actually mapped to physical port and by convention it is always the first port.
-            TODO: this should be removed with more logic to check which logical port maps to actual physical port
-            being used"""
-
-            if port != logical_port_list_per_port[0]:
-                continue
-
-            res_dict = {}
-            res_dict[0] = CONFIG_FAIL
-            res_dict[1] = "unknown"
-            res_dict = update_and_get_response_for_xcvr_cmd(
-                "config", "result", "True", "XCVRD_CONFIG_HWMODE_SWMODE_CMD", None, "XCVRD_CONFIG_HWMODE_SWMODE_RSP", port, 1, None, state)
-
-            rc = res_dict[0]
+        delete_all_keys_in_db_table("APPL_DB", "XCVRD_CONFIG_HWMODE_SWMODE_CMD")
+        delete_all_keys_in_db_table("STATE_DB", "XCVRD_CONFIG_HWMODE_SWMODE_RSP")
 
-            delete_all_keys_in_db_table("APPL_DB", "XCVRD_CONFIG_HWMODE_SWMODE_CMD")
-            delete_all_keys_in_db_table("STATE_DB", "XCVRD_CONFIG_HWMODE_SWMODE_RSP")
+        for port in ports:
+            rc = res_dicts[port][0]
 
             port = platform_sfputil_helper.get_interface_alias(port, db)
 
@@ -998,46 +901,20 @@ def download(db, fwfile, port):
             sys.exit(CONFIG_FAIL)
 
     elif port == "all":
-        click.confirm(('Muxcable at all ports will be changed to {} switching mode. Continue?'.format(state)), abort=True)
-
-        logical_port_list = platform_sfputil_helper.get_logical_list()
+        click.confirm(('Muxcable at all ports will download firmware {}. Continue?'.format(fwfile)), abort=True)
 
         rc_exit = True
 
-        for port in logical_port_list:
-
-            if platform_sfputil is not None:
-                physical_port_list = platform_sfputil_helper.logical_port_name_to_physical_port_list(port)
-
-            if not isinstance(physical_port_list, list):
-                continue
-            if len(physical_port_list) != 1:
-                continue
-
-            physical_port = physical_port_list[0]
-            logical_port_list_for_physical_port = platform_sfputil_helper.get_physical_to_logical()
-
-            logical_port_list_per_port = logical_port_list_for_physical_port.get(physical_port, None)
-
-            """ This check is required for checking whether or not this logical port is the one which is
-            actually mapped to physical port and by convention it is always the first port.
-            TODO: this should be removed with more logic to check which logical port maps to actual physical port
-            being used"""
-
-            if port != logical_port_list_per_port[0]:
-                continue
-
-            res_dict = {}
+        ports = get_logical_ports_of_physical_ports()
+        res_dicts = update_and_get_responses_for_xcvr_cmd(
+            "download_firmware", "status", "0", "XCVRD_DOWN_FW_CMD", None, "XCVRD_DOWN_FW_RSP",
+            ports, 1000, None, fwfile)
 
-            res_dict[0] = CONFIG_FAIL
-            res_dict[1] = "unknown"
-            res_dict = update_and_get_response_for_xcvr_cmd(
-                "download_firmware", "status", "0", "XCVRD_DOWN_FW_CMD", "XCVRD_DOWN_FW_RSP", port, 1000, fwfile)
-
-            rc = res_dict[0]
+        delete_all_keys_in_db_table("STATE_DB", "XCVRD_DOWN_FW_RSP")
+        delete_all_keys_in_db_table("APPL_DB", "XCVRD_DOWN_FW_CMD")
 
-            delete_all_keys_in_db_table("STATE_DB", "XCVRD_DOWN_FW_RSP")
-            delete_all_keys_in_db_table("APPL_DB", "XCVRD_DOWN_FW_CMD")
+        for port in ports:
+            rc = res_dicts[port][0]
 
             port = platform_sfputil_helper.get_interface_alias(port, db)
 
@@ -1091,45 +968,18 @@ def activate(db, port, fwfile, nonhitless):
 
     elif port == "all":
 
-        logical_port_list = platform_sfputil_helper.get_logical_list()
-
         rc_exit = True
 
-        for port in logical_port_list:
-
-            if platform_sfputil is not None:
-                physical_port_list = platform_sfputil_helper.logical_port_name_to_physical_port_list(port)
+        ports = get_logical_ports_of_physical_ports()
+        res_dicts = update_and_get_responses_for_xcvr_cmd(
+            "activate_firmware", "status", "0", "XCVRD_ACTI_FW_CMD", None, "XCVRD_ACTI_FW_RSP", ports, 60, None, fwfile)
 
-            if not isinstance(physical_port_list, list):
-                continue
-            if len(physical_port_list) != 1:
-                continue
-
-            physical_port = physical_port_list[0]
-            logical_port_list_for_physical_port = platform_sfputil_helper.get_physical_to_logical()
-
-            logical_port_list_per_port = logical_port_list_for_physical_port.get(physical_port, None)
-
-            """ This check is required for checking whether or not this logical port is the one which is
-            actually mapped to physical port and by convention it is always the first port.
-            TODO: this should be removed with more logic to check which logical port maps to actual physical port
-            being used"""
-
-            if port != logical_port_list_per_port[0]:
-                continue
-
-            res_dict = {}
-
-            res_dict[0] = CONFIG_FAIL
-            res_dict[1] = "unknown"
-            res_dict = update_and_get_response_for_xcvr_cmd(
-                "activate_firmware", "status", "0", "XCVRD_ACTI_FW_CMD", None, "XCVRD_ACTI_FW_RSP", port, 60, None, fwfile)
-
-            delete_all_keys_in_db_table("STATE_DB", "XCVRD_ACTI_FW_RSP")
-            delete_all_keys_in_db_table("APPL_DB", "XCVRD_ACTI_FW_CMD")
-            delete_all_keys_in_db_table("APPL_DB", "XCVRD_ACTI_FW_CMD_ARG")
+        delete_all_keys_in_db_table("STATE_DB", "XCVRD_ACTI_FW_RSP")
+        delete_all_keys_in_db_table("APPL_DB", "XCVRD_ACTI_FW_CMD")
+        delete_all_keys_in_db_table("APPL_DB", "XCVRD_ACTI_FW_CMD_ARG")
 
-            rc = res_dict[0]
+        for port in ports:
+            rc = res_dicts[port][0]
 
             port = platform_sfputil_helper.get_interface_alias(port, db)
 
@@ -1177,44 +1027,17 @@ def rollback(db, port, fwfile):
 
     elif port == "all":
 
-        logical_port_list = platform_sfputil_helper.get_logical_list()
-
         rc_exit = True
 
-        for port in logical_port_list:
-
-            if platform_sfputil is not None:
-                physical_port_list = platform_sfputil_helper.logical_port_name_to_physical_port_list(port)
+        ports = get_logical_ports_of_physical_ports()
+        res_dicts = update_and_get_responses_for_xcvr_cmd(
+            "rollback_firmware", "status", "0", "XCVRD_ROLL_FW_CMD", None, "XCVRD_ROLL_FW_RSP", ports, 60, None, fwfile)
 
-            if not isinstance(physical_port_list, list):
-                continue
-            if len(physical_port_list) != 1:
-                continue
-
-            physical_port = physical_port_list[0]
-            logical_port_list_for_physical_port = platform_sfputil_helper.get_physical_to_logical()
-
-            logical_port_list_per_port = logical_port_list_for_physical_port.get(physical_port, None)
-
-            """ This check is required for checking whether or not this logical port is the one which is
-            actually mapped to physical port and by convention it is always the first port.
-            TODO: this should be removed with more logic to check which logical port maps to actual physical port
-            being used"""
-
-            if port != logical_port_list_per_port[0]:
-                continue
-
-            res_dict = {}
-
-            res_dict[0] = CONFIG_FAIL
-            res_dict[1] = "unknown"
-            res_dict = update_and_get_response_for_xcvr_cmd(
-                "rollback_firmware", "status", "0", "XCVRD_ROLL_FW_CMD", None, "XCVRD_ROLL_FW_RSP", port, 60, None, fwfile)
-
-            delete_all_keys_in_db_table("STATE_DB", "XCVRD_ROLL_FW_RSP")
-            delete_all_keys_in_db_table("APPL_DB", "XCVRD_ROLL_FW_CMD")
+        delete_all_keys_in_db_table("STATE_DB", "XCVRD_ROLL_FW_RSP")
+        delete_all_keys_in_db_table("APPL_DB", "XCVRD_ROLL_FW_CMD")
 
-            rc = res_dict[0]
+        for port in ports:
+            rc = res_dicts[port][0]
 
             port = platform_sfputil_helper.get_interface_alias(port, db)
 
@@ -2,12 +2,15 @@ import os
 import sys
 import json
 import re
+import threading
 import click
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tabulate import tabulate
 from sonic_py_common import multi_asic
 from utilities_common.constants import DEFAULT_NAMESPACE
 from dump.match_infra import RedisSource, JsonSource, MatchEngine, CONN
 from swsscommon.swsscommon import ConfigDBConnector, SonicDBConfig
+from utilities_common.bulk_db import hgetall_bulk
 from dump import plugins
 
 
@@ -50,7 +53,11 @@ def dump(ctx):
               help="Prints any intermediate output to stdout useful for dev & troubleshooting")
 @click.option('--namespace', '-n', default=DEFAULT_NAMESPACE, type=str,
               show_default=True, help='Dump the redis-state for this namespace.')
-def state(ctx, module, identifier, db, table, key_map, verbose, namespace):
+@click.option('--jobs', '-j', default=1, type=click.IntRange(min=1), show_default=True,
+              help='Number of identifiers to collect in parallel')
+@click.option('--ndjson', is_flag=True, default=False, show_default=True,
+              help='Print one JSON object per identifier as soon as it is collected')
+def state(ctx, module, identifier, db, table, key_map, verbose, namespace, jobs, ndjson):
     """
     Dump the current state of the identifier for the specified module from Redis DB or CONFIG_FILE
     """
@@ -69,6 +76,10 @@ def state(ctx, module, identifier, db, table, key_map, verbose, namespace):
         click.echo("No Matching Plugin has been Implemented")
         ctx.exit()
 
+    if ndjson and table:
+        click.echo("--ndjson option is not valid with --table")
+        ctx.exit()
+
     if verbose:
         os.environ["VERBOSE"] = "1"
     else:
@@ -76,50 +87,115 @@ def state(ctx, module, identifier, db, table, key_map, verbose, namespace):
 
     obj = plugins.dump_modules[module](ctx.obj)
 
-    if identifier == "all":
-        ids = obj.get_all_args(namespace)
-    else:
-        ids = identifier.split(",")
+    prefetch = ctx.obj.prefetch
+    if identifier == "all" or jobs > 1:
+        # Every id hits the same tables, read them whole once and share them among the workers
+        ctx.obj.prefetch = True
+        ctx.obj.table_cache.clear()
+
+    try:
+        if identifier == "all":
+            ids = obj.get_all_args(namespace)
+        else:
+            ids = identifier.split(",")
+
+        vid_cache = None
+        if ctx.obj.prefetch:
+            vid_cache = load_vid_cache(namespace, ctx.obj.conn_pool)
 
-    params = {}
-    collected_info = {}
-    params['namespace'] = namespace
-    for arg in ids:
-        params[plugins.dump_modules[module].ARG_NAME] = arg
+        results = execute_plugins(module, ids, namespace, ctx.obj, jobs, ordered=not ndjson)
         try:
-            collected_info[arg] = obj.execute(params)
+            if ndjson:
+                for arg, info in results:
+                    # Workers share the connectors with the main thread
+                    with ctx.obj.table_cache.lock:
+                        info = complete_info({arg: info}, module, db, key_map, namespace, ctx.obj, obj, vid_cache)
+                    click.echo(json.dumps(info))
+                return
+
+            collected_info = dict(results)
         except ValueError as err:
-            click.fail(f"Failed to execute plugin: {err}")
+            ctx.fail(f"Failed to execute plugin: {err}")
+
+        collected_info = complete_info(collected_info, module, db, key_map, namespace, ctx.obj, obj, vid_cache)
+        print_dump(collected_info, table, module, identifier, key_map)
+    finally:
+        # The match engine outlives the command, e.g. when the command is invoked again from tests
+        ctx.obj.prefetch = prefetch
+
+
+def execute_plugins(module, ids, namespace, match_engine, jobs=1, ordered=True):
+    """
+    Run the plugin for every id, on a pool of jobs threads sharing the match_engine.
+    Yields (id, collected info), in the order of ids if ordered, else as soon as an id is collected
+    """
+    arg_name = plugins.dump_modules[module].ARG_NAME
+    local = threading.local()
+
+    def run(arg):
+        # Plugins keep per-request state, every thread gets its own
+        if not hasattr(local, "obj"):
+            local.obj = plugins.dump_modules[module](match_engine)
+        return local.obj.execute({"namespace": namespace, arg_name: arg})
+
+    if jobs == 1:
+        for arg in ids:
+            yield arg, run(arg)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(run, arg): arg for arg in ids}
+        try:
+            if ordered:
+                for future, arg in futures.items():
+                    yield arg, future.result()
+            else:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
 
+def complete_info(collected_info, module, db, key_map, namespace, match_engine, obj, vid_cache=None):
+    """ Filter the collected info and fill in the vid to rid mappings and the fv-pairs """
     if len(db) > 0:
         collected_info = filter_out_dbs(db, collected_info)
 
-    vidtorid = extract_rid(collected_info, namespace, ctx.obj.conn_pool)
+    vidtorid = extract_rid(collected_info, namespace, match_engine.conn_pool, vid_cache)
 
     if not key_map:
-        collected_info = populate_fv(collected_info, module, namespace, ctx.obj.conn_pool, obj.return_pb2_obj())
+        collected_info = populate_fv(collected_info, module, namespace, match_engine.conn_pool, obj.return_pb2_obj(),
+                                     match_engine.table_cache)
 
     for id in vidtorid.keys():
         collected_info[id]["ASIC_DB"]["vidtorid"] = vidtorid[id]
+    return collected_info
 
-    print_dump(collected_info, table, module, identifier, key_map)
 
-    return
+def load_vid_cache(ns, conn_pool):
+    """ Read the whole VIDTORID map at once """
+    r = RedisSource(conn_pool)
+    r.connect("ASIC_DB", ns)
+    return r.get("ASIC_DB", "VIDTORID") or {}
 
 
-def extract_rid(info, ns, conn_pool):
+def extract_rid(info, ns, conn_pool, vid_cache=None):
     r = RedisSource(conn_pool)
     r.connect("ASIC_DB", ns)
     vidtorid = {}
-    vid_cache = {}  # Cache Entries to reduce number of Redis Calls
+    # A vid_cache passed in holds the whole VIDTORID map
+    complete = vid_cache is not None
+    if vid_cache is None:
+        vid_cache = {}  # Cache Entries to reduce number of Redis Calls
     for arg in info.keys():
-        mp = get_v_r_map(r, info[arg], vid_cache)
+        mp = get_v_r_map(r, info[arg], vid_cache, complete)
         if mp:
             vidtorid[arg] = mp
     return vidtorid
 
 
-def get_v_r_map(r, single_dict, vid_cache):
+def get_v_r_map(r, single_dict, vid_cache, complete=False):
     v_r_map = {}
     asic_obj_ptrn = "ASIC_STATE:.*:oid:0x\w{1,14}"
 
@@ -131,6 +207,9 @@ def get_v_r_map(r, single_dict, vid_cache):
                     vid = matches[0]
                     if vid in vid_cache:
                         rid = vid_cache[vid]
+                    elif complete:
+                        # vid_cache holds the whole VIDTORID map
+                        rid = None
                     else:
                         rid = r.hget("ASIC_DB", "VIDTORID", vid)
                         vid_cache[vid] = rid
@@ -149,7 +228,7 @@ def filter_out_dbs(db_list, collected_info):
     return collected_info
 
 
-def populate_fv(info, module, namespace, conn_pool, dash_object):
+def populate_fv(info, module, namespace, conn_pool, dash_object, table_cache=None):
     all_dbs = set()
     for id in info.keys():
         for db_name in info[id].keys():
@@ -166,6 +245,23 @@ def populate_fv(info, module, namespace, conn_pool, dash_object):
         redis_conn = conn_pool.cache.get(namespace, {}).get("DASH_"+CONN, None)
     db_conn = conn_pool.cache.get(namespace, {}).get(CONN, None)
 
+    # Read the fv-pairs of all the ids at once per DB, skipping what was already prefetched
+    db_fvs = {}
+    for db_name in all_dbs:
+        if db_name == "CONFIG_FILE" or (dash_object and db_name == "APPL_DB"):
+            continue
+        fvs = db_fvs[db_name] = {}
+        missing = []
+        for id in info.keys():
+            for key in info[id].get(db_name, {}).get("keys", []):
+                fv = table_cache.get_entry(namespace, db_name, key) if table_cache else None
+                if fv is not None:
+                    fvs[key] = dict(fv)
+                elif key not in fvs:
+                    fvs[key] = None
+                    missing.append(key)
+        fvs.update(hgetall_bulk(db_conn, db_name, missing))
+
     final_info = {}
     for id in info.keys():
         final_info[id] = {}
@@ -185,7 +281,7 @@ def populate_fv(info, module, namespace, conn_pool, dash_object):
                         print("Issue in importing dash module!")
                         return final_info
                 else:
-                    fv = db_conn.get_all(db_name, key)
+                    fv = db_fvs[db_name][key]
                 final_info[id][db_name]["keys"].append({key: fv})
     return final_info
 
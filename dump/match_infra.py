@@ -1,12 +1,14 @@
 import json
 import fnmatch
 import copy
+import threading
 from abc import ABC, abstractmethod
 from dump.helper import verbose_print
 from swsscommon.swsscommon import SonicV2Connector, SonicDBConfig
 from sonic_py_common import multi_asic
 from utilities_common.constants import DEFAULT_NAMESPACE
 from utilities_common.general import load_db_config
+from utilities_common.bulk_db import hgetall_bulk
 import redis
 
 
@@ -198,13 +200,86 @@ class RedisSource(SourceAdapter):
         return self.conn.get_all(db, key)
 
 
+class TableCache:
+    """ Whole tables prefetched per namespace and DB, shared across requests and threads """
+
+    def __init__(self):
+        # Serializes the redis reads of the sources sharing the cache, the connectors are not thread safe
+        self.lock = threading.RLock()
+        self.tables = {}  # (ns, db, table) -> keys of the table, in the order returned by redis
+        self.entries = {}  # (ns, db) -> {key: fv-pairs}
+
+    def clear(self):
+        self.tables.clear()
+        self.entries.clear()
+
+    def get_entry(self, ns, db, key):
+        """ Returns the fv-pairs of a prefetched key, None if the key was not prefetched """
+        return self.entries.get((ns, db), {}).get(key)
+
+
+class PrefetchRedisSource(RedisSource):
+    """
+    Redis Source Adaptor which answers from tables prefetched into a TableCache.
+    The first request on a table lists its keys and reads all of them with pipelined HGETALLs
+    """
+
+    def __init__(self, conn_pool, table_cache):
+        super().__init__(conn_pool)
+        self.table_cache = table_cache
+        self.ns = DEFAULT_NAMESPACE
+
+    def connect(self, db, ns):
+        self.ns = ns
+        with self.table_cache.lock:
+            return super().connect(db, ns)
+
+    def get_table(self, db, table):
+        cache_key = (self.ns, db, table)
+        keys = self.table_cache.tables.get(cache_key)
+        if keys is not None:
+            return keys
+        with self.table_cache.lock:
+            if cache_key not in self.table_cache.tables:
+                keys = self.conn.keys(db, table + self.get_separator(db) + "*") or []
+                entries = self.table_cache.entries.setdefault((self.ns, db), {})
+                entries.update(hgetall_bulk(self.conn, db, keys))
+                self.table_cache.tables[cache_key] = keys
+            return self.table_cache.tables[cache_key]
+
+    def getKeys(self, db, table, key_pattern):
+        keys = self.get_table(db, table)
+        prefix_len = len(table + self.get_separator(db))
+        kp = key_pattern.replace("[^", "[!")
+        return [key for key in keys if fnmatch.fnmatchcase(key[prefix_len:], kp)]
+
+    def get(self, db, key):
+        fv = self.table_cache.get_entry(self.ns, db, key)
+        if fv is None:
+            with self.table_cache.lock:
+                return super().get(db, key)
+        return dict(fv)
+
+    def hget(self, db, key, field):
+        fv = self.table_cache.get_entry(self.ns, db, key)
+        if fv is None:
+            with self.table_cache.lock:
+                return super().hget(db, key, field)
+        return fv.get(field)
+
+    def hgetall(self, db, key):
+        return self.get(db, key)
+
+
 class RedisPySource(SourceAdapter):
     """ Concrete Adaptor Class for connecting to APPL_DB using Redis library"""
 
-    def __init__(self, conn_pool, pb_obj):
+    def __init__(self, conn_pool, pb_obj, lock=None):
         self.conn = None
         self.pool = conn_pool
         self.pb_obj = pb_obj
+        # Guards the lazy connection init of a pool shared with other threads
+        self.lock = lock if lock else threading.RLock()
 
     def get_decoded_value(self, pb_obj, key_val):
         try:
@@ -217,7 +292,8 @@ class RedisPySource(SourceAdapter):
 
     def connect(self, db, ns):
         try:
-            self.conn = self.pool.get_dash_conn(ns)
+            with self.lock:
+                self.conn = self.pool.get_dash_conn(ns)
         except Exception as e:
             verbose_print("RedisPySource: Connection Failed\n" + str(e))
             return False
@@ -349,24 +425,31 @@ class MatchEngine:
     Usage Guidelines:
     1) Instantiate the class once for the entire execution,
                 to effectively use the caching of redis connection objects
+    2) Set prefetch when many requests are made on the same tables, eg: dump state <module> all.
+                Redis tables are then read whole once and the requests are answered from memory.
+                A prefetching engine can be shared by threads, each with its own plugin object
     """
-    def __init__(self, pool=None):
+    def __init__(self, pool=None, prefetch=False):
         if not isinstance(pool, ConnectionPool):
             self.conn_pool = ConnectionPool()
         else:
             self.conn_pool = pool
+        self.prefetch = prefetch
+        self.table_cache = TableCache()
 
     def clear_cache(self, ns):
         self.conn_pool(ns)
 
     def get_redis_source_adapter(self):
+        if self.prefetch:
+            return PrefetchRedisSource(self.conn_pool, self.table_cache)
         return RedisSource(self.conn_pool)
 
     def get_json_source_adapter(self):
         return JsonSource()
 
     def get_redis_py_adapter(self, pb_obj):
-        return RedisPySource(self.conn_pool, pb_obj)
+        return RedisPySource(self.conn_pool, pb_obj, self.table_cache.lock)
 
     def __get_source_adapter(self, req):
         src = None
@@ -1,21 +1,33 @@
 import copy
+import functools
 import json
 import subprocess
 import jsondiff
 import importlib
 import os
+import redis
 import tempfile
 import time
 from collections import defaultdict
-from swsscommon.swsscommon import ConfigDBConnector
+from swsscommon.swsscommon import ConfigDBConnector, SonicV2Connector
 from sonic_py_common import multi_asic
-from .gu_common import GenericConfigUpdaterError, genericUpdaterLogging
+from .gu_common import genericUpdaterLogging, get_config_db_reader
+from .gu_common import get_config_db_client, subscribe_config_db_keyspace
 from .gu_common import JsonChange
 
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 UPDATER_CONF_FILE = f"{SCRIPT_DIR}/gcu_services_validator.conf.json"
 logger = genericUpdaterLogging.get_logger(title="Change Applier")
 
+# Entries created in/removed from a table with a "consumer_ack" in UPDATER_CONF_FILE
+# are acknowledged by its consumer creating/removing the same key in the given table.
+# Fields set in a table with "consumer_fields" are acknowledged by its consumer writing
+# the same values in the given table. Other writes are waited on until their CONFIG_DB
+# keyspace notification is received, i.e. they were published to the consumers.
+# Each write is waited on for at most CONSUMER_ACK_TIMEOUT seconds from when it was written.
+CONSUMER_ACK_TIMEOUT = 5
+CONSUMER_ACK_POLL_INTERVAL = 0.05
+
 print_to_console = False
 
 
@@ -43,6 +55,10 @@ def get_config_db(scope=multi_asic.DEFAULT_NAMESPACE):
     return config_db
 
 
+def get_ack_db(scope=multi_asic.DEFAULT_NAMESPACE):
+    return SonicV2Connector(use_unix_socket_path=True, namespace=scope)
+
+
 def set_config(config_db, tbl, key, data):
     config_db.set_entry(tbl, key, data)
 
@@ -64,10 +80,14 @@ class DryRunChangeApplier:
 
     def __init__(self, config_wrapper):
         self.config_wrapper = config_wrapper
+        self.last_wait = 0
 
     def apply(self, current_configdb: dict, change: JsonChange) -> dict:
         return self.config_wrapper.apply_change_to_config_db(current_configdb, change)
 
+    def wait_for_consumers(self, tables=None):
+        return 0
+
     def remove_backend_tables_from_config(self, data):
         return data
 
@@ -76,7 +96,7 @@ class ChangeApplier:
 
     updater_conf = None
 
-    def __init__(self, scope=multi_asic.DEFAULT_NAMESPACE):
+    def __init__(self, scope=multi_asic.DEFAULT_NAMESPACE, config_wrapper=None):
         self.scope = scope
         self.config_db = get_config_db(self.scope)
         self.backend_tables = [
@@ -87,6 +107,20 @@ class ChangeApplier:
         if (not ChangeApplier.updater_conf) and os.path.exists(UPDATER_CONF_FILE):
             with open(UPDATER_CONF_FILE, "r") as s:
                 ChangeApplier.updater_conf = json.load(s)
+        # Written keys not yet acknowledged by their consumers,
+        # (tbl, key) -> (old entry, new entry, write time), entries are None if absent
+        self.pending_keys = {}
+        self.ack_db = None
+        self.ack_db_names = set()
+        # The YANG table dependencies tell which pending keys a change has to wait for
+        self.config_wrapper = config_wrapper
+        self.table_dependencies = None
+        # CONFIG_DB keyspace notifications, and the written "<tbl>|<key>" not notified yet
+        self.pubsub = None
+        self.watched = False
+        self.unnotified = set()
+        # Seconds the last applied change waited for the consumers of earlier changes
+        self.last_wait = 0
 
     def _invoke_cmd(self, cmd, old_cfg, upd_cfg, keys):
         # cmd is in the format as <package/module name>.<method name>
@@ -124,15 +158,147 @@ class ChangeApplier:
             log_debug("service invoked: {}".format(cmd))
         return 0
 
-    def _upd_data(self, tbl, run_tbl, upd_tbl, upd_keys):
-        for key in set(run_tbl.keys()).union(set(upd_tbl.keys())):
-            run_data = run_tbl.get(key, None)
-            upd_data = upd_tbl.get(key, None)
-
-            if run_data != upd_data:
-                set_config(self.config_db, tbl, key, upd_data)
+    def _get_upd_entries(self, run_data, upd_data):
+        entries = []
+        for tbl in sorted(set(run_data.keys()).union(set(upd_data.keys()))):
+            run_tbl = run_data.get(tbl, {})
+            upd_tbl = upd_data.get(tbl, {})
+            for key in set(run_tbl.keys()).union(set(upd_tbl.keys())):
+                run_entry = run_tbl.get(key, None)
+                upd_entry = upd_tbl.get(key, None)
+                if run_entry != upd_entry:
+                    entries.append((tbl, key, run_entry, upd_entry))
+        return entries
+
+    def _watch(self):
+        # Subscribed before the first write, so that no notification of a write is missed
+        self.watched = True
+        try:
+            self.pubsub = subscribe_config_db_keyspace(get_config_db_client(self.scope), self.scope)
+        except redis.RedisError as e:
+            log_error("Failed to subscribe to CONFIG_DB keyspace notifications: {}".format(e))
+        if self.pubsub is None:
+            log_error("No CONFIG_DB keyspace notifications, writes without a consumer acknowledgement "
+                      "are not waited on")
+
+    def _upd_data(self, entries, upd_keys):
+        if entries and not self.watched:
+            self._watch()
+        try:
+            for tbl, key, run_entry, upd_entry in entries:
+                set_config(self.config_db, tbl, key, upd_entry)
                 upd_keys[tbl][key] = {}
+                self.pending_keys[(tbl, key)] = (run_entry, upd_entry, time.time())
+                if self.pubsub is not None:
+                    self.unnotified.add(tbl + "|" + key)
                 log_debug("Patch affected tbl={} key={}".format(tbl, key))
+        finally:
+            if entries:
+                get_config_db_reader(self.scope).invalidate()
+
+    def _get_ack_db(self, db_name):
+        if self.ack_db is None:
+            self.ack_db = get_ack_db(self.scope)
+        if db_name not in self.ack_db_names:
+            self.ack_db.connect(db_name)
+            self.ack_db_names.add(db_name)
+        return self.ack_db
+
+    def _is_acked(self, ack, key, removed):
+        db_name = ack["db"]
+        ack_db = self._get_ack_db(db_name)
+        exists = ack_db.exists(db_name, ack["table"] + ack_db.get_db_separator(db_name) + key)
+        return bool(exists) != removed
+
+    def _has_fields(self, consumer, key, fields):
+        db_name = consumer["db"]
+        ack_db = self._get_ack_db(db_name)
+        entry = ack_db.get_all(db_name, consumer["table"] + ack_db.get_db_separator(db_name) + key) or {}
+        return all(entry.get(field) == value for field, value in fields.items())
+
+    def _is_notified(self, tbl, key):
+        if self.pubsub is None:
+            return True
+        try:
+            message = self.pubsub.get_message(timeout=0)
+            while message is not None:
+                if message["type"] == "pmessage":
+                    # __keyspace@4__:<tbl>|<key>
+                    self.unnotified.discard(message["channel"].split(":", 1)[1])
+                message = self.pubsub.get_message(timeout=0)
+        except redis.RedisError as e:
+            log_error("Lost CONFIG_DB keyspace notifications: {}".format(e))
+            self.pubsub = None
+            self.unnotified = set()
+            return True
+        return tbl + "|" + key not in self.unnotified
+
+    def _get_consumer_check(self, tbl, key, run_entry, upd_entry):
+        """
+        Returns a function telling if the consumer of the given write received it
+        """
+        conf = (ChangeApplier.updater_conf or {}).get("tables", {}).get(tbl, {})
+        ack = conf.get("consumer_ack")
+        # The key of the consumer tells an entry was created or removed, not that a change of its fields
+        # was consumed
+        if ack and (run_entry is None or upd_entry is None):
+            return functools.partial(self._is_acked, ack, key, upd_entry is None)
+        consumer = conf.get("consumer_fields")
+        if consumer and upd_entry:
+            # A removed field is given a default by the consumer, only the set ones can be compared
+            fields = {field: upd_entry[field] for field in consumer["fields"]
+                      if field in upd_entry and upd_entry[field] != (run_entry or {}).get(field)}
+            if fields:
+                return functools.partial(self._has_fields, consumer, key, fields)
+        return functools.partial(self._is_notified, tbl, key)
+
+    def _get_related_tables(self, tables):
+        # The tables a change of the given tables depends on, or that depend on it, None if unknown
+        if self.config_wrapper is None:
+            return None
+        if self.table_dependencies is None:
+            try:
+                self.table_dependencies = self.config_wrapper.get_yang_table_dependencies()
+            except Exception as e:
+                log_error("No YANG table dependencies, every change waits for all the earlier ones: {}".format(e))
+                self.config_wrapper = None
+                return None
+        return self.table_dependencies.get_validation_tables(tables)
+
+    def wait_for_consumers(self, tables=None):
+        """
+        Wait for the consumers of the pending writes, only of those the tables given depend on, or that
+        depend on them, if any. Returns the seconds waited.
+        """
+        related = None if tables is None else self._get_related_tables(tables)
+        waits = []
+        for (tbl, key), (run_entry, upd_entry, write_time) in list(self.pending_keys.items()):
+            if related is not None and tbl not in related:
+                continue
+            del self.pending_keys[(tbl, key)]
+            waits.append((tbl, key, write_time + CONSUMER_ACK_TIMEOUT,
+                          self._get_consumer_check(tbl, key, run_entry, upd_entry)))
+        if not waits:
+            return 0
+
+        start = time.time()
+        while True:
+            waits = [wait for wait in waits if not wait[3]()]
+            now = time.time()
+            timed_out = [(tbl, key) for tbl, key, deadline, _ in waits if now >= deadline]
+            if timed_out:
+                log_error("No consumer acknowledgement in {}s for: {}".format(
+                    CONSUMER_ACK_TIMEOUT, ", ".join(tbl + "|" + key for tbl, key in timed_out)))
+                for tbl, key in timed_out:
+                    self.unnotified.discard(tbl + "|" + key)
+                waits = [wait for wait in waits if now < wait[2]]
+            if not waits:
+                break
+            time.sleep(CONSUMER_ACK_POLL_INTERVAL)
+
+        waited = time.time() - start
+        log_debug("Waited {:.3f}s for consumers".format(waited))
+        return waited
 
     def _report_mismatch(self, run_data, upd_data):
         log_error("run_data vs expected_data: {}".format(
@@ -142,9 +308,17 @@ class ChangeApplier:
         run_data = current_configdb
         upd_data = prune_empty_table(change.apply(run_data, in_place=False))
         upd_keys = defaultdict(dict)
+        entries = self._get_upd_entries(run_data, upd_data)
 
-        for tbl in sorted(set(run_data.keys()).union(set(upd_data.keys()))):
-            self._upd_data(tbl, run_data.get(tbl, {}), upd_data.get(tbl, {}), upd_keys)
+        # There is a race condition between consecutive changes, as the
+        # config_db changes are consumed asynchronously. Wait for the
+        # consumers of the earlier changes this one depends on, or that
+        # depend on it, before writing it. Changes of independent tables
+        # are written without waiting, and share a later wait.
+        # PatchApplier waits for the last changes once all are applied.
+        self.last_wait = self.wait_for_consumers({tbl for tbl, _, _, _ in entries})
+
+        self._upd_data(entries, upd_keys)
 
         ret = self._services_validate(run_data, upd_data, upd_keys)
         # The above function returns 0 on success as it uses shell return codes
@@ -158,19 +332,6 @@ class ChangeApplier:
         # we expect since we have a known state we are mutating with a lock.
         # That said we are leaving in the final configuration comparison in
         # PatchApplier "just in case".
-        #
-        # However, this code did hide a pretty nasty race condition since there
-        # is no feedback loop for when config_db changes are actually consumed.
-        # This check would consume high CPU and would take a good amount of
-        # time (0.5s - 1s).
-        #
-        # The below sleep is functionally equivalent in terms of preventing the
-        # race condition (without the high CPU that might cause other control
-        # plane issues), but is of course not the proper fix.
-        #
-        # An upstream SONiC issue will be opened for the race condition, and
-        # until resolved leaving this comment in place for future reference.
-        time.sleep(1)
 
         # Interestingly this function returns the updated data and doesn't
         # propagate an error.  Maybe it should?  Or are exceptions thrown
@@ -2,16 +2,17 @@ import json
 import jsonpatch
 import jsonpointer
 import os
-import subprocess
+import time
 
 from datetime import datetime, timezone
 from enum import Enum
 from typing import IO, Optional
 from .gu_common import HOST_NAMESPACE, GenericConfigUpdaterError, EmptyTableError, ConfigWrapper, \
-                    DryRunConfigWrapper, JsonChange, PatchWrapper, genericUpdaterLogging
+                    DryRunConfigWrapper, JsonChange, PatchWrapper, genericUpdaterLogging, get_config_db_as_json
 from .patch_sorter import StrictPatchSorter, NonStrictPatchSorter, ConfigSplitter, \
                         TablesWithoutYangConfigSplitter, IgnorePathsFromYangConfigSplitter
 from .change_applier import ChangeApplier, DryRunChangeApplier
+from .plan_cache import PlanCache
 from sonic_py_common import multi_asic
 
 CHECKPOINTS_DIR = "/etc/sonic/checkpoints"
@@ -44,26 +45,13 @@ def extract_scope(path):
     return scope, remainder
 
 
-def get_cmd_output(cmd):
-    proc = subprocess.Popen(cmd, text=True, stdout=subprocess.PIPE)
-    return proc.communicate()[0], proc.returncode
-
-
 def get_config_json():
     scope_list = [multi_asic.DEFAULT_NAMESPACE]
     all_running_config = {}
     if multi_asic.is_multi_asic():
         scope_list.extend(multi_asic.get_namespace_list())
     for scope in scope_list:
-        command = ["sonic-cfggen", "-d", "--print-data"]
-        if scope != multi_asic.DEFAULT_NAMESPACE:
-            command += ["-n", scope]
-
-        running_config_text, returncode = get_cmd_output(command)
-        if returncode:
-            raise GenericConfigUpdaterError(
-                f"Fetch all runningconfiguration failed as output:{running_config_text}")
-        running_config = json.loads(running_config_text)
+        running_config = get_config_db_as_json(scope)
 
         if multi_asic.is_multi_asic():
             if scope == multi_asic.DEFAULT_NAMESPACE:
@@ -95,13 +83,22 @@ class PatchApplier:
                  changeapplier=None,
                  config_wrapper=None,
                  patch_wrapper=None,
-                 scope=multi_asic.DEFAULT_NAMESPACE):
+                 scope=multi_asic.DEFAULT_NAMESPACE,
+                 report_latency=False):
         self.scope = scope
+        self.report_latency = report_latency
         self.logger = genericUpdaterLogging.get_logger(title="Patch Applier", print_all_to_console=True)
         self.config_wrapper = config_wrapper if config_wrapper is not None else ConfigWrapper(scope=self.scope)
         self.patch_wrapper = patch_wrapper if patch_wrapper is not None else PatchWrapper(scope=self.scope)
         self.patchsorter = patchsorter if patchsorter is not None else StrictPatchSorter(self.config_wrapper, self.patch_wrapper)
-        self.changeapplier = changeapplier if changeapplier is not None else ChangeApplier(scope=self.scope)
+        self.changeapplier = changeapplier if changeapplier is not None else \
+            ChangeApplier(scope=self.scope, config_wrapper=self.config_wrapper)
+
+    def log_latency(self, message):
+        if self.report_latency:
+            self.logger.log_notice(message)
+        else:
+            self.logger.log_debug(message)
 
     def apply(self, patch, sort=True, trace_io: Optional[IO] = None):
         scope = self.scope if self.scope else HOST_NAMESPACE
@@ -145,9 +142,19 @@ class PatchApplier:
         self.logger.log_notice(f"{scope}: applying {changes_len} change{'s' if changes_len != 1 else ''} " \
                                f"in order{':' if changes_len > 0 else '.'}")
         current_config = old_config
-        for change in changes:
+        apply_start = time.time()
+        for index, change in enumerate(changes, 1):
             self.logger.log_notice(f"  * {change}")
+            change_start = time.time()
             current_config = self.changeapplier.apply(current_config, change)
+            self.log_latency(f"{scope}: change {index}/{changes_len} applied in {time.time() - change_start:.3f}s, "
+                             f"waited {self.changeapplier.last_wait:.3f}s for the consumers of earlier changes")
+
+        # Changes do not wait for their consumers unless a later change depends on them
+        waited = self.changeapplier.wait_for_consumers()
+        self.log_latency(f"{scope}: waited {waited:.3f}s for the consumers of the last changes, "
+                         f"{changes_len} change{'s' if changes_len != 1 else ''} applied and consumed "
+                         f"in {time.time() - apply_start:.3f}s")
 
         # Validate config updated successfully
         self.logger.log_notice(f"{scope}: verifying patch updates are reflected on ConfigDB.")
@@ -505,17 +512,21 @@ class GenericUpdateFactory:
         dry_run,
         ignore_non_yang_tables,
         ignore_paths,
+        plan_cache=False,
+        report_latency=False,
     ):
         self.init_verbose_logging(verbose)
         config_wrapper = self.get_config_wrapper(dry_run)
         change_applier = self.get_change_applier(dry_run, config_wrapper)
         patch_wrapper = PatchWrapper(config_wrapper, scope=self.scope)
-        patch_sorter = self.get_patch_sorter(ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper)
+        patch_sorter = self.get_patch_sorter(ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper,
+                                             PlanCache() if plan_cache else None)
         patch_applier = PatchApplier(config_wrapper=config_wrapper,
                                      patchsorter=patch_sorter,
                                      patch_wrapper=patch_wrapper,
                                      changeapplier=change_applier,
-                                     scope=self.scope)
+                                     scope=self.scope,
+                                     report_latency=report_latency)
 
         if config_format == ConfigFormat.CONFIGDB:
             pass
@@ -615,11 +626,12 @@ class GenericUpdateFactory:
         if dry_run:
             return DryRunChangeApplier(config_wrapper)
         else:
-            return ChangeApplier(scope=self.scope)
+            return ChangeApplier(scope=self.scope, config_wrapper=config_wrapper)
 
-    def get_patch_sorter(self, ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper):
+    def get_patch_sorter(self, ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper,
+                         plan_cache=None):
         if not ignore_non_yang_tables and not ignore_paths:
-            return StrictPatchSorter(config_wrapper, patch_wrapper)
+            return StrictPatchSorter(config_wrapper, patch_wrapper, plan_cache=plan_cache)
 
         inner_config_splitters = []
         if ignore_non_yang_tables:
@@ -630,7 +642,7 @@ class GenericUpdateFactory:
 
         config_splitter = ConfigSplitter(config_wrapper, inner_config_splitters)
 
-        return NonStrictPatchSorter(config_wrapper, patch_wrapper, config_splitter)
+        return NonStrictPatchSorter(config_wrapper, patch_wrapper, config_splitter, plan_cache=plan_cache)
 
 
 class GenericUpdater:
@@ -648,6 +660,8 @@ class GenericUpdater:
         ignore_paths,
         sort=True,
         trace_io: Optional[IO] = None,
+        plan_cache=False,
+        report_latency=False,
     ):
         patch_applier = self.generic_update_factory.create_patch_applier(
             config_format,
@@ -655,6 +669,8 @@ class GenericUpdater:
             dry_run,
             ignore_non_yang_tables,
             ignore_paths,
+            plan_cache=plan_cache,
+            report_latency=report_latency,
         )
         patch_applier.apply(patch, sort, trace_io=trace_io)
 
@@ -9,15 +9,23 @@ import copy
 import re
 import os
 import hashlib
+import threading
+import redis
+from swsscommon.swsscommon import SonicDBConfig
 from sonic_py_common import logger, multi_asic
+from utilities_common.general import atomic_write
 from enum import Enum
 from functools import cmp_to_key
 
 YANG_DIR = "/usr/local/yang-models"
+# The schema index of a YANG dir is persisted next to it, e.g. /usr/local/yang-models.gcu-index.json
+YANG_SCHEMA_INDEX_EXT = ".gcu-index.json"
+YANG_SCHEMA_INDEX_VERSION = 1
 SYSLOG_IDENTIFIER = "GenericConfigUpdater"
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 GCU_FIELD_OP_CONF_FILE = f"{SCRIPT_DIR}/gcu_field_operation_validators.conf.json"
 HOST_NAMESPACE = "localhost"
+CONFIG_DB_READ_BATCH_SIZE = 1024
 
 
 class GenericConfigUpdaterError(Exception):
@@ -29,6 +37,159 @@ class IllegalPatchOperationError(ValueError):
 class EmptyTableError(ValueError):
     pass
 
+
+_DIGEST_MASK = (1 << 128) - 1
+
+
+def _content_digest(value):
+    data = json.dumps(value, sort_keys=True).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=16).digest(), "big")
+
+
+class ConfigDigest:
+    """
+    An order independent content digest of a ConfigDB config.
+
+    Every <table>/<key> entry is digested on its own, the state of a table is the sum of the digests of its
+    entries, and the digest of the config is the sum of the digests of the table states. As the sums do not
+    depend on the order of the entries, a config modified under a few keys is digested by subtracting the old
+    digests of these keys and adding the new ones, instead of serializing the whole config again.
+    A table which is not a dict, or a config which is not a dict, is digested as a single value.
+    """
+    _known = threading.local()
+
+    def __init__(self, config=None):
+        # table name -> (is dict, sum of entry digests or digest of the table value)
+        self.tables = {}
+        self.value = 0
+        if config is not None:
+            self._load(config)
+
+    def _load(self, config):
+        if not isinstance(config, dict):
+            self.tables = None
+            self.value = _content_digest(config)
+            return
+        for name, table in config.items():
+            self.tables[name] = self._table_state(table)
+            self.value += self._table_digest(name, self.tables[name])
+        self.value &= _DIGEST_MASK
+
+    @staticmethod
+    def _entry_digest(key, entry):
+        return _content_digest([key, entry])
+
+    @staticmethod
+    def _table_state(table):
+        if not isinstance(table, dict):
+            return (False, _content_digest(table))
+        total = 0
+        for key, entry in table.items():
+            total += ConfigDigest._entry_digest(key, entry)
+        return (True, total & _DIGEST_MASK)
+
+    @staticmethod
+    def _table_digest(name, state):
+        return _content_digest([name, state[0], state[1]])
+
+    def touched_entries(self, config, paths_tokens):
+        """
+        Returns the digests of the entries of config which are under the given paths, it has to be called on
+        the config this digest was taken of before modifying it. The result is passed to updated().
+        None is returned if the whole config is modified.
+        """
+        if self.tables is None:
+            return None
+        touched = {}
+        for tokens in paths_tokens:
+            if not tokens:
+                return None
+            table_name = tokens[0]
+            if len(tokens) == 1:
+                touched[table_name] = None
+                continue
+            entries = touched.setdefault(table_name, {})
+            if entries is None:
+                continue
+            table = config.get(table_name)
+            key = tokens[1]
+            if not isinstance(table, dict):
+                touched[table_name] = None
+            elif key not in entries:
+                entries[key] = self._entry_digest(key, table[key]) if key in table else 0
+        return touched
+
+    def updated(self, config, touched):
+        """
+        Returns the digest of config, which is the config this digest was taken of after modifying
+        the touched entries.
+        """
+        if touched is None or self.tables is None or not isinstance(config, dict):
+            return ConfigDigest(config)
+
+        digest = ConfigDigest()
+        digest.tables = dict(self.tables)
+        value = self.value
+        for table_name, entries in touched.items():
+            old_state = self.tables.get(table_name)
+            if table_name not in config:
+                new_state = None
+            elif entries is None or old_state is None or not old_state[0] \
+                    or not isinstance(config[table_name], dict):
+                new_state = self._table_state(config[table_name])
+            else:
+                table = config[table_name]
+                total = old_state[1]
+                for key, old_entry_digest in entries.items():
+                    total -= old_entry_digest
+                    if key in table:
+                        total += self._entry_digest(key, table[key])
+                new_state = (True, total & _DIGEST_MASK)
+
+            if old_state is not None:
+                value -= self._table_digest(table_name, old_state)
+            if new_state is None:
+                digest.tables.pop(table_name, None)
+            else:
+                digest.tables[table_name] = new_state
+                value += self._table_digest(table_name, new_state)
+        digest.value = value & _DIGEST_MASK
+        return digest
+
+    def __eq__(self, other):
+        if isinstance(other, ConfigDigest):
+            return self.value == other.value
+        return False
+
+    def __hash__(self):
+        return hash(self.value)
+
+    @staticmethod
+    def remember(known_digests):
+        """
+        Lets of() reuse the digests of the given config objects in the current thread, instead of computing
+        them again. known_digests is a list of (config, digest) pairs, a digest may also be a function
+        computing it. The configs must not be modified while they are remembered.
+        """
+        ConfigDigest._known.digests = {id(config): [config, digest] for config, digest in known_digests}
+
+    @staticmethod
+    def forget():
+        ConfigDigest._known.digests = {}
+
+    @staticmethod
+    def of(config):
+        """
+        Returns the digest of config, reusing a remembered one if available.
+        """
+        known = getattr(ConfigDigest._known, "digests", {}).get(id(config))
+        if known is None or known[0] is not config:
+            return ConfigDigest(config)
+        if callable(known[1]):
+            known[1] = known[1]()
+        return known[1]
+
+
 class JsonChange:
     """
     A class that describes a partial change to a JSON object.
@@ -56,10 +217,7 @@ class JsonChange:
 
 
 def get_config_db_as_json(scope=None):
-    text = get_config_db_as_text(scope=scope)
-    config_db_json = json.loads(text)
-    config_db_json.pop("bgpraw", None)
-    return config_db_json
+    return get_config_db_reader(scope).get_config()
 
 
 def get_config_db_as_text(scope=None):
@@ -76,6 +234,387 @@ def get_config_db_as_text(scope=None):
     return text
 
 
+def get_config_db_client(scope=None):
+    namespace = scope if scope else multi_asic.DEFAULT_NAMESPACE
+    return redis.Redis(unix_socket_path=SonicDBConfig.getDbSock("CONFIG_DB", namespace),
+                       db=SonicDBConfig.getDbId("CONFIG_DB", namespace),
+                       decode_responses=True)
+
+
+def subscribe_config_db_keyspace(client, scope=None):
+    """
+    Subscribe to the keyspace notifications of CONFIG_DB with the given client, returns the subscription
+    once confirmed, or None if the notifications are not enabled.
+    """
+    namespace = scope if scope else multi_asic.DEFAULT_NAMESPACE
+    events = client.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+    # Keyspace events of hash and generic commands, or of all commands
+    if "K" not in events or not ("A" in events or ("h" in events and "g" in events)):
+        return None
+    pubsub = client.pubsub()
+    pubsub.psubscribe("__keyspace@{}__:*".format(SonicDBConfig.getDbId("CONFIG_DB", namespace)))
+    # Events are only guaranteed once the subscription is confirmed
+    message = pubsub.get_message(timeout=1)
+    if message and message["type"] == "psubscribe":
+        return pubsub
+    pubsub.close()
+    return None
+
+
+def raw_config_db_to_json(raw_entries, separator="|"):
+    """
+    Convert CONFIG_DB hashes to config_db.json format, as 'sonic-cfggen -d --print-data' prints them.
+    """
+    config_db_json = {}
+    for raw_key in sorted(raw_entries):
+        fvs = raw_entries[raw_key]
+        table, sep, key = raw_key.partition(separator)
+        # Keys without a table are not config, and keys removed while reading are gone
+        if not sep or not fvs:
+            continue
+        entry = {}
+        for field, value in fvs.items():
+            # "NULL": "NULL" is the placeholder of entries without fields
+            if field == "NULL":
+                continue
+            # Fields ending with '@' hold lists
+            if field.endswith("@"):
+                entry[field[:-1]] = value.split(",")
+            else:
+                entry[field] = value
+        config_db_json.setdefault(table, {})[key] = entry
+    return config_db_json
+
+
+class ConfigDbReader:
+    """
+    Reads CONFIG_DB in process with pipelined HGETALLs, instead of a sonic-cfggen
+    launch per read.
+
+    The snapshot read last is reused while CONFIG_DB is not modified, so the
+    reads done while validating, sorting and applying a patch share a single
+    one. Writes of this process drop the snapshot with invalidate(), as their
+    keyspace notifications may not have arrived by the next read. Writes of
+    other processes are watched with the keyspace notifications of CONFIG_DB,
+    subscribed to before reading. If notifications are not enabled, the
+    snapshot is never reused.
+    """
+    def __init__(self, scope=None):
+        self.scope = scope if scope else multi_asic.DEFAULT_NAMESPACE
+        self.client = None
+        self.pubsub = None
+        self.snapshot = None
+        self.lock = threading.Lock()
+
+    def _watch(self):
+        self._unwatch()
+        try:
+            self.pubsub = subscribe_config_db_keyspace(self.client, self.scope)
+        except redis.RedisError:
+            pass
+
+    def _unwatch(self):
+        if self.pubsub is not None:
+            try:
+                self.pubsub.close()
+            except redis.RedisError:
+                pass
+            self.pubsub = None
+
+    def is_modified(self):
+        """
+        Returns False only if CONFIG_DB was surely not modified since the snapshot was read
+        """
+        if self.snapshot is None or self.pubsub is None:
+            return True
+        modified = False
+        try:
+            message = self.pubsub.get_message(timeout=0)
+            while message is not None:
+                if message["type"] == "pmessage":
+                    modified = True
+                message = self.pubsub.get_message(timeout=0)
+        except redis.RedisError:
+            self._unwatch()
+            return True
+        return modified
+
+    def read(self):
+        """
+        Read a new snapshot of CONFIG_DB
+        """
+        if self.client is None:
+            self.client = get_config_db_client(self.scope)
+        self._watch()
+        # Config entries are hashes keyed <table>|<key>, skip the rest, e.g. CONFIG_DB_INITIALIZED
+        keys = [key for key in self.client.keys("*") if "|" in key]
+        raw_entries = {}
+        for start in range(0, len(keys), CONFIG_DB_READ_BATCH_SIZE):
+            batch = keys[start:start + CONFIG_DB_READ_BATCH_SIZE]
+            pipe = self.client.pipeline(transaction=False)
+            for key in batch:
+                pipe.hgetall(key)
+            for key, fvs in zip(batch, pipe.execute(raise_on_error=False)):
+                if isinstance(fvs, dict):
+                    raw_entries[key] = fvs
+        self.snapshot = raw_config_db_to_json(raw_entries)
+        return self.snapshot
+
+    def get_config(self):
+        """
+        Returns the CONFIG_DB config, read again only if it may have been modified
+        """
+        with self.lock:
+            if self.is_modified():
+                self.read()
+            return copy.deepcopy(self.snapshot)
+
+    def invalidate(self):
+        """
+        Drop the snapshot, to be called once this process wrote to CONFIG_DB
+        """
+        with self.lock:
+            self.snapshot = None
+
+
+_config_db_readers = {}
+
+
+def get_config_db_reader(scope=None):
+    scope = scope if scope else multi_asic.DEFAULT_NAMESPACE
+    if scope not in _config_db_readers:
+        _config_db_readers[scope] = ConfigDbReader(scope)
+    return _config_db_readers[scope]
+
+
+_yang_models_digests = {}
+
+
+def get_yang_models_digest(yang_dir):
+    """
+    Returns a digest of the content of the YANG models in yang_dir, or None if it has no models. The models are
+    only read again when their names, sizes or modification times change.
+    """
+    try:
+        file_names = sorted(name for name in os.listdir(yang_dir) if name.endswith(".yang"))
+        stats = [(name, os.stat(os.path.join(yang_dir, name))) for name in file_names]
+    except OSError:
+        stats = []
+    signature = [(name, stat.st_size, stat.st_mtime_ns) for name, stat in stats]
+
+    if not signature:
+        return None
+    cached = _yang_models_digests.get(yang_dir)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    for name, _ in stats:
+        try:
+            with open(os.path.join(yang_dir, name), "rb") as fh:
+                content = fh.read()
+        except OSError:
+            content = b""
+        digest.update(name.encode())
+        digest.update(hashlib.sha256(content).digest())
+    _yang_models_digests[yang_dir] = (signature, digest.hexdigest())
+    return digest.hexdigest()
+
+
+class YangSchemaIndex:
+    """
+    Schema level dependencies of the loaded YANG models, indexed by schema xpath: the leafrefs pointing to a
+    schema node or its descendants, and the number of must statements on them.
+
+    Looking these up walks the libyang schema. The index does it once per schema node and YANG model set: it
+    is persisted next to the YANG dir together with the digest of the models, and is discarded when the models
+    change. Without YANG models on disk, e.g. when sonic_yang is mocked, the index is only kept in memory.
+    ConfigDB paths are also mapped to their schema xpath once per process.
+    """
+    def __init__(self, sy, yang_dir):
+        self.sy = sy
+        self.path = yang_dir.rstrip("/") + YANG_SCHEMA_INDEX_EXT
+        self.digest = get_yang_models_digest(yang_dir)
+        self.entries = self._load()
+        self.dirty = False
+        self._schema_xpaths = {}
+
+    def _load(self):
+        if self.digest is None:
+            return {}
+        try:
+            with open(self.path) as fh:
+                index = json.loads(fh.read())
+            if index["version"] == YANG_SCHEMA_INDEX_VERSION and index["digest"] == self.digest:
+                return index["entries"]
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+        return {}
+
+    def save(self):
+        """
+        Persists the entries added since the index was loaded. A read-only file system only costs the
+        next process the schema walks again.
+        """
+        if not self.dirty or self.digest is None:
+            return
+        index = {"version": YANG_SCHEMA_INDEX_VERSION, "digest": self.digest, "entries": self.entries}
+        try:
+            with atomic_write(self.path) as fh:
+                fh.write(json.dumps(index))
+            self.dirty = False
+        except OSError:
+            pass
+
+    def get_schema_xpath(self, path):
+        """
+        Returns the schema xpath of a ConfigDB path, raises KeyError if the path has no YANG model.
+        """
+        if path not in self._schema_xpaths:
+            try:
+                self._schema_xpaths[path] = self.sy.configdb_path_to_xpath(path, schema_xpath=True)
+            except KeyError:
+                self._schema_xpaths[path] = None
+        xpath = self._schema_xpaths[path]
+        if xpath is None:
+            raise KeyError(path)
+        return xpath
+
+    def _get_entry(self, xpath):
+        entry = self.entries.get(xpath)
+        if entry is None:
+            entry = {"dependencies": list(self.sy.find_schema_dependencies(xpath, match_ancestors=True)),
+                     "musts": self.sy.find_schema_must_count(xpath, match_ancestors=True)}
+            self.entries[xpath] = entry
+            self.dirty = True
+        return entry
+
+    def get_dependencies(self, xpath):
+        """
+        Returns the schema xpaths of the leafrefs pointing to xpath or its descendants.
+        """
+        return self._get_entry(xpath)["dependencies"]
+
+    def get_backlink_count(self, xpath):
+        return len(self._get_entry(xpath)["dependencies"])
+
+    def get_must_count(self, xpath):
+        return self._get_entry(xpath)["musts"]
+
+
+class YangTableDependencies:
+    """
+    Table level dependencies between the ConfigDB tables, derived from the loaded YANG models.
+
+    A table depends on the tables its leafrefs point to, as reported by sonic_yang, and on every table named
+    in its module's must and when conditions. The latter over-approximates, but a missed dependency would let
+    a scoped validation accept an invalid config. Tables without a YANG model, or whose dependencies cannot be
+    found, are unknown and always need the whole config to be loaded.
+    """
+    def __init__(self, sy, schema_index=None):
+        self.references = {}
+        self.referenced_by = {}
+        self.unknown = set()
+
+        tables = set(sy.confDbYangMap)
+        for table in tables:
+            self.references.setdefault(table, set())
+            self.referenced_by.setdefault(table, set())
+        for table in tables:
+            try:
+                path = PathAddressing.create_path([table])
+                if schema_index is not None:
+                    xpath = schema_index.get_schema_xpath(path)
+                    ref_xpaths = schema_index.get_dependencies(xpath)
+                else:
+                    xpath = sy.configdb_path_to_xpath(path, schema_xpath=True)
+                    ref_xpaths = sy.find_schema_dependencies(xpath, match_ancestors=True)
+                yang_module = sy.confDbYangMap[table]["yangModule"]
+            except (KeyError, ValueError, sonic_yang.SonicYangException):
+                self.unknown.add(table)
+                continue
+
+            for ref_xpath in ref_xpaths:
+                ref_table = self._get_xpath_table(ref_xpath)
+                if ref_table not in tables:
+                    self.unknown.add(table)
+                elif ref_table != table:
+                    self.references[ref_table].add(table)
+                    self.referenced_by[table].add(ref_table)
+
+            for condition in self._get_conditions(yang_module):
+                for ref_table in set(re.findall(r"[A-Za-z0-9_]+", condition)) & tables - {table}:
+                    self.references[table].add(ref_table)
+                    self.referenced_by[ref_table].add(table)
+
+    @staticmethod
+    def _get_xpath_table(xpath):
+        # /sonic-vlan:sonic-vlan/sonic-vlan:VLAN_MEMBER/sonic-vlan:VLAN_MEMBER_LIST/sonic-vlan:port
+        tokens = xpath.split("/")
+        if len(tokens) < 3:
+            return None
+        return tokens[2].split(":")[-1]
+
+    @staticmethod
+    def _get_conditions(yang_json):
+        conditions = []
+        pending = [yang_json]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, list):
+                pending.extend(node)
+            elif isinstance(node, dict):
+                for key, value in node.items():
+                    if key in ["must", "when"]:
+                        for statement in (value if isinstance(value, list) else [value]):
+                            if isinstance(statement, dict):
+                                statement = statement.get("@condition", "")
+                            conditions.append(str(statement))
+                    else:
+                        pending.append(value)
+        return conditions
+
+    def _add_references(self, tables):
+        # Tables are only valid with all the tables they depend on, directly or not
+        closure = set(tables)
+        pending = list(tables)
+        while pending:
+            table = pending.pop()
+            if table not in self.references or table in self.unknown:
+                return None
+            for ref_table in self.references[table]:
+                if ref_table not in closure:
+                    closure.add(ref_table)
+                    pending.append(ref_table)
+        return frozenset(closure)
+
+    def get_validation_tables(self, changed_tables):
+        """
+        Returns the tables to load to validate a change of changed_tables, or None if the whole config has to
+        be loaded. The other tables are neither changed nor depend on a changed table.
+        """
+        tables = set()
+        for table in changed_tables:
+            if table not in self.referenced_by:
+                return None
+            tables.add(table)
+            tables.update(self.referenced_by[table])
+        return self._add_references(tables)
+
+    def get_reference_tables(self, paths_tokens):
+        """
+        Returns the tables to load to find the references to the given paths, or None if the whole config has
+        to be loaded.
+        """
+        tables = set()
+        for tokens in paths_tokens:
+            if not tokens or tokens[0] not in self.referenced_by:
+                return None
+            tables.add(tokens[0])
+            tables.update(self.referenced_by[tokens[0]])
+        return self._add_references(tables)
+
+
 class ConfigWrapper:
     def __init__(self, yang_dir=YANG_DIR, scope=multi_asic.DEFAULT_NAMESPACE):
         self.scope = scope
@@ -83,6 +622,10 @@ class ConfigWrapper:
         self.sonic_yang_with_loaded_models = None
         self._validate_config_cache = {}
         self._currently_loaded_hash = None
+        # Tables loaded by a scoped validation, None if the whole config is loaded
+        self._currently_loaded_tables = None
+        self._yang_table_dependencies = None
+        self._yang_schema_index = None
 
     def get_config_db_as_json(self):
         return get_config_db_as_json(self.scope)
@@ -140,13 +683,32 @@ class ConfigWrapper:
             return False, ex
 
     def validate_config_db_config(self, config_db_as_json):
+        return self._validate_config_db_config(config_db_as_json)
+
+    def validate_config_db_config_scoped(self, config_db_as_json, base_config_db_as_json, changed_tables):
+        """
+        Validates config_db_as_json, which differs from base_config_db_as_json only under changed_tables.
+        If the base config is valid, only the changed tables, the tables depending on them and the tables these
+        depend on are loaded into libyang, as the constraints of the other tables are not affected by the change.
+        Otherwise, or if the dependencies of a changed table are unknown, the whole config is validated.
+        """
+        tables = self.get_yang_table_dependencies().get_validation_tables(changed_tables)
+        if tables is None:
+            return self._validate_config_db_config(config_db_as_json)
+
+        base_valid, _ = self._validate_config_db_config(base_config_db_as_json)
+        if not base_valid:
+            return self._validate_config_db_config(config_db_as_json)
+
+        return self._validate_config_db_config(config_db_as_json, tables)
+
+    def _validate_config_db_config(self, config_db_as_json, tables=None):
         # Cache validation results by config content hash.
         # validate_config_db_config is a pure function: same config always produces
         # the same result. Caching avoids redundant loadData() calls when the DFS
         # revisits the same config state during backtracking.
-        _cache_key = hashlib.md5(
-            json.dumps(config_db_as_json, sort_keys=True).encode()
-        ).hexdigest()
+        # A scoped validation gives the same result as a full one, so they share the cache.
+        _cache_key = ConfigDigest.of(config_db_as_json).value
         if _cache_key in self._validate_config_cache:
             return self._validate_config_cache[_cache_key]
 
@@ -163,8 +725,12 @@ class ConfigWrapper:
             # antipattern). Real failures still surface via the returned
             # tuple / SonicYangException, so callers retain full error
             # signal -- only the duplicate syslog spam is silenced.
-            sy.loadData(config_db_as_json, quiet=True)
+            if tables is None:
+                sy.loadData(config_db_as_json, quiet=True)
+            else:
+                sy.loadData(self._get_tables(config_db_as_json, tables), quiet=True)
             self._currently_loaded_hash = _cache_key
+            self._currently_loaded_tables = tables
             for supplemental_yang_validator in supplemental_yang_validators:
                 success, error = supplemental_yang_validator(config_db_as_json)
                 if not success:
@@ -181,6 +747,47 @@ class ConfigWrapper:
         self._validate_config_cache[_cache_key] = result
         return result
 
+    @staticmethod
+    def _get_tables(config_db_as_json, tables):
+        return {table: config_db_as_json[table] for table in tables if table in config_db_as_json}
+
+    def is_config_loaded(self, config_db_as_json, tables=None):
+        """
+        Returns True if the given tables of config_db_as_json, or the whole config if tables is None, are
+        currently loaded into the sonic_yang instance.
+        """
+        if self._currently_loaded_hash is None \
+                or self._currently_loaded_hash != ConfigDigest.of(config_db_as_json).value:
+            return False
+        if self._currently_loaded_tables is None:
+            return True
+        return tables is not None and tables <= self._currently_loaded_tables
+
+    def load_config(self, config_db_as_json, tables=None):
+        """
+        Loads the given tables of config_db_as_json, or the whole config if tables is None, into the sonic_yang
+        instance unless they are already loaded.
+        """
+        if self.is_config_loaded(config_db_as_json, tables):
+            return
+        sy = self.create_sonic_yang_with_loaded_models()
+        self._currently_loaded_hash = None
+        sy.loadData(config_db_as_json if tables is None else self._get_tables(config_db_as_json, tables))
+        self._currently_loaded_hash = ConfigDigest.of(config_db_as_json).value
+        self._currently_loaded_tables = tables
+
+    def get_yang_table_dependencies(self):
+        if self._yang_table_dependencies is None:
+            schema_index = self.get_yang_schema_index()
+            self._yang_table_dependencies = YangTableDependencies(schema_index.sy, schema_index)
+            schema_index.save()
+        return self._yang_table_dependencies
+
+    def get_yang_schema_index(self):
+        if self._yang_schema_index is None:
+            self._yang_schema_index = YangSchemaIndex(self.create_sonic_yang_with_loaded_models(), self.yang_dir)
+        return self._yang_schema_index
+
     def validate_field_operation(self, old_config, target_config):
         """
         Some fields in ConfigDB are restricted and may not allow third-party addition, replacement, or removal.
@@ -558,17 +1165,13 @@ class PathAddressing:
         sy = self._create_sonic_yang_with_loaded_models()
 
         if reload_config:
-            _config_hash = hashlib.md5(
-                json.dumps(config, sort_keys=True).encode()
-            ).hexdigest()
-            already_loaded = (
-                self.config_wrapper is not None and
-                self.config_wrapper._currently_loaded_hash == _config_hash
-            )
-            if not already_loaded:
+            if self.config_wrapper is None:
                 sy.loadData(config)
-                if self.config_wrapper is not None:
-                    self.config_wrapper._currently_loaded_hash = _config_hash
+            else:
+                # References are leafrefs, only the tables which may hold them need to be loaded
+                tables = self.config_wrapper.get_yang_table_dependencies().get_reference_tables(
+                    [self.get_path_tokens(path) for path in (paths if isinstance(paths, list) else [paths])])
+                self.config_wrapper.load_config(config, tables)
 
         # Force to be a list
         if not isinstance(paths, list):
@@ -650,9 +1253,6 @@ class PathAddressing:
         position.
         """
 
-        if sy is None and self.config_wrapper is not None:
-            sy = self._create_sonic_yang_with_loaded_models()
-
         # Traverse configdb to find the right pointer
         ptr = configdb
         tokens = self.get_path_tokens(configdb_path)
@@ -664,13 +1264,17 @@ class PathAddressing:
         if self.config_wrapper is None:
             return [key for key in ptr]
 
+        schema_index = self.config_wrapper.get_yang_schema_index()
+        if sy is not None and sy is not schema_index.sy:
+            schema_index = YangSchemaIndex(sy, self.config_wrapper.yang_dir)
+
         keys = []
         # Enumerate all keys and retrieve backlinks, store in a list of dictionaries for sorting
         for key in ptr:
             tokens.append(key)
             path = self.create_path(tokens)
             try:
-                xpath = sy.configdb_path_to_xpath(path, schema_xpath=True)
+                xpath = schema_index.get_schema_xpath(path)
             except KeyError:
                 # Test cases use invalid tables, so we have to handle that even
                 # though it shouldn't be possible in live code as tables without
@@ -684,11 +1288,12 @@ class PathAddressing:
             else:
                 keys.append({
                             "key": key,
-                            "backlinks": len(sy.find_schema_dependencies(xpath, match_ancestors=True)),
-                            "musts": sy.find_schema_must_count(xpath, match_ancestors=True),
+                            "backlinks": schema_index.get_backlink_count(xpath),
+                            "musts": schema_index.get_must_count(xpath),
                             "nsep": str(key).count("|")
                             })
             tokens.pop()
+        schema_index.save()
 
         # Sort list of keys by count
         keys = sorted(keys, key=cmp_to_key(self.configdb_sort_cmp), reverse=reverse)
@@ -253,7 +253,7 @@ def validate_patch(patch_ops, all_running_config):
 def apply_patch_for_scope(scope_changes, results, config_format,
                           verbose, dry_run,
                           ignore_non_yang_tables, ignore_path,
-                          trace_io=None):
+                          trace_io=None, plan_cache=False, report_latency=False):
     """Apply a patch for a single ASIC scope and record the outcome in
     *results* (a shared dict)."""
     scope, changes = scope_changes
@@ -276,6 +276,8 @@ def apply_patch_for_scope(scope_changes, results, config_format,
             ignore_non_yang_tables,
             ignore_path,
             trace_io=trace_io,
+            plan_cache=plan_cache,
+            report_latency=report_latency,
         )
         results[scope_for_log] = {"success": True, "message": "Success"}
         logger.info("apply-patch succeeded for %s", scope_for_log)
@@ -295,7 +297,8 @@ def _apply_patch_wrapper(args):
 
 def apply_patch_from_file(patch_file_path, config_format_name, verbose,
                           dry_run, parallel, ignore_non_yang_tables,
-                          ignore_path, preprocess=True, trace_io=None):
+                          ignore_path, preprocess=True, trace_io=None,
+                          plan_cache=False, report_latency=False):
     """Read a JSON-Patch file and apply it — the single implementation
     used by all entry points.
 
@@ -319,6 +322,12 @@ def apply_patch_from_file(patch_file_path, config_format_name, verbose,
     trace_io : IO, optional
         Writable file-like object for writing the patch-sorter decision path
         trace as JSON.  ``None`` (default) disables tracing.
+    plan_cache : bool
+        If *True*, reuse the sorted plan cached on disk for the same patch
+        and relevant config, and cache newly sorted plans.
+    report_latency : bool
+        If *True*, report how long each change took to apply and to be
+        consumed.
 
     Raises
     ------
@@ -374,7 +383,8 @@ def apply_patch_from_file(patch_file_path, config_format_name, verbose,
         with concurrent.futures.ThreadPoolExecutor() as executor:
             arguments = [
                 (sc, results, config_format, verbose, dry_run,
-                 ignore_non_yang_tables, ignore_path, trace_io)
+                 ignore_non_yang_tables, ignore_path, trace_io, plan_cache,
+                 report_latency)
                 for sc in changes_by_scope.items()
             ]
             futures = [
@@ -387,7 +397,7 @@ def apply_patch_from_file(patch_file_path, config_format_name, verbose,
             apply_patch_for_scope(
                 scope_changes, results, config_format,
                 verbose, dry_run, ignore_non_yang_tables, ignore_path,
-                trace_io,
+                trace_io, plan_cache, report_latency,
             )
 
     # 5. Aggregate results
@@ -530,6 +540,8 @@ def apply_patch(args):
             ignore_path=args.ignore_path,
             preprocess=True,
             trace_io=trace_file,
+            plan_cache=getattr(args, 'plan_cache', False),
+            report_latency=getattr(args, 'report_latency', False),
         )
 
         print_success("Patch applied successfully.")
@@ -714,6 +726,14 @@ Examples:
         default=None,
         help='Filename to write decision path trace for patch generation as JSON',
     )
+    p.add_argument(
+        '-c', '--plan-cache', action='store_true',
+        help='Reuse and store sorted patch plans in the on-disk plan cache',
+    )
+    p.add_argument(
+        '-l', '--report-latency', action='store_true',
+        help='Report how long each change took to apply and to be consumed',
+    )
 
     # ---- replace ----
     p = subparsers.add_parser(
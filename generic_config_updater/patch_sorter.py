@@ -1,45 +1,96 @@
 import copy
 import json
 import jsonpatch
+import jsonpointer
 import sonic_yang
 from collections import deque, OrderedDict
 from enum import Enum
 from typing import Any, IO, List, Optional, Tuple
 from .gu_common import OperationWrapper, OperationType, GenericConfigUpdaterError, \
-                       JsonChange, PathAddressing, genericUpdaterLogging
+                       JsonChange, PathAddressing, genericUpdaterLogging, ConfigDigest
 
 class Diff:
     """
     A class that contains the diff info between current and target configs.
+
+    The content digests of the configs are computed on first use, then updated incrementally by apply_move
+    and undo_move. Hashing a diff produced by a move costs as much as digesting the keys the move touched.
     """
-    def __init__(self, current_config, target_config):
+    def __init__(self, current_config, target_config, current_digest=None, target_digest=None):
         self.current_config = current_config
         self.target_config = target_config
+        self._current_digest = current_digest
+        self._target_digest = target_digest
+
+    @property
+    def current_digest(self):
+        if self._current_digest is None:
+            self._current_digest = ConfigDigest(self.current_config)
+        return self._current_digest
+
+    @property
+    def target_digest(self):
+        if self._target_digest is None:
+            self._target_digest = ConfigDigest(self.target_config)
+        return self._target_digest
 
     def __hash__(self):
-        cc = json.dumps(self.current_config, sort_keys=True)
-        tc = json.dumps(self.target_config, sort_keys=True)
-        return hash((cc,tc))
+        return hash((self.current_digest.value, self.target_digest.value))
 
     def __eq__(self, other):
         """Overrides the default implementation"""
         if isinstance(other, Diff):
+            if self._digests_differ(other):
+                return False
             return self.current_config == other.current_config and self.target_config == other.target_config
 
         return False
 
-    # TODO: Can be optimized to apply the move in place. JsonPatch supports that using the option 'in_place=True'
-    # Check: https://python-json-patch.readthedocs.io/en/latest/tutorial.html#applying-a-patch
-    # NOTE: in case move is applied in place, we will need to support `undo_move` as well.
+    def _digests_differ(self, other):
+        # Only digests which were already computed are compared
+        for mine, others in [(self._current_digest, other._current_digest),
+                             (self._target_digest, other._target_digest)]:
+            if mine is not None and others is not None and mine != others:
+                return True
+        return False
+
+    # NOTE: moves are applied copy on write, the new diff shares all but the move path with this diff.
     def apply_move(self, move, in_place: bool = False):
+        touched = self._get_touched_entries(move)
         new_current_config = move.apply(self.current_config, in_place)
-        return Diff(new_current_config, self.target_config)
+        return self._new_diff(new_current_config, touched, in_place)
 
     def undo_move(self, move, in_place: bool = False):
+        touched = self._get_touched_entries(move)
         new_current_config = move.undo(self.current_config, in_place)
-        return Diff(new_current_config, self.target_config)
+        return self._new_diff(new_current_config, touched, in_place)
+
+    def get_simulated_digest(self, move, simulated_config):
+        """
+        Returns the digest of simulated_config, the result of applying move to current_config not in place.
+        """
+        touched = self.current_digest.touched_entries(self.current_config, move.get_modified_tokens())
+        return self.current_digest.updated(simulated_config, touched)
+
+    def _get_touched_entries(self, move):
+        # The digest is only kept up to date if it was needed for this diff already
+        if self._current_digest is None:
+            return None
+        return self._current_digest.touched_entries(self.current_config, move.get_modified_tokens())
+
+    def _new_diff(self, new_current_config, touched, in_place):
+        new_current_digest = None
+        if touched is not None:
+            new_current_digest = self._current_digest.updated(new_current_config, touched)
+        if in_place:
+            # current_config was modified, the old digest does not describe it anymore
+            self._current_digest = new_current_digest
+        return Diff(new_current_config, self.target_config, new_current_digest, self._target_digest)
 
     def has_no_diff(self):
+        if self._current_digest is not None and self._target_digest is not None \
+                and self._current_digest != self._target_digest:
+            return False
         return self.current_config == self.target_config
 
     def __str__(self):
@@ -50,6 +101,67 @@ target_config: {self.target_config}"""
         return str(self)
 
 
+def _get_container_index(container, token, allow_end: bool = False):
+    if isinstance(container, dict):
+        return token
+    if allow_end and token == "-":
+        return len(container)
+    # Only canonical list indices, as JsonPointer
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        return None
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        return None
+    return index
+
+
+def _apply_copy_on_write(config, tokens, op, value, in_place, copied):
+    """
+    Applies an add, replace or remove operation at the path of the given non-empty tokens, copying only the
+    containers on the path. The rest of the config is shared with the returned config, so once configs are
+    shared they must only be modified this way. Containers whose ids are in copied are modified in place,
+    containers copied here are added to it.
+    Returns None if the operation cannot be applied.
+    """
+    def get_copy(container):
+        if id(container) in copied:
+            return container
+        container = copy.copy(container)
+        copied[id(container)] = container
+        return container
+
+    if not isinstance(config, (dict, list)):
+        return None
+    root = config if in_place else get_copy(config)
+    parent = root
+    for token in tokens[:-1]:
+        index = _get_container_index(parent, token)
+        if index is None or (isinstance(parent, dict) and index not in parent) \
+                or not isinstance(parent[index], (dict, list)):
+            return None
+        parent[index] = get_copy(parent[index])
+        parent = parent[index]
+
+    index = _get_container_index(parent, tokens[-1], allow_end=(op == 'add'))
+    if index is None:
+        return None
+    if op == 'add':
+        if isinstance(parent, list):
+            parent.insert(index, value)
+        else:
+            parent[index] = value
+    elif op in ['replace', 'remove']:
+        if isinstance(parent, dict) and index not in parent:
+            return None
+        if op == 'replace':
+            parent[index] = value
+        else:
+            del parent[index]
+    else:
+        return None
+    return root
+
+
 class JsonMove:
     """
     A class similar to JsonPatch operation, but it allows the path to refer to non-existing middle elements.
@@ -67,6 +179,7 @@ class JsonMove:
     def __init__(self, diff, op_type, current_config_tokens, target_config_tokens=None):
         # Support for undo
         self.orig_value = None
+        self._path_tokens = None
 
         operation = self._to_jsonpatch_operation(diff, op_type, current_config_tokens, target_config_tokens)
         self.patch = jsonpatch.JsonPatch([operation])
@@ -97,12 +210,12 @@ class JsonMove:
         raise ValueError(f"OperationType {op_type} is not supported")
 
     @staticmethod
-    def _get_value(config, tokens):
+    def _get_value(config, tokens, copy_value: bool = True):
         for token in tokens:
             if isinstance(config, list):
                 token = int(token)
             config = config[token]
-        return copy.deepcopy(config)
+        return copy.deepcopy(config) if copy_value else config
 
     @staticmethod
     def _to_jsonpatch_add_operation(diff, current_config_tokens, target_config_tokens):
@@ -281,26 +394,55 @@ class JsonMove:
 
         return JsonMove(diff, op_type, current_config_tokens, target_config_tokens)
 
-    def apply(self, config, in_place: bool = False):
+    def apply(self, config, in_place: bool = False, copied=None):
+        """
+        Applies the move copying only the containers on the move path, the returned config shares the rest
+        with the given config. copied maps the ids of containers which were copied by the caller, e.g.
+        by an earlier move of the same group, to the containers; they are modified in place.
+        """
+        tokens = self._get_path_tokens()
         if self.op_type == OperationType.REMOVE or self.op_type == OperationType.REPLACE:
-            self.orig_value = JsonMove._get_value(config, sonic_yang.SonicYang.configdb_path_split(self.path))
+            # No need to copy as configs sharing the value never modify it
+            self.orig_value = JsonMove._get_value(config, tokens, copy_value=False)
 
-        return self.patch.apply(config, in_place=in_place)
+        return self._apply_operation(config, self.patch.patch[0], in_place, copied)
 
-    def undo(self, config, in_place: bool = False):
-        # Create new patch to undo previous application
+    def _get_path_tokens(self):
+        if self._path_tokens is None:
+            self._path_tokens = sonic_yang.SonicYang.configdb_path_split(self.path)
+        return self._path_tokens
+
+    def _apply_operation(self, config, operation, in_place, copied):
+        tokens = self._get_path_tokens()
+        if tokens:
+            updated_config = _apply_copy_on_write(config, tokens, operation['op'], operation.get('value'),
+                                                  in_place, {} if copied is None else copied)
+            if updated_config is not None:
+                return updated_config
+
+        # Whole config operations and invalid operations, which raise the JsonPatch errors
+        return jsonpatch.JsonPatch([operation]).apply(config, in_place=in_place and not tokens)
+
+    def get_modified_tokens(self):
+        """
+        Returns the tokens of the paths under which applying or undoing the move modifies the config.
+        """
+        return [PathAddressing().get_path_tokens(self.path)]
+
+    def undo(self, config, in_place: bool = False, copied=None):
+        # Create new operation to undo previous application
         if self.patch.patch[0]['op'] == 'add':
-            patch = jsonpatch.JsonPatch([{'op': 'remove', 'path': self.patch.patch[0]['path']}])
+            operation = {'op': 'remove', 'path': self.patch.patch[0]['path']}
         elif self.patch.patch[0]['op'] == 'replace':
-            patch = jsonpatch.JsonPatch([{
-                                        'op': 'replace',
-                                        'path': self.patch.patch[0]['path'],
-                                        'value': self.orig_value
-                                        }])
+            operation = {
+                            'op': 'replace',
+                            'path': self.patch.patch[0]['path'],
+                            'value': self.orig_value
+                        }
         elif self.patch.patch[0]['op'] == 'remove':
-            patch = jsonpatch.JsonPatch([{'op': 'add', 'path': self.patch.patch[0]['path'], 'value': self.orig_value}])
+            operation = {'op': 'add', 'path': self.patch.patch[0]['path'], 'value': self.orig_value}
 
-        return patch.apply(config, in_place=in_place)
+        return self._apply_operation(config, operation, in_place, copied)
 
     def __str__(self):
         return str(self.patch)
@@ -332,25 +474,30 @@ class JsonMoveGroup:
         self.patches.append(move)
 
     def apply(self, config, in_place: bool = False):
+        # Containers copied by a move are modified in place by the next moves
+        copied = {}
         update = config
-        for i, patch in enumerate(self.patches):
-            if i != 0:
-                in_place = True
-            update = patch.apply(update, in_place=in_place)
+        for patch in self.patches:
+            update = patch.apply(update, in_place=in_place, copied=copied)
             if update is None:
                 return None
         return update
 
     def undo(self, config, in_place: bool = False):
+        copied = {}
         update = config
-        for i, patch in enumerate(reversed(self.patches)):
-            if i != 0:
-                in_place = True
-            update = patch.undo(update, in_place=in_place)
+        for patch in reversed(self.patches):
+            update = patch.undo(update, in_place=in_place, copied=copied)
             if update is None:
                 return None
         return update
 
+    def get_modified_tokens(self):
+        modified_tokens = []
+        for patch in self.patches:
+            modified_tokens.extend(patch.get_modified_tokens())
+        return modified_tokens
+
     def get_jsonpatch(self):
         raw_patches = []
         for move in self.patches:
@@ -470,14 +617,20 @@ class MoveWrapper:
         # Generate simulated config once, not once per validator as this performs
         # a deep copy
         simulated_config = move.apply(diff.current_config)
-        for validator in self.move_validators:
-            success, errmsg = validator.validate(move, diff, simulated_config)
-            if not success:
-                error = f"{validator.__class__.__name__} failed"
-                if errmsg is not None:
-                    error += ": " + errmsg
-                return False, error
-        return True, None
+        # Validators key their caches by config digest, let them reuse the incrementally computed ones
+        ConfigDigest.remember([(diff.current_config, lambda: diff.current_digest),
+                               (simulated_config, lambda: diff.get_simulated_digest(move, simulated_config))])
+        try:
+            for validator in self.move_validators:
+                success, errmsg = validator.validate(move, diff, simulated_config)
+                if not success:
+                    error = f"{validator.__class__.__name__} failed"
+                    if errmsg is not None:
+                        error += ": " + errmsg
+                    return False, error
+            return True, None
+        finally:
+            ConfigDigest.forget()
 
     def simulate(self, move, diff, in_place: bool = False):
         return diff.apply_move(move, in_place)
@@ -866,11 +1019,25 @@ class DeleteWholeConfigMoveValidator:
 class FullConfigMoveValidator:
     """
     A class to validate that full config is valid according to YANG models after applying the move.
+
+    If scoped, only the tables affected by the move are loaded into libyang, given the current config is valid.
     """
-    def __init__(self, config_wrapper):
+    def __init__(self, config_wrapper, scoped: bool = False):
         self.config_wrapper = config_wrapper
+        self.scoped = scoped
 
     def validate(self, move, diff, simulated_config) -> Tuple[bool, Optional[str]]:
+        if self.scoped:
+            changed_tables = set()
+            for tokens in move.get_modified_tokens():
+                if not tokens:
+                    changed_tables = None
+                    break
+                changed_tables.add(tokens[0])
+            if changed_tables is not None:
+                return self.config_wrapper.validate_config_db_config_scoped(
+                    simulated_config, diff.current_config, changed_tables)
+
         is_valid, error = self.config_wrapper.validate_config_db_config(simulated_config)
         return is_valid, error
 
@@ -1050,8 +1217,8 @@ class NoDependencyMoveValidator:
         deleted_paths, added_paths = self._get_paths(diff.current_config, simulated_config, [])
 
         # Validate added_paths against simulated_config first: FullConfigMoveValidator has
-        # already loaded simulated_config into the sy singleton (via validate_config_db_config),
-        # so _currently_loaded_hash will match and find_ref_paths skips loadData.
+        # already loaded simulated_config, or the tables affected by the move, into the sy singleton
+        # (via validate_config_db_config), so find_ref_paths skips loadData if they cover the references.
         # Then validate deleted_paths against current_config (requires a fresh loadData).
         # This ordering gives 2 loadData calls instead of 3 for REPLACE operations.
         if not self._validate_paths_config(added_paths, simulated_config, reload_config=True,
@@ -2370,7 +2537,7 @@ class SortAlgorithmFactory:
                           DeleteInsteadOfReplaceMoveExtender(),
                           DeleteRefsMoveExtender(self.path_addressing)]
         move_validators = [DeleteWholeConfigMoveValidator(),
-                           FullConfigMoveValidator(self.config_wrapper),
+                           FullConfigMoveValidator(self.config_wrapper, scoped=True),
                            NoDependencyMoveValidator(self.path_addressing, self.config_wrapper),
                            CreateOnlyMoveValidator(self.path_addressing),
                            RequiredValueMoveValidator(self.path_addressing),
@@ -2392,11 +2559,12 @@ class SortAlgorithmFactory:
 
 
 class StrictPatchSorter:
-    def __init__(self, config_wrapper, patch_wrapper, inner_patch_sorter=None):
+    def __init__(self, config_wrapper, patch_wrapper, inner_patch_sorter=None, plan_cache=None):
         self.logger = genericUpdaterLogging.get_logger(title="Patch Sorter - Strict", print_all_to_console=True)
         self.config_wrapper = config_wrapper
         self.patch_wrapper = patch_wrapper
-        self.inner_patch_sorter = inner_patch_sorter if inner_patch_sorter else PatchSorter(config_wrapper, patch_wrapper)
+        self.inner_patch_sorter = inner_patch_sorter if inner_patch_sorter else \
+            PatchSorter(config_wrapper, patch_wrapper, plan_cache=plan_cache)
 
     def sort(self, patch, algorithm=Algorithm.DFS, trace_io: Optional[IO] = None):
         current_config = self.config_wrapper.get_config_db_as_json()
@@ -2586,13 +2754,15 @@ class ChangeWrapper:
         return adjusted_changes
 
 class NonStrictPatchSorter:
-    def __init__(self, config_wrapper, patch_wrapper, config_splitter, change_wrapper=None, patch_sorter=None):
+    def __init__(self, config_wrapper, patch_wrapper, config_splitter, change_wrapper=None, patch_sorter=None,
+                 plan_cache=None):
         self.logger = genericUpdaterLogging.get_logger(title="Patch Sorter - Non-Strict", print_all_to_console=True)
         self.config_wrapper = config_wrapper
         self.patch_wrapper = patch_wrapper
         self.config_splitter = config_splitter
         self.change_wrapper = change_wrapper if change_wrapper else ChangeWrapper(patch_wrapper, config_splitter)
-        self.inner_patch_sorter = patch_sorter if patch_sorter else PatchSorter(config_wrapper, patch_wrapper)
+        self.inner_patch_sorter = patch_sorter if patch_sorter else \
+            PatchSorter(config_wrapper, patch_wrapper, plan_cache=plan_cache)
 
     def sort(self, patch, algorithm=Algorithm.DFS, trace_io: Optional[IO] = None):
         current_config = self.config_wrapper.get_config_db_as_json()
@@ -2647,9 +2817,10 @@ class NonStrictPatchSorter:
         return changes
 
 class PatchSorter:
-    def __init__(self, config_wrapper, patch_wrapper, sort_algorithm_factory=None):
+    def __init__(self, config_wrapper, patch_wrapper, sort_algorithm_factory=None, plan_cache=None):
         self.config_wrapper = config_wrapper
         self.patch_wrapper = patch_wrapper
+        self.plan_cache = plan_cache
         self.operation_wrapper = OperationWrapper()
         self.path_addressing = PathAddressing(self.config_wrapper)
         self.sort_algorithm_factory = sort_algorithm_factory if sort_algorithm_factory else \
@@ -2660,6 +2831,19 @@ class PatchSorter:
         current_config = preloaded_current_config if preloaded_current_config else self.config_wrapper.get_config_db_as_json()
         target_config = self.patch_wrapper.simulate_patch(patch, current_config)
 
+        plan_key = None
+        if self.plan_cache is not None:
+            plan_key = self.plan_cache.get_key(patch, current_config, self.config_wrapper, algorithm.name)
+            # A trace needs the sorting to be done again
+            if trace_io is None:
+                changes = self.plan_cache.get(plan_key)
+                if changes is not None:
+                    if self._verify_plan(changes, current_config, target_config):
+                        self.logger.log_info(f"Using cached plan of {len(changes)} changes. "
+                                             f"Plan cache {self.plan_cache.get_stats()}")
+                        return changes
+                    self.plan_cache.reject(plan_key)
+
         diff = Diff(copy.deepcopy(current_config), target_config)
 
         sort_algorithm = self.sort_algorithm_factory.create(algorithm, path_trace=False if trace_io is None else True)
@@ -2673,4 +2857,39 @@ class PatchSorter:
 
         changes = [JsonChange(move.get_jsonpatch()) for move in moves]
 
+        if self.plan_cache is not None:
+            self.plan_cache.put(plan_key, changes)
+            self.logger.log_info(f"Plan cache {self.plan_cache.get_stats()}")
+
         return changes
+
+    def _verify_plan(self, changes, current_config, target_config):
+        """
+        Verifies a cached plan still takes current_config to target_config through valid configs. The plan was
+        sorted for the same config of the tables the patch can affect, so only the YANG validity of the steps is
+        checked again, and each step is validated only against the tables it changes.
+        """
+        config = current_config
+        for change in changes:
+            changed_tables = set()
+            for operation in change.patch:
+                tokens = PathAddressing.get_path_tokens(operation[OperationWrapper.PATH_KEYWORD])
+                if not tokens:
+                    changed_tables = None
+                    break
+                changed_tables.add(tokens[0])
+
+            try:
+                new_config = change.apply(config)
+            except (jsonpatch.JsonPatchException, jsonpointer.JsonPointerException):
+                return False
+
+            if changed_tables is None:
+                is_valid, _ = self.config_wrapper.validate_config_db_config(new_config)
+            else:
+                is_valid, _ = self.config_wrapper.validate_config_db_config_scoped(new_config, config, changed_tables)
+            if not is_valid:
+                return False
+            config = new_config
+
+        return self.patch_wrapper.verify_same_json(config, target_config)
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+
+import jsonpatch
+from utilities_common.general import atomic_write
+
+from .gu_common import JsonChange, PathAddressing, genericUpdaterLogging, get_yang_models_digest
+
+PLAN_CACHE_DIR = "/etc/sonic/gcu_plan_cache"
+PLAN_CACHE_MAX_ENTRIES = 512
+PLAN_EXT = ".plan.json"
+# Bump when the stored plan format, or the way plans are sorted, changes
+PLAN_CACHE_VERSION = 1
+
+
+class PlanCache:
+    """
+    On-disk cache of sorted patch plans i.e. the ordered list of JsonChange the patch sorter produced for a patch.
+
+    A plan is keyed by the patch, the YANG model set and the current config of the tables the patch can affect:
+    the patched tables, the tables depending on them and the tables these depend on. The rest of the config does
+    not take part in sorting the patch, so the same plan is reused on switches whose configs only differ there.
+
+    The cache holds at most max_entries plans, the least recently used plan is evicted first. A plan file's
+    modification time is its last use.
+
+    The cache is best-effort, failing to store or evict plans e.g. on a read-only or full /etc/sonic only logs
+    a warning.
+    """
+    def __init__(self, cache_dir=PLAN_CACHE_DIR, max_entries=PLAN_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.rejected = 0
+        self.logger = genericUpdaterLogging.get_logger(title="Plan Cache")
+
+    def get_key(self, patch, current_config, config_wrapper, algorithm_name=""):
+        operations = [dict(operation) for operation in patch]
+        changed_tables = set()
+        for operation in operations:
+            tokens = PathAddressing.get_path_tokens(operation["path"])
+            if not tokens:
+                changed_tables = None
+                break
+            changed_tables.add(tokens[0])
+
+        tables = None
+        if changed_tables is not None:
+            tables = config_wrapper.get_yang_table_dependencies().get_validation_tables(changed_tables)
+        if tables is None:
+            relevant_config = current_config
+        else:
+            relevant_config = {table: current_config[table] for table in tables if table in current_config}
+
+        content = [PLAN_CACHE_VERSION,
+                   algorithm_name,
+                   get_yang_models_digest(config_wrapper.yang_dir),
+                   operations,
+                   relevant_config]
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    def _get_plan_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{PLAN_EXT}")
+
+    def get(self, key):
+        """
+        Returns the cached list of JsonChange for key, or None if not cached.
+        """
+        path = self._get_plan_path(key)
+        try:
+            with open(path) as fh:
+                plan = json.loads(fh.read())
+            changes = [JsonChange(jsonpatch.JsonPatch(operations)) for operations in plan]
+            os.utime(path)
+        except (OSError, ValueError, TypeError, jsonpatch.JsonPatchException):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return changes
+
+    def put(self, key, changes):
+        plan = [change.patch.patch for change in changes]
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Written atomically, so that concurrent updaters never read a partial plan
+            with atomic_write(self._get_plan_path(key)) as fh:
+                fh.write(json.dumps(plan))
+        except OSError as ex:
+            self.logger.log_warning(f"Failed to store plan in {self.cache_dir}: {ex}")
+            return
+        self.stores += 1
+        self._evict()
+
+    def reject(self, key):
+        """
+        Removes the plan of key, after it failed verification.
+        """
+        self.rejected += 1
+        try:
+            os.remove(self._get_plan_path(key))
+        except OSError:
+            pass
+
+    def _get_entries(self):
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(PLAN_EXT):
+                path = os.path.join(self.cache_dir, file_name)
+                try:
+                    entries.append((os.stat(path).st_mtime_ns, path))
+                except OSError:
+                    pass
+        return entries
+
+    def _evict(self):
+        try:
+            entries = self._get_entries()
+        except OSError as ex:
+            self.logger.log_warning(f"Failed to list plans in {self.cache_dir}: {ex}")
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError as ex:
+                self.logger.log_warning(f"Failed to evict plan {path}: {ex}")
+
+    def get_stats(self):
+        try:
+            entries = len(self._get_entries())
+        except OSError:
+            entries = 0
+        return f"hits: {self.hits}, misses: {self.misses}, stores: {self.stores}, evictions: {self.evictions}, " \
+               f"rejected: {self.rejected}, entries: {entries}/{self.max_entries}"
@@ -6,11 +6,13 @@ import json
 import sys
 import traceback
 import re
+import time
 
 from sonic_py_common import device_info, logger
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector, SonicDBConfig
 from minigraph import parse_xml
 from utilities_common.helper import update_config
+from utilities_common.db_snapshot import DBSnapshot
 
 INIT_CFG_FILE = '/etc/sonic/init_cfg.json'
 MINIGRAPH_FILE = '/etc/sonic/minigraph.xml'
@@ -1492,16 +1494,75 @@ class DBMigrator():
         self.migrate_tacplus()
         self.migrate_aaa()
 
-    def migrate(self):
-        version = self.get_version()
-        log.log_info('Upgrading from version ' + version)
-        while version:
-            next_version = getattr(self, version)()
-            if next_version == version:
-                raise Exception('Version migrate from %s stuck in same version' % version)
-            version = next_version
-        # Perform common migration ops
-        self.common_migration_ops()
+    def _open_snapshots(self):
+        """
+        Point the migrator to in-memory snapshots of its databases.
+        :return list of (attribute name, real connector, snapshot)
+        """
+        snapshots = []
+        for attr, db_name in (('configDB', 'CONFIG_DB'), ('appDB', 'APPL_DB'),
+                              ('stateDB', 'STATE_DB'), ('loglevelDB', 'LOGLEVEL_DB')):
+            db = getattr(self, attr)
+            if db is None:
+                continue
+            snapshot = DBSnapshot(db, db_name)
+            setattr(self, attr, snapshot)
+            snapshots.append((attr, db, snapshot))
+        # Almost every migration step reads CONFIG_DB, read it all at once
+        self.configDB.load()
+        self._set_buffer_migrator_dbs()
+        return snapshots
+
+    def _close_snapshots(self, snapshots):
+        for attr, db, _ in snapshots:
+            setattr(self, attr, db)
+        self._set_buffer_migrator_dbs()
+
+    def _set_buffer_migrator_dbs(self):
+        if hasattr(self, 'mellanox_buffer_migrator'):
+            self.mellanox_buffer_migrator.configDB = self.configDB
+            self.mellanox_buffer_migrator.appDB = self.appDB
+            self.mellanox_buffer_migrator.stateDB = self.stateDB
+
+    def migrate(self, dry_run=False):
+        """
+        Run the migration steps from the current database version on in-memory snapshots of the
+        databases, then write the changes back with one transaction per database.
+        :param dry_run: print the changes and the time of each step instead of writing them
+        """
+        timings = []
+        snapshots = self._open_snapshots()
+        try:
+            version = self.get_version()
+            log.log_info('Upgrading from version ' + version)
+            while version:
+                start = time.monotonic()
+                next_version = getattr(self, version)()
+                timings.append((version, time.monotonic() - start))
+                if next_version == version:
+                    raise Exception('Version migrate from %s stuck in same version' % version)
+                version = next_version
+            # Perform common migration ops
+            start = time.monotonic()
+            self.common_migration_ops()
+            timings.append(('common_migration_ops', time.monotonic() - start))
+        finally:
+            self._close_snapshots(snapshots)
+
+        for step, elapsed in timings:
+            log.log_info('Migration step {} took {:.3f}s'.format(step, elapsed))
+
+        if dry_run:
+            for _, _, snapshot in snapshots:
+                for command in snapshot.get_diff():
+                    print('{} {}'.format(snapshot.db_name, ' '.join(command)))
+            for step, elapsed in timings:
+                print('{}: {:.3f}s'.format(step, elapsed))
+            return
+
+        for _, _, snapshot in snapshots:
+            commands = snapshot.commit()
+            log.log_info('Wrote {} changes to {}'.format(len(commands), snapshot.db_name))
 
 def main():
     try:
@@ -1529,6 +1590,10 @@ def main():
                         required = False,
                         help = 'The asic namespace whose DB instance we need to connect',
                         default = None )
+        parser.add_argument('--dry-run',
+                            dest='dry_run',
+                            action='store_true',
+                            help='with migrate: print the database changes and step timings, do not write them')
         args = parser.parse_args()
         operation = args.operation
         socket_path = args.socket
@@ -1548,7 +1613,10 @@ def main():
         else:
             dbmgtr = DBMigrator(namespace)
 
-        result = getattr(dbmgtr, operation)()
+        if operation == 'migrate':
+            result = dbmgtr.migrate(dry_run=args.dry_run)
+        else:
+            result = getattr(dbmgtr, operation)()
         if result:
             print(str(result))
 
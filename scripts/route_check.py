@@ -19,6 +19,11 @@ How:
     5) Rule out local interfaces & default routes
     6) If still outstanding diffs, report failure.
 
+    With --daemon, APPL-DB & ASIC-DB routes are read once and kept in sync
+    from subscriptions. Only changed prefixes are re-checked every interval,
+    a diff is reported once it persists for --mismatch_age seconds, and
+    a full resync runs every --resync_interval seconds.
+
 To verify:
     Run this tool in SONiC switch and watch the result. In case of failure
     checkout the result to validate the failure.
@@ -35,6 +40,7 @@ To verify:
 """
 
 import argparse
+import collections
 from enum import Enum
 import ipaddress
 import json
@@ -54,6 +60,7 @@ from swsscommon import swsscommon
 from utilities_common import chassis
 from sonic_py_common import multi_asic, device_info
 from utilities_common.general import load_db_config
+from utilities_common.prefix_set import PrefixSet, pack_prefix
 
 APPL_DB_NAME = 'APPL_DB'
 ASIC_DB_NAME = 'ASIC_DB'
@@ -62,6 +69,11 @@ ASIC_KEY_PREFIX = 'SAI_OBJECT_TYPE_ROUTE_ENTRY:'
 
 SUBSCRIBE_WAIT_SECS = 1
 
+# Daemon mode: full resync period and how long a mismatch must persist before it is reported
+DEFAULT_RESYNC_INTERVAL = 3600
+DEFAULT_MISMATCH_AGE = 30
+DAEMON_SELECT_TIMEOUT_MSECS = 1000
+
 # Max of 2 minutes on normal devices and 5 minutes on virtual chassis
 TIMEOUT_SECONDS = 120 if not device_info.is_virtual_chassis() else 360
 
@@ -83,6 +95,8 @@ FRR_WAIT_TIME = 15
 
 REDIS_TIMEOUT_MSECS = 0
 
+LINK_LOCAL_PREFIXES = PrefixSet(['169.254.0.0/16', 'fe80::/10'])
+
 
 class Level(Enum):
     ERR = 'ERR'
@@ -259,6 +273,16 @@ def checkout_rt_entry(k):
     return False, None
 
 
+def filter_out_link_local(rt):
+    """
+    helper to drop link local routes, in place.
+    :param rt: PrefixSet of routes
+    :return rt without the link local routes
+    """
+    rt.difference_update(rt.covered_by(LINK_LOCAL_PREFIXES))
+    return rt
+
+
 def get_subscribe_updates(selector, subs):
     """
     helper to collect subscribe messages for a period
@@ -294,52 +318,66 @@ def is_vrf(k):
     return k.startswith("Vrf")
 
 
+def checkout_appl_rt_entry(k):
+    """
+    helper to strip VRF name from APPL-DB:ROUTE_TABLE key and filter out local routes.
+    :param k: ROUTE_TABLE key to check as string
+    :return (True, prefix) or (False, None)
+    """
+    if is_vrf(k):
+        k = k.split(":", 1)[1]
+
+    if is_local(k):
+        return False, None
+    return True, add_prefix_ifnot(k.lower())
+
+
 def get_appdb_routes(namespace):
     """
     helper to read route table from APPL-DB.
-    :return list of sorted routes with prefix ensured
+    :return PrefixSet of routes, link local ones excluded
     """
     db = swsscommon.DBConnector(APPL_DB_NAME, REDIS_TIMEOUT_MSECS, True, namespace)
     print_message(syslog.LOG_DEBUG, "APPL DB connected for routes")
     tbl = swsscommon.Table(db, 'ROUTE_TABLE')
     keys = tbl.getKeys()
 
-    valid_rt = []
+    rt = PrefixSet()
     for k in keys:
-        if (is_vrf(k)):
-            k = k.split(":", 1)[1]
+        rt.add(k.split(":", 1)[1] if is_vrf(k) else k)
+    valid_rt = filter_out_link_local(rt)
 
-        if not is_local(k):
-            valid_rt.append(add_prefix_ifnot(k.lower()))
-
-    print_message(syslog.LOG_DEBUG, json.dumps({"ROUTE_TABLE": sorted(valid_rt)}, indent=4))
-    return sorted(valid_rt)
+    if syslog.LOG_DEBUG <= report_level:
+        print_message(syslog.LOG_DEBUG, json.dumps({"ROUTE_TABLE": valid_rt.to_list()}, indent=4))
+    return valid_rt
 
 
 def get_asicdb_routes(namespace):
     """
     helper to read present route entries from ASIC-DB and
     as well initiate selector for ASIC-DB:ASIC-state updates.
-    :return (selector,  subscriber, <list of sorted routes>)
+    :return (selector,  subscriber, <PrefixSet of routes>)
     """
     db = swsscommon.DBConnector(ASIC_DB_NAME, REDIS_TIMEOUT_MSECS, True, namespace)
     subs = swsscommon.SubscriberStateTable(db, ASIC_TABLE_NAME)
     print_message(syslog.LOG_DEBUG, "ASIC DB {} connected".format(namespace))
 
-    rt = []
+    rt = PrefixSet()
+    dest_offset = len(ASIC_KEY_PREFIX) + len('{"dest":"')
     while True:
         k, _, _ = subs.pop()
         if not k:
             break
-        res, e = checkout_rt_entry(k)
-        if res:
-            rt.append(e)
+        if k.startswith(ASIC_KEY_PREFIX):
+            rt.add(k[dest_offset:].split("\"", 1)[0])
+    rt = filter_out_link_local(rt)
 
-    print_message(syslog.LOG_DEBUG, json.dumps({"ASIC_ROUTE_ENTRY": sorted(rt)}, indent=4))
+    if syslog.LOG_DEBUG <= report_level:
+        print_message(syslog.LOG_DEBUG, json.dumps({"ASIC_ROUTE_ENTRY": rt.to_list()}, indent=4))
 
     selector = swsscommon.Select()
     selector.addSelectable(subs)
-    return (selector, subs, sorted(rt))
+    return (selector, subs, rt)
 
 
 def get_appdb_sids(namespace):
@@ -494,26 +532,25 @@ def get_frr_routes_parallel(namespace):
 def get_interfaces(namespace):
     """
     helper to read interface table from APPL-DB.
-    :return sorted list of IP addresses with added prefix
+    :return PrefixSet of interface IP addresses with host prefix
     """
     db = swsscommon.DBConnector(APPL_DB_NAME, REDIS_TIMEOUT_MSECS, True, namespace)
     print_message(syslog.LOG_DEBUG, "APPL DB connected for interfaces")
     tbl = swsscommon.Table(db, 'INTF_TABLE')
     keys = tbl.getKeys()
 
-    intf = []
+    intf = PrefixSet()
     for k in keys:
         lst = re.split(':', k.lower(), maxsplit=1)
         if len(lst) == 1:
             # No IP address in key; ignore
             continue
 
-        ip = add_prefix(lst[1].split("/", -1)[0])
-        if not is_local(ip):
-            intf.append(ip)
+        intf.add(lst[1].split("/", -1)[0])
+    intf = filter_out_link_local(intf)
 
-    print_message(syslog.LOG_DEBUG, json.dumps({"APPL_DB_INTF": sorted(intf)}, indent=4))
-    return sorted(intf)
+    print_message(syslog.LOG_DEBUG, json.dumps({"APPL_DB_INTF": intf.to_list()}, indent=4))
+    return intf
 
 
 def is_point_to_point_prefix(prefix):
@@ -667,12 +704,12 @@ def filter_out_vnet_routes(namespace, routes):
 
     vnet_routes_db_keys = vnet_route_table.getKeys() + vnet_route_tunnel_table.getKeys()
 
-    vnet_routes = []
+    vnet_routes = set()
 
     for vnet_route_db_key in vnet_routes_db_keys:
         vnet_route_attrs = vnet_route_db_key.split(':', 1)
         vnet_route = vnet_route_attrs[1]
-        vnet_routes.append(vnet_route)
+        vnet_routes.add(vnet_route)
 
     updated_routes = []
 
@@ -699,7 +736,7 @@ def filter_out_standalone_tunnel_routes(namespace, routes):
     app_db = swsscommon.DBConnector('APPL_DB', REDIS_TIMEOUT_MSECS, True, namespace)
     neigh_table = swsscommon.Table(app_db, 'NEIGH_TABLE')
     neigh_keys = neigh_table.getKeys()
-    standalone_tunnel_route_ips = []
+    standalone_tunnel_route_ips = set()
     updated_routes = []
 
     for neigh in neigh_keys:
@@ -707,7 +744,7 @@ def filter_out_standalone_tunnel_routes(namespace, routes):
         if mac == '00:00:00:00:00:00':
             # remove preceding 'VlanXXXX' to get just the neighbor IP
             neigh_ip = ':'.join(neigh.split(':')[1:])
-            standalone_tunnel_route_ips.append(neigh_ip)
+            standalone_tunnel_route_ips.add(neigh_ip)
 
     if not standalone_tunnel_route_ips:
         return routes
@@ -836,7 +873,7 @@ def filter_out_soc_ip_routes(namespace, routes):
     if not is_dualtor(config_db):
         return routes
 
-    soc_ips = get_soc_ips(config_db)
+    soc_ips = set(get_soc_ips(config_db))
 
     if not soc_ips:
         return routes
@@ -930,17 +967,17 @@ def check_routes_for_namespace(namespace):
     intf_appl = get_interfaces(namespace)
 
     # Diff APPL-DB routes & ASIC-DB routes
-    rt_appl_miss, rt_asic_miss = diff_sorted_lists(rt_appl, rt_asic)
+    rt_appl_miss = (rt_appl - rt_asic).to_list()
 
     # Check missed ASIC routes against APPL-DB INTF_TABLE
-    _, rt_asic_miss = diff_sorted_lists(intf_appl, rt_asic_miss)
+    rt_asic_miss = (rt_asic - rt_appl - intf_appl).to_list()
     rt_asic_miss = filter_out_default_routes(rt_asic_miss)
     rt_asic_miss = filter_out_vnet_routes(namespace, rt_asic_miss)
     rt_asic_miss = filter_out_standalone_tunnel_routes(namespace, rt_asic_miss)
     rt_asic_miss = filter_out_soc_ip_routes(namespace, rt_asic_miss)
 
     # Check APPL-DB INTF_TABLE with ASIC table route entries
-    intf_appl_miss, _ = diff_sorted_lists(intf_appl, rt_asic)
+    intf_appl_miss = (intf_appl - rt_asic).to_list()
 
     if rt_appl_miss:
         rt_appl_miss = filter_out_local_interfaces(namespace, rt_appl_miss)
@@ -963,10 +1000,10 @@ def check_routes_for_namespace(namespace):
     del selector
 
     # Drop all those for which SET received
-    rt_appl_miss, _ = diff_sorted_lists(rt_appl_miss, adds)
+    rt_appl_miss = (PrefixSet(rt_appl_miss) - PrefixSet(adds)).to_list()
 
     # Drop all those for which DEL received
-    rt_asic_miss, _ = diff_sorted_lists(rt_asic_miss, deletes)
+    rt_asic_miss = (PrefixSet(rt_asic_miss) - PrefixSet(deletes)).to_list()
 
     # Filter local p2p IPs if any that are reported as missing in APPL_DB
     if rt_appl_miss:
@@ -1125,6 +1162,293 @@ def check_sids(namespace):
         return 0, None
 
 
+class RouteTracker:
+    """
+    Incrementally tracked view of APPL-DB:ROUTE_TABLE & ASIC-DB route entries
+    for a single namespace, used by daemon mode. Routes are counted by their
+    packed prefix key, as a route may be present in more than one VRF.
+
+    Both tables are read once through SubscriberStateTable and then kept in
+    sync from the subscription notifications. Only prefixes touched by a
+    notification are re-checked; a mismatch is reported once it has persisted
+    for the configured mismatch age, which replaces the fixed subscribe window
+    used by the one-shot check.
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.appl_keys = {}
+        self.asic_keys = {}
+        self.rt_appl = collections.Counter()
+        self.rt_asic = collections.Counter()
+        self.dirty = set()
+        self.pending = {}
+        self.intf_pending = {}
+        self.selector = None
+        self.appl_subs = None
+        self.asic_subs = None
+
+    def close(self):
+        """
+        Release the subscribers so that redis does not queue updates for them.
+        """
+        self.selector = None
+        self.appl_subs = None
+        self.asic_subs = None
+
+    def resync(self):
+        """
+        Rebuild both route sets from scratch.
+        Prefixes that differ after the rebuild, or had a pending mismatch
+        before it, are marked for re-check; pending ages are preserved.
+        """
+        self.close()
+        self.appl_keys.clear()
+        self.asic_keys.clear()
+        self.rt_appl.clear()
+        self.rt_asic.clear()
+
+        appl_db = swsscommon.DBConnector(APPL_DB_NAME, REDIS_TIMEOUT_MSECS, True, self.namespace)
+        self.appl_subs = swsscommon.SubscriberStateTable(appl_db, 'ROUTE_TABLE')
+        asic_db = swsscommon.DBConnector(ASIC_DB_NAME, REDIS_TIMEOUT_MSECS, True, self.namespace)
+        self.asic_subs = swsscommon.SubscriberStateTable(asic_db, ASIC_TABLE_NAME)
+        print_message(syslog.LOG_DEBUG, "APPL & ASIC DB {} subscribed for routes".format(self.namespace))
+
+        self.drain()
+
+        self.selector = swsscommon.Select()
+        self.selector.addSelectable(self.appl_subs)
+        self.selector.addSelectable(self.asic_subs)
+
+        self.dirty = set(self.pending)
+        self.dirty.update(p for p in self.rt_appl if p not in self.rt_asic)
+        self.dirty.update(p for p in self.rt_asic if p not in self.rt_appl)
+        print_message(syslog.LOG_INFO, "Resynced routes for namespace {}: appl={} asic={}".format(
+            self.namespace, len(self.appl_keys), len(self.asic_keys)))
+
+    @staticmethod
+    def _update(keys, counter, dirty, key, op, prefix):
+        """
+        helper to apply one notification to a key map & its prefix counter.
+        """
+        old = keys.pop(key, None)
+        if old is not None:
+            counter[old] -= 1
+            if counter[old] <= 0:
+                del counter[old]
+            dirty.add(old)
+        if op == "SET":
+            keys[key] = prefix
+            counter[prefix] += 1
+            dirty.add(prefix)
+
+    def drain(self):
+        """
+        Pop all queued notifications from both subscribers.
+        :return number of route notifications applied
+        """
+        cnt = 0
+        while True:
+            key, op, _ = self.appl_subs.pop()
+            if not key:
+                break
+            res, e = checkout_appl_rt_entry(key)
+            if res:
+                self._update(self.appl_keys, self.rt_appl, self.dirty, key, op, pack_prefix(e))
+                cnt += 1
+
+        while True:
+            key, op, _ = self.asic_subs.pop()
+            if not key:
+                break
+            res, e = checkout_rt_entry(key)
+            if res:
+                self._update(self.asic_keys, self.rt_asic, self.dirty, key, op, pack_prefix(e))
+                cnt += 1
+        return cnt
+
+    def poll(self, timeout_ms):
+        """
+        Wait up to timeout_ms for notifications and apply them.
+        :return number of route notifications applied
+        """
+        self.selector.select(timeout_ms)
+        return self.drain()
+
+    @staticmethod
+    def _age(pending, current, now, mismatch_age):
+        """
+        helper to age mismatches.
+        :param pending: dict of mismatch -> first seen time, updated in place
+        :param current: mismatches observed now
+        :return list of mismatches older than mismatch_age
+        """
+        for e in list(pending):
+            if e not in current:
+                del pending[e]
+        for e in current:
+            pending.setdefault(e, now)
+        return [e for e, t in pending.items() if now - t >= mismatch_age]
+
+    def check(self, now, mismatch_age):
+        """
+        Re-check the prefixes changed since the last check and report the
+        mismatches that have aged out, with the same filters as the one-shot check.
+        :return dict of unjustifiable entries; empty if all good
+        """
+        intf_set = get_interfaces(self.namespace).keys()
+        intf_miss = [ip for ip in intf_set if ip not in self.rt_asic]
+        intf_appl_miss = PrefixSet.from_keys(self._age(self.intf_pending, intf_miss, now, mismatch_age)).to_list()
+
+        def is_mismatch(p):
+            # ASIC route entries of local interfaces have no APPL-DB route
+            if p in self.rt_appl:
+                return p not in self.rt_asic
+            return p in self.rt_asic and p not in intf_set
+
+        mismatched = {p for p in self.pending if is_mismatch(p)}
+        mismatched.update(p for p in self.dirty if is_mismatch(p))
+        self.dirty.clear()
+        aged = self._age(self.pending, mismatched, now, mismatch_age)
+
+        results = {}
+        rt_appl_miss = PrefixSet.from_keys(p for p in aged if p in self.rt_appl).to_list()
+        rt_asic_miss = PrefixSet.from_keys(p for p in aged if p in self.rt_asic).to_list()
+
+        if rt_asic_miss:
+            rt_asic_miss = filter_out_default_routes(rt_asic_miss)
+            rt_asic_miss = filter_out_vnet_routes(self.namespace, rt_asic_miss)
+            rt_asic_miss = filter_out_standalone_tunnel_routes(self.namespace, rt_asic_miss)
+            rt_asic_miss = filter_out_soc_ip_routes(self.namespace, rt_asic_miss)
+
+        if rt_appl_miss:
+            rt_appl_miss = filter_out_local_interfaces(self.namespace, rt_appl_miss)
+
+        if rt_appl_miss:
+            rt_appl_miss = filter_out_voq_neigh_routes(self.namespace, rt_appl_miss)
+
+        if rt_appl_miss or rt_asic_miss:
+            rt_appl_miss, rt_asic_miss = filter_out_vlan_neigh_route_miss(self.namespace, rt_appl_miss, rt_asic_miss)
+
+        if rt_appl_miss:
+            rt_appl_miss = filter_out_local_p2p_ips(self.namespace, rt_appl_miss)
+
+        if rt_appl_miss:
+            results["missed_ROUTE_TABLE_routes"] = rt_appl_miss
+
+        if intf_appl_miss:
+            results["missed_INTF_TABLE_entries"] = intf_appl_miss
+
+        if rt_asic_miss:
+            results["Unaccounted_ROUTE_ENTRY_TABLE_entries"] = rt_asic_miss
+
+        return results
+
+    def check_frr(self):
+        """
+        FRR does not publish offload state changes, so its pending routes
+        are re-read on every full resync only.
+        :return dict of FRR related failures; empty if all good
+        """
+        results = {}
+        rt_frr_miss, rt_frr_failed = check_frr_pending_routes(self.namespace)
+
+        if rt_frr_miss:
+            results["missed_FRR_routes"] = rt_frr_miss
+
+        if rt_frr_failed:
+            results["failed_FRR_routes"] = rt_frr_failed
+
+        if rt_frr_miss and not self.pending:
+            print_message(syslog.LOG_ERR, "Some routes are not set offloaded in FRR{} \
+                          but all routes in APPL_DB and ASIC_DB are in sync".format(self.namespace))
+            if is_suppress_fib_pending_enabled(self.namespace):
+                mitigate_installed_not_offloaded_frr_routes(self.namespace, rt_frr_miss,
+                                                            PrefixSet.from_keys(self.rt_appl))
+        if rt_frr_failed:
+            print_message(syslog.LOG_ERR, "Some routes have failed state in FRR {} \
+                          : {}".format(self.namespace, rt_frr_failed))
+
+        return results
+
+
+def resync_tracker(tracker):
+    """
+    helper to fully resync a tracker and then re-read FRR pending routes.
+    :return FRR related failures of the tracker's namespace
+    """
+    tracker.resync()
+    return tracker.check_frr()
+
+
+def run_daemon(namespace, interval, resync_interval, mismatch_age):
+    """
+    Long running incremental check.
+    Route sets are built once per namespace and kept in sync from
+    subscriptions; a full resync (including FRR & SIDs) runs every
+    resync_interval seconds and changed prefixes are re-checked every
+    interval seconds.
+    :return (ret, res) of the last check; only returns in unit testing
+    """
+    namespace_list = []
+    if namespace is not multi_asic.DEFAULT_NAMESPACE and namespace in multi_asic.get_namespace_list():
+        namespace_list.append(namespace)
+    else:
+        namespace_list = multi_asic.get_namespace_list()
+        print_message(syslog.LOG_INFO, "Tracking routes for namespaces: ", namespace_list)
+
+    trackers = {ns: RouteTracker(ns) for ns in namespace_list}
+    frr_results = {}
+    sid_results = None
+    next_resync = 0
+
+    while True:
+        signal.alarm(TIMEOUT_SECONDS)
+        now = time.time()
+        if now >= next_resync:
+            frr_results = {}
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                futures = {executor.submit(resync_tracker, t): ns for ns, t in trackers.items()}
+                for future in concurrent.futures.as_completed(futures):
+                    res = future.result()
+                    if res:
+                        frr_results[futures[future]] = res
+            _, sid_results = check_sids(namespace)
+            next_resync = time.time() + resync_interval
+            now = time.time()
+
+        results = {}
+        for ns, tracker in trackers.items():
+            res = tracker.check(now, mismatch_age)
+            res.update(frr_results.get(ns, {}))
+            if res:
+                results[ns] = res
+        signal.alarm(0)
+
+        if results:
+            print_message(syslog.LOG_WARNING, "Route mismatch counts: ",
+                          json.dumps(summarize_results(results), separators=(",", ":")))
+            print_message(syslog.LOG_WARNING, "Failure results: {",  json.dumps(results, indent=4), "}")
+            print_message(syslog.LOG_WARNING, "Failed. Look at reported mismatches above")
+        else:
+            print_message(syslog.LOG_INFO, "All good!")
+
+        ret = -1 if results or sid_results else 0
+        res = None
+        if results or sid_results:
+            res = dict(results)
+            res.update(sid_results if sid_results else {})
+
+        if UNIT_TESTING:
+            return ret, res
+
+        # Keep draining notifications while waiting for the next check
+        deadline = time.time() + interval
+        while time.time() < deadline:
+            for tracker in trackers.values():
+                tracker.poll(DAEMON_SELECT_TIMEOUT_MSECS // len(trackers))
+
+
 def main():
     """
     main entry point, which mainly parses the args and call check_routes
@@ -1159,6 +1483,19 @@ def main():
                         type=int,
                         default=TIMEOUT_SECONDS,
                         help='Timeout in secs')
+    parser.add_argument('-d',
+                        '--daemon',
+                        action='store_true',
+                        default=False,
+                        help='Track routes incrementally from DB subscriptions; implies --interval')
+    parser.add_argument('--resync_interval',
+                        type=int,
+                        default=DEFAULT_RESYNC_INTERVAL,
+                        help='Full resync period in secs for daemon mode')
+    parser.add_argument('--mismatch_age',
+                        type=int,
+                        default=DEFAULT_MISMATCH_AGE,
+                        help='Secs a mismatch must persist before it is reported in daemon mode')
     args = parser.parse_args()
 
     namespace = args.namespace
@@ -1175,6 +1512,9 @@ def main():
 
     set_level(args.mode, args.log_to_syslog)
 
+    if args.daemon and not args.interval:
+        args.interval = MIN_SCAN_INTERVAL
+
     if args.interval:
         if (args.interval < MIN_SCAN_INTERVAL):
             interval = MIN_SCAN_INTERVAL
@@ -1192,6 +1532,10 @@ def main():
         print_message(syslog.LOG_INFO, "BGP feature is disabled, exiting without checking routes!!")
         return 0, None
 
+    if args.daemon:
+        resync_interval = max(args.resync_interval, interval)
+        return run_daemon(namespace, interval, resync_interval, args.mismatch_age)
+
     while True:
         signal.alarm(TIMEOUT_SECONDS)
         ret1, res1 = check_routes(namespace)
@@ -384,10 +384,9 @@ def show_routes(args, namespace, display, verbose, ipver):
         arg_strg += "json"
 
     combined_route = {}
-    for ns in ns_l:
-        # Need to add "ns" to form bgpX so it is sent to the correct bgpX docker to handle the request
-        cmd = "show {} route {}".format(ipver, arg_strg)
-        output = bgp_util.run_bgp_show_command(cmd, ns)
+    # Need to add "ns" to form bgpX so it is sent to the correct bgpX docker to handle the request
+    cmd = "show {} route {}".format(ipver, arg_strg)
+    for ns, output in zip(ns_l, bgp_util.run_bgp_show_command_on_namespaces(cmd, ns_l)):
         # in case no output or something went wrong with user specified cmd argument(s) error it out
         # error from FRR always start with character "%"
         if output == "":
@@ -181,9 +181,7 @@ def neighbors_helper(ipaddress, info_type, namespace, vrf=constants.DEFAULT_VRF)
         ipaddress, info_type)
 
     ns_list = multi_asic.get_namespace_list(namespace)
-    output = ""
-    for ns in ns_list:
-        output += bgp_util.run_bgp_show_command(command, ns)
+    output = "".join(bgp_util.run_bgp_show_command_on_namespaces(command, ns_list))
     
     click.echo(output.rstrip('\n'))
 
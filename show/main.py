@@ -9,7 +9,7 @@ import lazy_object_proxy
 import utilities_common.cli as clicommon
 from sonic_py_common import multi_asic
 import utilities_common.multi_asic as multi_asic_util
-from importlib import reload
+from importlib import import_module, reload
 from natsort import natsorted
 from sonic_py_common import device_info
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
@@ -39,43 +39,10 @@ try:
 except KeyError:
     pass
 
-from . import acl
 from . import bgp_common
 from .vtysh_helper import vtysh_command
-from . import chassis_modules
-from . import dropcounters
-from . import evpn
-from . import fabric
-from . import feature
-from . import fgnhg
-from . import flow_counters
-from . import hft
-from . import gearbox
-from . import interfaces
-from . import kdump
-from . import kube
-from . import muxcable
-from . import nat
 from . import platform
-from . import p4_table
-from . import processes
-from . import reboot_cause
-from . import sflow
-from . import vlan
-from . import vnet
-from . import vxlan
-from . import system_health
-from . import warm_restart
 from . import plugins
-from . import syslog
-from . import dns
-from . import bgp_cli
-from . import stp
-from . import llr
-from . import srv6
-from . import switch
-from . import icmp
-from . import copp
 
 # Global Variables
 PLATFORM_JSON = 'platform.json'
@@ -89,6 +56,53 @@ GEARBOX_TABLE_PHY_PATTERN = r"_GEARBOX_TABLE:phy:*"
 
 COMMAND_TIMEOUT = 300
 
+# Commands implemented in other modules, as 'module:attribute'. A module is
+# imported only when one of its commands is used.
+LAZY_COMMANDS = {
+    'acl': 'show.acl:acl',
+    'bgp': 'show.bgp_cli:BGP',
+    'chassis': 'show.chassis_modules:chassis',
+    'copp': 'show.copp:copp',
+    'dns': 'show.dns:dns',
+    'dropcounters': 'show.dropcounters:dropcounters',
+    'evpn': 'show.evpn:evpn',
+    'fabric': 'show.fabric:fabric',
+    'feature': 'show.feature:feature',
+    'fgnhg': 'show.fgnhg:fgnhg',
+    'flowcnt-route': 'show.flow_counters:flowcnt_route',
+    'flowcnt-trap': 'show.flow_counters:flowcnt_trap',
+    'gearbox': 'show.gearbox:gearbox',
+    'hft': 'show.hft:hft',
+    'icmp': 'show.icmp:icmp',
+    'interfaces': 'show.interfaces:interfaces',
+    'kdump': 'show.kdump:kdump',
+    'kubernetes': 'show.kube:kubernetes',
+    'llr': 'show.llr:llr',
+    'muxcable': 'show.muxcable:muxcable',
+    'nat': 'show.nat:nat',
+    'p4-table': 'show.p4_table:p4_table',
+    'processes': 'show.processes:processes',
+    'reboot-cause': 'show.reboot_cause:reboot_cause',
+    'sflow': 'show.sflow:sflow',
+    'spanning-tree': 'show.stp:spanning_tree',
+    'srv6': 'show.srv6:srv6',
+    'switch': 'show.switch:switch',
+    'syslog': 'show.syslog:syslog',
+    'system-health': 'show.system_health:system_health',
+    'vlan': 'show.vlan:vlan',
+    'vnet': 'show.vnet:vnet',
+    'vxlan': 'show.vxlan:vxlan',
+    'warm_restart': 'show.warm_restart:warm_restart',
+}
+LAZY_MODULES = {import_path.split(':')[0].rsplit('.', 1)[1] for import_path in LAZY_COMMANDS.values()}
+
+
+def __getattr__(name):
+    # The modules in LAZY_COMMANDS remain reachable as attributes of this module
+    if name in LAZY_MODULES:
+        return import_module('{}.{}'.format(__package__, name))
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
 # To be enhanced. Routing-stack information should be collected from a global
 # location (configdb?), so that we prevent the continuous execution of this
 # bash oneliner. To be revisited once routing-stack info is tracked somewhere.
@@ -293,9 +307,10 @@ CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help', '-?'])
 # 'cli' group (root group)
 #
 
+
 # This is our entrypoint - the main "show" command
 # TODO: Consider changing function name to 'show' for better understandability
-@click.group(cls=clicommon.AliasedGroup, context_settings=CONTEXT_SETTINGS)
+@click.group(cls=clicommon.LazyAliasedGroup, context_settings=CONTEXT_SETTINGS)
 @click.pass_context
 def cli(ctx):
     """SONiC command line - 'show' command"""
@@ -305,50 +320,12 @@ def cli(ctx):
     ctx.obj = Db()
 
 # Add groups from other modules
-cli.add_command(acl.acl)
-cli.add_command(chassis_modules.chassis)
-cli.add_command(dropcounters.dropcounters)
-cli.add_command(evpn.evpn)
-cli.add_command(fabric.fabric)
-cli.add_command(feature.feature)
-cli.add_command(fgnhg.fgnhg)
-cli.add_command(flow_counters.flowcnt_route)
-cli.add_command(flow_counters.flowcnt_trap)
-if hft_common.is_supported_platform():
-    cli.add_command(hft.hft)
-cli.add_command(kdump.kdump)
-cli.add_command(interfaces.interfaces)
-cli.add_command(kdump.kdump)
-cli.add_command(kube.kubernetes)
-cli.add_command(muxcable.muxcable)
-cli.add_command(nat.nat)
 cli.add_command(platform.platform)
-cli.add_command(p4_table.p4_table)
-cli.add_command(processes.processes)
-cli.add_command(reboot_cause.reboot_cause)
-cli.add_command(sflow.sflow)
-cli.add_command(vlan.vlan)
-cli.add_command(vnet.vnet)
-cli.add_command(vxlan.vxlan)
-cli.add_command(system_health.system_health)
-cli.add_command(warm_restart.warm_restart)
-cli.add_command(dns.dns)
-cli.add_command(stp.spanning_tree)
-cli.add_command(llr.llr)
-cli.add_command(srv6.srv6)
-cli.add_command(switch.switch)
-cli.add_command(icmp.icmp)
-cli.add_command(copp.copp)
-
-# syslog module
-cli.add_command(syslog.syslog)
-
-# Add greabox commands only if GEARBOX is configured
-if is_gearbox_configured():
-    cli.add_command(gearbox.gearbox)
-
-# bgp module
-cli.add_command(bgp_cli.BGP)
+cli.add_lazy_commands(LAZY_COMMANDS, conditions={
+    'hft': hft_common.is_supported_platform,
+    # gearbox commands only if GEARBOX is configured
+    'gearbox': is_gearbox_configured,
+})
 
 #
 # 'vrf' command ("show vrf")
@@ -2998,7 +2975,7 @@ def show_fast_linkup_global(db, json_output):
 
 # Load plugins and register them
 helper = util_base.UtilHelper()
-helper.load_and_register_plugins(plugins, cli)
+helper.load_and_register_plugins_lazily(plugins, cli)
 
 if __name__ == '__main__':
     cli()
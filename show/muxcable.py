@@ -1,7 +1,6 @@
 
 import json
 import sys
-import time
 
 import click
 import re
@@ -15,6 +14,7 @@ from swsscommon import swsscommon
 from tabulate import tabulate
 from utilities_common import platform_sfputil_helper
 from utilities_common.general import get_optional_value_for_key_in_config_tbl 
+from utilities_common.xcvrd_channel import XcvrdCommandChannel, XCVRD_RSP_OK, XCVRD_CHANNEL_DEADLINE_TIMEOUTS
 
 platform_sfputil = None
 
@@ -287,137 +287,62 @@ def get_result(port, res_dict, cmd ,result, table_name):
 
 def update_and_get_response_for_xcvr_cmd(cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name, rsp_table_name , res_table_name, port, cmd_timeout_secs, param_dict= None, arg=None):
 
-    res_dict = {}
-    state_db, appl_db = {}, {}
-    firmware_rsp_tbl, firmware_rsp_tbl_keys = {}, {}
-    firmware_rsp_sub_tbl = {}
-    firmware_cmd_tbl = {}
-    firmware_cmd_arg_tbl = {}
-
-    CMD_TIMEOUT_SECS = cmd_timeout_secs
-
-    time_start = time.time()
-
-    delete_all_keys_in_db_tables_helper(cmd_table_name, rsp_table_name, cmd_arg_table_name, res_table_name)
-
-    sel = swsscommon.Select()
-    namespaces = multi_asic.get_front_end_namespaces()
-    for namespace in namespaces:
-        asic_id = multi_asic.get_asic_index_from_namespace(namespace)
-        state_db[asic_id] = db_connect("STATE_DB", namespace)
-        appl_db[asic_id] = db_connect("APPL_DB", namespace)
-        firmware_cmd_tbl[asic_id] = swsscommon.Table(appl_db[asic_id], cmd_table_name)
-        firmware_rsp_sub_tbl[asic_id] = swsscommon.SubscriberStateTable(state_db[asic_id], rsp_table_name)
-        firmware_rsp_tbl[asic_id] = swsscommon.Table(state_db[asic_id], rsp_table_name)
-        if cmd_arg_table_name is not None:
-            firmware_cmd_arg_tbl[asic_id] = swsscommon.Table(appl_db[asic_id], cmd_arg_table_name)
-        firmware_rsp_tbl_keys[asic_id] = firmware_rsp_tbl[asic_id].getKeys()
-        for key in firmware_rsp_tbl_keys[asic_id]:
-            firmware_rsp_tbl[asic_id]._del(key)
-        sel.addSelectable(firmware_rsp_sub_tbl[asic_id])
-
-    rc = CONFIG_FAIL
-    res_dict[0] = CONFIG_FAIL
-    res_dict[1] = 'unknown'
-
-    logical_port_list = platform_sfputil_helper.get_logical_list()
-    if port not in logical_port_list:
-        click.echo("ERR: This is not a valid port, valid ports ({})".format(", ".join(logical_port_list)))
-        res_dict[0] = rc
-        return res_dict
-
-    asic_index = None
-    if platform_sfputil is not None:
-        asic_index = platform_sfputil_helper.get_asic_id_for_logical_port(port)
-    if asic_index is None:
-        # TODO this import is only for unit test purposes, and should be removed once sonic_platform_base
-        # is fully mocked
-        import sonic_platform_base.sonic_sfp.sfputilhelper
-        asic_index = sonic_platform_base.sonic_sfp.sfputilhelper.SfpUtilHelper().get_asic_id_for_logical_port(port)
-        if asic_index is None:
-            click.echo("Got invalid asic index for port {}, can't perform firmware cmd".format(port))
-            res_dict[0] = rc
-            return res_dict
-
-    if arg is None:
-        cmd_arg = "null"
-    else:
-        cmd_arg = str(arg)
-
-    if param_dict is not None:
-        for key, value in param_dict.items():
-            fvs = swsscommon.FieldValuePairs([(str(key), str(value))])
-            firmware_cmd_arg_tbl[asic_index].set(port, fvs)
+    res_dicts = update_and_get_responses_for_xcvr_cmd(
+        cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name, rsp_table_name, res_table_name, [port],
+        cmd_timeout_secs, param_dict, arg)
 
-    fvs = swsscommon.FieldValuePairs([(cmd_name, cmd_arg)])
-    firmware_cmd_tbl[asic_index].set(port, fvs)
-
-    # Listen indefinitely for changes to the HW_MUX_CABLE_TABLE in the Application DB's
-    while True:
-        # Use timeout to prevent ignoring the signals we want to handle
-        # in signal_handler() (e.g. SIGTERM for graceful shutdown)
+    return res_dicts[port]
 
-        (state, selectableObj) = sel.select(SELECT_TIMEOUT)
 
-        time_now = time.time()
-        time_diff = time_now - time_start
-        if time_diff >= CMD_TIMEOUT_SECS:
-            return res_dict
-
-        if state == swsscommon.Select.TIMEOUT:
-            # Do not flood log when select times out
-            continue
-        if state != swsscommon.Select.OBJECT:
-            click.echo("sel.select() did not  return swsscommon.Select.OBJECT for sonic_y_cable updates")
-            continue
-
-        # Get the redisselect object  from selectable object
-        redisSelectObj = swsscommon.CastSelectableToRedisSelectObj(
-            selectableObj)
-        # Get the corresponding namespace from redisselect db connector object
-        namespace = redisSelectObj.getDbConnector().getNamespace()
-        asic_index = multi_asic.get_asic_index_from_namespace(namespace)
+def update_and_get_responses_for_xcvr_cmd(cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name,
+                                          rsp_table_name, res_table_name, ports, cmd_timeout_secs,
+                                          param_dict=None, arg=None):
+    """
+    Issues the xcvrd command for all the ports at once and returns {port: res_dict},
+    a port timing out after cmd_timeout_secs without a response from xcvrd, and all
+    the ports at most XCVRD_CHANNEL_DEADLINE_TIMEOUTS timeouts after the commands.
+    """
 
-        (port_m, op_m, fvp_m) = firmware_rsp_sub_tbl[asic_index].pop()
+    res_dicts = {}
+    port_asics = {}
 
-        if not port_m:
-            click.echo("Did not receive a port response {}".format(port))
-            res_dict[1] = 'unknown'
-            res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
-            break
+    delete_all_keys_in_db_tables_helper(cmd_table_name, rsp_table_name, cmd_arg_table_name, res_table_name)
 
-        if port_m != port:
+    logical_port_list = platform_sfputil_helper.get_logical_list()
+    for port in ports:
+        res_dicts[port] = {}
+        res_dicts[port][0] = CONFIG_FAIL
+        res_dicts[port][1] = 'unknown'
 
-            res_dict[1] = 'unknown'
-            res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
+        if port not in logical_port_list:
+            click.echo("ERR: This is not a valid port, valid ports ({})".format(", ".join(logical_port_list)))
             continue
 
-        if fvp_m:
-
-            fvp_dict = dict(fvp_m)
-            if rsp_name in fvp_dict:
-                # check if xcvrd got a probe command
-                result = fvp_dict[rsp_name]
+        asic_index = None
+        if platform_sfputil is not None:
+            asic_index = platform_sfputil_helper.get_asic_id_for_logical_port(port)
+        if asic_index is None:
+            # TODO this import is only for unit test purposes, and should be removed once sonic_platform_base
+            # is fully mocked
+            import sonic_platform_base.sonic_sfp.sfputilhelper
+            asic_index = sonic_platform_base.sonic_sfp.sfputilhelper.SfpUtilHelper().get_asic_id_for_logical_port(port)
+            if asic_index is None:
+                click.echo("Got invalid asic index for port {}, can't perform firmware cmd".format(port))
+                continue
 
-                res_dict[1] = result
-                res_dict[0] = 0
-            else:
-                res_dict[1] = 'unknown'
-                res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
-            break
-        else:
-            res_dict[1] = 'unknown'
-            res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
-            break
+        port_asics[port] = asic_index
 
+    channel = XcvrdCommandChannel(cmd_table_name, rsp_table_name, cmd_arg_table_name, db_connect)
+    responses = channel.run(port_asics, cmd_name, rsp_name, arg, param_dict, cmd_timeout_secs,
+                            deadline=cmd_timeout_secs * XCVRD_CHANNEL_DEADLINE_TIMEOUTS)
+    for port, response in responses.items():
+        if response.status == XCVRD_RSP_OK:
+            res_dicts[port][1] = response.value
+            res_dicts[port][0] = 0
 
     delete_all_keys_in_db_tables_helper(cmd_table_name, rsp_table_name, cmd_arg_table_name, None)
 
-    return res_dict
+    return res_dicts
 
 
 def delete_all_keys_in_db_tables_helper(cmd_table_name, rsp_table_name, cmd_arg_table_name = None, res_table_name = None):
@@ -1302,26 +1227,47 @@ def cableinfo(db, port):
 
 def get_hwmode_mux_direction_port(db, port):
 
-
-    delete_all_keys_in_db_table("APPL_DB", "XCVRD_SHOW_HWMODE_DIR_CMD")
-    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_HWMODE_DIR_RSP")
-    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_HWMODE_DIR_RES")
-
     res_dict = {}
     res_dict[0] = CONFIG_FAIL
     res_dict[1] = "unknown"
     res_dict[2] = "unknown"
-    result = {}
     if port is not None:
+        res_dict = get_hwmode_mux_direction_ports(db, [port])[port]
 
-        res_dict = update_and_get_response_for_xcvr_cmd(
-            "state", "state", "True", "XCVRD_SHOW_HWMODE_DIR_CMD", "XCVRD_SHOW_HWMODE_DIR_RES", "XCVRD_SHOW_HWMODE_DIR_RSP", None, port, HWMODE_MUXDIRECTION_TIMEOUT, None, "probe")
+    return res_dict
 
-        result = get_result(port, res_dict, "muxdirection" , result, "XCVRD_SHOW_HWMODE_DIR_RES")
 
-        res_dict[2] = result.get("presence","unknown")
+def get_hwmode_mux_direction_ports(db, ports):
 
-    return res_dict
+    res_table_name = "XCVRD_SHOW_HWMODE_DIR_RES"
+    state_db = {}
+    xcvrd_show_hwmode_dir_res_tbl = {}
+
+    delete_all_keys_in_db_table("APPL_DB", "XCVRD_SHOW_HWMODE_DIR_CMD")
+    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_HWMODE_DIR_RSP")
+    delete_all_keys_in_db_table("STATE_DB", res_table_name)
+
+    res_dicts = update_and_get_responses_for_xcvr_cmd(
+        "state", "state", "True", "XCVRD_SHOW_HWMODE_DIR_CMD", None, "XCVRD_SHOW_HWMODE_DIR_RSP", res_table_name, ports,
+        HWMODE_MUXDIRECTION_TIMEOUT, None, "probe")
+
+    namespaces = multi_asic.get_front_end_namespaces()
+    for namespace in namespaces:
+        asic_id = multi_asic.get_asic_index_from_namespace(namespace)
+        state_db[asic_id] = db_connect("STATE_DB", namespace)
+        xcvrd_show_hwmode_dir_res_tbl[asic_id] = swsscommon.Table(state_db[asic_id], res_table_name)
+
+    for port in ports:
+        res_dicts[port][2] = "unknown"
+        if res_dicts[port][0] != 0:
+            continue
+        asic_index = get_asic_index_for_port(port)
+        (status, fvp) = xcvrd_show_hwmode_dir_res_tbl[asic_index].get(port)
+        res_dicts[port][2] = dict(fvp).get("presence", "unknown")
+
+    delete_all_keys_in_db_table("STATE_DB", res_table_name)
+
+    return res_dicts
 
 
 def create_active_active_mux_direction_json_result(result, port, db):
@@ -1338,9 +1284,11 @@ def create_active_active_mux_direction_json_result(result, port, db):
 
     return rc
 
-def create_active_standby_mux_direction_json_result(result, port, db):
 
-    res_dict = get_hwmode_mux_direction_port(db, port)
+def create_active_standby_mux_direction_json_result(result, port, db, res_dict=None):
+
+    if res_dict is None:
+        res_dict = get_hwmode_mux_direction_port(db, port)
     port = platform_sfputil_helper.get_interface_alias(port, db)
     result["HWMODE"][port] = {}
     result["HWMODE"][port]["Direction"] = res_dict[1]
@@ -1366,9 +1314,11 @@ def create_active_active_mux_direction_result(body, port, db):
 
     return rc
 
-def create_active_standby_mux_direction_result(body, port, db):
 
-    res_dict = get_hwmode_mux_direction_port(db, port)
+def create_active_standby_mux_direction_result(body, port, db, res_dict=None):
+
+    if res_dict is None:
+        res_dict = get_hwmode_mux_direction_port(db, port)
 
     temp_list = []
     port = platform_sfputil_helper.get_interface_alias(port, db)
@@ -1379,10 +1329,6 @@ def create_active_standby_mux_direction_result(body, port, db):
 
     rc = res_dict[0]
 
-    delete_all_keys_in_db_table("APPL_DB", "XCVRD_SHOW_HWMODE_DIR_CMD")
-    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_HWMODE_DIR_RSP")
-    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_HWMODE_DIR_RES")
-
     return rc
 
 @muxcable.group(cls=clicommon.AbbreviationGroup)
@@ -1449,6 +1395,7 @@ def muxdirection(db, port, json_output):
 
         rc_exit = EXIT_SUCCESS
         body = []
+        port_cable_types = []
         active_active = False
         if json_output:
             result = {}
@@ -1483,19 +1430,26 @@ def muxdirection(db, port, json_output):
             
             asic_index = get_asic_index_for_port(port)
             cable_type = get_optional_value_for_key_in_config_tbl(per_npu_configdb[asic_index], port, "cable_type", "MUX_CABLE")
+            port_cable_types.append((port, cable_type))
+
+        # Probe the direction of all the active-standby cables at once
+        active_standby_ports = [port for port, cable_type in port_cable_types if cable_type != "active-active"]
+        mux_directions = get_hwmode_mux_direction_ports(db, active_standby_ports) if active_standby_ports else {}
+
+        for port, cable_type in port_cable_types:
             if json_output:
                 if cable_type == "active-active":
                     rc = create_active_active_mux_direction_json_result(result, port, db)
                     active_active = True
                 else:
-                    rc = create_active_standby_mux_direction_json_result(result, port, db)
+                    rc = create_active_standby_mux_direction_json_result(result, port, db, mux_directions[port])
 
             else:
                 if cable_type == 'active-active':
                     rc = create_active_active_mux_direction_result(body, port, db)
                     active_active = True
                 else:
-                    rc = create_active_standby_mux_direction_result(body, port, db)
+                    rc = create_active_standby_mux_direction_result(body, port, db, mux_directions[port])
 
             if rc != 0:
                 rc_exit = EXIT_FAIL
@@ -1559,6 +1513,7 @@ def switchmode(db, port):
 
         rc_exit = True
         body = []
+        ports = []
 
         for port in logical_port_list:
 
@@ -1586,16 +1541,18 @@ def switchmode(db, port):
             if port != logical_port_list_per_port[0]:
                 continue
 
+            ports.append(port)
+
+        res_dicts = update_and_get_responses_for_xcvr_cmd(
+            "state", "state", "True", "XCVRD_SHOW_HWMODE_SWMODE_CMD", None, "XCVRD_SHOW_HWMODE_SWMODE_RSP", None, ports,
+            1, None, "probe")
+
+        for port in ports:
             temp_list = []
-            res_dict = {}
-            res_dict[0] = CONFIG_FAIL
-            res_dict[1] = "unknown"
-            res_dict = update_and_get_response_for_xcvr_cmd(
-                "state", "state", "True", "XCVRD_SHOW_HWMODE_SWMODE_CMD", None, "XCVRD_SHOW_HWMODE_SWMODE_RSP", None, port, 1, None, "probe")
-            port = platform_sfputil_helper.get_interface_alias(port, db)
-            temp_list.append(port)
+            res_dict = res_dicts[port]
+            temp_list.append(platform_sfputil_helper.get_interface_alias(port, db))
             temp_list.append(res_dict[1])
-            rc = res_dict[1]
+            rc = res_dict[0]
             if rc != 0:
                 rc_exit = False
             body.append(temp_list)
@@ -11,6 +11,7 @@ from ..common import (
    IMAGE_PREFIX,
    ROOTFS_NAME,
 )
+from ..download import download
 
 class Bootloader(object):
 
@@ -49,6 +50,11 @@ class Bootloader(object):
         """returns the version of the image"""
         raise NotImplementedError
 
+    def download_image(self, url, image_path, reporthook=None):
+        """download the image from url to image_path"""
+        with open(image_path, 'wb') as image_file:
+            download(url, image_file.write, reporthook)
+
     def verify_image_platform(self, image_path):
         """verify that the image is of the same platform than running platform"""
         raise NotImplementedError
@@ -16,9 +16,11 @@ from ..common import (
    run_command,
    default_sigpipe,
 )
-from .onie import OnieInstallerBootloader
+from .onie import (
+   PLATFORMS_ASIC,
+   OnieInstallerBootloader,
+)
 
-PLATFORMS_ASIC = "installer/platforms_asic"
 BOOT_PARAMETER_PREFIX_LINUX = "linux "
 BOOT_PARAMETER_PREFIX_LINUXEFI = "linuxefi "
 LEN_BOOT_PARAMETER_PREFIX_LINUX = len(BOOT_PARAMETER_PREFIX_LINUX)
@@ -139,7 +141,12 @@ class GrubBootloader(OnieInstallerBootloader):
         For those images that don't have devices list builtin, 'tar' will have non-zero returncode.
         In this case, we simply return True to make it worked compatible as before.
         Otherwise, we can grep to check if platform is inside the supported target platforms list.
+        The list read while downloading the image is used when there is one.
         """
+        info = self.get_image_info(image_path)
+        if info is not None:
+            return info.platforms is None or platform in info.platforms
+
         with open(os.devnull, 'w') as fnull:
             p1 = subprocess.Popen(["sed", "-e", "1,/^exit_marker$/d", image_path], stdout=subprocess.PIPE, preexec_fn=default_sigpipe)
             p2 = subprocess.Popen(["tar", "xf", "-", PLATFORMS_ASIC, "-O"], stdin=p1.stdout, stdout=subprocess.PIPE, stderr=fnull, preexec_fn=default_sigpipe)
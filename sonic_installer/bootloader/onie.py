@@ -5,18 +5,179 @@ Common logic for bootloaders using an ONIE installer image
 import os
 import re
 import subprocess
+import tarfile
+import threading
 
 from ..common import (
    IMAGE_DIR_PREFIX,
    IMAGE_PREFIX,
    default_sigpipe,
 )
+from ..download import download
 from .bootloader import Bootloader
 
+PLATFORMS_ASIC = "installer/platforms_asic"
+EXIT_MARKER = b'\nexit_marker\n'
+# The sharch header is a short shell script; an image with no exit marker in
+# that many bytes is not a sharch installer
+SHARCH_HEADER_SIZE_MAX = 1024 * 1024
+
+
+class OnieImageInfo(object):
+    """
+    What is known of an ONIE installer image after reading it once: the version and
+    the target platforms (None if the image has no list).
+    """
+    def __init__(self, version, platforms):
+        self.version = version
+        self.platforms = platforms
+
+
+class _PlatformsReader(object):
+    """
+    Reads the target platforms list from the payload tarball fed to it.
+    """
+    def __init__(self):
+        read_fd, write_fd = os.pipe()
+        self._input = os.fdopen(read_fd, 'rb')
+        self._output = os.fdopen(write_fd, 'wb')
+        self.platforms = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            with tarfile.open(fileobj=self._input, mode='r|*') as tar:
+                for member in tar:
+                    if member.isfile() and os.path.normpath(member.name) == PLATFORMS_ASIC:
+                        content = tar.extractfile(member).read().decode(errors='replace')
+                        self.platforms = content.splitlines()
+                        break
+        except (tarfile.TarError, EOFError, OSError, ValueError):
+            # Not a tarball, as 'tar' failing: the image has no platforms list
+            pass
+        finally:
+            # Drain the rest for the writer not to block
+            try:
+                while self._input.read(1024 * 1024):
+                    pass
+            finally:
+                self._input.close()
+
+    def feed(self, data):
+        self._output.write(data)
+
+    def close(self):
+        self._output.close()
+        self._thread.join()
+        return self.platforms
+
+
+class OnieImageStream(object):
+    """
+    Writes an ONIE installer image to a file, reading its version and platforms list
+    on the way, the same way the installer looks at a complete image file.
+    """
+    def __init__(self, image_path):
+        self._file = open(image_path, 'wb')
+        self._header = bytearray()
+        self._sharch = None
+        self._version = None
+        self._payload_left = None
+        self._platforms = None
+
+    def write(self, data):
+        self._file.write(data)
+        if self._sharch is None:
+            self._header += data
+            end = self._header.find(EXIT_MARKER)
+            if end < 0:
+                if len(self._header) > SHARCH_HEADER_SIZE_MAX:
+                    self._sharch = False
+                    self._header = None
+                return
+            end += len(EXIT_MARKER)
+            header, data = bytes(self._header[:end]), bytes(self._header[end:])
+            self._header = None
+            self._sharch = True
+            self._parse_header(header)
+            self._platforms = _PlatformsReader()
+
+        if not self._sharch or not data:
+            return
+
+        payload = data
+        if self._payload_left is not None:
+            payload = data[:self._payload_left]
+            self._payload_left -= len(payload)
+        if payload:
+            self._platforms.feed(payload)
+
+    def _parse_header(self, header):
+        lines = header.split(b'\n')
+        for line in lines:
+            match = re.match(rb'^image_version="(.*)"$', line)
+            if match:
+                self._version = match.group(1).decode(errors='replace')
+                break
+        # verify_image_sign.sh looks for the payload size in the first lines only
+        for line in lines[:50]:
+            match = re.match(rb'^payload_image_size=(\d+)$', line)
+            if match:
+                self._payload_left = int(match.group(1))
+                break
+
+    def close(self):
+        """
+        Close the file, returns the OnieImageInfo of a sharch image or None.
+        """
+        self._file.close()
+        if not self._sharch:
+            return None
+        return OnieImageInfo(self._version, self._platforms.close())
+
+
 class OnieInstallerBootloader(Bootloader): # pylint: disable=abstract-method
 
     DEFAULT_IMAGE_PATH = '/tmp/sonic_image'
 
+    def __init__(self):
+        # image path -> (OnieImageInfo, size, mtime) of the images downloaded
+        self._image_info = {}
+
+    def download_image(self, url, image_path, reporthook=None):
+        """
+        Download the image, reading its version and platforms list
+        as it is written so that the file need not be read again.
+        """
+        self._image_info.pop(image_path, None)
+        stream = OnieImageStream(image_path)
+        try:
+            download(url, stream.write, reporthook)
+        finally:
+            info = stream.close()
+        if info is not None:
+            stat = os.stat(image_path)
+            self._image_info[image_path] = (info, stat.st_size, stat.st_mtime_ns)
+
+    def get_image_info(self, image_path):
+        """
+        Returns the OnieImageInfo of an image downloaded with download_image(),
+        None if the image is not known or was changed since.
+        """
+        cached = self._image_info.get(image_path)
+        if cached is None:
+            return None
+        info, size, mtime = cached
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            stat = None
+        if stat is None or (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+            del self._image_info[image_path]
+            return None
+        return info
+
     def get_current_image(self):
         cmdline = open('/proc/cmdline', 'r')
         current = re.search(r"loop=(\S+)/fs.squashfs", cmdline.read()).group(1)
@@ -28,6 +189,10 @@ class OnieInstallerBootloader(Bootloader): # pylint: disable=abstract-method
 
     def get_binary_image_version(self, image_path):
         """returns the version of the image"""
+        info = self.get_image_info(image_path)
+        if info is not None:
+            return IMAGE_PREFIX + info.version if info.version else None
+
         p1 = subprocess.Popen(["cat", "-v", image_path], stdout=subprocess.PIPE, preexec_fn=default_sigpipe)
         p2 = subprocess.Popen(["grep", "-m 1", "^image_version"], stdin=p1.stdout, stdout=subprocess.PIPE, preexec_fn=default_sigpipe)
         p3 = subprocess.Popen(["sed", "-n", r"s/^image_version=\"\(.*\)\"$/\1/p"], stdin=p2.stdout, stdout=subprocess.PIPE, preexec_fn=default_sigpipe, text=True)
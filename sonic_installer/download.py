@@ -0,0 +1,101 @@
+"""
+Resumable HTTP download used by sonic-installer.
+
+The image is handed chunk by chunk to a sink as it is received, so that it can
+be inspected while it is being written. An interrupted transfer is resumed
+with a range request from the last byte received.
+"""
+
+import time
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_RETRY_DELAY = 2
+DOWNLOAD_TIMEOUT = 60
+
+
+class DownloadError(Exception):
+    pass
+
+
+def _content_length(response):
+    length = response.headers.get('Content-Length')
+    if length is None or not length.isdigit():
+        return None
+    return int(length)
+
+
+def _open(url, offset, timeout):
+    """
+    Open url at offset, returns the response and the number of leading bytes
+    of the response to skip when the server ignored the range.
+    """
+    request = Request(url)
+    if offset:
+        request.add_header('Range', 'bytes={}-'.format(offset))
+    response = urlopen(request, timeout=timeout)
+    status = response.getcode()
+    if offset and status != 206:
+        # Range not supported, the whole file is sent again
+        return response, offset
+    return response, 0
+
+
+def download(url, sink, reporthook=None, retries=DOWNLOAD_RETRIES, chunk_size=DOWNLOAD_CHUNK_SIZE,
+             timeout=DOWNLOAD_TIMEOUT, retry_delay=DOWNLOAD_RETRY_DELAY):
+    """
+    Download url, calling sink with every chunk of data received in order.
+
+    reporthook is called like urlretrieve does, with a block size of one byte:
+    reporthook(bytes_received, 1, total_size), total_size is -1 if unknown.
+
+    Returns the number of bytes downloaded.
+    """
+    offset = 0
+    total_size = -1
+    attempt = 0
+    if reporthook:
+        reporthook(0, 1, total_size)
+
+    while True:
+        try:
+            response, skip = _open(url, offset, timeout)
+            with response:
+                length = _content_length(response)
+                if length is not None:
+                    total_size = offset - skip + length if skip == 0 else length
+                expected = offset + length - skip if length is not None else None
+
+                while True:
+                    data = response.read(chunk_size)
+                    if not data:
+                        break
+                    if skip:
+                        if len(data) <= skip:
+                            skip -= len(data)
+                            continue
+                        data = data[skip:]
+                        skip = 0
+                    sink(data)
+                    offset += len(data)
+                    attempt = 0
+                    if reporthook:
+                        reporthook(offset, 1, total_size)
+
+                if expected is not None and offset < expected:
+                    raise DownloadError('Connection closed after {} of {} bytes'.format(offset, expected))
+            return offset
+        except HTTPError as e:
+            # Client errors will not go away by retrying
+            if e.code < 500:
+                raise
+            error = e
+        except (OSError, DownloadError) as e:
+            error = e
+
+        attempt += 1
+        if attempt > retries:
+            raise DownloadError('Download of {} failed: {}'.format(url, error))
+        time.sleep(retry_delay)
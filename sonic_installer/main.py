@@ -559,7 +559,7 @@ def install(url, force, skip_platform_check=False, skip_migration=False, skip_pa
         echo_and_log('Downloading image...')
         validate_url_or_abort(url)
         try:
-            urlretrieve(url, bootloader.DEFAULT_IMAGE_PATH, reporthook)
+            bootloader.download_image(url, bootloader.DEFAULT_IMAGE_PATH, reporthook)
             click.echo('')
         except Exception as e:
             echo_and_log("Download error", e)
@@ -3,10 +3,12 @@
 """ Module provides Docker interface. """
 
 import contextlib
+import functools
 import io
 import tarfile
 import re
-from typing import Optional
+import threading
+from typing import Callable, Optional
 
 from sonic_package_manager.logger import log
 from sonic_package_manager.progress import ProgressManager
@@ -66,6 +68,20 @@ def process_progress(progress_manager, line):
         return
 
 
+def locked(func):
+    """ Runs a DockerApi method under the lock of its docker client,
+    when the threads share that client. """
+
+    @functools.wraps(func)
+    def wrapped_function(self, *args, **kwargs):
+        if self.client_factory is not None:
+            return func(self, *args, **kwargs)
+        with self.lock:
+            return func(self, *args, **kwargs)
+
+    return wrapped_function
+
+
 def get_repository_from_image(image):
     """ Returns the first RepoTag repository
     found in image. """
@@ -78,14 +94,36 @@ def get_repository_from_image(image):
 
 class DockerApi:
     """ DockerApi provides a set of methods -
-     wrappers around docker client methods """
+     wrappers around docker client methods.
+
+     The docker client is not thread safe. Given a client_factory, every
+     thread gets a client of its own, so that e.g. the images of packages
+     migrated concurrently are loaded in parallel. Otherwise the threads
+     share the client and the methods using it run one at a time. """
 
     def __init__(self,
                  client,
-                 progress_manager: Optional[ProgressManager] = None):
-        self.client = client
+                 progress_manager: Optional[ProgressManager] = None,
+                 client_factory: Optional[Callable] = None):
         self.progress_manager = progress_manager
-
+        self.client_factory = client_factory
+        self.lock = threading.RLock()
+        self._client = client
+        self._local = threading.local()
+        self._local.client = client
+
+    @property
+    def client(self):
+        """ Returns the docker client of the calling thread. """
+
+        if self.client_factory is None:
+            return self._client
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.client_factory()
+        return client
+
+    @locked
     def pull(self, repository: str,
              reference: Optional[str] = None):
         """ Docker 'pull' command.
@@ -126,41 +164,54 @@ class DockerApi:
     def load(self, imgpath: str):
         """ Docker 'load' command.
         Args:
-
+            imgpath: Path to image tarball.
         """
 
         log.debug(f'loading image from {imgpath}')
 
+        with open(imgpath, 'rb') as imagefile:
+            return self.load_stream(imagefile)
+
+    @locked
+    def load_stream(self, data, show_progress: bool = True):
+        """ Docker 'load' command reading the image tarball from a stream.
+        Args:
+            data: File object or iterable of chunks, e.g. the result
+                  of Image.save() of another docker library.
+            show_progress: Whether to show progress bars. Concurrent
+                           loads should not show them.
+        """
+
         api = self.client.api
-        progress_manager = self.progress_manager
+        progress_manager = self.progress_manager if show_progress else None
 
         imageid = None
         repotag = None
 
         with progress_manager or contextlib.nullcontext():
-            with open(imgpath, 'rb') as imagefile:
-                for line in api.load_image(imagefile, quiet=False):
-                    log.debug(f'pull status: {line}')
+            for line in api.load_image(data, quiet=False):
+                log.debug(f'pull status: {line}')
 
-                    if progress_manager:
-                        process_progress(progress_manager, line)
+                if progress_manager:
+                    process_progress(progress_manager, line)
 
-                    if 'stream' not in line:
-                        continue
+                if 'stream' not in line:
+                    continue
 
-                    stream = line['stream']
-                    repotag_match = re.match(r'Loaded image: (?P<repotag>.*)\n', stream)
-                    if repotag_match:
-                        repotag = repotag_match.groupdict()['repotag']
-                    imageid_match = re.match(r'Loaded image ID: sha256:(?P<id>.*)\n', stream)
-                    if imageid_match:
-                        imageid = imageid_match.groupdict()['id']
+                stream = line['stream']
+                repotag_match = re.match(r'Loaded image: (?P<repotag>.*)\n', stream)
+                if repotag_match:
+                    repotag = repotag_match.groupdict()['repotag']
+                imageid_match = re.match(r'Loaded image ID: sha256:(?P<id>.*)\n', stream)
+                if imageid_match:
+                    imageid = imageid_match.groupdict()['id']
 
         imagename = repotag if repotag else imageid
         log.debug(f'Loaded image {imagename}')
 
         return self.get_image(imagename)
 
+    @locked
     def rmi(self, image: str, **kwargs):
         """ Docker 'rmi -f' command. """
 
@@ -170,6 +221,7 @@ class DockerApi:
 
         log.debug(f'image {image} removed successfully')
 
+    @locked
     def tag(self, image: str, repotag: str, **kwargs):
         """ Docker 'tag' command """
 
@@ -180,12 +232,14 @@ class DockerApi:
 
         log.debug(f'image {image} tagged {repotag} successfully')
 
+    @locked
     def rm(self, container: str, **kwargs):
         """ Docker 'rm' command. """
 
         self.client.containers.get(container).remove(**kwargs)
         log.debug(f'removed container {container}')
 
+    @locked
     def rm_by_ancestor(self, image_id: str, **kwargs):
         """ Docker 'rm' command for running containers instantiated
         from image passed to this function. """
@@ -195,11 +249,13 @@ class DockerApi:
         for container in containers:
             self.rm(container.id, **kwargs)
 
+    @locked
     def ps(self, **kwargs):
         """ Docker 'ps' command. """
 
         return self.client.containers.list(**kwargs)
 
+    @locked
     def labels(self, image: str):
         """ Returns a list of labels associated with image. """
 
@@ -210,9 +266,17 @@ class DockerApi:
         log.debug(f'image {image} labels successfully: {labels}')
         return labels
 
+    @locked
     def get_image(self, name: str):
         return self.client.images.get(name)
 
+    @locked
+    def save(self, image: str):
+        """ Docker 'save' command, returns the image tarball as an iterable of chunks. """
+
+        return self.client.images.get(image).save(named=True)
+
+    @locked
     def extract(self, image, src_path: str, dst_path: str):
         """ Copy src_path from the docker image to host dst_path. """
 
@@ -233,22 +233,25 @@ def manifest(ctx,
 
 
 @package.command()
-@click.argument('name')
+@click.argument('names', metavar='NAME...', nargs=-1, required=True)
 @click.option('--all', is_flag=True, help='Show all available tags in repository.')
 @click.option('--plain', is_flag=True, help='Plain output.')
 @click.pass_context
-def versions(ctx, name, all, plain):
+def versions(ctx, names, all, plain):
     """ Show available versions. """
 
     try:
         manager: PackageManager = ctx.obj
-        versions = manager.get_package_available_versions(name, all)
-        for version in versions:
-            if not plain:
-                click.secho(f'{BULLET_UC} ', bold=True, fg='green', nl=False)
-            click.secho(f'{version}')
+        packages_versions = manager.get_packages_available_versions(names, all)
+        for name, versions in packages_versions.items():
+            if len(names) > 1:
+                click.secho(f'{name}:', bold=not plain)
+            for version in versions:
+                if not plain:
+                    click.secho(f'{BULLET_UC} ', bold=True, fg='green', nl=False)
+                click.secho(f'{version}')
     except Exception as err:
-        exit_cli(f'Failed to get package versions for {name}: {err}', fg='red')
+        exit_cli(f'Failed to get package versions for {", ".join(names)}: {err}', fg='red')
 
 
 @package.command()
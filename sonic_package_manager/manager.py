@@ -1,11 +1,11 @@
 #!/usr/bin/env python
 
+import concurrent.futures
 import contextlib
 import functools
 import os
 import pkgutil
 import subprocess
-import tempfile
 from inspect import signature
 from typing import Any, Iterable, List, Callable, Dict, Optional
 
@@ -56,6 +56,7 @@ from sonic_package_manager.service_creator.sonic_db import (
 from sonic_package_manager.service_creator.utils import in_chroot
 from sonic_package_manager.source import (
     PackageSource,
+    DockerImageSource,
     LocalSource,
     RegistrySource,
     TarballSource
@@ -74,6 +75,10 @@ import urllib.parse
 from scp import SCPClient
 from sonic_package_manager.manifest import Manifest, MANIFESTS_LOCATION, DEFAULT_MANIFEST_FILE
 LOCAL_JSON = "/tmp/local_json"
+# Maximum number of concurrent registry queries
+REGISTRY_WORKERS_MAX = 8
+# Maximum number of images transferred concurrently during migration
+MIGRATION_WORKERS_MAX = 4
 
 @contextlib.contextmanager
 def failure_ignore(ignore: bool):
@@ -275,6 +280,38 @@ def validate_package_tree(packages: Dict[str, Package]):
                                                         constraint, component_version)
 
 
+def sort_packages_by_dependencies(packages: Dict[str, Optional[Package]]) -> List[str]:
+    """ Orders packages so that every package comes after the packages
+    it depends on. Dependencies on packages not passed are ignored.
+    Packages that can go in any order keep their original order.
+
+    Args:
+        packages: Dictionary of package name to package, or None
+                  if the package dependencies are unknown.
+    Returns:
+        List of package names.
+    """
+
+    dependencies = {}
+    for name, package in packages.items():
+        depends = package.manifest['package']['depends'] if package is not None else []
+        dependencies[name] = {dependency.name for dependency in depends
+                              if dependency.name in packages and dependency.name != name}
+
+    ordered = []
+    while dependencies:
+        ready = [name for name, depends in dependencies.items() if not depends]
+        if not ready:
+            log.warning(f'circular dependencies between packages {", ".join(dependencies)}')
+            ready = list(dependencies)
+        for name in ready:
+            del dependencies[name]
+            ordered.append(name)
+        for depends in dependencies.values():
+            depends.difference_update(ready)
+    return ordered
+
+
 def validate_package_cli_can_be_skipped(package: Package, skip: bool):
     """ Checks whether package CLI installation can be skipped.
 
@@ -354,6 +391,7 @@ class PackageManager:
                 tarball: Optional[str] = None,
                 use_local_manifest: bool = False,
                 name: Optional[str] = None,
+                source: Optional[PackageSource] = None,
                 **kwargs):
         """ Install/Upgrade SONiC Package from either an expression
         representing the package and its version, repository and tag or
@@ -363,12 +401,15 @@ class PackageManager:
             expression: SONiC Package reference expression
             repotag: Install/Upgrade from REPO[:TAG][@DIGEST]
             tarball: Install/Upgrade from tarball, path to tarball file
+            source: Install/Upgrade from source, instead of the above
             kwargs: Install/Upgrade options for self.install_from_source
         Raises:
             PackageManagerError
         """
 
-        source = self.get_package_source(expression, repotag, tarball, use_local_manifest=use_local_manifest, name=name)
+        if source is None:
+            source = self.get_package_source(expression, repotag, tarball,
+                                             use_local_manifest=use_local_manifest, name=name)
         package = source.get_package()
 
         if self.is_installed(package.name):
@@ -756,7 +797,8 @@ class PackageManager:
         is installed in the passed database and in the current it is installed but with
         never version - no actions are taken. If dockerd_sock parameter is passed, the
         migration process will use loaded images from docker library of the currently
-        installed image.
+        installed image, streaming them into the new docker library concurrently.
+        Packages are installed after the packages they depend on.
 
         Args:
             old_package_database: SONiC Package Database to migrate packages from.
@@ -767,6 +809,13 @@ class PackageManager:
 
         self._migrate_package_database(old_package_database)
 
+        if dockerd_sock:
+            # dockerd_sock is defined, so use docked_sock to connect to
+            # dockerd and fetch package images from it.
+            old_docker = DockerApi(self.get_docker_client(dockerd_sock),
+                                   client_factory=functools.partial(self.get_docker_client, dockerd_sock))
+            old_metadata_resolver = MetadataResolver(old_docker, self.registry_resolver)
+
         def migrate_package(old_package_entry,
                             new_package_entry):
             """ Migrate package routine
@@ -774,32 +823,27 @@ class PackageManager:
             Args:
                 old_package_entry: Entry in old package database.
                 new_package_entry: Entry in new package database.
+            Returns:
+                Arguments and keyword arguments for self.install.
             """
 
             name = new_package_entry.name
             version = new_package_entry.version
 
             if dockerd_sock:
-                # dockerd_sock is defined, so use docked_sock to connect to
-                # dockerd and fetch package image from it.
                 log.info(f'installing {name} from old docker library')
-                docker_client = self.get_docker_client(dockerd_sock)
-                docker_api = DockerApi(docker_client)
-
-                image = docker_api.get_image(old_package_entry.image_id)
-
-                with tempfile.NamedTemporaryFile('wb') as file:
-                    for chunk in image.save(named=True):
-                        file.write(chunk)
-                    file.flush()
-
-                    self.install(tarball=file.name, name=name)
-            else:
-                log.info(f'installing {name} version {version}')
-
-                self.install(f'{name}={version}')
-
-        # TODO: Topological sort packages by their dependencies first.
+                source = DockerImageSource(old_package_entry.image_id,
+                                           old_docker,
+                                           self.database,
+                                           self.docker,
+                                           old_metadata_resolver,
+                                           name=name)
+                return (), {'source': source, 'name': name}
+
+            log.info(f'installing {name} version {version}')
+            return (f'{name}={version}',), {}
+
+        installs = {}
         for old_package in old_package_database:
             if not old_package.installed or old_package.built_in:
                 continue
@@ -815,7 +859,7 @@ class PackageManager:
                              f'{old_package.version} > {new_package.version}')
                     log.info(f'upgrading {new_package.name} to {old_package.version}')
                     new_package.version = old_package.version
-                    migrate_package(old_package, new_package)
+                    installs[new_package.name] = migrate_package(old_package, new_package)
                 else:
                     log.info(f'skipping {new_package.name} as installed version is newer')
             elif new_package.default_reference is not None:
@@ -828,18 +872,58 @@ class PackageManager:
                              f'then the default in new image: '
                              f'{old_package.version} > {new_package_default_version}')
                     new_package.version = old_package.version
-                    migrate_package(old_package, new_package)
+                    installs[new_package.name] = migrate_package(old_package, new_package)
                 else:
-                    # self.install(f'{new_package.name}={new_package_default_version}')
                     repo_tag_formed = "{}:{}".format(new_package.repository, new_package.default_reference)
-                    self.install(None, repo_tag_formed, name=new_package.name)
+                    installs[new_package.name] = (None, repo_tag_formed), {'name': new_package.name}
             else:
                 # No default version and package is not installed.
                 # Migrate old package same version.
                 new_package.version = old_package.version
-                migrate_package(old_package, new_package)
+                installs[new_package.name] = migrate_package(old_package, new_package)
 
-            self.database.commit()
+        self.database.commit()
+
+        def get_package_source(args, kwargs):
+            """ Returns the source of the package to be installed, with the package
+            metadata fetched, None if it can't be retrieved. In that case installing
+            the package reports the error. """
+
+            try:
+                source = kwargs.get('source')
+                if source is None:
+                    source = self.get_package_source(*args, name=kwargs.get('name'))
+                source.get_package()
+                return source
+            except Exception as err:
+                log.warning(f'failed to get package {kwargs.get("name") or args}: {err}')
+                return None
+
+        max_workers = max(1, min(len(installs), MIGRATION_WORKERS_MAX))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            sources = {name: executor.submit(get_package_source, args, kwargs)
+                       for name, (args, kwargs) in installs.items()}
+            sources = {name: future.result() for name, future in sources.items()}
+            packages = {name: source.get_package() if source is not None else None
+                        for name, source in sources.items()}
+
+            # Images from the old docker library are transferred concurrently,
+            # while packages whose images are loaded are installed in dependency order.
+            images = {name: executor.submit(kwargs['source'].load_image, False)
+                      for name, (args, kwargs) in installs.items() if 'source' in kwargs}
+            try:
+                for name in sort_packages_by_dependencies(packages):
+                    args, kwargs = installs[name]
+                    if name in images:
+                        images[name].result()
+                    if sources[name] is not None:
+                        # Installs with the metadata fetched above
+                        kwargs = dict(kwargs, source=sources[name])
+                    self.install(*args, **kwargs)
+                    self.database.commit()
+            finally:
+                for future in images.values():
+                    future.cancel()
 
     def get_installed_package(self, name: str, use_local_manifest: bool = False, use_edit: bool = False) -> Package:
         """ Get installed package by name.
@@ -963,6 +1047,31 @@ class PackageManager:
 
         return map(tag_to_version, filter(is_semantic_ver_tag, available_tags))
 
+    def get_packages_available_versions(self,
+                                        names: List[str],
+                                        all: bool = False) -> Dict[str, List]:
+        """ Returns the available versions of several packages. The
+        registries are queried concurrently.
+
+        Args:
+            names: Package names.
+            all: If set to True will return all tags including
+                 those which do not follow semantic versioning.
+        Returns:
+            Dictionary of package name to list of versions
+        """
+
+        def get_versions(name):
+            return list(self.get_package_available_versions(name, all))
+
+        if len(names) <= 1:
+            return {name: get_versions(name) for name in names}
+
+        max_workers = min(len(names), REGISTRY_WORKERS_MAX)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            versions = executor.map(get_versions, names)
+            return dict(zip(names, versions))
+
     def is_installed(self, name: str) -> bool:
         """ Returns boolean whether a package called name is installed.
 
@@ -1340,7 +1449,7 @@ class PackageManager:
             PackageManager
         """
 
-        docker_api = DockerApi(docker.from_env(), ProgressManager())
+        docker_api = DockerApi(docker.from_env(), ProgressManager(), client_factory=docker.from_env)
         registry_resolver = RegistryResolver()
         metadata_resolver = MetadataResolver(docker_api, registry_resolver)
         cfg_mgmt = config_mgmt.ConfigMgmt(source=INIT_CFG_JSON)
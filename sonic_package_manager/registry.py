@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 
 import json
+import threading
+import time
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 import requests
 import www_authenticate
@@ -19,15 +21,61 @@ class AuthenticationServiceError(Exception):
     pass
 
 
+class TokenCache:
+    """ Keeps authentication tokens until they expire. Tokens are
+    cached by the realm, service and scope they were issued for. """
+
+    # Token lifetime when the authentication service does not tell,
+    # as defined by the docker registry token specification.
+    DEFAULT_EXPIRES_IN = 60
+    # Tokens are dropped this many seconds before they expire, so that
+    # a token does not expire on its way to the registry.
+    EXPIRY_MARGIN = 10
+
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(bearer: Dict):
+        return bearer.get('realm'), bearer.get('service'), bearer.get('scope')
+
+    def get(self, bearer: Dict) -> Optional[str]:
+        """ Returns the cached token for bearer or None. """
+
+        with self._lock:
+            token, expires_at = self._tokens.get(self._key(bearer), (None, 0))
+            if time.monotonic() >= expires_at:
+                return None
+            return token
+
+    def put(self, bearer: Dict, token: str, expires_in: int):
+        with self._lock:
+            expires_at = time.monotonic() + expires_in - self.EXPIRY_MARGIN
+            self._tokens[self._key(bearer)] = token, expires_at
+
+    def discard(self, bearer: Dict):
+        with self._lock:
+            self._tokens.pop(self._key(bearer), None)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
 class AuthenticationService:
     """ AuthenticationService provides an authentication tokens. """
 
-    @staticmethod
-    def get_token(bearer: Dict) -> str:
-        """ Retrieve an authentication token.
+    token_cache = TokenCache()
+
+    @classmethod
+    def get_token(cls, bearer: Dict, session: Optional[requests.Session] = None) -> str:
+        """ Retrieve an authentication token, from the cache if
+        a token for the same realm, service and scope has not expired yet.
 
         Args:
             bearer: Bearer token.
+            session: Session to send the request with.
         Returns:
             token value as a string.
         """
@@ -36,16 +84,26 @@ class AuthenticationService:
         if 'realm' not in bearer:
             raise AuthenticationServiceError(f'Realm is required in bearer')
 
-        url = bearer.pop('realm')
-        response = requests.get(url, params=bearer)
+        token = cls.token_cache.get(bearer)
+        if token is not None:
+            return token
+
+        params = dict(bearer)
+        url = params.pop('realm')
+        response = (session or requests).get(url, params=params)
         if response.status_code != requests.codes.ok:
             raise AuthenticationServiceError('Failed to retrieve token')
 
         content = json.loads(response.content)
         token = content['token']
+        try:
+            expires_in = int(content.get('expires_in', TokenCache.DEFAULT_EXPIRES_IN))
+        except (TypeError, ValueError):
+            expires_in = TokenCache.DEFAULT_EXPIRES_IN
+        cls.token_cache.put(bearer, token, expires_in)
 
-        log.debug(f'authentication token for bearer={bearer}: '
-                  f'token={token}')
+        log.debug(f'authentication token for bearer={params}: '
+                  f'token={token} expires_in={expires_in}')
 
         return token
 
@@ -68,16 +126,41 @@ class RegistryApiError(Exception):
 
 
 class Registry:
-    """ Provides a Docker registry interface. """
+    """ Provides a Docker registry interface.
+
+    A registry object is shared by the threads querying the same host,
+    e.g. 'show package versions' queries the registries of several
+    packages concurrently. requests.Session is not thread safe, so every
+    thread gets a session of its own. """
 
     MIME_DOCKER_MANIFEST = 'application/vnd.docker.distribution.manifest.v2+json'
 
     def __init__(self, host: str):
         self.url = host
+        # Keeps the connections to the registry alive between requests of a thread
+        self._local = threading.local()
+        # Authentication details the registry asked for, per repository
+        self._bearers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """ Returns the session of the calling thread. """
+
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _execute_get_request(self, url, headers, repository=None):
+        with self._lock:
+            bearer = self._bearers.get(repository)
+        if bearer is not None:
+            # Authenticate up front, the registry asked for it before
+            token = AuthenticationService.get_token(bearer, self.session)
+            headers['Authorization'] = f'Bearer {token}'
 
-    @staticmethod
-    def _execute_get_request(url, headers):
-        response = requests.get(url, headers=headers)
+        response = self.session.get(url, headers=headers)
         if response.status_code == requests.codes.unauthorized:
             # Get authentication details from headers
             # Registry should tell how to authenticate
@@ -85,10 +168,16 @@ class Registry:
             log.debug(f'unauthorized: retrieving authentication details '
                       f'from response headers {www_authenticate_details}')
             bearer = www_authenticate.parse(www_authenticate_details)['bearer']
-            token = AuthenticationService.get_token(bearer)
+            if 'Authorization' in headers:
+                # The token sent was refused, e.g. it was revoked
+                AuthenticationService.token_cache.discard(bearer)
+            if repository is not None:
+                with self._lock:
+                    self._bearers[repository] = bearer
+            token = AuthenticationService.get_token(bearer, self.session)
             headers['Authorization'] = f'Bearer {token}'
             # Repeat request
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers)
         return response
 
     def _get_base_url(self, repository: str):
@@ -100,7 +189,7 @@ class Registry:
         _, repository = reference.Reference.split_docker_domain(repository)
         headers = {'Accept': 'application/json'}
         url = f'{self._get_base_url(repository)}/tags/list'
-        response = self._execute_get_request(url, headers)
+        response = self._execute_get_request(url, headers, repository)
         if response.status_code != requests.codes.ok:
             raise RegistryApiError(f'Failed to retrieve tags from {repository}', response)
 
@@ -115,7 +204,7 @@ class Registry:
         _, repository = reference.Reference.split_docker_domain(repository)
         headers = {'Accept': self.MIME_DOCKER_MANIFEST}
         url = f'{self._get_base_url(repository)}/manifests/{ref}'
-        response = self._execute_get_request(url, headers)
+        response = self._execute_get_request(url, headers, repository)
 
         if response.status_code != requests.codes.ok:
             raise RegistryApiError(f'Failed to retrieve manifest for {repository}:{ref}', response)
@@ -131,7 +220,7 @@ class Registry:
         _, repository = reference.Reference.split_docker_domain(repository)
         headers = {'Accept': self.MIME_DOCKER_MANIFEST}
         url = f'{self._get_base_url(repository)}/blobs/{digest}'
-        response = self._execute_get_request(url, headers)
+        response = self._execute_get_request(url, headers, repository)
         if response.status_code != requests.codes.ok:
             raise RegistryApiError(f'Failed to retrieve blobs for {repository}:{digest}', response)
         content = json.loads(response.content)
@@ -147,11 +236,16 @@ class RegistryResolver:
     DockerHubRegistry = Registry('https://index.docker.io')
 
     def __init__(self):
-        pass
+        # One registry object, hence one session, per registry host
+        self._registries = {}
+        self._lock = threading.Lock()
 
     def get_registry_for(self, ref: str) -> Registry:
         domain, _ = DockerReference.split_docker_domain(ref)
         if domain == reference.DEFAULT_DOMAIN:
             return self.DockerHubRegistry
-        # TODO: support insecure registries
-        return Registry(f'https://{domain}')
+        with self._lock:
+            if domain not in self._registries:
+                # TODO: support insecure registries
+                self._registries[domain] = Registry(f'https://{domain}')
+            return self._registries[domain]
@@ -18,6 +18,8 @@ class PackageSource(object):
         self.database = database
         self.docker = docker
         self.metadata_resolver = metadata_resolver
+        # Fetched once by get_package(), e.g. ahead of the installation when migrating packages
+        self.metadata = None
 
     def get_metadata(self) -> Metadata:
         """ Returns package manifest.
@@ -78,7 +80,9 @@ class PackageSource(object):
               SONiC Package
         """
 
-        metadata = self.get_metadata()
+        if self.metadata is None:
+            self.metadata = self.get_metadata()
+        metadata = self.metadata
         manifest = metadata.manifest
 
         name = manifest['package']['name']
@@ -131,6 +135,52 @@ class TarballSource(PackageSource):
         return self.docker.load(self.tarball_path)
 
 
+class DockerImageSource(PackageSource):
+    """ DockerImageSource implements PackageSource for an image in
+    another docker library, e.g. the one of the previous SONiC image.
+    The image is streamed from that library into the local one,
+    without an intermediate tarball. """
+
+    def __init__(self,
+                 image_id: str,
+                 source_docker: DockerApi,
+                 database: PackageDatabase,
+                 docker: DockerApi,
+                 metadata_resolver: MetadataResolver,
+                 name: Optional[str] = None):
+        """ Initialize DockerImageSource.
+
+        Args:
+            image_id: Image ID in the source docker library.
+            source_docker: Docker library to take the image from.
+            metadata_resolver: Metadata resolver of the source docker library.
+        """
+
+        super().__init__(database,
+                         docker,
+                         metadata_resolver)
+        self.image_id = image_id
+        self.source_docker = source_docker
+        self.name = name
+        self.image = None
+
+    def get_metadata(self) -> Metadata:
+        """ Returns manifest read from the image in the source docker library. """
+        return self.metadata_resolver.from_local(self.image_id, name=self.name)
+
+    def load_image(self, show_progress: bool = True):
+        """ Streams the image into the local docker library, unless
+        it is already loaded. May be called ahead of install(). """
+
+        if self.image is None:
+            self.image = self.docker.load_stream(self.source_docker.save(self.image_id), show_progress)
+        return self.image
+
+    def install_image(self, package: Package):
+        """ Installs image from the source docker library. """
+        return self.load_image()
+
+
 class RegistrySource(PackageSource):
     """ RegistrySource implements PackageSource
     for packages that are pulled from registry. """
@@ -341,6 +341,95 @@ class TestAclLoader(object):
         acl_loader.incremental_update()
         assert acl_loader.rules_info[(('NTP_ACL', 'RULE_1'))]["PACKET_ACTION"] == "DROP"
 
+    def test_incremental_update_diff(self, acl_loader, capsys):
+        acl_loader.per_npu_configdb = {}
+        acl_loader.appl_db_rule_keys = set()
+        acl_loader.rules_db_info = {
+            ('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'FORWARD', 'IP_PROTOCOL': '6'},
+            ('DATAACL', 'RULE_2'): {'PRIORITY': '9998', 'PACKET_ACTION': 'FORWARD', 'L4_SRC_PORT': '80'},
+            ('DATAACL', 'RULE_3'): {'PRIORITY': '9997', 'PACKET_ACTION': 'DROP'},
+            ('DATAACL', 'DEFAULT_RULE'): {'PRIORITY': '1', 'PACKET_ACTION': 'DROP'},
+        }
+        acl_loader.rules_info = {
+            # Unchanged, the value read from Config DB is a string
+            ('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'FORWARD', 'IP_PROTOCOL': 6},
+            # A field removed
+            ('DATAACL', 'RULE_2'): {'PRIORITY': '9998', 'PACKET_ACTION': 'FORWARD'},
+            # The priority only
+            ('DATAACL', 'RULE_3'): {'PRIORITY': '9000', 'PACKET_ACTION': 'DROP'},
+            ('DATAACL', 'RULE_4'): {'PRIORITY': '9996', 'PACKET_ACTION': 'DROP'},
+        }
+
+        assert acl_loader.get_rules_diff() == (
+            [('DATAACL', 'RULE_4')],
+            [('DATAACL', 'RULE_2'), ('DATAACL', 'RULE_3')],
+            [('DATAACL', 'DEFAULT_RULE')])
+
+        acl_loader.configdb.mod_config = mock.MagicMock()
+        acl_loader.configdb.set_entry = mock.MagicMock()
+        acl_loader.incremental_update(dry_run=True)
+        assert capsys.readouterr().out == (
+            "Add DATAACL|RULE_4\n"
+            "Modify DATAACL|RULE_2\n"
+            "Modify DATAACL|RULE_3\n"
+            "Delete DATAACL|DEFAULT_RULE\n"
+            "1 to add, 2 to modify, 1 to delete\n")
+        acl_loader.configdb.mod_config.assert_not_called()
+
+        client = mock.MagicMock()
+        with mock.patch('acl_loader.main.get_pipeline_client', mock.MagicMock(return_value=client)):
+            acl_loader.incremental_update()
+        acl_loader.configdb.mod_config.assert_not_called()
+        acl_loader.configdb.set_entry.assert_not_called()
+        client.pipeline.assert_called_once_with(transaction=True)
+        pipe = client.pipeline.return_value
+        assert pipe.mock_calls == [
+            mock.call.delete('ACL_RULE|DATAACL|DEFAULT_RULE'),
+            mock.call.hset('ACL_RULE|DATAACL|RULE_4', 'PRIORITY', '9996'),
+            mock.call.hset('ACL_RULE|DATAACL|RULE_4', 'PACKET_ACTION', 'DROP'),
+            mock.call.hdel('ACL_RULE|DATAACL|RULE_2', 'L4_SRC_PORT'),
+            mock.call.hset('ACL_RULE|DATAACL|RULE_2', 'PRIORITY', '9998'),
+            mock.call.hset('ACL_RULE|DATAACL|RULE_2', 'PACKET_ACTION', 'FORWARD'),
+            mock.call.hset('ACL_RULE|DATAACL|RULE_3', 'PRIORITY', '9000'),
+            mock.call.hset('ACL_RULE|DATAACL|RULE_3', 'PACKET_ACTION', 'DROP'),
+            mock.call.execute(),
+        ]
+
+        # Without a pipelining client the rules are written with mod_config and set_entry
+        with mock.patch('acl_loader.main.get_pipeline_client', mock.MagicMock(return_value=None)):
+            acl_loader.incremental_update()
+        acl_loader.configdb.mod_config.assert_called_once_with({'ACL_RULE': {
+            ('DATAACL', 'DEFAULT_RULE'): None,
+            ('DATAACL', 'RULE_4'): acl_loader.rules_info[('DATAACL', 'RULE_4')],
+            ('DATAACL', 'RULE_2'): acl_loader.rules_info[('DATAACL', 'RULE_2')],
+            ('DATAACL', 'RULE_3'): acl_loader.rules_info[('DATAACL', 'RULE_3')],
+        }})
+        acl_loader.configdb.set_entry.assert_called_once_with(
+            'ACL_RULE', ('DATAACL', 'RULE_2'), acl_loader.rules_info[('DATAACL', 'RULE_2')])
+
+    def test_incremental_update_list_fields(self, acl_loader):
+        acl_loader.per_npu_configdb = {}
+        acl_loader.appl_db_rule_keys = set()
+        # List fields are stored as 'field@' and read back as lists named without the suffix
+        acl_loader.rules_db_info = {
+            ('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'IN_PORTS': ['Ethernet0', 'Ethernet4']},
+            ('DATAACL', 'RULE_2'): {'PRIORITY': '9998', 'IN_PORTS': ['Ethernet0']},
+        }
+        acl_loader.rules_info = {
+            ('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'IN_PORTS': ['Ethernet0', 'Ethernet8']},
+            ('DATAACL', 'RULE_2'): {'PRIORITY': '9998'},
+        }
+
+        client = mock.MagicMock()
+        with mock.patch('acl_loader.main.get_pipeline_client', mock.MagicMock(return_value=client)):
+            acl_loader.incremental_update()
+        assert client.pipeline.return_value.mock_calls == [
+            mock.call.hset('ACL_RULE|DATAACL|RULE_1', 'PRIORITY', '9999'),
+            mock.call.hset('ACL_RULE|DATAACL|RULE_1', 'IN_PORTS@', 'Ethernet0,Ethernet8'),
+            mock.call.hdel('ACL_RULE|DATAACL|RULE_2', 'IN_PORTS@'),
+            mock.call.hset('ACL_RULE|DATAACL|RULE_2', 'PRIORITY', '9998'),
+            mock.call.execute(),
+        ]
 
 
 class TestMasicAclLoader(object):
@@ -380,3 +469,19 @@ class TestMasicAclLoader(object):
         acl_loader.load_rules_from_file(os.path.join(test_path, 'acl_input/incremental_2.json'))
         acl_loader.incremental_update()
         assert acl_loader.rules_info[(('NTP_ACL', 'RULE_1'))]["PACKET_ACTION"] == "DROP"
+
+    def test_incremental_update_diff(self, acl_loader):
+        acl_loader.appl_db_rule_keys = set()
+        acl_loader.rules_db_info = {('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'FORWARD'}}
+        acl_loader.rules_info = {('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'DROP'}}
+        configdbs = [acl_loader.configdb] + list(acl_loader.per_npu_configdb.values())
+        clients = {id(configdb): mock.MagicMock() for configdb in configdbs}
+        with mock.patch('acl_loader.main.get_pipeline_client',
+                        mock.MagicMock(side_effect=lambda configdb, db_name: clients[id(configdb)])):
+            acl_loader.incremental_update()
+        for client in clients.values():
+            assert client.pipeline.return_value.mock_calls == [
+                mock.call.hset('ACL_RULE|DATAACL|RULE_1', 'PRIORITY', '9999'),
+                mock.call.hset('ACL_RULE|DATAACL|RULE_1', 'PACKET_ACTION', 'DROP'),
+                mock.call.execute(),
+            ]
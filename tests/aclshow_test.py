@@ -1,10 +1,10 @@
-import json
 import os
 import sys
 from io import StringIO
 from unittest import mock
 
 from utilities_common.general import load_module_from_source
+from utilities_common.snapshot import write_snapshot
 
 test_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(test_path)
@@ -196,8 +196,7 @@ class Aclshow():
         if exist in /tmp/.counters_acl.p (by default).
         """
         if os.path.isfile(aclshow.COUNTERS_CACHE):
-            with open(aclshow.COUNTERS_CACHE, 'w') as fp:
-                json.dump([], fp)
+            write_snapshot(aclshow.COUNTERS_CACHE, {})
 
     def runTest(self):
         """
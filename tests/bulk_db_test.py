@@ -0,0 +1,34 @@
+from unittest import mock
+
+from .mock_tables import dbconnector
+
+from utilities_common import bulk_db
+
+
+class TestBulkDb(object):
+    def setup_method(self):
+        dbconnector.load_database_config()
+        self.db = dbconnector.SonicV2Connector(use_unix_socket_path=False)
+        self.db.connect(self.db.COUNTERS_DB)
+
+    def test_hgetall_bulk(self):
+        keys = ['RATES:oid:0x1000000000012', 'RATES:oid:0x1000000000013', 'RATES:oid:0xdead']
+        client = self.db.get_redis_client(self.db.COUNTERS_DB)
+        with mock.patch.object(client, 'pipeline', wraps=client.pipeline) as mock_pipeline:
+            data = bulk_db.hgetall_bulk(self.db, self.db.COUNTERS_DB, keys, batch_size=2)
+
+        # Two batches for three keys
+        assert mock_pipeline.call_count == 2
+        assert data['RATES:oid:0x1000000000012'] == self.db.get_all(self.db.COUNTERS_DB, 'RATES:oid:0x1000000000012')
+        assert data['RATES:oid:0x1000000000013']['RX_BPS']
+        assert data['RATES:oid:0xdead'] == {}
+
+    def test_hgetall_table(self):
+        data = bulk_db.hgetall_table(self.db, self.db.COUNTERS_DB, 'RATES', ['oid:0x1000000000012'], separator=':')
+        assert data == {'oid:0x1000000000012': self.db.get_all(self.db.COUNTERS_DB, 'RATES:oid:0x1000000000012')}
+
+    def test_hgetall_bulk_no_pipeline(self):
+        with mock.patch('utilities_common.bulk_db.get_pipeline_client', return_value=None):
+            data = bulk_db.hgetall_bulk(self.db, self.db.COUNTERS_DB, ['RATES:oid:0x1000000000012', 'RATES:oid:0xdead'])
+        assert data['RATES:oid:0x1000000000012']['RX_BPS'] == '2.e9'
+        assert data['RATES:oid:0xdead'] == {}
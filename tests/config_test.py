@@ -170,7 +170,7 @@ RELOAD_CONFIG_DB_OUTPUT = """\
 Acquired lock on {0}
 Running command: sudo systemctl stop featured.timer
 Stopping SONiC target ...
-Running command: /usr/local/bin/sonic-cfggen -j /tmp/config.json --write-to-db
+Loading /tmp/config.json to CONFIG_DB
 Restarting SONiC target ...
 Reloading Monit configuration ...
 Released lock on {0}
@@ -184,7 +184,7 @@ RELOAD_CONFIG_DB_BYPASS_LOCK_OUTPUT = """\
 Bypass lock on {0}
 Running command: sudo systemctl stop featured.timer
 Stopping SONiC target ...
-Running command: /usr/local/bin/sonic-cfggen -j /tmp/config.json --write-to-db
+Loading /tmp/config.json to CONFIG_DB
 Restarting SONiC target ...
 Reloading Monit configuration ...
 """
@@ -203,9 +203,9 @@ RELOAD_MASIC_CONFIG_DB_OUTPUT = """\
 Acquired lock on {0}
 Running command: sudo systemctl stop featured.timer
 Stopping SONiC target ...
-Running command: /usr/local/bin/sonic-cfggen -j /tmp/config.json --write-to-db
-Running command: /usr/local/bin/sonic-cfggen -j /tmp/config0.json -n asic0 --write-to-db
-Running command: /usr/local/bin/sonic-cfggen -j /tmp/config1.json -n asic1 --write-to-db
+Loading /tmp/config.json to CONFIG_DB
+Loading /tmp/config0.json to CONFIG_DB of asic0
+Loading /tmp/config1.json to CONFIG_DB of asic1
 Restarting SONiC target ...
 Reloading Monit configuration ...
 Released lock on {0}
@@ -218,7 +218,7 @@ Running command: /usr/local/bin/sonic-cfggen -H -k Seastone-DX010-25-50 --write-
 reload_config_with_disabled_service_output="""\
 Acquired lock on {0}
 Stopping SONiC target ...
-Running command: /usr/local/bin/sonic-cfggen -j /tmp/config.json --write-to-db
+Loading /tmp/config.json to CONFIG_DB
 Restarting SONiC target ...
 Reloading Monit configuration ...
 Released lock on {0}
@@ -246,23 +246,23 @@ Released lock on {0}
 """
 
 save_config_output = """\
-Running command: /usr/local/bin/sonic-cfggen -d --print-data > /etc/sonic/config_db.json
+Saving CONFIG_DB to /etc/sonic/config_db.json
 """
 
 save_config_filename_output = """\
-Running command: /usr/local/bin/sonic-cfggen -d --print-data > /tmp/config_db.json
+Saving CONFIG_DB to /tmp/config_db.json
 """
 
 save_config_masic_output = """\
-Running command: /usr/local/bin/sonic-cfggen -d --print-data > /etc/sonic/config_db.json
-Running command: /usr/local/bin/sonic-cfggen -n asic0 -d --print-data > /etc/sonic/config_db0.json
-Running command: /usr/local/bin/sonic-cfggen -n asic1 -d --print-data > /etc/sonic/config_db1.json
+Saving CONFIG_DB to /etc/sonic/config_db.json
+Saving CONFIG_DB of asic0 to /etc/sonic/config_db0.json
+Saving CONFIG_DB of asic1 to /etc/sonic/config_db1.json
 """
 
 save_config_filename_masic_output = """\
-Running command: /usr/local/bin/sonic-cfggen -d --print-data > config_db.json
-Running command: /usr/local/bin/sonic-cfggen -n asic0 -d --print-data > config_db0.json
-Running command: /usr/local/bin/sonic-cfggen -n asic1 -d --print-data > config_db1.json
+Saving CONFIG_DB to config_db.json
+Saving CONFIG_DB of asic0 to config_db0.json
+Saving CONFIG_DB of asic1 to config_db1.json
 """
 
 save_config_onefile_masic_output = """\
@@ -302,6 +302,18 @@ config_temp = {
         }
     }
 
+
+def sort_namespace_lines(output):
+    """
+    Namespaces are reloaded concurrently, so the lines printed per namespace come in any order
+    """
+    lines = [li.rstrip() for li in output.split('\n')]
+    namespace_lines = [i for i, li in enumerate(lines) if "CONFIG_DB" in li or "sonic-cfggen -H" in li]
+    for i, line in zip(namespace_lines, sorted(lines[i] for i in namespace_lines)):
+        lines[i] = line
+    return "\n".join(lines)
+
+
 def mock_run_command_side_effect(*args, **kwargs):
     command = args[0]
     if isinstance(command, str):
@@ -458,17 +470,13 @@ class TestConfigSave(object):
         importlib.reload(config.main)
 
     def test_config_save(self, get_cmd_module, setup_single_broadcom_asic):
-        def read_json_file_side_effect(filename):
-            return {}
-
         mock_file = MagicMock()
         mock_file.fileno.return_value = 1
         mock_file.__enter__.return_value = mock_file
         mock_file.__exit__.return_value = None
         with mock.patch("utilities_common.cli.run_command",
-                        mock.MagicMock(side_effect=mock_run_command_side_effect)),\
-            mock.patch('config.main.read_json_file',
-                       mock.MagicMock(side_effect=read_json_file_side_effect)),\
+                        mock.MagicMock(side_effect=mock_run_command_side_effect)) as mock_run_command, \
+            mock.patch('config.main.os.replace') as mock_replace, \
             mock.patch('config.main.open',
                        mock.MagicMock(return_value=mock_file)):
             (config, show) = get_cmd_module
@@ -483,19 +491,18 @@ class TestConfigSave(object):
 
             assert result.exit_code == 0
             assert "\n".join([li.rstrip() for li in result.output.split('\n')]) == save_config_output
+            # CONFIG_DB is read in-process and the file replaced atomically
+            mock_run_command.assert_not_called()
+            mock_replace.assert_called_once_with("/etc/sonic/config_db.json.tmp", "/etc/sonic/config_db.json")
 
     def test_config_save_filename(self, get_cmd_module, setup_single_broadcom_asic):
-        def read_json_file_side_effect(filename):
-            return {}
-
         mock_file = MagicMock()
         mock_file.fileno.return_value = 1
         mock_file.__enter__.return_value = mock_file
         mock_file.__exit__.return_value = None
         with mock.patch("utilities_common.cli.run_command",
                         mock.MagicMock(side_effect=mock_run_command_side_effect)),\
-            mock.patch('config.main.read_json_file',
-                       mock.MagicMock(side_effect=read_json_file_side_effect)),\
+            mock.patch('config.main.os.replace') as mock_replace, \
             mock.patch('config.main.open',
                        mock.MagicMock(return_value=mock_file)):
 
@@ -514,13 +521,11 @@ class TestConfigSave(object):
             assert (
                 "\n".join([li.rstrip() for li in result.output.split('\n')])
                 == save_config_filename_output)
+            mock_replace.assert_called_once_with(output_file + ".tmp", output_file)
 
     def test_config_save_calls_flush_and_fsync(
             self, get_cmd_module, setup_single_broadcom_asic):
         """Verify config save calls flush() and fsync() for persistence."""
-        def read_json_file_side_effect(filename):
-            return {}
-
         mock_file = MagicMock()
         mock_file.fileno.return_value = 1
         mock_file.__enter__.return_value = mock_file
@@ -528,9 +533,7 @@ class TestConfigSave(object):
         with mock.patch("utilities_common.cli.run_command",
                         mock.MagicMock(
                             side_effect=mock_run_command_side_effect)), \
-                mock.patch('config.main.read_json_file',
-                           mock.MagicMock(
-                               side_effect=read_json_file_side_effect)), \
+                mock.patch('config.main.os.replace'), \
                 mock.patch('config.main.open',
                            mock.MagicMock(return_value=mock_file)), \
                 mock.patch('config.main.os.fsync') as mock_fsync:
@@ -563,9 +566,6 @@ class TestConfigSaveMasic(object):
         dbconnector.load_namespace_config()
 
     def test_config_save_masic(self):
-        def read_json_file_side_effect(filename):
-            return {}
-
         mock_file = MagicMock()
         mock_file.fileno.return_value = 1
         mock_file.__enter__.return_value = mock_file
@@ -573,9 +573,7 @@ class TestConfigSaveMasic(object):
         with mock.patch("utilities_common.cli.run_command",
                         mock.MagicMock(
                             side_effect=mock_run_command_side_effect)), \
-                mock.patch('config.main.read_json_file',
-                           mock.MagicMock(
-                               side_effect=read_json_file_side_effect)), \
+                mock.patch('config.main.os.replace') as mock_replace, \
                 mock.patch('config.main.open',
                            mock.MagicMock(return_value=mock_file)):
 
@@ -590,11 +588,12 @@ class TestConfigSaveMasic(object):
             assert result.exit_code == 0
             assert "\n".join([li.rstrip() for li in result.output.split(
                 '\n')]) == save_config_masic_output
+            assert {call.args for call in mock_replace.call_args_list} == {
+                ("/etc/sonic/config_db.json.tmp", "/etc/sonic/config_db.json"),
+                ("/etc/sonic/config_db0.json.tmp", "/etc/sonic/config_db0.json"),
+                ("/etc/sonic/config_db1.json.tmp", "/etc/sonic/config_db1.json")}
 
     def test_config_save_filename_masic(self):
-        def read_json_file_side_effect(filename):
-            return {}
-
         mock_file = MagicMock()
         mock_file.fileno.return_value = 1
         mock_file.__enter__.return_value = mock_file
@@ -602,9 +601,7 @@ class TestConfigSaveMasic(object):
         with mock.patch("utilities_common.cli.run_command",
                         mock.MagicMock(
                             side_effect=mock_run_command_side_effect)), \
-                mock.patch('config.main.read_json_file',
-                           mock.MagicMock(
-                               side_effect=read_json_file_side_effect)), \
+                mock.patch('config.main.os.replace') as mock_replace, \
                 mock.patch('config.main.open',
                            mock.MagicMock(return_value=mock_file)):
 
@@ -621,6 +618,7 @@ class TestConfigSaveMasic(object):
 
             assert result.exit_code == 0
             assert "\n".join([li.rstrip() for li in result.output.split('\n')]) == save_config_filename_masic_output
+            assert mock_replace.call_count == 3
 
     def test_config_save_filename_wrong_cnt_masic(self):
         def read_json_file_side_effect(filename):
@@ -1154,9 +1152,8 @@ class TestConfigReloadMasic(object):
             traceback.print_tb(result.exc_info[2])
 
             assert result.exit_code == 0
-            assert "\n".join(
-                [li.rstrip() for li in result.output.split('\n')]
-            ) == reload_config_masic_onefile_gen_sysinfo_output.format(config.SYSTEM_RELOAD_LOCK)
+            assert sort_namespace_lines(result.output) == \
+                sort_namespace_lines(reload_config_masic_onefile_gen_sysinfo_output.format(config.SYSTEM_RELOAD_LOCK))
 
     def test_config_reload_onefile_bad_format_masic(self):
         def read_json_file_side_effect(filename):
@@ -1208,8 +1205,8 @@ class TestConfigReloadMasic(object):
                 [cfg_files, '-y', '-f'])
 
             assert result.exit_code == 0
-            assert "\n".join([li.rstrip() for li in result.output.split('\n')]) == \
-                RELOAD_MASIC_CONFIG_DB_OUTPUT.format(config.SYSTEM_RELOAD_LOCK)
+            assert sort_namespace_lines(result.output) == \
+                sort_namespace_lines(RELOAD_MASIC_CONFIG_DB_OUTPUT.format(config.SYSTEM_RELOAD_LOCK))
 
     def test_config_reload_multiple_files_with_spaces(self):
         dummy_cfg_file = os.path.join(os.sep, "tmp", "config.json")
@@ -1238,8 +1235,8 @@ class TestConfigReloadMasic(object):
                 [cfg_files, '-y', '-f'])
 
             assert result.exit_code == 0
-            assert "\n".join([li.rstrip() for li in result.output.split('\n')]) == \
-                RELOAD_MASIC_CONFIG_DB_OUTPUT.format(config.SYSTEM_RELOAD_LOCK)
+            assert sort_namespace_lines(result.output) == \
+                sort_namespace_lines(RELOAD_MASIC_CONFIG_DB_OUTPUT.format(config.SYSTEM_RELOAD_LOCK))
 
     def test_config_reload_default_files_validate_all_namespaces(self):
         dummy_cfg_file = os.path.join(
@@ -2260,6 +2257,8 @@ class TestGenericUpdateCommands(unittest.TestCase):
             False,
             (),
             trace_io=None,
+            plan_cache=False,
+            report_latency=False,
         )
         mock_generic_updater = mock.Mock()
         with mock.patch('generic_config_updater.main.GenericUpdater', return_value=mock_generic_updater):
@@ -2285,7 +2284,8 @@ class TestGenericUpdateCommands(unittest.TestCase):
         expected_output = "Patch applied successfully"
         expected_ignore_path_tuple = ('/ANY_TABLE', '/ANY_OTHER_TABLE/ANY_FIELD', '')
         expected_call_with_non_default_values = \
-            mock.call(mock.ANY, ConfigFormat.SONICYANG, True, True, True, expected_ignore_path_tuple, trace_io=None)
+            mock.call(mock.ANY, ConfigFormat.SONICYANG, True, True, True, expected_ignore_path_tuple,
+                      trace_io=None, plan_cache=False, report_latency=False)
         mock_generic_updater = mock.Mock()
         with mock.patch('generic_config_updater.main.GenericUpdater', return_value=mock_generic_updater):
             with mock.patch('builtins.open', mock.mock_open(read_data=self.any_patch_as_text)):
@@ -2334,19 +2334,32 @@ class TestGenericUpdateCommands(unittest.TestCase):
     def test_apply_patch__optional_parameters_passed_correctly(self):
         self.validate_apply_patch_optional_parameter(
             ["--format", ConfigFormat.SONICYANG.name],
-            mock.call(mock.ANY, ConfigFormat.SONICYANG, False, False, False, (), trace_io=None))
+            mock.call(mock.ANY, ConfigFormat.SONICYANG, False, False, False, (),
+                      trace_io=None, plan_cache=False, report_latency=False))
         self.validate_apply_patch_optional_parameter(
             ["--verbose"],
-            mock.call(mock.ANY, ConfigFormat.CONFIGDB, True, False, False, (), trace_io=None))
+            mock.call(mock.ANY, ConfigFormat.CONFIGDB, True, False, False, (),
+                      trace_io=None, plan_cache=False, report_latency=False))
         self.validate_apply_patch_optional_parameter(
             ["--dry-run"],
-            mock.call(mock.ANY, ConfigFormat.CONFIGDB, False, True, False, (), trace_io=None))
+            mock.call(mock.ANY, ConfigFormat.CONFIGDB, False, True, False, (),
+                      trace_io=None, plan_cache=False, report_latency=False))
         self.validate_apply_patch_optional_parameter(
             ["--ignore-non-yang-tables"],
-            mock.call(mock.ANY, ConfigFormat.CONFIGDB, False, False, True, (), trace_io=None))
+            mock.call(mock.ANY, ConfigFormat.CONFIGDB, False, False, True, (),
+                      trace_io=None, plan_cache=False, report_latency=False))
         self.validate_apply_patch_optional_parameter(
             ["--ignore-path", "/ANY_TABLE"],
-            mock.call(mock.ANY, ConfigFormat.CONFIGDB, False, False, False, ("/ANY_TABLE",), trace_io=None))
+            mock.call(mock.ANY, ConfigFormat.CONFIGDB, False, False, False, ("/ANY_TABLE",),
+                      trace_io=None, plan_cache=False, report_latency=False))
+        self.validate_apply_patch_optional_parameter(
+            ["--plan-cache"],
+            mock.call(mock.ANY, ConfigFormat.CONFIGDB, False, False, False, (),
+                      trace_io=None, plan_cache=True, report_latency=False))
+        self.validate_apply_patch_optional_parameter(
+            ["--report-latency"],
+            mock.call(mock.ANY, ConfigFormat.CONFIGDB, False, False, False, (),
+                      trace_io=None, plan_cache=False, report_latency=True))
 
     @patch('subprocess.Popen', mock.Mock(return_value=mock.Mock(
         communicate=mock.Mock(return_value=('{"some": "config"}', None)),
@@ -2691,7 +2704,7 @@ class TestGenericUpdateCommands(unittest.TestCase):
                 False,
                 False,
                 ("/ANY_TABLE",),
-                trace_io=None,
+                trace_io=None
             )
         )
 
@@ -5238,37 +5251,17 @@ class TestApplyPatchMultiAsic(unittest.TestCase):
             self.assertNotEqual(result.exit_code, 0, "Command should failed")
             self.assertIn("Failed to replace config", result.output)
 
-    @patch('generic_config_updater.generic_updater.subprocess.Popen')
+    @patch('generic_config_updater.generic_updater.get_config_db_as_json')
     @patch('generic_config_updater.generic_updater.Util.ensure_checkpoints_dir_exists', mock.Mock(return_value=True))
     @patch('generic_config_updater.generic_updater.Util.save_json_file', MagicMock())
-    def test_checkpoint_multiasic(self, mock_subprocess_popen):
+    def test_checkpoint_multiasic(self, mock_get_config_db_as_json):
         allconfigs = copy.deepcopy(self.all_config)
 
-        # Create mock instances for each subprocess call
-        mock_instance_localhost = MagicMock()
-        mock_instance_localhost.communicate.return_value = (json.dumps(allconfigs["localhost"]), 0)
-        mock_instance_localhost.returncode = 0
-
-        mock_instance_asic0 = MagicMock()
-        mock_instance_asic0.communicate.return_value = (json.dumps(allconfigs["asic0"]), 0)
-        mock_instance_asic0.returncode = 0
-
-        mock_instance_asic1 = MagicMock()
-        mock_instance_asic1.communicate.return_value = (json.dumps(allconfigs["asic1"]), 0)
-        mock_instance_asic1.returncode = 0
-
-        # Setup side effect to return different mock instances based on input arguments
-        def side_effect(*args, **kwargs):
-            if "asic" not in args[0]:
-                return mock_instance_localhost
-            elif "asic0" in args[0]:
-                return mock_instance_asic0
-            elif "asic1" in args[0]:
-                return mock_instance_asic1
-            else:
-                return MagicMock()  # Default case
-
-        mock_subprocess_popen.side_effect = side_effect
+        # Return the config of each scope
+        def side_effect(scope):
+            return copy.deepcopy(allconfigs[scope if scope else "localhost"])
+
+        mock_get_config_db_as_json.side_effect = side_effect
 
         checkpointname = "checkpointname"
         print("Multi ASIC: {}".format(multi_asic.is_multi_asic()))
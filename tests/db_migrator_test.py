@@ -308,6 +308,27 @@ class TestAutoNegMigrator(object):
         assert dbmgtr.configDB.get_table('PORT') == expected_db.cfgdb.get_table('PORT')
         assert dbmgtr.configDB.get_table('VERSIONS') == expected_db.cfgdb.get_table('VERSIONS')
 
+
+class TestMigrateDryRun(object):
+    def test_port_autoneg_migrator_dry_run(self, capsys):
+        dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(mock_db_path, 'config_db', 'port-an-input')
+        import db_migrator
+        dbmgtr = db_migrator.DBMigrator(None)
+        port_table = dbmgtr.configDB.get_table('PORT')
+        dbmgtr.migrate(dry_run=True)
+
+        # Nothing is written, the changes and the steps are printed
+        assert dbmgtr.configDB.get_table('PORT') == port_table
+        output = capsys.readouterr().out
+        assert 'CONFIG_DB HSET PORT|Ethernet0 autoneg on' in output
+        assert 'CONFIG_DB HSET VERSIONS|DATABASE VERSION {}'.format(dbmgtr.CURRENT_VERSION) in output
+        assert 'common_migration_ops: ' in output
+
+        dbmgtr.migrate()
+        assert dbmgtr.configDB.get_table('PORT') != port_table
+        assert dbmgtr.get_version() == dbmgtr.CURRENT_VERSION
+
+
 class TestInitConfigMigrator(object):
 
 
@@ -0,0 +1,50 @@
+from unittest import mock
+
+from .mock_tables import dbconnector
+
+from utilities_common.db_snapshot import DBSnapshot
+
+
+class TestDbSnapshot(object):
+    def setup_method(self):
+        dbconnector.load_database_config()
+        self.db = dbconnector.SonicV2Connector(use_unix_socket_path=False)
+        self.db.connect(self.db.CONFIG_DB)
+
+    def test_changes_kept_until_commit(self):
+        snapshot = DBSnapshot(self.db, self.db.CONFIG_DB)
+        snapshot.load()
+        port = self.db.get_all(self.db.CONFIG_DB, 'PORT|Ethernet0')
+        assert snapshot.get_entry('PORT', 'Ethernet0')['mtu'] == port['mtu']
+
+        snapshot.mod_entry('PORT', 'Ethernet0', {'mtu': '1500'})
+        snapshot.set_entry('PORT', 'Ethernet4', None)
+        snapshot.set_entry('NEW_TABLE', ('a', 'b'), {'ports': ['Ethernet0', 'Ethernet4']})
+
+        assert snapshot.get_entry('PORT', 'Ethernet0')['mtu'] == '1500'
+        assert 'Ethernet4' not in snapshot.get_keys('PORT')
+        assert snapshot.get_table('NEW_TABLE') == {('a', 'b'): {'ports': ['Ethernet0', 'Ethernet4']}}
+        # The database is untouched
+        assert self.db.get_all(self.db.CONFIG_DB, 'PORT|Ethernet0') == port
+        assert self.db.exists(self.db.CONFIG_DB, 'PORT|Ethernet4')
+        assert snapshot.get_diff() == [
+            ('HSET', 'NEW_TABLE|a|b', 'ports@', 'Ethernet0,Ethernet4'),
+            ('HSET', 'PORT|Ethernet0', 'mtu', '1500'),
+            ('DEL', 'PORT|Ethernet4'),
+        ]
+
+        client = self.db.get_redis_client(self.db.CONFIG_DB)
+        with mock.patch.object(client, 'pipeline', wraps=client.pipeline) as mock_pipeline:
+            assert len(snapshot.commit()) == 3
+        # One transaction for all changes
+        mock_pipeline.assert_called_once_with(transaction=True)
+        assert self.db.get(self.db.CONFIG_DB, 'PORT|Ethernet0', 'mtu') == '1500'
+        assert not self.db.exists(self.db.CONFIG_DB, 'PORT|Ethernet4')
+        assert self.db.get(self.db.CONFIG_DB, 'NEW_TABLE|a|b', 'ports@') == 'Ethernet0,Ethernet4'
+        assert snapshot.get_diff() == []
+
+    def test_unchanged_value_not_written(self):
+        snapshot = DBSnapshot(self.db, self.db.CONFIG_DB)
+        mtu = snapshot.get(self.db.CONFIG_DB, 'PORT|Ethernet0', 'mtu')
+        snapshot.set(self.db.CONFIG_DB, 'PORT|Ethernet0', 'mtu', mtu)
+        assert snapshot.get_diff() == []
@@ -218,6 +218,38 @@ class TestDumpState:
         ddiff = DeepDiff(set(expected_entries), set(rec_json.keys()))
         assert not ddiff, "Expected Entries were not recieved when passing all keyword"
 
+    def test_option_jobs(self, match_engine):
+        runner = CliRunner()
+        result = runner.invoke(dump.state, ["port", "all", "--db", "CONFIG_DB"], obj=match_engine)
+        assert result.exit_code == 0, "exit code: {}, Exception: {}, Traceback: {}".format(
+            result.exit_code, result.exception, result.exc_info)
+        result_jobs = runner.invoke(dump.state, ["port", "all", "--db", "CONFIG_DB", "--jobs", "4"], obj=match_engine)
+        assert result_jobs.exit_code == 0, "exit code: {}, Exception: {}, Traceback: {}".format(
+            result_jobs.exit_code, result_jobs.exception, result_jobs.exc_info)
+        assert result.output == result_jobs.output
+        # Prefetching is only on for the command that asked for it
+        assert not match_engine.prefetch
+
+    def test_option_ndjson(self, match_engine):
+        runner = CliRunner()
+        result = runner.invoke(dump.state, ["port", "Ethernet0,Ethernet4"], obj=match_engine)
+        expected = json.loads(result.output)
+        result = runner.invoke(dump.state, ["port", "Ethernet0,Ethernet4", "--ndjson", "--jobs", "2"], obj=match_engine)
+        assert result.exit_code == 0, "exit code: {}, Exception: {}, Traceback: {}".format(
+            result.exit_code, result.exception, result.exc_info)
+        records = [json.loads(line) for line in result.output.splitlines()]
+        assert len(records) == 2
+        received = {}
+        for record in records:
+            received.update(record)
+        ddiff = DeepDiff(expected, received)
+        assert not ddiff, ddiff
+
+    def test_option_ndjson_table(self, match_engine):
+        runner = CliRunner()
+        result = runner.invoke(dump.state, ["port", "Ethernet0", "--ndjson", "--table"], obj=match_engine)
+        assert result.output == "--ndjson option is not valid with --table\n"
+
     def test_namespace_single_asic(self, match_engine):
         runner = CliRunner()
         result = runner.invoke(dump.state, ["port", "Ethernet0", "--table", "--key-map", "--namespace", "asic0"], obj=match_engine)
@@ -5,7 +5,7 @@ import pytest
 from dump.match_infra import MatchEngine, EXCEP_DICT, MatchRequest, MatchRequestOptimizer, ConnectionPool, CONN
 from utilities_common.constants import DEFAULT_NAMESPACE
 from dump.helper import populate_mock
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from deepdiff import DeepDiff
 from importlib import reload
 
@@ -248,6 +248,33 @@ class TestMatchEngine:
         assert len(ret["keys"]) == 1
         assert "PORT|Ethernet60" in ret["keys"]
 
+
+@pytest.mark.usefixtures("match_engine")
+class TestPrefetch:
+
+    def test_prefetch_matches_direct_reads(self, match_engine):
+        prefetch_engine = MatchEngine(match_engine.conn_pool, prefetch=True)
+        reqs = [MatchRequest(db="STATE_DB", table="VXLAN_TUNNEL_TABLE", key_pattern="EVPN_25.25.25.2*",
+                             field="operstatus", value="down", return_fields=["src_ip"]),
+                MatchRequest(db="STATE_DB", table="REBOOT_CAUSE", key_pattern="2020_10_09_02*",
+                             return_fields=["cause"]),
+                MatchRequest(db="CONFIG_DB", table="SFLOW", key_pattern="global", just_keys=False),
+                MatchRequest(db="CONFIG_DB", table="PORT", key_pattern="*", field="lanes", value="61,62,63,64",
+                             match_entire_list=True)]
+        for req in reqs:
+            ddiff = DeepDiff(match_engine.fetch(req), prefetch_engine.fetch(req))
+            assert not ddiff, ddiff
+
+        # Tables are read once and later requests are served from memory
+        assert ("", "STATE_DB", "REBOOT_CAUSE") in prefetch_engine.table_cache.tables
+        conn = match_engine.conn_pool.cache[DEFAULT_NAMESPACE][CONN]
+        with patch.object(conn, "keys") as mock_keys:
+            ret = prefetch_engine.fetch(MatchRequest(db="STATE_DB", table="REBOOT_CAUSE", return_fields=["cause"]))
+        assert not mock_keys.called
+        assert len(ret["keys"]) == 2
+        assert "warm-reboot" == ret["return_values"]["REBOOT_CAUSE|2020_10_09_04_53_58"]["cause"]
+
+
 @pytest.mark.usefixtures("match_engine")
 class TestNonDefaultNameSpace:
 
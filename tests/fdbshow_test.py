@@ -3,7 +3,7 @@ from click.testing import CliRunner
 import pytest
 
 import show.main as show
-from .utils import get_result_and_return_code
+from .utils import get_result_and_return_code, load_source
 import subprocess
 
 root_path = os.path.dirname(os.path.abspath(__file__))
@@ -624,6 +624,39 @@ class TestFdbshow():
         assert return_code == 0
         assert "10.0.0.1" in result
 
+    def test_show_mac_evpn_mh_nhg_port(self):
+        """A port filter drops the NHG remote MACs, as it does the endpoint_ip ones"""
+        self.set_mock_variant("8")
+
+        return_code, result = get_result_and_return_code(['fdbshow', '-p', 'Ethernet0'])
+        print("return_code: {}".format(return_code))
+        print("result = {}".format(result))
+        assert return_code == 0
+        assert "11:22:33:44:55:66" in result
+        assert "aa:bb:cc:dd:ee:01" not in result
+        assert "aa:bb:cc:dd:ee:02" not in result
+
+    def test_fetch_fdb_data_evpn_mh_nhg_index(self):
+        """The next hop group index resolves the NHG bridge port to all its remote endpoints"""
+        from tests.mock_tables import dbconnector
+        self.set_mock_variant("8")
+        dedicated_dbs = dict(dbconnector.dedicated_dbs)
+        try:
+            fdbshow = load_source('fdbshow', os.path.join(scripts_path, 'fdbshow'))
+            fdb = fdbshow.FdbShow()
+
+            fdb.fetch_fdb_data(port="10.0.0.2")
+            assert list(fdb.nhg_endpoints) == ["0000000000bbb"]
+            assert sorted(fdb.nhg_endpoints["0000000000bbb"]) == ["10.0.0.1", "10.0.0.2"]
+            assert [(mac, port) for _, mac, port, _ in fdb.bridge_mac_list] == \
+                [("aa:bb:cc:dd:ee:02", "\n".join(fdb.nhg_endpoints["0000000000bbb"]))]
+
+            fdb.fetch_fdb_data(port="10.0.0.3")
+            assert fdb.bridge_mac_list == []
+        finally:
+            dbconnector.dedicated_dbs.clear()
+            dbconnector.dedicated_dbs.update(dedicated_dbs)
+
     def test_show_mac_local_flag(self):
         """Cover the -l/--local flag: remote MACs (endpoint_ip and NHG) are skipped"""
         self.set_mock_variant("8")
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from utilities_common.general import atomic_write
+
+
+class TestAtomicWrite(object):
+    def test_write(self, tmp_path):
+        path = str(tmp_path / "config_db.json")
+
+        with atomic_write(path, fsync=True) as fh:
+            fh.write("{}")
+
+        with open(path) as fh:
+            assert fh.read() == "{}"
+        assert os.stat(path).st_mode & 0o777 == 0o644
+        assert os.listdir(str(tmp_path)) == ["config_db.json"]
+
+    def test_replace_keeps_mode(self, tmp_path):
+        path = str(tmp_path / "snapshot")
+        with open(path, "wb") as fh:
+            fh.write(b"old")
+        os.chmod(path, 0o600)
+
+        with atomic_write(path, "wb") as fh:
+            fh.write(b"new")
+
+        with open(path, "rb") as fh:
+            assert fh.read() == b"new"
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+    def test_failure_keeps_file(self, tmp_path):
+        path = str(tmp_path / "plan.json")
+        with open(path, "w") as fh:
+            fh.write("old")
+
+        with pytest.raises(KeyboardInterrupt):
+            with atomic_write(path) as fh:
+                fh.write("partial")
+                raise KeyboardInterrupt()
+
+        with open(path) as fh:
+            assert fh.read() == "old"
+        assert os.listdir(str(tmp_path)) == ["plan.json"]
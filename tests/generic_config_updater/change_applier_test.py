@@ -284,6 +284,159 @@ class TestChangeApplier(unittest.TestCase):
         debug_print("all good for applier")
 
 
+class TestChangeApplierConsumerWait(unittest.TestCase):
+
+    def setUp(self):
+        self.updater_conf = generic_config_updater.change_applier.ChangeApplier.updater_conf
+
+    def tearDown(self):
+        generic_config_updater.change_applier.ChangeApplier.updater_conf = self.updater_conf
+
+    def _change(self, upd_config):
+        change = Mock()
+        change.apply.side_effect = lambda config, in_place: copy.deepcopy(upd_config)
+        return change
+
+    @patch("generic_config_updater.change_applier.subscribe_config_db_keyspace", Mock(return_value=None))
+    @patch("generic_config_updater.change_applier.get_config_db_client", Mock())
+    @patch("generic_config_updater.change_applier.time.sleep")
+    @patch("generic_config_updater.change_applier.get_ack_db")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_wait_for_previous_change(self, mock_set, mock_db, mock_ack_db, mock_sleep):
+        generic_config_updater.change_applier.ChangeApplier.updater_conf = {
+            "tables": {"VLAN": {"consumer_ack": {"db": "STATE_DB", "table": "VLAN_TABLE"},
+                                "consumer_fields": {"db": "APPL_DB", "table": "VLAN_TABLE", "fields": ["mtu"]}},
+                       "PORTCHANNEL_MEMBER": {"consumer_ack": {"db": "STATE_DB", "table": "LAG_MEMBER_TABLE"}}},
+            "services": {}
+        }
+        state_db = {}
+        ack_db = mock_ack_db.return_value
+        ack_db.get_db_separator.side_effect = lambda db_name: ":" if db_name == "APPL_DB" else "|"
+
+        def exists(db_name, key):
+            # The consumer acknowledges on the second poll
+            state_db[key] = state_db.get(key, 0) + 1
+            return state_db[key] > 1
+        ack_db.exists.side_effect = exists
+        # The consumer copies the new mtu on the second poll
+        ack_db.get_all.side_effect = [{"mtu": "1500"}, {"mtu": "9000"}]
+
+        applier = generic_config_updater.change_applier.ChangeApplier()
+        config = {}
+        config_1 = {"VLAN": {"Vlan100": {"vlanid": "100"}}}
+        config_2 = dict(config_1, PORTCHANNEL_MEMBER={"PortChannel01|Ethernet0": {}})
+        config_3 = dict(config_2, VLAN={"Vlan100": {"vlanid": "100", "mtu": "9000"}})
+
+        config = applier.apply(config, self._change(config_1))
+        assert not ack_db.exists.called
+        assert set(applier.pending_keys) == {("VLAN", "Vlan100")}
+
+        # Without the table dependencies, the next change waits for the previous one
+        config = applier.apply(config, self._change(config_2))
+        ack_db.exists.assert_called_with("STATE_DB", "VLAN_TABLE|Vlan100")
+        assert ack_db.exists.call_count == 2
+        assert set(applier.pending_keys) == {("PORTCHANNEL_MEMBER", "PortChannel01|Ethernet0")}
+
+        config = applier.apply(config, self._change(config_3))
+        ack_db.exists.assert_called_with("STATE_DB", "LAG_MEMBER_TABLE|PortChannel01|Ethernet0")
+        assert ack_db.exists.call_count == 4
+
+        # VLAN_TABLE|Vlan100 already exists, the modified Vlan100 is consumed once its mtu is copied
+        ack_db.exists.reset_mock()
+        assert applier.wait_for_consumers() >= 0
+        assert not ack_db.exists.called
+        ack_db.get_all.assert_called_with("APPL_DB", "VLAN_TABLE:Vlan100")
+        assert ack_db.get_all.call_count == 2
+        assert not applier.pending_keys
+        assert mock_set.call_count == 3
+        # Only polls, no fixed delay
+        assert all(args == (generic_config_updater.change_applier.CONSUMER_ACK_POLL_INTERVAL,)
+                   for args, _ in mock_sleep.call_args_list)
+
+    @patch("generic_config_updater.change_applier.time.sleep")
+    @patch("generic_config_updater.change_applier.get_ack_db")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_independent_tables_share_a_wait(self, mock_set, mock_db, mock_ack_db, mock_sleep):
+        generic_config_updater.change_applier.ChangeApplier.updater_conf = {
+            "tables": {"VLAN": {"consumer_ack": {"db": "STATE_DB", "table": "VLAN_TABLE"}},
+                       "PORTCHANNEL": {"consumer_ack": {"db": "STATE_DB", "table": "LAG_TABLE"}}},
+            "services": {}
+        }
+        ack_db = mock_ack_db.return_value
+        ack_db.get_db_separator.return_value = "|"
+        ack_db.exists.return_value = True
+        config_wrapper = Mock()
+        dependencies = config_wrapper.get_yang_table_dependencies.return_value
+        dependencies.get_validation_tables.side_effect = lambda tables: {
+            frozenset({"VLAN"}): frozenset({"VLAN", "VLAN_MEMBER"}),
+            frozenset({"PORTCHANNEL"}): frozenset({"PORTCHANNEL", "PORTCHANNEL_MEMBER"}),
+            frozenset({"VLAN_MEMBER"}): frozenset({"VLAN", "VLAN_MEMBER"})}[frozenset(tables)]
+
+        applier = generic_config_updater.change_applier.ChangeApplier(config_wrapper=config_wrapper)
+        config_1 = {"VLAN": {"Vlan100": {"vlanid": "100"}}}
+        config_2 = dict(config_1, PORTCHANNEL={"PortChannel01": {}})
+        config_3 = dict(config_2, VLAN_MEMBER={"Vlan100|Ethernet0": {}})
+
+        with patch("generic_config_updater.change_applier.subscribe_config_db_keyspace", Mock(return_value=None)), \
+                patch("generic_config_updater.change_applier.get_config_db_client", Mock()):
+            config = applier.apply({}, self._change(config_1))
+            # PORTCHANNEL does not depend on VLAN
+            config = applier.apply(config, self._change(config_2))
+            assert not ack_db.exists.called
+            assert set(applier.pending_keys) == {("VLAN", "Vlan100"), ("PORTCHANNEL", "PortChannel01")}
+
+            # VLAN_MEMBER depends on VLAN, the PORTCHANNEL stays pending
+            config = applier.apply(config, self._change(config_3))
+            ack_db.exists.assert_called_once_with("STATE_DB", "VLAN_TABLE|Vlan100")
+            assert set(applier.pending_keys) == {("PORTCHANNEL", "PortChannel01"),
+                                                 ("VLAN_MEMBER", "Vlan100|Ethernet0")}
+
+            applier.wait_for_consumers()
+            assert not applier.pending_keys
+
+    @patch("generic_config_updater.change_applier.CONSUMER_ACK_TIMEOUT", 0.5)
+    @patch("generic_config_updater.change_applier.get_config_db_client", Mock())
+    @patch("generic_config_updater.change_applier.subscribe_config_db_keyspace")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_wait_for_keyspace_notification(self, mock_set, mock_db, mock_subscribe):
+        generic_config_updater.change_applier.ChangeApplier.updater_conf = {"tables": {}, "services": {}}
+        messages = []
+        pubsub = mock_subscribe.return_value
+        pubsub.get_message.side_effect = lambda timeout: messages.pop(0) if messages else None
+
+        applier = generic_config_updater.change_applier.ChangeApplier()
+        applier.apply({}, self._change({"NTP_SERVER": {"10.0.0.1": {}, "10.0.0.2": {}}}))
+        assert applier.unnotified == {"NTP_SERVER|10.0.0.1", "NTP_SERVER|10.0.0.2"}
+
+        messages.extend([{"type": "pmessage", "channel": "__keyspace@4__:NTP_SERVER|10.0.0.1", "data": "hset"},
+                         {"type": "pmessage", "channel": "__keyspace@4__:NTP_SERVER|10.0.0.2", "data": "hset"}])
+        assert applier.wait_for_consumers() < 0.5
+        assert not applier.unnotified
+        assert not applier.pending_keys
+
+        # A write whose notification never arrives is waited on until it times out
+        applier.apply({}, self._change({"NTP_SERVER": {"10.0.0.3": {}}}))
+        assert applier.wait_for_consumers() >= 0.5
+        assert not applier.unnotified
+        assert not applier.pending_keys
+        mock_subscribe.assert_called_once()
+
+    @patch("generic_config_updater.change_applier.get_config_db_reader")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_apply__config_db_snapshot_invalidated(self, mock_set, mock_db, mock_reader):
+        generic_config_updater.change_applier.ChangeApplier.updater_conf = {"tables": {}, "services": {}}
+        applier = generic_config_updater.change_applier.ChangeApplier()
+
+        applier.apply({}, self._change({"NTP_SERVER": {"10.0.0.1": {}}}))
+
+        mock_reader.assert_called_once_with(applier.scope)
+        mock_reader.return_value.invalidate.assert_called_once_with()
+
+
 class TestDryRunChangeApplier(unittest.TestCase):
     def test_apply__calls_apply_change_to_config_db(self):
         # Arrange
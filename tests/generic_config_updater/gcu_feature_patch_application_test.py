@@ -94,6 +94,7 @@ class TestFeaturePatchApplication(unittest.TestCase):
         patch_wrapper = PatchWrapper(config_wrapper)
         return gu.PatchApplier(config_wrapper=config_wrapper, patch_wrapper=patch_wrapper, changeapplier=change_applier)
     
+    @patch("generic_config_updater.change_applier.CONSUMER_ACK_TIMEOUT", 0)
     @patch("generic_config_updater.change_applier.get_config_db")
     @patch("generic_config_updater.change_applier.set_config")
     def run_single_success_case_applier(self, data, mock_set, mock_db):
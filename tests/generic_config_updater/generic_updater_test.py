@@ -47,10 +47,37 @@ class TestPatchApplier(unittest.TestCase):
         patch_applier.patch_wrapper.verify_same_json.assert_has_calls(
             [call(Files.CONFIG_DB_AFTER_MULTI_PATCH, Files.CONFIG_DB_AFTER_MULTI_PATCH)])
 
+    def test_apply__report_latency__latency_of_each_change_logged(self):
+        # Arrange
+        patch_applier = self.__create_patch_applier(report_latency=True)
+        patch_applier.logger = Mock()
+
+        # Act
+        patch_applier.apply(Files.MULTI_OPERATION_CONFIG_DB_PATCH)
+
+        # Assert
+        notices = [args[0] for args, _ in patch_applier.logger.log_notice.call_args_list]
+        self.assertTrue(any("change 1/2 applied in" in notice for notice in notices))
+        self.assertTrue(any("change 2/2 applied in" in notice for notice in notices))
+        self.assertTrue(any("for the consumers of the last changes" in notice for notice in notices))
+
+    def test_apply__no_report_latency__latency_not_logged(self):
+        # Arrange
+        patch_applier = self.__create_patch_applier()
+        patch_applier.logger = Mock()
+
+        # Act
+        patch_applier.apply(Files.MULTI_OPERATION_CONFIG_DB_PATCH)
+
+        # Assert
+        notices = [args[0] for args, _ in patch_applier.logger.log_notice.call_args_list]
+        self.assertFalse(any("applied in" in notice for notice in notices))
+
     def __create_patch_applier(self,
                                changes=None,
                                valid_patch_does_not_produce_empty_tables=True,
-                               verified_same_config=True):
+                               verified_same_config=True,
+                               report_latency=False):
         config_wrapper = Mock()
         config_wrapper.get_config_db_as_json.side_effect = \
             [Files.CONFIG_DB_AS_JSON, Files.CONFIG_DB_AFTER_MULTI_PATCH]
@@ -77,8 +104,11 @@ class TestPatchApplier(unittest.TestCase):
         changeapplier.apply.side_effect = create_side_effect_skipfirstarg_dict({
                 (str(changes[0]),): Files.CONFIG_DB_AFTER_MULTI_PATCH,
                 (str(changes[1]),): Files.CONFIG_DB_AFTER_MULTI_PATCH})
+        changeapplier.last_wait = 0
+        changeapplier.wait_for_consumers.return_value = 0
 
-        return gu.PatchApplier(patchsorter, changeapplier, config_wrapper, patch_wrapper)
+        return gu.PatchApplier(patchsorter, changeapplier, config_wrapper, patch_wrapper,
+                               report_latency=report_latency)
 
 class TestConfigReplacer(unittest.TestCase):
     def test_replace__json_not_fully_updated__failure(self):
@@ -436,6 +466,18 @@ class TestGenericUpdateFactory(unittest.TestCase):
         # Act and assert
         self.recursively_test_create_func(options, 0, {}, [], self.validate_create_patch_applier)
 
+    def test_create_patch_applier__plan_cache__patch_sorter_uses_plan_cache(self):
+        # Arrange
+        factory = gu.GenericUpdateFactory()
+
+        # Act
+        patch_applier = factory.create_patch_applier(gu.ConfigFormat.CONFIGDB, False, True, False, (), plan_cache=True)
+        no_cache_patch_applier = factory.create_patch_applier(gu.ConfigFormat.CONFIGDB, False, True, False, ())
+
+        # Assert
+        self.assertIsInstance(patch_applier.patchsorter.inner_patch_sorter.plan_cache, gu.PlanCache)
+        self.assertIsNone(no_cache_patch_applier.patchsorter.inner_patch_sorter.plan_cache)
+
     def test_create_config_replacer__invalid_config_format__failure(self):
         # Arrange
         factory = gu.GenericUpdateFactory()
@@ -1,7 +1,10 @@
 import copy
 import json
 import jsonpatch
+import os
+import shutil
 import sonic_yang
+import tempfile
 import unittest
 import mock
 
@@ -10,17 +13,330 @@ from mock import patch
 from .gutest_helpers import create_side_effect_dict, Files
 import generic_config_updater.gu_common as gu_common
 
+
+class FakeConfigDbClient:
+    """
+    Redis client serving CONFIG_DB hashes, with keyspace notifications
+    """
+    def __init__(self, data, notify_keyspace_events="AKE"):
+        self.data = data
+        self.notify_keyspace_events = notify_keyspace_events
+        self.messages = []
+        self.keys_calls = 0
+
+    def config_get(self, name):
+        return {name: self.notify_keyspace_events}
+
+    def keys(self, pattern):
+        self.keys_calls += 1
+        return list(self.data.keys())
+
+    def pipeline(self, transaction=True):
+        client = self
+        pipe = MagicMock()
+        commands = []
+        pipe.hgetall.side_effect = lambda key: commands.append(key)
+        pipe.execute.side_effect = lambda raise_on_error=True: [dict(client.data.get(key, {})) for key in commands]
+        return pipe
+
+    def pubsub(self):
+        client = self
+        client.messages = [{"type": "psubscribe"}]
+        pubsub = MagicMock()
+        pubsub.get_message.side_effect = lambda timeout=0: client.messages.pop(0) if client.messages else None
+        return pubsub
+
+    def hset(self, key, field, value, notify=True):
+        self.data.setdefault(key, {})[field] = value
+        if notify:
+            self.messages.append({"type": "pmessage", "data": "hset"})
+
+
+class TestConfigDbReader(unittest.TestCase):
+    def setUp(self):
+        gu_common._config_db_readers.clear()
+
+    def test_get_config__converts_as_cfggen(self):
+        client = FakeConfigDbClient({
+            "PORT|Ethernet0": {"alias": "etp1", "lanes": "0,1,2,3"},
+            "VLAN_MEMBER|Vlan1000|Ethernet0": {"tagging_mode": "untagged"},
+            "ACL_TABLE|DATAACL": {"ports@": "Ethernet0,Ethernet4", "type": "L3"},
+            "LOOPBACK_INTERFACE|Loopback0": {"NULL": "NULL"},
+            "CONFIG_DB_INITIALIZED": {"1": "1"},
+        })
+        with patch('generic_config_updater.gu_common.get_config_db_client', return_value=client):
+            actual = gu_common.get_config_db_as_json()
+
+        expected = {
+            "PORT": {"Ethernet0": {"alias": "etp1", "lanes": "0,1,2,3"}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {"tagging_mode": "untagged"}},
+            "ACL_TABLE": {"DATAACL": {"ports": ["Ethernet0", "Ethernet4"], "type": "L3"}},
+            "LOOPBACK_INTERFACE": {"Loopback0": {}},
+        }
+        self.assertDictEqual(expected, actual)
+
+    def test_get_config__snapshot_reused_until_modified(self):
+        client = FakeConfigDbClient({"PORT|Ethernet0": {"mtu": "9100"}})
+        with patch('generic_config_updater.gu_common.get_config_db_client', return_value=client):
+            config = gu_common.get_config_db_as_json()
+            config["PORT"]["Ethernet0"]["mtu"] = "1500"
+            self.assertEqual(gu_common.get_config_db_as_json(), {"PORT": {"Ethernet0": {"mtu": "9100"}}})
+            self.assertEqual(client.keys_calls, 1)
+
+            client.hset("PORT|Ethernet0", "mtu", "1500")
+            self.assertEqual(gu_common.get_config_db_as_json(), {"PORT": {"Ethernet0": {"mtu": "1500"}}})
+            self.assertEqual(client.keys_calls, 2)
+
+    def test_get_config__invalidated__read_again(self):
+        client = FakeConfigDbClient({"PORT|Ethernet0": {"mtu": "9100"}})
+        with patch('generic_config_updater.gu_common.get_config_db_client', return_value=client):
+            gu_common.get_config_db_as_json()
+
+            # The keyspace notification of a write of this process has not arrived yet
+            client.hset("PORT|Ethernet0", "mtu", "1500", notify=False)
+            gu_common.get_config_db_reader().invalidate()
+            self.assertEqual(gu_common.get_config_db_as_json(), {"PORT": {"Ethernet0": {"mtu": "1500"}}})
+            self.assertEqual(client.keys_calls, 2)
+
+    def test_get_config__no_keyspace_notifications__always_read(self):
+        client = FakeConfigDbClient({"PORT|Ethernet0": {"mtu": "9100"}}, notify_keyspace_events="")
+        with patch('generic_config_updater.gu_common.get_config_db_client', return_value=client):
+            gu_common.get_config_db_as_json()
+            gu_common.get_config_db_as_json()
+        self.assertEqual(client.keys_calls, 2)
+
+
+class TestConfigDigest(unittest.TestCase):
+    def test_digest__order_independent(self):
+        config = {"PORT": {"Ethernet0": {"mtu": "9100"}, "Ethernet4": {"mtu": "1500"}}, "VLAN": {"Vlan1000": {}}}
+        reordered = {"VLAN": {"Vlan1000": {}}, "PORT": {"Ethernet4": {"mtu": "1500"}, "Ethernet0": {"mtu": "9100"}}}
+
+        self.assertEqual(gu_common.ConfigDigest(config), gu_common.ConfigDigest(reordered))
+        self.assertNotEqual(gu_common.ConfigDigest(config), gu_common.ConfigDigest({"PORT": config["PORT"]}))
+        # An empty table is not the same as a missing one
+        self.assertNotEqual(gu_common.ConfigDigest({"VLAN": {}}), gu_common.ConfigDigest({}))
+
+    def test_updated__same_as_full_digest(self):
+        config = copy.deepcopy(Files.CROPPED_CONFIG_DB_AS_JSON)
+        digest = gu_common.ConfigDigest(config)
+        paths_tokens = [["PORT", "Ethernet0", "mtu"], ["VLAN_MEMBER", "Vlan1000|Ethernet0"], ["NEW_TABLE", "key"],
+                        ["ACL_TABLE"]]
+
+        touched = digest.touched_entries(config, paths_tokens)
+        config["PORT"]["Ethernet0"]["mtu"] = "1500"
+        del config["VLAN_MEMBER"]["Vlan1000|Ethernet0"]
+        config["NEW_TABLE"] = {"key": {"field": "value"}}
+        del config["ACL_TABLE"]
+
+        self.assertEqual(gu_common.ConfigDigest(config).value, digest.updated(config, touched).value)
+
+    def test_of__remembered_digest_used(self):
+        config = {"PORT": {}}
+        other_config = {"PORT": {}}
+        digest_func = MagicMock(return_value=gu_common.ConfigDigest(config))
+
+        gu_common.ConfigDigest.remember([(config, digest_func)])
+        try:
+            self.assertIs(gu_common.ConfigDigest.of(config), gu_common.ConfigDigest.of(config))
+            self.assertEqual(gu_common.ConfigDigest.of(config), gu_common.ConfigDigest.of(other_config))
+        finally:
+            gu_common.ConfigDigest.forget()
+
+        digest_func.assert_called_once()
+
+
+def create_sonic_yang_with_table_dependencies():
+    """
+    sonic_yang with PORT, VLAN_MEMBER referencing PORT by leafref, ACL_TABLE referencing PORT by a must
+    condition, and a stand-alone NTP table.
+    """
+    mock_sy = MagicMock()
+    mock_sy.confDbYangMap = {
+        "PORT": {"yangModule": {"container": {"@name": "sonic-port"}}},
+        "VLAN_MEMBER": {"yangModule": {"container": {"@name": "sonic-vlan"}}},
+        "ACL_TABLE": {"yangModule": {"container": {"leaf": [
+            {"@name": "stage", "must": {"@condition": "count(../../../PORT/PORT_LIST) > 0"}}]}}},
+        "NTP": {"yangModule": {}},
+    }
+    mock_sy.configdb_path_to_xpath.side_effect = lambda path, schema_xpath: "/sonic-x:sonic-x" + path
+    mock_sy.find_schema_dependencies.side_effect = lambda xpath, match_ancestors: \
+        ["/sonic-vlan:sonic-vlan/sonic-vlan:VLAN_MEMBER/sonic-vlan:VLAN_MEMBER_LIST/sonic-vlan:port"] \
+        if xpath.endswith("/PORT") else []
+    return mock_sy
+
+
+class TestYangTableDependencies(unittest.TestCase):
+    def test_dependencies__leafrefs_and_musts(self):
+        dependencies = gu_common.YangTableDependencies(create_sonic_yang_with_table_dependencies())
+
+        self.assertEqual({"VLAN_MEMBER", "ACL_TABLE"}, dependencies.referenced_by["PORT"])
+        self.assertEqual({"PORT"}, dependencies.references["ACL_TABLE"])
+        self.assertEqual(set(), dependencies.references["NTP"])
+
+    def test_get_validation_tables(self):
+        dependencies = gu_common.YangTableDependencies(create_sonic_yang_with_table_dependencies())
+
+        self.assertEqual({"PORT", "VLAN_MEMBER"}, dependencies.get_validation_tables({"VLAN_MEMBER"}))
+        self.assertEqual({"PORT", "VLAN_MEMBER", "ACL_TABLE"}, dependencies.get_validation_tables({"PORT"}))
+        self.assertEqual({"NTP"}, dependencies.get_validation_tables({"NTP"}))
+        # Tables without YANG model need the whole config
+        self.assertIsNone(dependencies.get_validation_tables({"NTP", "NO_YANG_TABLE"}))
+
+    def test_get_reference_tables(self):
+        dependencies = gu_common.YangTableDependencies(create_sonic_yang_with_table_dependencies())
+
+        self.assertEqual({"PORT", "VLAN_MEMBER", "ACL_TABLE"},
+                         dependencies.get_reference_tables([["PORT", "Ethernet0"]]))
+        self.assertIsNone(dependencies.get_reference_tables([[]]))
+
+    def test_validate_config_db_config_scoped__only_affected_tables_loaded(self):
+        config_wrapper = gu_common.ConfigWrapper()
+        mock_sy = create_sonic_yang_with_table_dependencies()
+        config_wrapper.sonic_yang_with_loaded_models = mock_sy
+        base_config = {"PORT": {"Ethernet0": {}}, "VLAN_MEMBER": {}, "NTP": {"global": {}}}
+        config = {"PORT": {"Ethernet0": {}}, "VLAN_MEMBER": {"Vlan1000|Ethernet0": {}}, "NTP": {"global": {}}}
+
+        self.assertEqual((True, None), config_wrapper.validate_config_db_config_scoped(
+            config, base_config, {"VLAN_MEMBER"}))
+
+        # The base config is validated as a whole once, the change only with the tables it affects
+        scoped_config = {"PORT": {"Ethernet0": {}}, "VLAN_MEMBER": {"Vlan1000|Ethernet0": {}}}
+        self.assertEqual([mock.call(base_config, quiet=True), mock.call(scoped_config, quiet=True)],
+                         mock_sy.loadData.call_args_list)
+        self.assertTrue(config_wrapper.is_config_loaded(config, frozenset({"PORT", "VLAN_MEMBER"})))
+        self.assertFalse(config_wrapper.is_config_loaded(config))
+
+    def test_validate_config_db_config_scoped__invalid_base__whole_config_loaded(self):
+        config_wrapper = gu_common.ConfigWrapper()
+        mock_sy = create_sonic_yang_with_table_dependencies()
+        mock_sy.loadData.side_effect = [sonic_yang.SonicYangException("invalid"), None]
+        config_wrapper.sonic_yang_with_loaded_models = mock_sy
+        base_config = {"PORT": {}, "VLAN_MEMBER": {"Vlan1000|Ethernet0": {}}}
+        config = {"PORT": {}, "VLAN_MEMBER": {}}
+
+        config_wrapper.validate_config_db_config_scoped(config, base_config, {"VLAN_MEMBER"})
+
+        self.assertEqual(mock.call(config, quiet=True), mock_sy.loadData.call_args)
+
+
+class TestYangSchemaIndex(unittest.TestCase):
+    def setUp(self):
+        self.yang_dir = tempfile.mkdtemp()
+        self.write_yang_model("sonic-port.yang", "module sonic-port {}")
+
+    def tearDown(self):
+        shutil.rmtree(self.yang_dir)
+        index_path = self.yang_dir + gu_common.YANG_SCHEMA_INDEX_EXT
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    def write_yang_model(self, name, content):
+        with open(os.path.join(self.yang_dir, name), "w") as fh:
+            fh.write(content)
+
+    def create_sonic_yang(self):
+        mock_sy = create_sonic_yang_with_table_dependencies()
+        mock_sy.find_schema_must_count.side_effect = lambda xpath, match_ancestors: 1 if "ACL" in xpath else 0
+        return mock_sy
+
+    def test_get_dependencies__schema_walked_once_per_xpath(self):
+        mock_sy = self.create_sonic_yang()
+        schema_index = gu_common.YangSchemaIndex(mock_sy, self.yang_dir)
+
+        xpath = schema_index.get_schema_xpath("/PORT")
+        for _ in range(3):
+            self.assertEqual(1, schema_index.get_backlink_count(xpath))
+            self.assertEqual(0, schema_index.get_must_count(xpath))
+            schema_index.get_schema_xpath("/PORT")
+
+        mock_sy.find_schema_dependencies.assert_called_once()
+        mock_sy.find_schema_must_count.assert_called_once()
+        mock_sy.configdb_path_to_xpath.assert_called_once()
+
+    def test_get_schema_xpath__no_yang_model__key_error(self):
+        mock_sy = self.create_sonic_yang()
+        mock_sy.configdb_path_to_xpath.side_effect = KeyError("NO_YANG_TABLE")
+        schema_index = gu_common.YangSchemaIndex(mock_sy, self.yang_dir)
+
+        for _ in range(2):
+            self.assertRaises(KeyError, schema_index.get_schema_xpath, "/NO_YANG_TABLE")
+        mock_sy.configdb_path_to_xpath.assert_called_once()
+
+    def test_save__reloaded_without_schema_walk(self):
+        schema_index = gu_common.YangSchemaIndex(self.create_sonic_yang(), self.yang_dir)
+        xpath = schema_index.get_schema_xpath("/ACL_TABLE")
+        schema_index.get_dependencies(xpath)
+        schema_index.save()
+
+        mock_sy = self.create_sonic_yang()
+        reloaded_index = gu_common.YangSchemaIndex(mock_sy, self.yang_dir)
+
+        self.assertEqual([], reloaded_index.get_dependencies(xpath))
+        self.assertEqual(1, reloaded_index.get_must_count(xpath))
+        mock_sy.find_schema_dependencies.assert_not_called()
+        mock_sy.find_schema_must_count.assert_not_called()
+
+    def test_save__yang_models_changed__index_discarded(self):
+        schema_index = gu_common.YangSchemaIndex(self.create_sonic_yang(), self.yang_dir)
+        xpath = schema_index.get_schema_xpath("/PORT")
+        schema_index.get_dependencies(xpath)
+        schema_index.save()
+
+        self.write_yang_model("sonic-port.yang", "module sonic-port { leaf mtu {} }")
+        mock_sy = self.create_sonic_yang()
+        reloaded_index = gu_common.YangSchemaIndex(mock_sy, self.yang_dir)
+
+        self.assertEqual({}, reloaded_index.entries)
+        reloaded_index.get_dependencies(xpath)
+        mock_sy.find_schema_dependencies.assert_called_once()
+
+    def test_save__no_yang_models__not_persisted(self):
+        os.remove(os.path.join(self.yang_dir, "sonic-port.yang"))
+        schema_index = gu_common.YangSchemaIndex(self.create_sonic_yang(), self.yang_dir)
+        schema_index.get_dependencies(schema_index.get_schema_xpath("/PORT"))
+
+        schema_index.save()
+
+        self.assertFalse(os.path.exists(self.yang_dir + gu_common.YANG_SCHEMA_INDEX_EXT))
+
+    def test_yang_table_dependencies__same_as_without_index(self):
+        schema_index = gu_common.YangSchemaIndex(self.create_sonic_yang(), self.yang_dir)
+        expected = gu_common.YangTableDependencies(self.create_sonic_yang())
+
+        dependencies = gu_common.YangTableDependencies(schema_index.sy, schema_index)
+
+        self.assertEqual(expected.references, dependencies.references)
+        self.assertEqual(expected.referenced_by, dependencies.referenced_by)
+        self.assertEqual(expected.unknown, dependencies.unknown)
+
+    def test_configdb_sorted_keys_by_backlinks__schema_walked_once_per_table(self):
+        config_wrapper = gu_common.ConfigWrapper()
+        mock_sy = self.create_sonic_yang()
+        config_wrapper.sonic_yang_with_loaded_models = mock_sy
+        path_addressing = gu_common.PathAddressing(config_wrapper)
+        config = {"PORT": {}, "NTP": {}, "ACL_TABLE": {}, "NO_YANG_TABLE": {}}
+
+        def configdb_path_to_xpath(path, schema_xpath):
+            if path.startswith("/NO_YANG_TABLE"):
+                raise KeyError(path)
+            return "/sonic-x:sonic-x" + path
+        mock_sy.configdb_path_to_xpath.side_effect = configdb_path_to_xpath
+
+        for _ in range(2):
+            self.assertEqual(["ACL_TABLE", "NTP", "NO_YANG_TABLE", "PORT"],
+                             path_addressing.configdb_sorted_keys_by_backlinks("", config))
+
+        self.assertEqual(3, mock_sy.find_schema_dependencies.call_count)
+
+
 class TestDryRunConfigWrapper(unittest.TestCase):
-    @patch('generic_config_updater.gu_common.subprocess.Popen')
-    def test_get_config_db_as_json(self, mock_popen):
-        config_wrapper = gu_common.DryRunConfigWrapper()
-        mock_proc = MagicMock()
-        mock_proc.communicate = MagicMock(
-            return_value=('{"PORT": {}, "bgpraw": ""}', None))
-        mock_proc.returncode = 0
-        mock_popen.return_value = mock_proc
-        actual = config_wrapper.get_config_db_as_json()
-        expected = {"PORT": {}}
+    def test_get_config_db_as_json(self):
+        gu_common._config_db_readers.clear()
+        client = FakeConfigDbClient({"PORT|Ethernet0": {"mtu": "9100"}})
+        with patch('generic_config_updater.gu_common.get_config_db_client', return_value=client):
+            config_wrapper = gu_common.DryRunConfigWrapper()
+            actual = config_wrapper.get_config_db_as_json()
+        expected = {"PORT": {"Ethernet0": {"mtu": "9100"}}}
         self.assertDictEqual(actual, expected)
 
     def test_get_config_db_as_json__returns_imitated_config_db(self):
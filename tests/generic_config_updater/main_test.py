@@ -845,6 +845,8 @@ class TestBuildParser(unittest.TestCase):
         self.assertFalse(args.parallel)
         self.assertFalse(args.ignore_non_yang_tables)
         self.assertEqual(args.ignore_path, [])
+        self.assertFalse(args.plan_cache)
+        self.assertFalse(args.report_latency)
 
     def test_apply_patch_all_flags(self):
         args = self.parser.parse_args([
@@ -856,6 +858,8 @@ class TestBuildParser(unittest.TestCase):
             '--ignore-path', '/T1',
             '--ignore-path', '/T2',
             '--verbose',
+            '--plan-cache',
+            '--report-latency',
         ])
         self.assertEqual(args.format, 'SONICYANG')
         self.assertTrue(args.dry_run)
@@ -863,6 +867,8 @@ class TestBuildParser(unittest.TestCase):
         self.assertTrue(args.ignore_non_yang_tables)
         self.assertEqual(args.ignore_path, ['/T1', '/T2'])
         self.assertTrue(args.verbose)
+        self.assertTrue(args.plan_cache)
+        self.assertTrue(args.report_latency)
 
     def test_replace_command_defaults(self):
         args = self.parser.parse_args(['replace', 'cfg.json'])
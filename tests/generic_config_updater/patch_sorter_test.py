@@ -1,14 +1,18 @@
 from collections import OrderedDict
+import copy
 import io
+import os
 import jsonpatch
 import sys
 import unittest
 from unittest.mock import MagicMock, Mock
 import generic_config_updater.patch_sorter as ps
+from ..utils import benchmark, measure
 from .gutest_helpers import Files, create_side_effect_dict, create_side_effect_jsonmovegroup_dict, \
                             create_side_effect_skiplastarg_dict
 from generic_config_updater.gu_common import ConfigWrapper, PatchWrapper, OperationWrapper, \
-                                             GenericConfigUpdaterError, OperationType, JsonChange, PathAddressing
+                                             GenericConfigUpdaterError, OperationType, JsonChange, PathAddressing, \
+                                             ConfigDigest
 from generic_config_updater.patch_sorter import JsonMoveGroup
 
 class TestDiff(unittest.TestCase):
@@ -111,6 +115,24 @@ class TestDiff(unittest.TestCase):
         self.assertEqual(diff, other_diff)
         self.assertTrue(diff == other_diff)
 
+    def test_apply_move__digest_updated_incrementally(self):
+        # Arrange
+        diff = ps.Diff(current_config=Files.CROPPED_CONFIG_DB_AS_JSON, target_config=Files.ANY_CONFIG_DB)
+        move = ps.JsonMove.from_patch(Files.SINGLE_OPERATION_CONFIG_DB_PATCH)
+        hash(diff)
+
+        # Act
+        actual = diff.apply_move(move)
+        undone = actual.undo_move(move)
+
+        # Assert
+        self.assertIsNotNone(actual._current_digest)
+        self.assertEqual(ConfigDigest(Files.CONFIG_DB_AFTER_SINGLE_OPERATION), actual.current_digest)
+        self.assertIs(diff.target_digest, actual.target_digest)
+        self.assertEqual(hash(ps.Diff(Files.CONFIG_DB_AFTER_SINGLE_OPERATION, Files.ANY_CONFIG_DB)), hash(actual))
+        self.assertEqual(diff.current_digest, undone.current_digest)
+        self.assertEqual(hash(diff), hash(undone))
+
 class TestJsonMove(unittest.TestCase):
     def setUp(self):
         self.operation_wrapper = OperationWrapper()
@@ -427,6 +449,56 @@ class TestJsonMove(unittest.TestCase):
         self.assertListEqual(expected_current_config_tokens, jsonmove.current_config_tokens)
         self.assertEqual(expected_target_config_tokens, jsonmove.target_config_tokens)
 
+    def test_apply__only_move_path_copied(self):
+        # Arrange
+        config = {
+            "PORT": {"Ethernet0": {"mtu": "9100"}, "Ethernet4": {"mtu": "9100"}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+            "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0", "Ethernet4"]}}
+        }
+        expected_config = copy.deepcopy(config)
+        move = ps.JsonMove.from_operation({"op": "replace", "path": "/PORT/Ethernet0/mtu", "value": "1500"})
+        list_move = ps.JsonMove.from_operation({"op": "remove", "path": "/ACL_TABLE/EVERFLOW/ports/0"})
+
+        # Act
+        actual = move.apply(config)
+        actual_list = list_move.apply(actual)
+
+        # Assert
+        self.assertEqual(expected_config, config)
+        self.assertEqual("1500", actual["PORT"]["Ethernet0"]["mtu"])
+        self.assertIsNot(config["PORT"]["Ethernet0"], actual["PORT"]["Ethernet0"])
+        self.assertIs(config["PORT"]["Ethernet4"], actual["PORT"]["Ethernet4"])
+        self.assertIs(config["VLAN"], actual["VLAN"])
+        self.assertEqual(["Ethernet4"], actual_list["ACL_TABLE"]["EVERFLOW"]["ports"])
+        self.assertEqual(["Ethernet0", "Ethernet4"], actual["ACL_TABLE"]["EVERFLOW"]["ports"])
+        self.assertEqual(actual, list_move.undo(actual_list))
+        self.assertEqual(config, move.undo(actual))
+
+    def test_apply__invalid_path__jsonpatch_error_raised(self):
+        # Arrange
+        config = {"PORT": {"Ethernet0": {"mtu": "9100"}}}
+        move = ps.JsonMove.from_operation({"op": "add", "path": "/PORT/Ethernet4/mtu", "value": "1500"})
+
+        # Act and assert
+        self.assertRaises(jsonpatch.JsonPointerException, move.apply, config)
+        self.assertEqual({"PORT": {"Ethernet0": {"mtu": "9100"}}}, config)
+
+    def test_group_apply__path_copied_once(self):
+        # Arrange
+        config = {"PORT": {"Ethernet0": {"mtu": "9100"}, "Ethernet4": {"mtu": "9100"}}, "VLAN": {}}
+        group = JsonMoveGroup("", ps.JsonMove.from_operation({"op": "remove", "path": "/PORT/Ethernet0"}))
+        group.append(ps.JsonMove.from_operation({"op": "remove", "path": "/PORT/Ethernet4"}))
+
+        # Act
+        actual = group.apply(config)
+
+        # Assert
+        self.assertEqual({"PORT": {}, "VLAN": {}}, actual)
+        self.assertEqual(2, len(config["PORT"]))
+        self.assertIs(config["VLAN"], actual["VLAN"])
+        self.assertEqual(config, group.undo(actual))
+
 class TestMoveWrapper(unittest.TestCase):
     def setUp(self):
         self.any_current_config = {}
@@ -962,6 +1034,23 @@ class TestFullConfigMoveValidator(unittest.TestCase):
         config_wrapper.validate_config_db_config.assert_called_once_with(
             self.any_simulated_config)
 
+    def test_validate__scoped__changed_tables_validated(self):
+        # Arrange
+        config_wrapper = Mock()
+        config_wrapper.validate_config_db_config_scoped.return_value = (True, None)
+        validator = ps.FullConfigMoveValidator(config_wrapper, scoped=True)
+        group = JsonMoveGroup("", ps.JsonMove.from_operation({"op": "remove", "path": "/PORT/Ethernet0"}))
+        group.append(ps.JsonMove.from_operation({"op": "remove", "path": "/VLAN_MEMBER/Vlan1000|Ethernet0"}))
+
+        # Act
+        actual = validator.validate(group, self.any_diff, self.any_simulated_config)
+
+        # Assert
+        self.assertEqual((True, None), actual)
+        config_wrapper.validate_config_db_config_scoped.assert_called_once_with(
+            self.any_simulated_config, self.any_current_config, {"PORT", "VLAN_MEMBER"})
+        config_wrapper.validate_config_db_config.assert_not_called()
+
 
 class TestCreateOnlyMoveValidator(unittest.TestCase):
     def setUp(self):
@@ -3746,6 +3835,55 @@ class TestPatchSorter(unittest.TestCase):
         # Assert
         self.assertEqual(expected, actual)
 
+    def test_sort__cached_plan_verified__cached_plan_returned_without_sorting(self):
+        # Arrange
+        current_config = {"PORT": {"Ethernet0": {"mtu": "9100"}}}
+        patch = jsonpatch.JsonPatch([{"op": "replace", "path": "/PORT/Ethernet0/mtu", "value": "1500"}])
+        cached_changes = [JsonChange(jsonpatch.JsonPatch(patch.patch))]
+        config_wrapper = Mock()
+        config_wrapper.validate_config_db_config_scoped.return_value = (True, None)
+        plan_cache = Mock()
+        plan_cache.get.return_value = cached_changes
+        sort_algorithm_factory = Mock()
+        sorter = ps.PatchSorter(config_wrapper, PatchWrapper(config_wrapper), sort_algorithm_factory,
+                                plan_cache=plan_cache)
+
+        # Act
+        actual = sorter.sort(patch, preloaded_current_config=current_config)
+
+        # Assert
+        self.assertIs(cached_changes, actual)
+        plan_cache.get_key.assert_called_once_with(patch, current_config, config_wrapper, "DFS")
+        config_wrapper.validate_config_db_config_scoped.assert_called_once_with(
+            {"PORT": {"Ethernet0": {"mtu": "1500"}}}, current_config, {"PORT"})
+        sort_algorithm_factory.create.assert_not_called()
+        plan_cache.put.assert_not_called()
+
+    def test_sort__cached_plan_invalid__plan_rejected_and_sorted_plan_stored(self):
+        # Arrange
+        current_config = {"PORT": {"Ethernet0": {"mtu": "9100"}}}
+        patch = jsonpatch.JsonPatch([{"op": "replace", "path": "/PORT/Ethernet0/mtu", "value": "1500"}])
+        config_wrapper = Mock()
+        config_wrapper.validate_config_db_config_scoped.return_value = (False, "invalid")
+        plan_cache = Mock()
+        plan_cache.get_key.return_value = "key"
+        plan_cache.get.return_value = [JsonChange(jsonpatch.JsonPatch(patch.patch))]
+        move = JsonMoveGroup("", ps.JsonMove.from_operation(patch.patch[0]))
+        sort_algorithm = Mock()
+        sort_algorithm.sort.return_value = [move]
+        sort_algorithm_factory = Mock()
+        sort_algorithm_factory.create.return_value = sort_algorithm
+        sorter = ps.PatchSorter(config_wrapper, PatchWrapper(config_wrapper), sort_algorithm_factory,
+                                plan_cache=plan_cache)
+
+        # Act
+        actual = sorter.sort(patch, preloaded_current_config=current_config)
+
+        # Assert
+        self.assertEqual([JsonChange(move.get_jsonpatch())], actual)
+        plan_cache.reject.assert_called_once_with("key")
+        plan_cache.put.assert_called_once_with("key", actual)
+
     def create_patch_sorter(self, config=None, sort_algorithm=None):
         if config is None:
             config=Files.CROPPED_CONFIG_DB_AS_JSON
@@ -4114,3 +4252,81 @@ class TestStrictPatchSorter(unittest.TestCase):
                 {(str(patch), str(algorithm)): changes})
 
         return ps.StrictPatchSorter(config_wrapper, patch_wrapper, inner_patch_sorter)
+
+
+BENCH_PORTS = int(os.environ.get("GCU_COW_BENCH_PORTS", "500"))
+
+
+def _gen_large_config(ports):
+    config = {
+        "PORT": {},
+        "INTERFACE": {},
+        "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+        "VLAN_MEMBER": {},
+        "ACL_TABLE": {"EVERFLOW": {"type": "MIRROR", "ports": []}},
+    }
+    for i in range(ports):
+        port = f"Ethernet{i * 4}"
+        config["PORT"][port] = {"admin_status": "up", "alias": f"etp{i}", "lanes": f"{i * 4}",
+                                "mtu": "9100", "speed": "100000"}
+        config["INTERFACE"][f"{port}|10.0.{i // 256}.{i % 256}/31"] = {}
+        config["VLAN_MEMBER"][f"Vlan1000|{port}"] = {"tagging_mode": "untagged"}
+        config["ACL_TABLE"]["EVERFLOW"]["ports"].append(port)
+    return config
+
+
+def _gen_apply_moves(ports):
+    config = _gen_large_config(ports)
+    operations = []
+    for i in range(0, ports, max(1, ports // 50)):
+        operations.append({"op": "replace", "path": f"/PORT/Ethernet{i * 4}/mtu", "value": "1500"})
+        operations.append({"op": "remove", "path": f"/VLAN_MEMBER/Vlan1000|Ethernet{i * 4}"})
+    return config, operations
+
+
+def test_copy_on_write_apply__same_as_deep_copy__untouched_containers_shared():
+    config, operations = _gen_apply_moves(100)
+    expected_config = copy.deepcopy(config)
+
+    for operation in operations:
+        move = ps.JsonMove.from_operation(operation)
+        table = operation["path"].split("/")[1]
+
+        actual = move.apply(config)
+
+        assert actual == jsonpatch.JsonPatch([operation]).apply(config)
+        assert config == expected_config
+        assert actual is not config
+        assert actual[table] is not config[table]
+        for other_table in config:
+            if other_table != table:
+                assert actual[other_table] is config[other_table]
+        if table == "PORT":
+            port = operation["path"].split("/")[2]
+            assert actual["PORT"][port] is not config["PORT"][port]
+            assert all(actual["PORT"][other] is config["PORT"][other] for other in config["PORT"] if other != port)
+
+
+@benchmark
+def test_copy_on_write_apply_benchmark():
+    """
+    Compare applying candidate moves with a deep copy of the config, as JsonPatch does, against the copy on
+    write JsonMove.apply. Runs with SONIC_UTILITIES_BENCHMARK=1, set GCU_COW_BENCH_PORTS=10000 for a full size
+    run.
+    """
+    config, operations = _gen_apply_moves(BENCH_PORTS)
+    moves = [ps.JsonMove.from_operation(operation) for operation in operations]
+
+    def deep_copy_apply():
+        return [jsonpatch.JsonPatch([operation]).apply(config) for operation in operations]
+
+    def copy_on_write_apply():
+        return [move.apply(config) for move in moves]
+
+    old_res, old_time, old_peak = measure(deep_copy_apply)
+    new_res, new_time, new_peak = measure(copy_on_write_apply)
+
+    print("ports={} moves={} deep-copy: {:.2f}s peak={:.1f}MB copy-on-write: {:.2f}s peak={:.1f}MB".format(
+        BENCH_PORTS, len(moves), old_time, old_peak / 1e6, new_time, new_peak / 1e6))
+
+    assert new_res == old_res
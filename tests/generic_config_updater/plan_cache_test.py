@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import unittest
+import jsonpatch
+
+from unittest.mock import Mock, patch
+from generic_config_updater.gu_common import JsonChange
+from generic_config_updater.plan_cache import PlanCache, PLAN_EXT
+
+
+class TestPlanCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.yang_dir = tempfile.mkdtemp()
+        self.write_yang_model("sonic-port.yang", "module sonic-port {}")
+
+        self.config_wrapper = Mock()
+        self.config_wrapper.yang_dir = self.yang_dir
+        self.config_wrapper.get_yang_table_dependencies.return_value.get_validation_tables.side_effect = \
+            lambda tables: None if "NO_YANG_TABLE" in tables else frozenset(tables | {"PORT"})
+
+        self.current_config = {
+            "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0"]}},
+            "PORT": {"Ethernet0": {"mtu": "9100"}},
+            "DEVICE_METADATA": {"localhost": {"hostname": "switch1"}},
+        }
+        self.patch = jsonpatch.JsonPatch([{"op": "add", "path": "/ACL_TABLE/EVERFLOW/ports/1", "value": "Ethernet4"}])
+        self.changes = [JsonChange(jsonpatch.JsonPatch([{"op": "add", "path": "/PORT/Ethernet4", "value": {}}])),
+                        JsonChange(jsonpatch.JsonPatch(self.patch.patch))]
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        shutil.rmtree(self.yang_dir)
+
+    def write_yang_model(self, name, content):
+        with open(os.path.join(self.yang_dir, name), "w") as fh:
+            fh.write(content)
+
+    def get_key(self, current_config=None, patch=None, plan_cache=None):
+        plan_cache = plan_cache if plan_cache else PlanCache(self.cache_dir)
+        return plan_cache.get_key(patch if patch else self.patch,
+                                  current_config if current_config else self.current_config,
+                                  self.config_wrapper,
+                                  "DFS")
+
+    def test_get__stored_plan__same_changes_returned(self):
+        plan_cache = PlanCache(self.cache_dir)
+        key = self.get_key()
+
+        self.assertIsNone(plan_cache.get(key))
+        plan_cache.put(key, self.changes)
+
+        self.assertEqual(self.changes, plan_cache.get(key))
+        self.assertEqual((1, 1, 1), (plan_cache.hits, plan_cache.misses, plan_cache.stores))
+        self.assertIn("hits: 1, misses: 1, stores: 1", plan_cache.get_stats())
+
+    def test_get_key__unrelated_table_changed__same_key(self):
+        other_config = dict(self.current_config)
+        other_config["DEVICE_METADATA"] = {"localhost": {"hostname": "switch2"}}
+
+        self.assertEqual(self.get_key(), self.get_key(current_config=other_config))
+
+    def test_get_key__related_table_changed__different_key(self):
+        other_config = dict(self.current_config)
+        other_config["PORT"] = {"Ethernet0": {"mtu": "1500"}}
+
+        self.assertNotEqual(self.get_key(), self.get_key(current_config=other_config))
+
+    def test_get_key__unknown_table_dependencies__whole_config_used(self):
+        patch = jsonpatch.JsonPatch([{"op": "add", "path": "/NO_YANG_TABLE", "value": {}}])
+        other_config = dict(self.current_config)
+        other_config["DEVICE_METADATA"] = {"localhost": {"hostname": "switch2"}}
+
+        self.assertNotEqual(self.get_key(patch=patch), self.get_key(current_config=other_config, patch=patch))
+
+    def test_get_key__different_patch_or_yang_models__different_key(self):
+        key = self.get_key()
+        other_patch = jsonpatch.JsonPatch([{"op": "add", "path": "/ACL_TABLE/EVERFLOW/ports/1", "value": "Ethernet8"}])
+        self.assertNotEqual(key, self.get_key(patch=other_patch))
+
+        self.write_yang_model("sonic-port.yang", "module sonic-port { leaf mtu {} }")
+        self.assertNotEqual(key, self.get_key())
+
+    def test_put__max_entries_exceeded__least_recently_used_evicted(self):
+        plan_cache = PlanCache(self.cache_dir, max_entries=2)
+        plan_cache.put("key1", self.changes)
+        plan_cache.put("key2", self.changes)
+        # Make key1 the most recently used
+        os.utime(os.path.join(self.cache_dir, "key2" + PLAN_EXT), ns=(0, 0))
+        self.assertIsNotNone(plan_cache.get("key1"))
+
+        plan_cache.put("key3", self.changes)
+
+        self.assertIsNone(plan_cache.get("key2"))
+        self.assertIsNotNone(plan_cache.get("key1"))
+        self.assertIsNotNone(plan_cache.get("key3"))
+        self.assertEqual(1, plan_cache.evictions)
+
+    def test_reject__plan_removed(self):
+        plan_cache = PlanCache(self.cache_dir)
+        plan_cache.put("key", self.changes)
+
+        plan_cache.reject("key")
+
+        self.assertIsNone(plan_cache.get("key"))
+        self.assertEqual(1, plan_cache.rejected)
+
+    def test_get__corrupted_plan__miss(self):
+        plan_cache = PlanCache(self.cache_dir)
+        with open(os.path.join(self.cache_dir, "key" + PLAN_EXT), "w") as fh:
+            fh.write("[{")
+
+        self.assertIsNone(plan_cache.get("key"))
+        self.assertEqual(1, plan_cache.misses)
+
+    def test_put__cache_dir_not_writable__warning_logged(self):
+        plan_cache = PlanCache(os.path.join(self.cache_dir, "file", "plans"))
+        plan_cache.logger = Mock()
+        with open(os.path.join(self.cache_dir, "file"), "w") as fh:
+            fh.write("")
+
+        plan_cache.put("key", self.changes)
+
+        self.assertEqual(0, plan_cache.stores)
+        plan_cache.logger.log_warning.assert_called_once()
+        self.assertIsNone(plan_cache.get("key"))
+
+    def test_put__write_fails__warning_logged_temporary_file_removed(self):
+        plan_cache = PlanCache(self.cache_dir)
+        plan_cache.logger = Mock()
+
+        with patch("generic_config_updater.plan_cache.os.replace", side_effect=OSError(28, "No space left on device")):
+            plan_cache.put("key", self.changes)
+
+        self.assertEqual(0, plan_cache.stores)
+        plan_cache.logger.log_warning.assert_called_once()
+        self.assertEqual([], os.listdir(self.cache_dir))
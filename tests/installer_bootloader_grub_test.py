@@ -4,6 +4,7 @@ from unittest.mock import Mock, patch, call
 
 # Import test module
 import sonic_installer.bootloader.grub as grub
+import sonic_installer.bootloader.onie as onie
 
 installed_images = [
     f'{grub.IMAGE_PREFIX}expeliarmus-{grub.IMAGE_PREFIX}abcde',
@@ -130,3 +131,17 @@ def test_verify_image():
     assert not bootloader.is_secure_upgrade_image_verification_supported()
     # command should fail
     assert not bootloader.verify_image_sign(image)
+
+
+def test_platform_in_platforms_asic_downloaded(tmp_path):
+    image_path = str(tmp_path / 'sonic_image')
+    bootloader = grub.GrubBootloader()
+    info = onie.OnieImageInfo('test', ['x86_64-test_platform-r0'])
+
+    with patch.object(bootloader, 'get_image_info', return_value=info), \
+            patch('sonic_installer.bootloader.grub.subprocess.Popen') as mock_popen:
+        assert bootloader.platform_in_platforms_asic('x86_64-test_platform-r0', image_path)
+        assert not bootloader.platform_in_platforms_asic('x86_64-other-r0', image_path)
+        info.platforms = None
+        assert bootloader.platform_in_platforms_asic('x86_64-other-r0', image_path)
+        mock_popen.assert_not_called()
@@ -1,4 +1,14 @@
+import http.server
+import io
+import os
+import re
+import subprocess
+import tarfile
+import threading
 from unittest.mock import Mock, patch
+from urllib.error import HTTPError
+
+import pytest
 
 # Import test module
 import sonic_installer.bootloader.onie as onie
@@ -25,4 +35,136 @@ def test_verify_image_sign():
     except NotImplementedError:
         assert not is_supported
     else:
-        assert False, "Wrong return value from verify_image_sign, returned" + str(return_value)
\ No newline at end of file
+        assert False, "Wrong return value from verify_image_sign, returned" + str(return_value)
+
+
+def make_image(tmp_path, platforms=b'x86_64-test_platform-r0\nx86_64-other-r0\n', signed=True):
+    """
+    Build an ONIE installer image as the build does: a sharch header, the payload
+    tarball and the CMS signature of both.
+    """
+    payload = io.BytesIO()
+    with tarfile.open(fileobj=payload, mode='w') as tar:
+        for name, content in ((onie.PLATFORMS_ASIC, platforms), ('installer/fs.zip', os.urandom(300000))):
+            member = tarfile.TarInfo(name)
+            member.size = len(content)
+            tar.addfile(member, io.BytesIO(content))
+    payload = payload.getvalue()
+    header = ('#!/bin/sh\n'
+              'payload_sha1=0000\n'
+              'payload_image_size={}\n'
+              'image_version="test-image-1"\n'
+              'exit 0\n'
+              'exit_marker\n').format(len(payload)).encode()
+    image = header + payload
+    if signed:
+        key = str(tmp_path / 'key.pem')
+        cert = str(tmp_path / 'cert.pem')
+        data = tmp_path / 'data.bin'
+        data.write_bytes(image)
+        subprocess.check_call(['openssl', 'req', '-x509', '-newkey', 'ec', '-pkeyopt', 'ec_paramgen_curve:prime256v1',
+                               '-nodes', '-keyout', key, '-out', cert, '-days', '1', '-subj', '/CN=Test'],
+                              stderr=subprocess.DEVNULL)
+        image += subprocess.check_output(['openssl', 'cms', '-sign', '-nocerts', '-binary', '-md', 'sha256',
+                                          '-signer', cert, '-inkey', key, '-in', str(data), '-outform', 'pem'])
+    return image
+
+
+class ImageRequestHandler(http.server.BaseHTTPRequestHandler):
+    image = b''
+    support_range = True
+    # Bytes sent before dropping the first connection, None to send everything
+    drop_after = None
+
+    def do_GET(self):
+        if self.path != '/image.bin':
+            self.send_error(404)
+            return
+        start = 0
+        match = re.match(r'bytes=(\d+)-$', self.headers.get('Range', ''))
+        if match and self.support_range:
+            start = int(match.group(1))
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, len(self.image) - 1, len(self.image)))
+        else:
+            self.send_response(200)
+        body = self.image[start:]
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.drop_after is not None:
+            body = body[:self.drop_after]
+            type(self).drop_after = None
+            self.close_connection = True
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def image_server():
+    handler = type('Handler', (ImageRequestHandler,), {})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield handler, 'http://127.0.0.1:{}/image.bin'.format(server.server_port)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('support_range', [True, False])
+def test_download_image_resumes(tmp_path, image_server, support_range):
+    handler, url = image_server
+    handler.image = make_image(tmp_path)
+    handler.support_range = support_range
+    handler.drop_after = 100000
+    image_path = str(tmp_path / 'sonic_image')
+    progress = []
+
+    bootloader = onie.OnieInstallerBootloader()
+    with patch('sonic_installer.download.time.sleep'):
+        bootloader.download_image(url, image_path, lambda count, size, total: progress.append(count * size))
+
+    with open(image_path, 'rb') as image_file:
+        assert image_file.read() == handler.image
+    assert progress[0] == 0 and progress[-1] == len(handler.image)
+
+    info = bootloader.get_image_info(image_path)
+    assert info.version == 'test-image-1'
+    assert info.platforms == ['x86_64-test_platform-r0', 'x86_64-other-r0']
+    assert bootloader.get_binary_image_version(image_path) == onie.IMAGE_PREFIX + 'test-image-1'
+
+
+def test_download_image_unsigned(tmp_path, image_server):
+    handler, url = image_server
+    handler.image = make_image(tmp_path, signed=False)
+    image_path = str(tmp_path / 'sonic_image')
+
+    bootloader = onie.OnieInstallerBootloader()
+    bootloader.download_image(url, image_path)
+
+    info = bootloader.get_image_info(image_path)
+    assert info.platforms == ['x86_64-test_platform-r0', 'x86_64-other-r0']
+
+    # The image changed since the download: its information is not used anymore
+    with open(image_path, 'ab') as image_file:
+        image_file.write(b'garbage')
+    assert bootloader.get_image_info(image_path) is None
+
+
+def test_download_image_not_sharch(tmp_path, image_server):
+    handler, url = image_server
+    handler.image = b'not an installer\n' * 1000
+    image_path = str(tmp_path / 'sonic_image')
+
+    bootloader = onie.OnieInstallerBootloader()
+    bootloader.download_image(url, image_path)
+    assert bootloader.get_image_info(image_path) is None
+    assert bootloader.get_binary_image_version(image_path) is None
+
+
+def test_download_image_not_found(tmp_path, image_server):
+    handler, url = image_server
+    bootloader = onie.OnieInstallerBootloader()
+    with pytest.raises(HTTPError):
+        bootloader.download_image(url.replace('image.bin', 'missing'), str(tmp_path / 'sonic_image'))
@@ -0,0 +1,228 @@
+import json
+import os
+import subprocess
+import sys
+
+import click
+import pytest
+from click.shell_completion import ShellComplete
+from click.testing import CliRunner
+from sonic_py_common import device_info
+
+import utilities_common.cli as clicommon
+from utilities_common.util_base import UtilHelper
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+
+SAMPLE_MODULE = '''
+import click
+
+@click.group()
+def remotemac():
+    """show vxlan remotemac"""
+
+@remotemac.command()
+def all():
+    click.echo("remotemac all")
+'''
+
+SAMPLE_PLUGIN = '''
+import click
+
+@click.command()
+def remotevni():
+    """show vxlan remotevni"""
+    click.echo("remotevni")
+
+def register(cli):
+    if remotevni.name in cli.commands:
+        raise Exception(f"{remotevni.name} already exists in CLI")
+    cli.add_command(remotevni)
+'''
+
+SAMPLE_EXTENSION_PLUGIN = '''
+import click
+
+@click.command()
+def counters():
+    click.echo("remotemac counters")
+
+def register(cli):
+    cli.commands['remotemac'].add_command(counters)
+'''
+
+
+@pytest.fixture
+def sample_package(tmp_path, monkeypatch):
+    """A package with a command module and plugins, named after the test for a clean import"""
+    name = 'lazy_cli_sample_{}'.format(os.getpid())
+    package = tmp_path / name
+    (package / 'plugins').mkdir(parents=True)
+    (package / '__init__.py').write_text('')
+    (package / 'remote.py').write_text(SAMPLE_MODULE)
+    (package / 'plugins' / '__init__.py').write_text('')
+    (package / 'plugins' / 'vni.py').write_text(SAMPLE_PLUGIN)
+    (package / 'plugins' / 'counters.py').write_text(SAMPLE_EXTENSION_PLUGIN)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv('SONIC_CLI_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('SONIC_CLI_PLUGINS_MANIFEST_DIR', str(tmp_path / 'manifest'))
+    yield name
+    for module in list(sys.modules):
+        if module.startswith(name):
+            del sys.modules[module]
+
+
+def make_cli(package):
+    @click.group(cls=clicommon.LazyAliasedGroup)
+    def cli():
+        """Sample lazy CLI"""
+
+    @cli.command()
+    def version():
+        click.echo("version")
+
+    cli.add_lazy_commands({
+        'remotemac': '{}.remote:remotemac'.format(package),
+        'remoteip': '{}.remote:remotemac'.format(package),
+    }, conditions={'remoteip': lambda: False})
+    plugins = __import__(package + '.plugins', fromlist=['plugins'])
+    UtilHelper().load_and_register_plugins_lazily(plugins, cli)
+    return cli
+
+
+def forget_modules(package):
+    for module in list(sys.modules):
+        if module.startswith(package + '.') and module != package + '.plugins':
+            del sys.modules[module]
+
+
+class TestLazyCli(object):
+    def test_command_imported_when_used(self, sample_package):
+        cli = make_cli(sample_package)
+        forget_modules(sample_package)
+        cli = make_cli(sample_package)
+        assert sample_package + '.remote' not in sys.modules
+
+        result = CliRunner().invoke(cli, ['version'])
+        assert result.output == 'version\n'
+        assert sample_package + '.remote' not in sys.modules
+
+        result = CliRunner().invoke(cli, ['remotemac', 'all'])
+        assert result.output == 'remotemac all\n'
+        assert sample_package + '.remote' in sys.modules
+
+    def test_abbreviation(self, sample_package):
+        cli = make_cli(sample_package)
+        # 'remotemac' and the plugin's 'remotevni' both match 'remote'
+        with pytest.raises(click.UsageError):
+            cli.get_command(click.Context(cli), 'remote')
+        assert cli.get_command(click.Context(cli, resilient_parsing=True), 'remote') is None
+
+        result = CliRunner().invoke(cli, ['remotem', 'all'])
+        assert result.output == 'remotemac all\n'
+        result = CliRunner().invoke(cli, ['remotev'])
+        assert result.output == 'remotevni\n'
+
+    def test_condition(self, sample_package):
+        cli = make_cli(sample_package)
+        result = CliRunner().invoke(cli, ['remoteip', 'all'])
+        assert result.exit_code != 0
+        assert 'remoteip' not in cli.commands
+
+        result = CliRunner().invoke(cli, ['--help'])
+        assert 'remotemac' in result.output and 'remoteip' not in result.output
+
+    def test_shell_completion(self, sample_package):
+        cli = make_cli(sample_package)
+        completion = ShellComplete(cli, {}, 'show', '_SHOW_COMPLETE')
+        assert [item.value for item in completion.get_completions([], 'remote')] == ['remotemac', 'remotevni']
+        assert [item.value for item in completion.get_completions(['remotemac'], '')] == ['all', 'counters']
+
+    def test_plugins_manifest(self, sample_package, tmp_path):
+        # The first time, plugins are loaded to learn what they register
+        make_cli(sample_package)
+        plugins = sys.modules[sample_package + '.plugins']
+        manifest_name = UtilHelper.get_plugins_manifest_name(plugins)
+        assert manifest_name.startswith(sample_package + '.plugins.')
+        with open(str(tmp_path / 'manifest' / manifest_name)) as manifest_file:
+            manifest = json.load(manifest_file)
+        assert manifest[sample_package + '.plugins.vni']['commands'] == ['remotevni']
+        assert manifest[sample_package + '.plugins.counters']['extends'] == ['remotemac']
+
+        # Then they are loaded only when their commands are used
+        forget_modules(sample_package)
+        cli = make_cli(sample_package)
+        assert sample_package + '.plugins.vni' not in sys.modules
+        assert sample_package + '.plugins.counters' not in sys.modules
+
+        result = CliRunner().invoke(cli, ['remotevni'])
+        assert result.output == 'remotevni\n'
+        assert sample_package + '.plugins.counters' not in sys.modules
+
+        result = CliRunner().invoke(cli, ['remotemac', 'counters'])
+        assert result.output == 'remotemac counters\n'
+
+    def test_plugins_manifest_other_platform(self, sample_package, monkeypatch):
+        make_cli(sample_package)
+        forget_modules(sample_package)
+
+        # The manifest of another platform or ASIC type is not used
+        monkeypatch.setattr(device_info, 'get_platform', lambda: 'x86_64-other_platform-r0')
+        make_cli(sample_package)
+        assert sample_package + '.plugins.vni' in sys.modules
+
+    def test_plugins_manifest_dir_writable_by_others(self, sample_package, tmp_path):
+        manifest_dir = tmp_path / 'manifest'
+        manifest_dir.mkdir()
+        manifest_dir.chmod(0o777)
+
+        make_cli(sample_package)
+        assert os.listdir(str(manifest_dir)) == []
+        assert UtilHelper.get_plugins_manifest_dir() == (None, False)
+
+    def test_plugins_manifest_outdated(self, sample_package, tmp_path):
+        make_cli(sample_package)
+        forget_modules(sample_package)
+
+        # A changed plugin is loaded again
+        plugin_path = tmp_path / sample_package / 'plugins' / 'vni.py'
+        plugin_path.write_text(SAMPLE_PLUGIN.replace('remotevni', 'remotevni2'))
+        cli = make_cli(sample_package)
+        assert sample_package + '.plugins.vni' in sys.modules
+        assert 'remotevni2' in cli.commands and 'remotevni' not in cli.commands
+
+
+@pytest.mark.parametrize('module_name, group_name', [('show.main', 'cli'), ('config.main', 'config')])
+def test_lazy_commands_manifest(module_name, group_name):
+    """Every command of the manifest is found under its name"""
+    module = __import__(module_name, fromlist=[group_name])
+    group = getattr(module, group_name)
+    for name, import_path in module.LAZY_COMMANDS.items():
+        command = clicommon.import_command(import_path)
+        assert command.name == name, import_path
+        assert name in group.commands
+
+
+@pytest.mark.parametrize('module_name', ['show.main', 'config.main'])
+def test_import_time(module_name, tmp_path):
+    """Import time benchmark: importing the CLI does not import the modules of lazy commands"""
+    env = dict(os.environ, UTILITIES_UNIT_TESTING='2', SONIC_CLI_CACHE_DIR=str(tmp_path),
+               SONIC_CLI_PLUGINS_MANIFEST_DIR=str(tmp_path / 'manifest'))
+    # The second run has the plugins manifest
+    for _ in range(2):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module_name],
+                                cwd=modules_path, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        assert result.returncode == 0, result.stderr
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and line.count('|') == 2:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                timings[name.strip()] = int(cumulative)
+    print('{} imported in {} ms'.format(module_name, timings[module_name] // 1000))
+
+    module = __import__(module_name, fromlist=['LAZY_COMMANDS'])
+    lazy_modules = {import_path.split(':')[0] for import_path in module.LAZY_COMMANDS.values()}
+    assert not lazy_modules & set(timings)
@@ -1497,6 +1497,8 @@ class TestMuxcable(object):
     @mock.patch('show.muxcable.get_hwmode_mux_direction_port', mock.MagicMock(return_value={0: 0,
                                                                                             1: "standby",
                                                                                             2: "True"}))
+    @mock.patch('show.muxcable.get_hwmode_mux_direction_ports', mock.MagicMock(side_effect=lambda db, ports: {
+        port: {0: 0, 1: "standby", 2: "True"} for port in ports}))
     @mock.patch('show.muxcable.check_port_in_mux_cable_table', mock.MagicMock(return_value=True))
     @mock.patch('show.muxcable.platform_sfputil_helper.get_logical_list', mock.MagicMock(return_value=["Ethernet0", "Ethernet12"]))
     @mock.patch('show.muxcable.platform_sfputil_helper.get_asic_id_for_logical_port', mock.MagicMock(return_value=0))
@@ -1569,6 +1571,8 @@ class TestMuxcable(object):
     @mock.patch('show.muxcable.get_hwmode_mux_direction_port', mock.MagicMock(return_value={0: 0,
                                                                                             1: "sucess",
                                                                                             2: "True"}))
+    @mock.patch('show.muxcable.get_hwmode_mux_direction_ports', mock.MagicMock(side_effect=lambda db, ports: {
+        port: {0: 0, 1: "sucess", 2: "True"} for port in ports}))
     @mock.patch('show.muxcable.check_port_in_mux_cable_table', mock.MagicMock(return_value=True))
     @mock.patch('show.muxcable.platform_sfputil_helper.get_logical_list', mock.MagicMock(return_value=["Ethernet0", "Ethernet12"]))
     @mock.patch('show.muxcable.platform_sfputil_helper.get_asic_id_for_logical_port', mock.MagicMock(return_value=0))
@@ -1616,6 +1620,8 @@ class TestMuxcable(object):
     @mock.patch('config.muxcable.delete_all_keys_in_db_table', mock.MagicMock(return_value=0))
     @mock.patch('config.muxcable.update_and_get_response_for_xcvr_cmd', mock.MagicMock(return_value={0: 0,
                                                                                                       1: "sucess"}))
+    @mock.patch('config.muxcable.update_and_get_responses_for_xcvr_cmd', mock.MagicMock(side_effect=lambda *args: {
+        port: {0: 0, 1: "sucess"} for port in args[6]}))
     @mock.patch('show.muxcable.get_hwmode_mux_direction_port', mock.MagicMock(return_value={0: 0,
                                                                                             1: "sucess",
                                                                                             2: "True"}))
@@ -1672,6 +1678,8 @@ class TestMuxcable(object):
     @mock.patch('config.muxcable.delete_all_keys_in_db_table', mock.MagicMock(return_value=0))
     @mock.patch('config.muxcable.update_and_get_response_for_xcvr_cmd', mock.MagicMock(return_value={0: 0,
                                                                                                       1: "standby"}))
+    @mock.patch('config.muxcable.update_and_get_responses_for_xcvr_cmd', mock.MagicMock(side_effect=lambda *args: {
+        port: {0: 0, 1: "standby"} for port in args[6]}))
     @mock.patch('show.muxcable.get_hwmode_mux_direction_port', mock.MagicMock(return_value={0: 0,
                                                                                             1: "standby",
                                                                                             2: "True"}))
@@ -0,0 +1,121 @@
+import ipaddress
+import os
+import sys
+
+import pytest
+
+from utilities_common.prefix_set import PrefixSet, pack_prefix, prefix_to_str, unpack_prefix
+from .utils import benchmark, measure
+
+sys.path.append("scripts")
+import route_check  # noqa: E402
+
+BENCH_PREFIXES = int(os.environ.get("PREFIX_SET_BENCH_PREFIXES", "100000"))
+ASIC_KEY_SUFFIX = '","switch_id":"oid:0x21000000000000","vr":"oid:0x3000000000023"}'
+
+
+class TestPrefixSet(object):
+    def test_pack_unpack(self):
+        assert unpack_prefix(pack_prefix("10.1.0.0/16")) == (4, 0x0a010000, 16)
+        assert unpack_prefix(pack_prefix("fc00::1")) == (6, (0xfc00 << 112) | 1, 128)
+        assert prefix_to_str(pack_prefix("10.1.2.3")) == "10.1.2.3/32"
+        assert prefix_to_str(pack_prefix("2603:10B0:503:0DF4::5D/128")) == "2603:10b0:503:df4::5d/128"
+        # Same address & length in different families must not collide
+        assert pack_prefix("0.0.0.0/0") != pack_prefix("::/0")
+
+    @pytest.mark.parametrize("prefix", ["10.1.2/24", "10.0.0.0/33", "fc00::/129", "abc", "10.0.0.0/-1"])
+    def test_pack_invalid(self, prefix):
+        with pytest.raises(ValueError):
+            pack_prefix(prefix)
+
+    def test_set_ops(self):
+        a = PrefixSet(["10.0.0.0/24", "10.0.1.0/24", "fc00::/64"])
+        b = PrefixSet(["10.0.1.0/24", "fc00:0:0:0::/64", "192.168.0.1/32"])
+
+        assert (a - b).to_list() == ["10.0.0.0/24"]
+        assert (b - a).to_list() == ["192.168.0.1/32"]
+        assert (a & b).to_list() == ["10.0.1.0/24", "fc00::/64"]
+        assert len(a | b) == 4
+        assert "fc00::0/64" in a
+        assert "fc00::/63" not in a
+        assert "not-a-prefix" not in a
+        assert a.filter(lambda p: p.startswith("10.")) == PrefixSet(["10.0.0.0/24", "10.0.1.0/24"])
+
+    def test_covered_by(self):
+        routes = PrefixSet(["10.1.2.0/24", "10.2.0.0/16", "10.0.0.0/8", "169.254.1.1/32",
+                            "fe80::1/128", "fc00::/7", "2001:db8::/32"])
+        covers = PrefixSet(["10.0.0.0/12", "169.254.0.0/16", "fe80::/10", "2001:db8:1::/48"])
+
+        assert routes.covered_by(covers).to_list() == ["10.1.2.0/24", "10.2.0.0/16",
+                                                       "169.254.1.1/32", "fe80::1/128"]
+
+        # Host bits of the covering prefix are ignored
+        assert PrefixSet(["10.1.0.0/16"]).covered_by(PrefixSet(["10.1.2.3/8"])) == PrefixSet(["10.1.0.0/16"])
+
+
+def _gen_routes(count):
+    appl = []
+    asic = []
+    for i in range(count):
+        if i % 4 == 0:
+            prefix = str(ipaddress.ip_network("2001:db8:{:x}:{:x}::/64".format(i >> 16, i & 0xffff)))
+        else:
+            prefix = "{}.{}.{}.0/24".format(10 + (i >> 16), (i >> 8) & 0xff, i & 0xff)
+        appl.append(prefix)
+        if i % 1000:
+            asic.append(route_check.ASIC_KEY_PREFIX + '{"dest":"' + prefix + ASIC_KEY_SUFFIX)
+    asic.append(route_check.ASIC_KEY_PREFIX + '{"dest":"fe80::/64' + ASIC_KEY_SUFFIX)
+    return appl, asic
+
+
+def _diff_sorted_strings(appl, asic):
+    rt_appl = sorted(route_check.add_prefix_ifnot(k.lower()) for k in appl if not route_check.is_local(k))
+    rt_asic = []
+    for k in asic:
+        res, e = route_check.checkout_rt_entry(k)
+        if res:
+            rt_asic.append(e)
+    return route_check.diff_sorted_lists(rt_appl, sorted(rt_asic))
+
+
+def _diff_prefix_sets(appl, asic):
+    rt_appl = route_check.filter_out_link_local(PrefixSet(appl))
+    rt_asic = PrefixSet()
+    dest_offset = len(route_check.ASIC_KEY_PREFIX) + len('{"dest":"')
+    for k in asic:
+        rt_asic.add(k[dest_offset:].split('"', 1)[0])
+    rt_asic = route_check.filter_out_link_local(rt_asic)
+    return (rt_appl - rt_asic).to_list(), (rt_asic - rt_appl).to_list()
+
+
+def test_prefix_set_diff_matches_sorted_strings():
+    appl, asic = _gen_routes(5000)
+    missing, unexpected = _diff_prefix_sets(appl, asic)
+
+    assert (missing, unexpected) == _diff_sorted_strings(appl, asic)
+    assert len(missing) == 5
+    assert unexpected == []
+
+
+@benchmark
+def test_prefix_set_benchmark():
+    """
+    Compare the sorted string merge against the prefix set engine for the
+    APPL-DB vs ASIC-DB diff. Runs with SONIC_UTILITIES_BENCHMARK=1, set
+    PREFIX_SET_BENCH_PREFIXES=2000000 for a full size run.
+
+    The prefix set is several times faster. Its peak memory is not lower: a set
+    of Python ints costs about as much as the sorted lists of short strings, so
+    the memory is only checked not to grow much.
+    """
+    appl, asic = _gen_routes(BENCH_PREFIXES)
+
+    old_res, old_time, old_peak = measure(_diff_sorted_strings, appl, asic)
+    new_res, new_time, new_peak = measure(_diff_prefix_sets, appl, asic)
+
+    print("prefixes={} sorted-strings: {:.2f}s peak={:.1f}MB prefix-set: {:.2f}s peak={:.1f}MB".format(
+        BENCH_PREFIXES, old_time, old_peak / 1e6, new_time, new_peak / 1e6))
+
+    assert new_res == old_res
+    assert new_time * 2 < old_time
+    assert new_peak < old_peak * 1.5
@@ -3,7 +3,7 @@ import os
 import sys
 
 from click.testing import CliRunner
-from unittest import TestCase
+from unittest import mock
 from swsscommon.swsscommon import ConfigDBConnector
 
 from .mock_tables import dbconnector
@@ -12,6 +12,7 @@ import show.main as show
 import clear.main as clear
 from utilities_common.cli import json_dump
 from utilities_common.db import Db
+from utilities_common.general import load_module_from_source
 
 test_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(test_path)
@@ -2453,6 +2454,25 @@ class TestQueue(object):
             del v["time"]
         assert json_dump(json_output) == show_queue_port_voq_counters_json
 
+    def test_queue_counters_batched(self, tmp_path):
+        queuestat = load_module_from_source('queuestat', os.path.join(scripts_path, 'queuestat'))
+        queuestat.cnstat_fqn_file = str(tmp_path / 'queuestat')
+        stat = queuestat.Queuestat(None, None)
+
+        with mock.patch.object(queuestat, 'hgetall_bulk', wraps=queuestat.hgetall_bulk) as mock_bulk:
+            stat.get_print_all_stat(False, False)
+            # The ports are served from the table, no read per port
+            stat.get_cnstat(stat.port_queues_map['Ethernet0'])
+
+        # The counters of every queue are read with a single bulk call
+        assert mock_bulk.call_count == 1
+        table_ids = [table_id for queue_map in stat.port_queues_map.values() for table_id in queue_map.values()]
+        assert sorted(mock_bulk.call_args[0][2]) == sorted(queuestat.COUNTER_TABLE_PREFIX + table_id
+                                                           for table_id in table_ids)
+        for table_id in table_ids:
+            assert stat.queue_counters[table_id] == \
+                (stat.db.get_all(stat.db.COUNTERS_DB, queuestat.COUNTER_TABLE_PREFIX + table_id) or {})
+
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
@@ -19,6 +19,7 @@ logger = logging.getLogger(__name__)
 
 sys.path.append("scripts")
 import route_check  # noqa: E402
+from utilities_common.prefix_set import prefix_to_str  # noqa: E402
 
 current_test_data = None
 selector_returned = None
@@ -254,6 +255,33 @@ class TestRouteCheck(object):
         set_test_case_data(ct_data)
         self.run_test(ct_data)
 
+    @pytest.mark.parametrize("test_num", [k for k, v in TEST_DATA.items() if UPD not in v])
+    def test_route_check_daemon(self, mock_dbs, test_num):
+        logger.debug("test_route_check_daemon: test_num={}".format(test_num))
+        self.init()
+        ct_data = copy.deepcopy(TEST_DATA[test_num])
+        ct_data[ARGS] += " -d --mismatch_age 0"
+        set_test_case_data(ct_data)
+        self.run_test(ct_data)
+
+    def test_route_tracker_aging(self, mock_dbs):
+        self.init()
+        ct_data = TEST_DATA['1']
+        set_test_case_data(ct_data)
+        init_db_conns(ct_data[NAMESPACE])
+        tracker = route_check.RouteTracker(DEFAULTNS)
+        tracker.resync()
+
+        # Mismatches younger than the mismatch age are not reported
+        now = time.time()
+        assert tracker.check(now, 10) == {}
+        assert set(map(prefix_to_str, tracker.pending)) == {"10.10.196.12/31", "10.10.196.30/31", "10.10.10.10/32"}
+
+        # SET & DEL notifications resolve the pending ones; the local interface route is filtered
+        assert tracker.poll(0) == 2
+        assert tracker.check(now + 100, 10) == {}
+        assert set(map(prefix_to_str, tracker.pending)) == {"10.10.196.30/31"}
+
     def run_test(self, ct_data):
         with patch('sys.argv', ct_data[ARGS].split()), \
             patch('sonic_py_common.multi_asic.get_namespace_list', return_value=ct_data[NAMESPACE]), \
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Fake vtysh replaying recorded outputs, for 'vtysh -c <command>' and for the commands
+read from stdin, like vtysh does with a pipe: the prompt, the echo of the command
+then its output.
+
+FAKE_VTYSH_REPLAY is a JSON file of {command: path of the recorded output}.
+FAKE_VTYSH_LOG, if set, gets a line per fake vtysh started, with its arguments.
+FAKE_VTYSH_NO_ECHO makes 'echo' an unknown command.
+"""
+
+import json
+import os
+import sys
+
+PROMPT = 'sonic# '
+
+
+def run(command, replay):
+    if command.startswith('echo ') and not os.environ.get('FAKE_VTYSH_NO_ECHO'):
+        return command[len('echo '):] + '\n', 0
+    if command in replay:
+        with open(replay[command]) as recorded:
+            return recorded.read(), 0
+    return '% Unknown command: {}\n'.format(command), 1
+
+
+def main():
+    args = sys.argv[1:]
+    if os.environ.get('FAKE_VTYSH_LOG'):
+        with open(os.environ['FAKE_VTYSH_LOG'], 'a') as log:
+            log.write(' '.join(args) + '\n')
+    with open(os.environ['FAKE_VTYSH_REPLAY']) as replay_file:
+        replay = json.load(replay_file)
+
+    if '-c' in args:
+        output, ret = run(args[args.index('-c') + 1], replay)
+        sys.stdout.write(output)
+        return ret
+
+    sys.stdout.write('\nHello, this is FRRouting (version 8.5.4).\n\n')
+    while True:
+        sys.stdout.write(PROMPT)
+        sys.stdout.flush()
+        line = sys.stdin.readline()
+        if not line:
+            return 0
+        command = line.strip()
+        sys.stdout.write(command + '\n')
+        output, _ = run(command, replay)
+        sys.stdout.write(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Fake xcvrd answering the muxcable commands written to a CMD table of APPL_DB
+with a response in the RSP table of STATE_DB, one command at a time.
+
+FAKE_XCVRD_CONFIG is a JSON file of:
+    socket: the unix socket of the redis server
+    cmd_table, rsp_table: the names of the tables
+    rsp_name: the field of the responses
+    delay: the seconds each command takes
+    delays: {port: seconds the command of the port takes instead}, optional
+    responses: {port: value of the response}, a port with a null value gets a
+        response without the rsp_name field, a port not in there gets none
+"""
+
+import json
+import os
+import time
+
+import redis
+
+APPL_DB = 0
+STATE_DB = 6
+POLL_INTERVAL_SECS = 0.01
+
+
+def main():
+    with open(os.environ['FAKE_XCVRD_CONFIG']) as config_file:
+        config = json.load(config_file)
+
+    appl_db = redis.Redis(unix_socket_path=config['socket'], db=APPL_DB, decode_responses=True)
+    state_db = redis.Redis(unix_socket_path=config['socket'], db=STATE_DB, decode_responses=True)
+    cmd_prefix = config['cmd_table'] + ':'
+    handled = set()
+
+    while True:
+        for key in sorted(appl_db.keys(cmd_prefix + '*')):
+            port = key[len(cmd_prefix):]
+            if port in handled:
+                continue
+            handled.add(port)
+            time.sleep(config.get('delays', {}).get(port, config['delay']))
+            if port not in config['responses']:
+                continue
+            value = config['responses'][port]
+            fields = {config['rsp_name']: value} if value is not None else {'error': 'unsupported'}
+            state_db.hset('{}|{}'.format(config['rsp_table'], port), mapping=fields)
+        time.sleep(POLL_INTERVAL_SECS)
+
+
+if __name__ == '__main__':
+    main()
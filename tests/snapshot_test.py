@@ -0,0 +1,61 @@
+import datetime
+import os
+
+from utilities_common.cli import json_serial
+from utilities_common.snapshot import SnapshotStore, read_snapshot, write_snapshot, DEFAULT_SECTION
+
+
+class TestSnapshot(object):
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "portstat")
+        now = datetime.datetime(2024, 1, 2, 3, 4, 5)
+        cnstat = {
+            'time': now,
+            'Ethernet0': {'rx_ok': '10', 'tx_ok': 'N/A'},
+            'Ethernet4': {'rx_ok': 20, 'hist': {'pfc0': [1, 2]}},
+            'Ethernet8': {},
+        }
+        store = SnapshotStore(path)
+        assert store.get() is None
+
+        store.save({DEFAULT_SECTION: cnstat, 'asic1': {'Ethernet0': {'rx_ok': '10'}}}, default=json_serial)
+        section = store.get()
+
+        assert section.get('time') == now.isoformat()
+        assert section['Ethernet0'] == {'rx_ok': '10', 'tx_ok': 'N/A'}
+        assert section['Ethernet4'] == {'rx_ok': 20, 'hist': {'pfc0': [1, 2]}}
+        assert section['Ethernet8'] == {}
+        assert 'Ethernet12' not in section
+        assert section.get('Ethernet12') is None
+        assert list(section) == ['time', 'Ethernet0', 'Ethernet4', 'Ethernet8']
+        assert dict(store.get('asic1')) == {'Ethernet0': {'rx_ok': '10'}}
+        assert store.get('asic2') is None
+
+        # No temporary file is left behind
+        assert os.listdir(str(tmp_path)) == ["portstat"]
+
+    def test_update(self, tmp_path):
+        path = str(tmp_path / "queuestat")
+        store = SnapshotStore(path)
+        store.update({'Ethernet0': {'time': 't0', 'Ethernet0:0': {'totalpacket': '1'}}})
+        store.update({'Ethernet4': {'time': 't1'}})
+        store.update({'Ethernet0': {'time': 't2'}})
+
+        snapshot = read_snapshot(path)
+        assert sorted(snapshot) == ['Ethernet0', 'Ethernet4']
+        assert dict(snapshot['Ethernet0']) == {'time': 't2'}
+        assert dict(snapshot['Ethernet4']) == {'time': 't1'}
+
+    def test_invalid_file(self, tmp_path):
+        path = str(tmp_path / "aclstat")
+        for content in (b'', b'[]', b'SNAP' + b'\x01' * 40):
+            with open(path, 'wb') as fp:
+                fp.write(content)
+            assert read_snapshot(path) is None
+
+        write_snapshot(path, {'DATAACL': {'RULE_1': {'SAI_ACL_COUNTER_ATTR_PACKETS': '1'}}})
+        with open(path, 'rb') as fp:
+            data = fp.read()
+        with open(path, 'wb') as fp:
+            fp.write(data[:-4])
+        assert read_snapshot(path) is None
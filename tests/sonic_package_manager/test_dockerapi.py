@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+import threading
+from unittest.mock import MagicMock
+
+from sonic_package_manager.dockerapi import DockerApi
+
+
+def run_in_threads(func, args_list):
+    threads = [threading.Thread(target=func, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_docker_client_per_thread():
+    client = MagicMock()
+    client_factory = MagicMock(side_effect=MagicMock)
+    docker = DockerApi(client, client_factory=client_factory)
+
+    clients = []
+    run_in_threads(lambda: clients.append(docker.client), [()])
+
+    assert docker.client is client
+    assert clients[0] is not client
+    client_factory.assert_called_once()
+
+
+def test_docker_load_stream_concurrent():
+    # The loads only get past the barrier if both are in progress at once
+    barrier = threading.Barrier(2, timeout=5)
+
+    def make_client():
+        client = MagicMock()
+
+        def load_image(data, quiet):
+            barrier.wait()
+            yield {'stream': f'Loaded image: {data}\n'}
+
+        client.api.load_image.side_effect = load_image
+        return client
+
+    docker = DockerApi(make_client(), client_factory=make_client)
+    images = {}
+
+    def load(name):
+        images[name] = docker.load_stream(name, show_progress=False)
+
+    run_in_threads(load, [('test-a:1.0.0',), ('test-b:1.0.0',)])
+
+    assert sorted(images) == ['test-a:1.0.0', 'test-b:1.0.0']
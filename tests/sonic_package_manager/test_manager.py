@@ -8,7 +8,9 @@ import pytest
 
 import sonic_package_manager
 from sonic_package_manager.errors import *
-from sonic_package_manager.manager import PackageManager
+from sonic_package_manager.constraint import PackageConstraint
+from sonic_package_manager.manager import PackageManager, sort_packages_by_dependencies
+from sonic_package_manager.source import DockerImageSource
 from sonic_package_manager.version import Version
 import json
 
@@ -265,6 +267,23 @@ def test_installation_from_registry(package_manager, mock_docker_api):
     mock_docker_api.pull.assert_called_once_with('Azure/docker-test', '1.6.0')
 
 
+def test_get_packages_available_versions(package_manager, mock_registry_resolver):
+    tags = {
+        'docker-database': ['1.0.0', 'latest'],
+        'docker-orchagent': ['1.0.0', '1.1.0'],
+    }
+    mock_registry_resolver.get_registry_for.return_value.tags.side_effect = lambda repository: tags[repository]
+
+    versions = package_manager.get_packages_available_versions(['database', 'swss'])
+
+    assert list(versions) == ['database', 'swss']
+    assert versions['database'] == [Version.parse('1.0.0')]
+    assert versions['swss'] == [Version.parse('1.0.0'), Version.parse('1.1.0')]
+    assert package_manager.get_packages_available_versions(['database'], all=True) == {
+        'database': ['1.0.0', 'latest']
+    }
+
+
 def test_installation_from_registry_using_digest(package_manager, mock_docker_api, fake_metadata_resolver):
     ref = 'sha256:9780f6d83e45878749497a6297ed9906c19ee0cc48cc88dc63827564bb8768fd'
     metadata = fake_metadata_resolver.metadata_store['Azure/docker-test']['1.6.0']
@@ -371,7 +390,15 @@ def test_manager_migration(package_manager, fake_db_for_migration):
     package_manager.install = Mock()
     package_manager.migrate_packages(fake_db_for_migration)
 
-    package_manager.install.assert_has_calls([
+    install_calls = []
+    for install_call in package_manager.install.call_args_list:
+        kwargs = dict(install_call.kwargs)
+        # Installed from the source the package metadata was fetched from
+        assert kwargs.pop('source').metadata is not None
+        install_calls.append(call(*install_call.args, **kwargs))
+
+    assert len(install_calls) == 4
+    for expected in [
         # test-package-3 was installed but there is a newer version installed
         # in fake_db_for_migration, asserting for upgrade
         call('test-package-3=1.6.0'),
@@ -383,9 +410,9 @@ def test_manager_migration(package_manager, fake_db_for_migration):
         call(None, 'Azure/docker-test-5:1.9.0', name='test-package-5'),
         # test-package-6 2.0.0 was installed in fake_db_for_migration but the default
         # in current db is 1.5.0, assert that migration will install the newer version.
-        call('test-package-6=2.0.0')],
-        any_order=True
-    )
+        call('test-package-6=2.0.0'),
+    ]:
+        assert expected in install_calls
 
 
 def mock_get_docker_client(dockerd_sock):
@@ -415,6 +442,31 @@ def test_manager_migration_dockerd(package_manager, fake_db_for_migration, mock_
     package_manager.get_docker_client.assert_has_calls([
         call('/var/run/docker.sock')], any_order=True)
 
+    # Images are streamed from the old docker library, not saved to a file first
+    mock_docker_api.load_stream.assert_has_calls([call([b'named: True'], False)] * 2)
+    mock_docker_api.load.assert_not_called()
+    sources = {kwargs['name']: kwargs['source'] for _, kwargs in package_manager.install.call_args_list
+               if isinstance(kwargs['source'], DockerImageSource)}
+    assert sorted(sources) == ['test-package-3', 'test-package-6']
+    assert sources['test-package-3'].image_id == 'Azure/docker-test-3:1.6.0'
+
+
+def test_sort_packages_by_dependencies():
+    def package(*depends):
+        return Mock(manifest={'package': {'depends': [PackageConstraint.parse(name) for name in depends]}})
+
+    packages = {
+        'a': package('b', 'c'),
+        'b': package('c', 'database'),
+        'c': None,
+        'd': package(),
+    }
+    assert sort_packages_by_dependencies(packages) == ['c', 'd', 'b', 'a']
+
+    # Circular dependencies do not prevent migration
+    packages = {'a': package('b'), 'b': package('a'), 'c': package('a')}
+    assert sort_packages_by_dependencies(packages) == ['a', 'b', 'c']
+
 
 def test_create_package_manifest_default_manifest(package_manager):
     """Test case for creating a default manifest."""
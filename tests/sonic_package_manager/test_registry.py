@@ -1,8 +1,16 @@
 #!/usr/bin/env python
 
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+from unittest import mock
+
+import pytest
 import requests
 import responses
-from sonic_package_manager.registry import RegistryResolver
+from sonic_package_manager.registry import AuthenticationService, Registry, RegistryResolver
 
 
 def test_get_registry_for():
@@ -15,6 +23,7 @@ def test_get_registry_for():
     assert registry.url == 'https://registry-server:5000'
     registry = resolver.get_registry_for('registry-server.com/docker')
     assert registry.url == 'https://registry-server.com'
+    assert resolver.get_registry_for('registry-server.com/other') is registry
 
 
 @responses.activate
@@ -34,3 +43,106 @@ def test_registry_auth():
                   json={'tags': ['a', 'b']},
                   status=requests.codes.ok)
     assert registry.tags('registry-server:5000/docker') == ['a', 'b']
+
+
+class StandInRegistry(http.server.ThreadingHTTPServer):
+    """ Local registry requiring a bearer token issued by its own /token. """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StandInRegistryHandler)
+        self.url = f'http://127.0.0.1:{self.server_address[1]}'
+        self.token_requests = 0
+        self.requests = []
+        self.connections = set()
+
+
+class StandInRegistryHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, content, headers={}):
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        path = urllib.parse.urlparse(self.path).path
+        if path == '/token':
+            self.server.token_requests += 1
+            self.send_json(200, {'token': 'secret', 'expires_in': 300})
+            return
+        self.server.requests.append(path)
+        if self.headers.get('Authorization') != 'Bearer secret':
+            challenge = (f'Bearer realm="{self.server.url}/token",service="stand-in",'
+                         f'scope="repository:library/docker:pull"')
+            self.send_json(401, {'errors': []}, {'Www-Authenticate': challenge})
+        elif path == '/v2/library/docker/tags/list':
+            self.send_json(200, {'tags': ['1.0.0', 'latest']})
+        elif path.startswith('/v2/library/docker/manifests/'):
+            self.send_json(200, {'config': {'digest': 'sha256:abc'}})
+        else:
+            self.send_json(404, {'errors': []})
+
+
+@pytest.fixture
+def stand_in_registry():
+    AuthenticationService.token_cache.clear()
+    server = StandInRegistry()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    AuthenticationService.token_cache.clear()
+
+
+def test_registry_token_and_connection_reuse(stand_in_registry):
+    registry = Registry(stand_in_registry.url)
+    assert registry.tags('docker') == ['1.0.0', 'latest']
+    assert registry.manifest('docker', '1.0.0') == {'config': {'digest': 'sha256:abc'}}
+    assert registry.tags('docker') == ['1.0.0', 'latest']
+
+    # One token for all calls, only the first call is rejected
+    assert stand_in_registry.token_requests == 1
+    assert stand_in_registry.requests == ['/v2/library/docker/tags/list', '/v2/library/docker/tags/list',
+                                          '/v2/library/docker/manifests/1.0.0', '/v2/library/docker/tags/list']
+    # Registry and token requests share a single kept alive connection
+    assert len(stand_in_registry.connections) == 1
+
+    # The cached token is shared by new clients
+    assert Registry(stand_in_registry.url).tags('docker') == ['1.0.0', 'latest']
+    assert stand_in_registry.token_requests == 1
+
+
+def test_registry_token_expired(stand_in_registry):
+    registry = Registry(stand_in_registry.url)
+    registry.tags('docker')
+    with mock.patch('sonic_package_manager.registry.time.monotonic', return_value=time.monotonic() + 300):
+        registry.tags('docker')
+    assert stand_in_registry.token_requests == 2
+
+
+def test_registry_session_per_thread(stand_in_registry):
+    registry = Registry(stand_in_registry.url)
+    sessions = []
+
+    def get_tags():
+        assert registry.tags('docker') == ['1.0.0', 'latest']
+        sessions.append(registry.session)
+
+    threads = [threading.Thread(target=get_tags) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sessions) == 4
+    assert len(set(map(id, sessions))) == 4
+    assert registry.session is registry.session
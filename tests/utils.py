@@ -7,6 +7,14 @@ import os
 import subprocess
 import sys
 import tempfile
+import time
+import tracemalloc
+
+import pytest
+
+# Benchmarks are slow and their timings depend on the host, run them with SONIC_UTILITIES_BENCHMARK=1
+benchmark = pytest.mark.skipif(not os.environ.get('SONIC_UTILITIES_BENCHMARK'),
+                               reason='set SONIC_UTILITIES_BENCHMARK=1 to run benchmarks')
 
 
 def worker_tmp_path(filename):
@@ -37,6 +45,23 @@ def load_source(modname, filename, cache_module=False):
     return module
 
 
+def measure(func, *args):
+    """
+    Run func(*args) twice, once for the wall time and once under tracemalloc for the peak memory.
+
+    Returns the result of the first run, the elapsed seconds and the peak traced bytes.
+    """
+    start = time.perf_counter()
+    res = func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return res, elapsed, peak
+
+
 def get_result_and_return_code(cmd):
     return_code = 0
     try:
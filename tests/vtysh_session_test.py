@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+import threading
+import time
+from unittest import mock
+
+import click
+import pytest
+from click.testing import CliRunner
+
+import utilities_common.bgp_util as bgp_util
+from utilities_common import vtysh_session
+from utilities_common.vtysh_session import VtyshSession, VtyshSessionError
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+mock_tables_path = os.path.join(test_path, 'mock_tables')
+fake_vtysh = os.path.join(test_path, 'scripts', 'fake_vtysh.py')
+
+REPLAY = {
+    'show ip bgp summary json': os.path.join(mock_tables_path, 'ipv4_bgp_summary.json'),
+    'show bgp ipv6 summary json': os.path.join(mock_tables_path, 'ipv6_bgp_summary.json'),
+    'show ip route json': os.path.join(mock_tables_path, 'ip_route.json'),
+}
+
+
+def recorded(command):
+    with open(REPLAY[command]) as recorded_file:
+        return json.load(recorded_file)
+
+
+@pytest.fixture
+def fake_vtysh_env(tmp_path, monkeypatch):
+    replay_path = tmp_path / 'replay.json'
+    replay_path.write_text(json.dumps(REPLAY))
+    log_path = tmp_path / 'vtysh.log'
+    monkeypatch.setenv('FAKE_VTYSH_REPLAY', str(replay_path))
+    monkeypatch.setenv('FAKE_VTYSH_LOG', str(log_path))
+    # The fake vtysh is run by python instead of sudo
+    monkeypatch.setattr(vtysh_session, 'VTYSH_SESSION_SUDO', [sys.executable])
+    yield log_path
+    vtysh_session.close_sessions()
+
+
+def started(log_path):
+    return log_path.read_text().splitlines() if log_path.exists() else []
+
+
+class TestVtyshSession(object):
+    def test_run_command(self, fake_vtysh_env):
+        session = VtyshSession([sys.executable, fake_vtysh])
+        try:
+            for command in ['show ip bgp summary json', 'show ip route json', 'show bgp ipv6 summary json',
+                            'show ip bgp summary json']:
+                assert json.loads(session.run_command(command)) == recorded(command)
+        finally:
+            session.close()
+        assert len(started(fake_vtysh_env)) == 1
+
+    def test_no_echo(self, fake_vtysh_env, monkeypatch):
+        monkeypatch.setenv('FAKE_VTYSH_NO_ECHO', '1')
+        session = VtyshSession([sys.executable, fake_vtysh])
+        start = time.monotonic()
+        with pytest.raises(VtyshSessionError):
+            session.run_command('show ip bgp summary json')
+        assert time.monotonic() - start < vtysh_session.VTYSH_SESSION_START_TIMEOUT
+        # A failed session is not started again
+        with pytest.raises(VtyshSessionError):
+            session.run_command('show ip bgp summary json')
+        assert len(started(fake_vtysh_env)) == 1
+
+    def test_exited(self, fake_vtysh_env):
+        session = VtyshSession([sys.executable, '-c', 'pass'])
+        with pytest.raises(VtyshSessionError):
+            session.run_command('show ip bgp summary json')
+
+
+class TestRunBgpCommand(object):
+    def test_one_session(self, fake_vtysh_env):
+        with mock.patch('utilities_common.cli.run_command') as mock_run_command:
+            for command in ['show ip bgp summary json', 'show bgp ipv6 summary json', 'show ip bgp summary json']:
+                output = bgp_util.run_bgp_command(command, vtysh_shell_cmd=fake_vtysh)
+                assert json.loads(output) == recorded(command)
+        mock_run_command.assert_not_called()
+        assert started(fake_vtysh_env) == ['']
+
+    def test_error_runs_vtysh_command(self, fake_vtysh_env):
+        with mock.patch('utilities_common.cli.run_command', return_value=('% Unknown command\n', 1)) as run_command:
+            with pytest.raises(SystemExit):
+                bgp_util.run_bgp_command('show ip bgp vrf Vrf1 summary json', vtysh_shell_cmd=fake_vtysh)
+        run_command.assert_called_once_with(
+            ['sudo', fake_vtysh, '-c', 'show ip bgp vrf Vrf1 summary json'], return_cmd=True)
+
+    def test_no_echo_runs_vtysh_command(self, fake_vtysh_env, monkeypatch):
+        monkeypatch.setenv('FAKE_VTYSH_NO_ECHO', '1')
+        with mock.patch('utilities_common.cli.run_command', return_value=('{}', 0)) as run_command:
+            assert bgp_util.run_bgp_command('show ip bgp summary json', vtysh_shell_cmd=fake_vtysh) == '{}'
+            assert bgp_util.run_bgp_command('show ip route json', vtysh_shell_cmd=fake_vtysh) == '{}'
+        assert run_command.call_count == 2
+        assert len(started(fake_vtysh_env)) == 1
+
+    def test_text_runs_vtysh_command(self, fake_vtysh_env):
+        with mock.patch('utilities_common.cli.run_command', return_value=('summary', 0)) as run_command:
+            assert bgp_util.run_bgp_command('show ip bgp summary', vtysh_shell_cmd=fake_vtysh) == 'summary'
+        run_command.assert_called_once()
+        assert started(fake_vtysh_env) == []
+
+    def test_namespaces_queried_concurrently(self):
+        namespaces = ['asic0', 'asic1', 'asic2']
+        barrier = threading.Barrier(len(namespaces), timeout=10)
+
+        def run_bgp_command(vtysh_cmd, bgp_namespace, vtysh_shell_cmd, exit_on_fail):
+            barrier.wait()
+            return '{} {}'.format(click.get_current_context().command.name, bgp_namespace)
+
+        @click.command()
+        def summary():
+            click.echo(bgp_util.run_bgp_show_command_on_namespaces('show ip bgp summary json', namespaces))
+
+        with mock.patch.object(bgp_util, 'run_bgp_command', run_bgp_command):
+            result = CliRunner().invoke(summary)
+        assert result.exit_code == 0, result.output
+        assert result.output == "['summary asic0', 'summary asic1', 'summary asic2']\n"
@@ -0,0 +1,143 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utilities_common.xcvrd_channel import XCVRD_RSP_OK, XCVRD_RSP_INVALID, XCVRD_RSP_TIMEOUT, \
+    XCVRD_CHANNEL_DEADLINE_TIMEOUTS
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+fake_xcvrd = os.path.join(test_path, 'scripts', 'fake_xcvrd.py')
+
+CMD_TABLE = 'XCVRD_DOWN_FW_CMD'
+RSP_TABLE = 'XCVRD_DOWN_FW_RSP'
+
+# The channel runs in its own python, the tests mock the swsscommon DBConnector
+RUN_CHANNEL = '''
+import json, sys, time
+from swsscommon import swsscommon
+from utilities_common import xcvrd_channel
+
+args = json.loads(sys.argv[1])
+swsscommon.SonicDBConfig.initialize(args['db_config'])
+channel = xcvrd_channel.XcvrdCommandChannel(
+    args['cmd_table'], args['rsp_table'],
+    db_connect=lambda db_name, namespace: swsscommon.DBConnector(db_name, 0, False))
+start = time.time()
+responses = channel.run(args['port_asics'], 'download_firmware', 'status', 'image.bin', None,
+                        args['timeout'], args['deadline'])
+elapsed = time.time() - start
+keys = [swsscommon.Table(swsscommon.DBConnector('APPL_DB', 0, False), args['cmd_table']).getKeys(),
+        swsscommon.Table(swsscommon.DBConnector('STATE_DB', 0, False), args['rsp_table']).getKeys()]
+print(json.dumps({'responses': responses, 'elapsed': elapsed, 'keys': keys}))
+'''
+
+
+def swsscommon_available():
+    return subprocess.run([sys.executable, '-c', 'from swsscommon import swsscommon; swsscommon.SubscriberStateTable'],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+
+@pytest.fixture
+def redis_db(tmp_path):
+    if shutil.which('redis-server') is None or not swsscommon_available():
+        pytest.skip('needs redis-server and swsscommon')
+
+    socket_path = str(tmp_path / 'redis.sock')
+    server = subprocess.Popen(['redis-server', '--port', '0', '--unixsocket', socket_path, '--save', '',
+                               '--notify-keyspace-events', 'AKE', '--dir', str(tmp_path)],
+                              stdout=subprocess.DEVNULL)
+    for _ in range(500):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.01)
+
+    db_config = tmp_path / 'database_config.json'
+    db_config.write_text(json.dumps({
+        'INSTANCES': {'redis': {'hostname': '127.0.0.1', 'port': 6379, 'unix_socket_path': socket_path}},
+        'DATABASES': {
+            'APPL_DB': {'id': 0, 'separator': ':', 'instance': 'redis'},
+            'CONFIG_DB': {'id': 4, 'separator': '|', 'instance': 'redis'},
+            'STATE_DB': {'id': 6, 'separator': '|', 'instance': 'redis'},
+        },
+        'VERSION': '1.0'
+    }))
+    yield socket_path, str(db_config)
+    server.terminate()
+    server.wait()
+
+
+def run_channel(redis_db, tmp_path, responses, delay, port_asics, timeout, deadline=None, delays=None):
+    socket_path, db_config = redis_db
+    fake_xcvrd_config = tmp_path / 'fake_xcvrd.json'
+    fake_xcvrd_config.write_text(json.dumps({
+        'socket': socket_path, 'cmd_table': CMD_TABLE, 'rsp_table': RSP_TABLE, 'rsp_name': 'status',
+        'delay': delay, 'delays': delays or {}, 'responses': responses
+    }))
+    env = dict(os.environ, FAKE_XCVRD_CONFIG=str(fake_xcvrd_config), PLATFORM='x86_64-fake-r0')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [modules_path, os.environ.get('PYTHONPATH')]))
+    responder = subprocess.Popen([sys.executable, fake_xcvrd], env=env)
+    try:
+        args = {'db_config': db_config, 'cmd_table': CMD_TABLE, 'rsp_table': RSP_TABLE,
+                'port_asics': port_asics, 'timeout': timeout, 'deadline': deadline}
+        output = subprocess.check_output([sys.executable, '-c', RUN_CHANNEL, json.dumps(args)], env=env)
+    finally:
+        responder.kill()
+        responder.wait()
+    return json.loads(output)
+
+
+class TestXcvrdCommandChannel(object):
+    def test_responses_matched_by_port(self, redis_db, tmp_path):
+        port_asics = {port: 0 for port in ['Ethernet0', 'Ethernet4', 'Ethernet8', 'Ethernet12', 'Ethernet16']}
+        responses = {'Ethernet0': '0', 'Ethernet4': '1', 'Ethernet8': '0', 'Ethernet16': None}
+        result = run_channel(redis_db, tmp_path, responses, delay=0.1, port_asics=port_asics, timeout=1)
+
+        assert result['responses'] == {
+            'Ethernet0': [XCVRD_RSP_OK, '0'],
+            'Ethernet4': [XCVRD_RSP_OK, '1'],
+            'Ethernet8': [XCVRD_RSP_OK, '0'],
+            'Ethernet12': [XCVRD_RSP_TIMEOUT, 'unknown'],
+            'Ethernet16': [XCVRD_RSP_INVALID, 'unknown'],
+        }
+        # The silent port costs one timeout, not one per port
+        assert result['elapsed'] < 2
+        assert result['keys'] == [[], []]
+
+    def test_port_timeout_after_silent_port(self, redis_db, tmp_path):
+        # xcvrd is stuck on the first port for more than the timeout, the ports
+        # after it still get their own timeout
+        port_asics = {port: 0 for port in ['Ethernet0', 'Ethernet4', 'Ethernet8']}
+        responses = {'Ethernet4': '0', 'Ethernet8': '0'}
+        result = run_channel(redis_db, tmp_path, responses, delay=0.1, port_asics=port_asics, timeout=1,
+                             delays={'Ethernet0': 1.5})
+
+        assert result['responses'] == {
+            'Ethernet0': [XCVRD_RSP_TIMEOUT, 'unknown'],
+            'Ethernet4': [XCVRD_RSP_OK, '0'],
+            'Ethernet8': [XCVRD_RSP_OK, '0'],
+        }
+
+    def test_deadline(self, redis_db, tmp_path):
+        ports = ['Ethernet{}'.format(index * 4) for index in range(8)]
+        result = run_channel(redis_db, tmp_path, {port: '0' for port in ports}, delay=0.3,
+                             port_asics={port: 0 for port in ports}, timeout=1, deadline=1)
+
+        statuses = [result['responses'][port][0] for port in ports]
+        assert XCVRD_RSP_OK in statuses
+        assert XCVRD_RSP_TIMEOUT in statuses
+        assert result['elapsed'] < 2
+
+    def test_default_deadline_unresponsive_xcvrd(self, redis_db, tmp_path):
+        # xcvrd answers no port, the batch still ends after the default deadline
+        # and not after one timeout per port
+        ports = ['Ethernet{}'.format(index * 4) for index in range(48)]
+        result = run_channel(redis_db, tmp_path, {}, delay=0.1, port_asics={port: 0 for port in ports}, timeout=0.2)
+
+        assert all(result['responses'][port][0] == XCVRD_RSP_TIMEOUT for port in ports)
+        assert result['elapsed'] < 0.2 * XCVRD_CHANNEL_DEADLINE_TIMEOUTS + 1
@@ -9,7 +9,7 @@ import utilities_common.multi_asic as multi_asic_util
 from natsort import natsorted
 from sonic_py_common import multi_asic, device_info
 from tabulate import tabulate
-from utilities_common import constants
+from utilities_common import constants, vtysh_session
 
 
 def get_namespace_for_bgp_neighbor(neighbor_ip, vrf_name=constants.DEFAULT_VRF):
@@ -248,6 +248,13 @@ def run_bgp_command(vtysh_cmd, bgp_namespace=multi_asic.DEFAULT_NAMESPACE,
     if bgp_namespace is not multi_asic.DEFAULT_NAMESPACE:
         bgp_instance_id = ['-n', str(multi_asic.get_asic_id_from_name(bgp_namespace))]
 
+    # JSON queries go through the vtysh session of the namespace, kept for the whole CLI invocation.
+    # The alias mode of run_command and the exit status of errors need a 'vtysh -c'.
+    if vtysh_cmd.endswith(' json') and clicommon.get_interface_naming_mode() != "alias":
+        output = vtysh_session.run_json_command(vtysh_shell_cmd, bgp_instance_id, vtysh_cmd)
+        if output is not None:
+            return output
+
     cmd = ['sudo', vtysh_shell_cmd] + bgp_instance_id + ['-c', vtysh_cmd]
     try:
         output, ret = clicommon.run_command(cmd, return_cmd=True)
@@ -282,6 +289,15 @@ def run_bgp_show_command(vtysh_cmd, bgp_namespace=multi_asic.DEFAULT_NAMESPACE,
     return output
 
 
+def run_bgp_show_command_on_namespaces(vtysh_cmd, namespaces, exit_on_fail=True):
+    """
+    Run vtysh_cmd with run_bgp_show_command() in every namespace, concurrently with
+    multi_asic_util.run_in_namespaces(), returns the outputs in namespaces order.
+    """
+    return multi_asic_util.run_in_namespaces(run_bgp_show_command,
+                                             [(vtysh_cmd, ns, exit_on_fail) for ns in namespaces])
+
+
 def process_bgp_vrf_summary(cmd_output_json, bgp_summary, key, ns, device, vrf=constants.DEFAULT_VRF):
     ctx = click.get_current_context()
 
@@ -326,8 +342,8 @@ def get_bgp_summary_from_all_bgp_instances(af, namespace, display, vrf=constants
     if vrf == 'all':
         # Return per-VRF summaries as an ordered list of (vrf_name, bgp_summary) tuples
         vrf_summaries = {}
-        for ns in device.get_ns_list_based_on_options():
-            cmd_output = run_bgp_show_command(vtysh_cmd, ns)
+        ns_list = device.get_ns_list_based_on_options()
+        for ns, cmd_output in zip(ns_list, run_bgp_show_command_on_namespaces(vtysh_cmd, ns_list)):
             device.current_namespace = ns
             try:
                 cmd_output_json = json.loads(cmd_output)
@@ -340,8 +356,8 @@ def get_bgp_summary_from_all_bgp_instances(af, namespace, display, vrf=constants
         return list(vrf_summaries.items())
     else:
         bgp_summary = {}
-        for ns in device.get_ns_list_based_on_options():
-            cmd_output = run_bgp_show_command(vtysh_cmd, ns)
+        ns_list = device.get_ns_list_based_on_options()
+        for ns, cmd_output in zip(ns_list, run_bgp_show_command_on_namespaces(vtysh_cmd, ns_list)):
             device.current_namespace = ns
             try:
                 cmd_output_json = json.loads(cmd_output)
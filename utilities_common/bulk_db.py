@@ -0,0 +1,104 @@
+"""
+Bulk reads from the redis backed SONiC databases.
+
+The CLI scripts used to read counters one field (or one key) at a time, which
+costs one redis round trip per call. The helpers here read many hashes with
+pipelined HGETALLs, so reading all ports of a box takes a handful of round
+trips instead of tens of thousands.
+
+swsscommon's DBConnector has no pipelining, so when the connector does not
+hand out a pipelining capable client, a redis-py client is opened on the same
+database. If that is not possible either, every key is read with a single
+HGETALL, which is still cheaper than one HGET per field.
+"""
+
+import os
+
+from swsscommon.swsscommon import SonicDBConfig
+
+BULK_BATCH_SIZE = 1024
+
+_pipeline_clients = {}
+
+
+def _connect_redis(db_name, namespace):
+    try:
+        import redis
+    except ImportError:
+        return None
+
+    try:
+        db_id = SonicDBConfig.getDbId(db_name, namespace)
+        sock = SonicDBConfig.getDbSock(db_name, namespace)
+        if sock and os.path.exists(sock):
+            client = redis.Redis(unix_socket_path=sock, db=db_id, decode_responses=True)
+        else:
+            client = redis.Redis(host=SonicDBConfig.getDbHostname(db_name, namespace),
+                                 port=SonicDBConfig.getDbPort(db_name, namespace),
+                                 db=db_id, decode_responses=True)
+        client.ping()
+    except Exception:
+        return None
+    return client
+
+
+def get_pipeline_client(db, db_name):
+    """
+    Get a client able to pipeline commands to db_name.
+    :param db: connected SonicV2Connector
+    :param db_name: database name, e.g. COUNTERS_DB
+    :return client with a redis-py style pipeline(), or None if not available
+    """
+    client = db.get_redis_client(db_name)
+    if hasattr(client, 'pipeline'):
+        return client
+
+    namespace = getattr(db, 'namespace', None) or ''
+    key = (namespace, db_name)
+    if key not in _pipeline_clients:
+        _pipeline_clients[key] = _connect_redis(db_name, namespace)
+    return _pipeline_clients[key]
+
+
+def hgetall_bulk(db, db_name, keys, batch_size=BULK_BATCH_SIZE):
+    """
+    Read many hashes with as few round trips as possible.
+    :param db: connected SonicV2Connector
+    :param db_name: database name
+    :param keys: iterable of full redis keys
+    :return dict of key to dict of fields; a missing key maps to an empty dict
+    """
+    keys = list(keys)
+    result = {}
+    client = get_pipeline_client(db, db_name)
+
+    if client is None:
+        client = db.get_redis_client(db_name)
+        for key in keys:
+            result[key] = dict(client.hgetall(key) or {})
+        return result
+
+    for start in range(0, len(keys), batch_size):
+        chunk = keys[start:start + batch_size]
+        pipe = client.pipeline(transaction=False)
+        for key in chunk:
+            pipe.hgetall(key)
+        for key, fvs in zip(chunk, pipe.execute()):
+            result[key] = dict(fvs or {})
+    return result
+
+
+def hgetall_table(db, db_name, table, names, separator=None, batch_size=BULK_BATCH_SIZE):
+    """
+    Read the entries of one table for many object names.
+    :param table: table name, e.g. RATES
+    :param names: iterable of object names (keys without the table prefix)
+    :param separator: key separator; the database's separator by default
+    :return dict of name to dict of fields
+    """
+    if separator is None:
+        separator = db.get_db_separator(db_name)
+    names = list(names)
+    prefix = table + separator
+    data = hgetall_bulk(db, db_name, [prefix + name for name in names], batch_size)
+    return {name: data[prefix + name] for name in names}
@@ -1,10 +1,13 @@
 import configparser
 import datetime
+import importlib
 import os
 import re
 import subprocess
 import sys
 import shutil
+from collections.abc import MutableMapping
+from contextlib import contextmanager
 
 import click
 import json
@@ -126,6 +129,119 @@ class AliasedGroup(click.Group):
         ctx.fail('Too many matches: %s' % ', '.join(sorted(matches)))
 
 
+def import_command(import_path):
+    """Return the command at import_path, 'module:attribute'"""
+    module_name, attribute = import_path.split(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class LazyCommands(MutableMapping):
+    """Subcommands of a lazy group by name.
+
+    Besides commands, it holds loaders: callables run when the command of
+    their name is first looked up, which either return the command or
+    register it in the group themselves. A loader returning nothing for
+    its name drops the name. Extensions are callables run before a command
+    is first returned, to add subcommands to it.
+    """
+
+    def __init__(self, commands=None):
+        # A name is either in _commands or in _loaders
+        self._commands = dict(commands or {})
+        self._loaders = {}
+        self._extensions = {}
+        self._accessed = None
+
+    def add_loader(self, name, loader):
+        self._commands.pop(name, None)
+        self._loaders[name] = loader
+
+    def discard_loader(self, name):
+        self._loaders.pop(name, None)
+
+    def add_extension(self, name, extension):
+        self._extensions.setdefault(name, []).append(extension)
+
+    @contextmanager
+    def recording(self):
+        """Collect the names of the commands looked up in the block"""
+        accessed = self._accessed = set()
+        try:
+            yield accessed
+        finally:
+            self._accessed = None
+
+    def __getitem__(self, name):
+        if self._accessed is not None:
+            self._accessed.add(name)
+        loader = self._loaders.pop(name, None)
+        if loader is not None:
+            command = loader()
+            if command is not None:
+                self._commands[name] = command
+        extensions = self._extensions.pop(name, None)
+        if extensions and name in self._commands:
+            for extension in extensions:
+                extension()
+        return self._commands[name]
+
+    def __setitem__(self, name, command):
+        self._loaders.pop(name, None)
+        self._commands[name] = command
+
+    def __delitem__(self, name):
+        if self._loaders.pop(name, None) is None:
+            del self._commands[name]
+
+    def __contains__(self, name):
+        return name in self._commands or name in self._loaders
+
+    def __iter__(self):
+        yield from list(self._commands)
+        yield from list(self._loaders)
+
+    def __len__(self):
+        return len(self._commands) + len(self._loaders)
+
+
+class LazyGroupMixin(object):
+    """Group mixin registering subcommands by name, the module implementing
+    a subcommand is imported when the subcommand is resolved.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = LazyCommands(self.commands)
+
+    def add_lazy_command(self, name, import_path, condition=None):
+        """Register the command at import_path, 'module:attribute', as name.
+
+        condition, if given, is checked when the command is resolved: the
+        command does not exist when it returns False.
+        """
+        def load():
+            if condition is not None and not condition():
+                return None
+            return import_command(import_path)
+        self.commands.add_loader(name, load)
+
+    def add_lazy_commands(self, manifest, conditions=None):
+        """Register the commands of a manifest, a dict of name: import path,
+        conditions holds the condition of the commands which have one.
+        """
+        conditions = conditions or {}
+        for name, import_path in manifest.items():
+            self.add_lazy_command(name, import_path, conditions.get(name))
+
+
+class LazyAliasedGroup(LazyGroupMixin, AliasedGroup):
+    """AliasedGroup with subcommands imported on first use"""
+
+
+class LazyAbbreviationGroup(LazyGroupMixin, AbbreviationGroup):
+    """AbbreviationGroup with subcommands imported on first use"""
+
+
 class InterfaceAliasConverter(object):
     """Class which handles conversion between interface name and alias"""
 
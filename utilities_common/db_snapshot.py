@@ -0,0 +1,279 @@
+"""
+In-memory snapshot of a redis backed SONiC database.
+
+A DBSnapshot stands in for a connected ConfigDBConnector or SonicV2Connector:
+it offers the raw hash API (keys, get, get_all, set, delete, ...) and the
+ConfigDB table API (get_table, get_entry, set_entry, ...) of the connector,
+but reads every hash from the database only once and keeps all changes in
+memory. The changes are written back with commit(), as a single pipelined
+transaction when the database hands out a pipelining client.
+
+Hashes are read when first used: load() reads the whole database up front,
+keys() reads all hashes matching a pattern with pipelined HGETALLs, the other
+calls read the hash they are given.
+"""
+
+import fnmatch
+
+from utilities_common.bulk_db import get_pipeline_client, hgetall_bulk
+
+# Placeholder of a hash known to exist but not read yet
+_NOT_LOADED = object()
+
+
+class DBSnapshot(object):
+    def __init__(self, db, db_name):
+        """
+        :param db: connected ConfigDBConnector or SonicV2Connector
+        :param db_name: database name, e.g. CONFIG_DB
+        """
+        self.db = db
+        self.db_name = db_name
+        self.KEY_SEPARATOR = self.TABLE_NAME_SEPARATOR = db.get_db_separator(db_name)
+        # key -> dict of fields, None if the key does not exist
+        self._hashes = {}
+        # key -> fields as read from the database, for the keys changed since
+        self._original = {}
+        self._patterns = set()
+        # Whether every key of the database is in _hashes
+        self._complete = False
+
+    def __getattr__(self, name):
+        # Database names and the like, e.g. CONFIG_DB. Anything else is not supported
+        # by the snapshot and must not silently reach the database.
+        if name.isupper():
+            return getattr(self.db, name)
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+
+    def _check_db(self, db_name):
+        if db_name != self.db_name:
+            raise ValueError("Snapshot of {} used for {}".format(self.db_name, db_name))
+
+    def _read(self, keys):
+        if self._complete:
+            for key in keys:
+                self._hashes.setdefault(key, None)
+            return
+        keys = [key for key in keys if self._hashes.get(key, _NOT_LOADED) is _NOT_LOADED]
+        if keys:
+            for key, fvs in hgetall_bulk(self.db, self.db_name, keys).items():
+                self._hashes[key] = fvs if fvs else None
+
+    def _get(self, key):
+        self._read([key])
+        return self._hashes[key]
+
+    def _modify(self, key):
+        """
+        Returns the fields of key to be changed in place, the key is created if needed.
+        """
+        fvs = self._get(key)
+        if key not in self._original:
+            self._original[key] = dict(fvs) if fvs else None
+        if fvs is None:
+            fvs = self._hashes[key] = {}
+        return fvs
+
+    def _delete(self, key):
+        if self._get(key) is None:
+            return 0
+        self._modify(key)
+        self._hashes[key] = None
+        return 1
+
+    def _drop_if_empty(self, key):
+        # Redis removes a hash with its last field
+        if not self._hashes[key]:
+            self._hashes[key] = None
+
+    def load(self):
+        """
+        Read the whole database.
+        """
+        self._read(self._load_pattern('*'))
+        self._complete = True
+
+    def _load_pattern(self, pattern):
+        if not self._complete and pattern not in self._patterns:
+            self._patterns.add(pattern)
+            for key in self.db.keys(self.db_name, pattern) or []:
+                self._hashes.setdefault(key, _NOT_LOADED)
+        return [key for key in self._hashes if fnmatch.fnmatchcase(key, pattern)]
+
+    # SonicV2Connector API
+
+    def keys(self, db_name, pattern='*', blocking=False):
+        self._check_db(db_name)
+        keys = self._load_pattern(pattern)
+        self._read(keys)
+        return [key for key in keys if self._hashes[key] is not None]
+
+    def exists(self, db_name, key):
+        self._check_db(db_name)
+        return self._get(key) is not None
+
+    def hexists(self, db_name, _hash, key):
+        self._check_db(db_name)
+        return key in (self._get(_hash) or {})
+
+    def get(self, db_name, _hash, key, blocking=False):
+        self._check_db(db_name)
+        return (self._get(_hash) or {}).get(key)
+
+    def get_all(self, db_name, _hash, blocking=False):
+        self._check_db(db_name)
+        return dict(self._get(_hash) or {})
+
+    def set(self, db_name, _hash, key, val, blocking=False):
+        self._check_db(db_name)
+        fvs = self._modify(_hash)
+        added = 0 if key in fvs else 1
+        fvs[key] = str(val)
+        return added
+
+    def hmset(self, db_name, key, values):
+        self._check_db(db_name)
+        self._modify(key).update({field: str(value) for field, value in values.items()})
+
+    def delete(self, db_name, key, blocking=False):
+        self._check_db(db_name)
+        return self._delete(key)
+
+    def get_db_separator(self, db_name):
+        self._check_db(db_name)
+        return self.KEY_SEPARATOR
+
+    # ConfigDBConnector API
+
+    def serialize_key(self, key):
+        if type(key) is tuple:
+            return self.KEY_SEPARATOR.join(key)
+        return str(key)
+
+    def deserialize_key(self, key):
+        tokens = key.split(self.KEY_SEPARATOR)
+        if len(tokens) > 1:
+            return tuple(tokens)
+        return key
+
+    @staticmethod
+    def raw_to_typed(raw_data):
+        if raw_data is None:
+            return None
+        typed_data = {}
+        for field, value in raw_data.items():
+            # "NULL:NULL" is used as a placeholder for objects with no attributes
+            if field == "NULL":
+                continue
+            # A field ending with '@' holds a list
+            if field.endswith("@"):
+                typed_data[field[:-1]] = value.split(',')
+            else:
+                typed_data[field] = value
+        return typed_data
+
+    @staticmethod
+    def typed_to_raw(typed_data):
+        if typed_data is None:
+            return {}
+        if len(typed_data) == 0:
+            return {"NULL": "NULL"}
+        raw_data = {}
+        for field, value in typed_data.items():
+            if type(value) is list:
+                raw_data[field + '@'] = ','.join(value)
+            else:
+                raw_data[field] = str(value)
+        return raw_data
+
+    def _hash_name(self, table, key):
+        return '{}{}{}'.format(table.upper(), self.TABLE_NAME_SEPARATOR, self.serialize_key(key))
+
+    def _table_rows(self, table):
+        prefix = '{}{}'.format(table.upper(), self.TABLE_NAME_SEPARATOR)
+        return [(key, key[len(prefix):]) for key in self.keys(self.db_name, prefix + '*')]
+
+    def get_entry(self, table, key):
+        return self.raw_to_typed(self._get(self._hash_name(table, key)) or {})
+
+    def set_entry(self, table, key, data):
+        _hash = self._hash_name(table, key)
+        raw_data = self.typed_to_raw(data)
+        if not raw_data:
+            self._delete(_hash)
+            return
+        fvs = self._modify(_hash)
+        fvs.clear()
+        fvs.update(raw_data)
+
+    def mod_entry(self, table, key, data):
+        _hash = self._hash_name(table, key)
+        raw_data = self.typed_to_raw(data)
+        if not raw_data:
+            self._delete(_hash)
+            return
+        self._modify(_hash).update(raw_data)
+
+    def get_keys(self, table, split=True):
+        return [self.deserialize_key(row) if split else row for _, row in self._table_rows(table)]
+
+    def get_table(self, table):
+        return {self.deserialize_key(row): self.raw_to_typed(self._hashes[key])
+                for key, row in self._table_rows(table)}
+
+    def delete_table(self, table):
+        for key, _ in self._table_rows(table):
+            self._delete(key)
+
+    # Write back
+
+    def get_diff(self):
+        """
+        Returns the changes as redis commands, sorted by key: ('DEL', key), ('HDEL', key, field)
+        and ('HSET', key, field, value).
+        """
+        commands = []
+        for key in sorted(self._original):
+            original = self._original[key] or {}
+            current = self._hashes[key]
+            if current is None:
+                if original:
+                    commands.append(('DEL', key))
+                continue
+            for field in sorted(original):
+                if field not in current:
+                    commands.append(('HDEL', key, field))
+            for field in sorted(current):
+                if original.get(field) != current[field]:
+                    commands.append(('HSET', key, field, current[field]))
+        return commands
+
+    def commit(self):
+        """
+        Write the changes back to the database.
+        :return the commands written, see get_diff()
+        """
+        for key in self._original:
+            if self._hashes[key] is not None:
+                self._drop_if_empty(key)
+        commands = self.get_diff()
+        if not commands:
+            return commands
+
+        client = get_pipeline_client(self.db, self.db_name)
+        if client is not None:
+            pipe = client.pipeline(transaction=True)
+        else:
+            pipe = self.db.get_redis_client(self.db_name)
+        for command in commands:
+            if command[0] == 'DEL':
+                pipe.delete(command[1])
+            elif command[0] == 'HDEL':
+                pipe.hdel(command[1], command[2])
+            else:
+                pipe.hset(command[1], command[2], command[3])
+        if client is not None:
+            pipe.execute()
+
+        self._original.clear()
+        return commands
@@ -1,6 +1,9 @@
+import contextlib
 import importlib.machinery
 import importlib.util
+import os
 import sys
+import tempfile
 
 from sonic_py_common import multi_asic
 from swsscommon import swsscommon
@@ -22,6 +25,39 @@ def load_module_from_source(module_name, file_path):
 
     return module
 
+
+@contextlib.contextmanager
+def atomic_write(path, mode='w', fsync=False):
+    """
+    Context manager to write a file atomically: the data is written to a temporary file in the same
+    directory, which replaces path once the block finished, so that readers never see a partial file.
+    If the block or the write fails, the temporary file is removed and path is left as it was.
+    The new file keeps the permissions of the file it replaces, 0644 if there is none.
+    :param path: file path
+    :param mode: 'w' or 'wb'
+    :param fsync: flush the data to disk before replacing path
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix='.' + name + '.')
+    try:
+        with os.fdopen(fd, mode) as fh:
+            try:
+                os.fchmod(fh.fileno(), os.stat(path).st_mode & 0o7777)
+            except FileNotFoundError:
+                os.fchmod(fh.fileno(), 0o644)
+            yield fh
+            if fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 def load_db_config():
     '''
     Load the correct database config file:
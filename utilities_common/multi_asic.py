@@ -1,4 +1,5 @@
 import argparse
+import concurrent.futures
 import functools
 
 import click
@@ -8,6 +9,9 @@ from sonic_py_common import multi_asic, device_info
 from utilities_common import constants
 from utilities_common.general import load_db_config
 
+# Most threads run_in_namespaces() uses, the work per namespace is mostly waiting on its DB or daemons
+NAMESPACE_WORKERS_MAX = 8
+
 
 class LazyChoice(click.Choice):
     """A click.Choice whose choices are computed lazily at validation time.
@@ -268,3 +272,28 @@ def get_namespace_from_ctx(default=None):
             return ns if ns is not None else default
         ctx = ctx.parent
     return default
+
+
+def run_in_namespaces(func, namespace_args):
+    """Call func(*args) for every args of namespace_args, concurrently on at most NAMESPACE_WORKERS_MAX threads.
+
+    The calls run in the click context of the caller, so that ctx.fail() and ctx.obj work in func.
+    Every call runs to completion, then the results are returned in namespace_args order, or the first
+    exception in that order is raised.
+    """
+    namespace_args = list(namespace_args)
+    if len(namespace_args) <= 1:
+        return [func(*args) for args in namespace_args]
+
+    ctx = click.get_current_context(silent=True)
+
+    def run(args):
+        if ctx is None:
+            return func(*args)
+        with ctx.scope(cleanup=False):
+            return func(*args)
+
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(len(namespace_args), NAMESPACE_WORKERS_MAX)) as executor:
+        futures = [executor.submit(run, args) for args in namespace_args]
+    return [future.result() for future in futures]
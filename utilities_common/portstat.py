@@ -9,6 +9,7 @@ from sonic_py_common import device_info
 from swsscommon.swsscommon import SonicV2Connector, CounterTable, PortCounter
 
 from utilities_common import constants
+from utilities_common.bulk_db import hgetall_bulk, hgetall_table
 import utilities_common.multi_asic as multi_asic_util
 from utilities_common.netstat import ns_diff, table_as_json, format_brate, format_prate, \
                                      format_util, format_number_with_comma, format_util_directly, \
@@ -49,6 +50,8 @@ rates_key_list = ['RX_BPS', 'RX_PPS', 'RX_UTIL', 'TX_BPS', 'TX_PPS', 'TX_UTIL',
 ratestat_fields = ("rx_bps",  "rx_pps", "rx_util", "tx_bps", "tx_pps", "tx_util", "fec_pre_ber", "fec_post_ber",
                    "fec_pre_ber_max", "fec_flr", "fec_flr_predicted", "fec_flr_r_squared", "fec_max_t")
 RateStats = namedtuple("RateStats", ratestat_fields)
+lc_nstat_fields = ("rx_ok", "rx_err", "rx_drop", "rx_ovr", "tx_ok", "tx_err", "tx_drop", "tx_ovr")
+PortStatus = namedtuple("PortStatus", "admin_status, oper_status, appl_speed, state_speed")
 
 """
 The order and count of statistics mentioned below needs to be in sync with the values in portstat script
@@ -153,6 +156,8 @@ PORT_STATE_UP = 'U'
 PORT_STATE_DOWN = 'D'
 PORT_STATE_DISABLED = 'X'
 
+GEARBOX_TABLE_PHY_PATTERN = "_GEARBOX_TABLE:phy:*"
+
 LINECARD_PORT_STAT_TABLE = 'LINECARD_PORT_STAT_TABLE'
 LINECARD_PORT_STAT_MARK_TABLE = 'LINECARD_PORT_STAT_MARK_TABLE'
 CHASSIS_MIDPLANE_INFO_TABLE = 'CHASSIS_MIDPLANE_TABLE'
@@ -190,6 +195,8 @@ class Portstat(object):
             self.db = SonicV2Connector(use_unix_socket_path=False)
             self.db.connect(self.db.CHASSIS_STATE_DB, False)
         self.db_clients = {}
+        self.port_status_cache = {}
+        self.lc_port_state_cache = {}
         self.sorted = natsorted
 
     def get_cnstat_dict(self):
@@ -250,34 +257,14 @@ class Portstat(object):
         ratestat_dict = OrderedDict()
 
         # Get the counter values from CHASSIS_STATE_DB
+        linecard_port_stats = hgetall_bulk(self.db, self.db.CHASSIS_STATE_DB, linecard_port_aliases)
         for key in linecard_port_aliases:
-            rx_ok = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_ok")
-            rx_bps = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_bps")
-            rx_pps = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_pps")
-            rx_util = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_util")
-            rx_err = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_err")
-            rx_drop = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_drop")
-            rx_ovr = self.db.get(self.db.CHASSIS_STATE_DB, key, "rx_ovr")
-            tx_ok = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_ok")
-            tx_bps = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_bps")
-            tx_pps = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_pps")
-            tx_util = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_util")
-            tx_err = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_err")
-            tx_drop = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_drop")
-            tx_ovr = self.db.get(self.db.CHASSIS_STATE_DB, key, "tx_ovr")
-            fec_pre_ber = self.db.get(self.db.CHASSIS_STATE_DB, key, "fec_pre_ber")
-            fec_post_ber = self.db.get(self.db.CHASSIS_STATE_DB, key, "fec_post_ber")
-            fec_pre_ber_max = self.db.get(self.db.CHASSIS_STATE_DB, key, "fec_pre_ber_max")
-            fec_flr = self.db.get(self.db.CHASSIS_STATE_DB, key, "fec_flr")
-            fec_flr_predicted = self.db.get(self.db.CHASSIS_STATE_DB, key, "fec_flr_predicted")
-            fec_flr_r_squared = self.db.get(self.db.CHASSIS_STATE_DB, key, "fec_flr_r_squared")
-            fec_max_t = self.db.get(self.db.CHASSIS_STATE_DB, key, "fec_max_t")
+            stats = linecard_port_stats[key]
             port_alias = key.split("|")[-1]
-            cnstat_dict[port_alias] = NStats._make([rx_ok, rx_err, rx_drop, rx_ovr, tx_ok, tx_err, tx_drop, tx_ovr] +
-                                                   [STATUS_NA] * (len(NStats._fields) - 8))._asdict()
-            ratestat_dict[port_alias] = RateStats._make([rx_bps, rx_pps, rx_util, tx_bps,
-                                                        tx_pps, tx_util, fec_pre_ber, fec_post_ber, fec_pre_ber_max,
-                                                        fec_flr, fec_flr_predicted, fec_flr_r_squared, fec_max_t])
+            cnstat_dict[port_alias] = NStats._make([stats.get(field) for field in lc_nstat_fields] +
+                                                   [STATUS_NA] * (len(NStats._fields) - len(lc_nstat_fields)))._asdict()
+            ratestat_dict[port_alias] = RateStats._make([stats.get(field) for field in ratestat_fields])
+            self.lc_port_state_cache[port_alias] = stats.get("state")
         self.cnstat_dict.update(cnstat_dict)
         self.ratestat_dict.update(ratestat_dict)
 
@@ -342,8 +329,11 @@ class Portstat(object):
             """
             fields = ["0"] * len(counter_bucket_dict)
 
-            _, fvs = counter_table.get(PortCounter(), port)
-            fvs = dict(fvs)
+            if port in counters_data:
+                fvs = counters_data[port]
+            else:
+                _, fvs = counter_table.get(PortCounter(), port)
+                fvs = dict(fvs)
             for pos, cntr_list in counter_bucket_dict.items():
                 for counter_name in cntr_list:
                     if counter_name not in fvs:
@@ -359,9 +349,9 @@ class Portstat(object):
                 Get the rates from specific table.
             """
             fields = ["0", "0", "0", "0", "0", "0", "0", "0", "0", "0", "0", "0", "0"]
+            rates_data = rates_table.get(table_id, {})
             for pos, name in enumerate(rates_key_list):
-                full_table_id = RATES_TABLE_PREFIX + table_id
-                counter_data = self.db.get(self.db.COUNTERS_DB, full_table_id, name)
+                counter_data = rates_data.get(name)
                 if counter_data is None:
                     fields[pos] = STATUS_NA
                 elif fields[pos] != STATUS_NA:
@@ -378,18 +368,51 @@ class Portstat(object):
         counter_table = CounterTable(self.db.get_redis_client(self.db.COUNTERS_DB))
         if counter_port_name_map is None:
             return cnstat_dict, ratestat_dict
-        for port in self.sorted(counter_port_name_map):
-            port_name = port.split(":")[0]
-            if self.multi_asic.skip_display(constants.PORT_OBJ, port_name):
-                continue
+        ports = [port for port in self.sorted(counter_port_name_map)
+                 if not self.multi_asic.skip_display(constants.PORT_OBJ, port.split(":")[0])]
+
+        # Read all ports' counters & rates in bulk. Gearbox port counters are
+        # merged by CounterTable, so those are still read port by port.
+        oids = [counter_port_name_map[port] for port in ports]
+        rates_table = hgetall_table(self.db, self.db.COUNTERS_DB, "RATES", oids, separator=":")
+        counters_data = {}
+        if not self.db.keys(self.db.APPL_DB, GEARBOX_TABLE_PHY_PATTERN):
+            counters_table = hgetall_table(self.db, self.db.COUNTERS_DB, "COUNTERS", oids, separator=":")
+            counters_data = {port: counters_table[counter_port_name_map[port]] for port in ports}
+        self.cache_port_status(ports)
+
+        for port in ports:
             cnstat_dict[port] = get_counters(port)
             ratestat_dict[port] = get_rates(counter_port_name_map[port])
         return cnstat_dict, ratestat_dict
 
+    def cache_port_status(self, ports):
+        """
+            Read admin/oper status & speed of all ports of the current namespace
+            in bulk, for get_port_state and get_port_speed.
+        """
+        appl_table = hgetall_table(self.db, self.db.APPL_DB, "PORT_TABLE", ports, separator=":")
+        state_table = hgetall_table(self.db, self.db.STATE_DB, "PORT_TABLE", ports, separator="|")
+        for port in ports:
+            if not appl_table[port] and not state_table[port]:
+                continue
+            self.port_status_cache[port] = PortStatus(appl_table[port].get(PORT_ADMIN_STATUS_FIELD),
+                                                      appl_table[port].get(PORT_OPER_STATUS_FIELD),
+                                                      appl_table[port].get(PORT_SPEED_FIELD),
+                                                      state_table[port].get(PORT_SPEED_FIELD))
+
     def get_port_speed(self, port_name):
         """
             Get the port speed
         """
+        status = self.port_status_cache.get(port_name)
+        if status is not None:
+            speed = status.state_speed
+            if speed is None or speed == STATUS_NA or status.oper_status != "up":
+                speed = status.appl_speed
+            if speed is not None:
+                return int(speed)
+
         # Get speed from APPL_DB
         state_db_table_id = PORT_STATE_TABLE_PREFIX + port_name
         app_db_table_id = PORT_STATUS_TABLE_PREFIX + port_name
@@ -414,11 +437,17 @@ class Portstat(object):
         """
         if device_info.is_supervisor():
             if device_info.is_voq_chassis() or (self.namespace is None and self.display_option != 'all'):
+                if port_name in self.lc_port_state_cache:
+                    return self.lc_port_state_cache[port_name]
                 self.db.connect(self.db.CHASSIS_STATE_DB, False)
                 return self.db.get(self.db.CHASSIS_STATE_DB, LINECARD_PORT_STAT_TABLE + "|" + port_name, "state")
             else:
                 pass
 
+        status = self.port_status_cache.get(port_name)
+        if status is not None and status.admin_status is not None and status.oper_status is not None:
+            return self.port_state_from_status(status.admin_status, status.oper_status)
+
         full_table_id = PORT_STATUS_TABLE_PREFIX + port_name
         for ns in self.multi_asic.get_ns_list_based_on_options():
             self.db = self.get_db_client(ns)
@@ -427,16 +456,20 @@ class Portstat(object):
 
             if admin_state is None or oper_state is None:
                 continue
-            if admin_state.upper() == PORT_STATUS_VALUE_DOWN:
-                return PORT_STATE_DISABLED
-            elif admin_state.upper() == PORT_STATUS_VALUE_UP and oper_state.upper() == PORT_STATUS_VALUE_UP:
-                return PORT_STATE_UP
-            elif admin_state.upper() == PORT_STATUS_VALUE_UP and oper_state.upper() == PORT_STATUS_VALUE_DOWN:
-                return PORT_STATE_DOWN
-            else:
-                return STATUS_NA
+            return self.port_state_from_status(admin_state, oper_state)
         return STATUS_NA
 
+    @staticmethod
+    def port_state_from_status(admin_state, oper_state):
+        if admin_state.upper() == PORT_STATUS_VALUE_DOWN:
+            return PORT_STATE_DISABLED
+        elif admin_state.upper() == PORT_STATUS_VALUE_UP and oper_state.upper() == PORT_STATUS_VALUE_UP:
+            return PORT_STATE_UP
+        elif admin_state.upper() == PORT_STATUS_VALUE_UP and oper_state.upper() == PORT_STATUS_VALUE_DOWN:
+            return PORT_STATE_DOWN
+        else:
+            return STATUS_NA
+
     def cnstat_intf_diff_print(self, cnstat_new_dict, cnstat_old_dict, intf_list):
         """
             Print the difference between two cnstat results for interface.
@@ -0,0 +1,177 @@
+"""
+Set of IPv4/IPv6 prefixes.
+
+Each prefix is packed into a single integer holding the address, the prefix
+length and the address family, so large route tables are kept as sets of
+ints instead of lists of strings. Set difference then runs in C on the
+packed keys instead of a Python merge over sorted string lists. This is
+faster, not smaller: a set of ints takes about as much memory as the lists.
+"""
+
+import ipaddress
+import socket
+
+PREFIX_SEPARATOR = '/'
+IPV6_SEPARATOR = ':'
+
+_LEN_BITS = 8
+_LEN_MASK = (1 << _LEN_BITS) - 1
+_V4_WIDTH = 32
+_V6_WIDTH = 128
+
+
+def pack_prefix(prefix):
+    """
+    Pack a prefix string into an integer key.
+    :param prefix: IPv4/IPv6 prefix as string; a bare address gets a host length
+    :return int key
+    :raise ValueError on malformed prefix
+    """
+    addr, sep, plen = prefix.partition(PREFIX_SEPARATOR)
+    try:
+        if IPV6_SEPARATOR in addr:
+            family = 1
+            width = _V6_WIDTH
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET6, addr), 'big')
+        else:
+            family = 0
+            width = _V4_WIDTH
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET, addr), 'big')
+    except OSError:
+        raise ValueError("Invalid IP prefix {}".format(prefix))
+
+    length = int(plen) if sep else width
+    if length < 0 or length > width:
+        raise ValueError("Invalid prefix length {}".format(prefix))
+    return (((value << _LEN_BITS) | length) << 1) | family
+
+
+def unpack_prefix(key):
+    """
+    Unpack an integer key into its (family, address, length) tuple.
+    :param key: key as returned by pack_prefix
+    :return (4 or 6, int address, prefix length)
+    """
+    family = 6 if key & 1 else 4
+    key >>= 1
+    return family, key >> _LEN_BITS, key & _LEN_MASK
+
+
+def prefix_to_str(key):
+    """
+    Format an integer key back to prefix string, as ipaddress does.
+    """
+    family, value, length = unpack_prefix(key)
+    if family == 6:
+        addr = ipaddress.IPv6Address(value)
+    else:
+        addr = ipaddress.IPv4Address(value)
+    return "{}{}{}".format(addr, PREFIX_SEPARATOR, length)
+
+
+class PrefixSet(object):
+    """
+    Set of IP prefixes stored as packed integer keys.
+
+    Supports the usual set operators between PrefixSets, membership test with
+    prefix strings, and longest-prefix containment against another set.
+    """
+
+    __slots__ = ('_keys',)
+
+    def __init__(self, prefixes=()):
+        self._keys = set(map(pack_prefix, prefixes))
+
+    @classmethod
+    def from_keys(cls, keys):
+        obj = cls.__new__(cls)
+        obj._keys = keys if isinstance(keys, set) else set(keys)
+        return obj
+
+    def add(self, prefix):
+        self._keys.add(pack_prefix(prefix))
+
+    def discard(self, prefix):
+        self._keys.discard(pack_prefix(prefix))
+
+    def difference_update(self, other):
+        self._keys.difference_update(other._keys)
+
+    def keys(self):
+        return self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __bool__(self):
+        return bool(self._keys)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __contains__(self, prefix):
+        try:
+            return pack_prefix(prefix) in self._keys
+        except ValueError:
+            return False
+
+    def __eq__(self, other):
+        if isinstance(other, PrefixSet):
+            return self._keys == other._keys
+        return NotImplemented
+
+    def __sub__(self, other):
+        return PrefixSet.from_keys(self._keys - other._keys)
+
+    def __and__(self, other):
+        return PrefixSet.from_keys(self._keys & other._keys)
+
+    def __or__(self, other):
+        return PrefixSet.from_keys(self._keys | other._keys)
+
+    def __repr__(self):
+        return "PrefixSet({})".format(self.to_list())
+
+    def filter(self, predicate):
+        """
+        :param predicate: callable taking a prefix string
+        :return PrefixSet of the prefixes for which predicate is true
+        """
+        return PrefixSet.from_keys({k for k in self._keys if predicate(prefix_to_str(k))})
+
+    def covered_by(self, other):
+        """
+        Longest-prefix containment.
+        :param other: PrefixSet of covering prefixes
+        :return PrefixSet of the prefixes in self that fall within any prefix of other
+        """
+        # Group the covering prefixes by (family, length); each candidate then
+        # needs one masked lookup per distinct length instead of a scan.
+        by_len = {}
+        for k in other._keys:
+            family, value, length = unpack_prefix(k)
+            shift = (_V6_WIDTH if family == 6 else _V4_WIDTH) - length
+            by_len.setdefault((family, length), set()).add((value >> shift) << shift)
+
+        lens = {4: [], 6: []}
+        for family, length in sorted(by_len, key=lambda fl: fl[1], reverse=True):
+            lens[family].append(length)
+
+        covered = set()
+        for k in self._keys:
+            family, value, length = unpack_prefix(k)
+            width = _V6_WIDTH if family == 6 else _V4_WIDTH
+            for cover_len in lens[family]:
+                if cover_len > length:
+                    continue
+                shift = width - cover_len
+                if (value >> shift) << shift in by_len[(family, cover_len)]:
+                    covered.add(k)
+                    break
+        return PrefixSet.from_keys(covered)
+
+    def to_list(self):
+        """
+        :return prefixes as sorted list of strings
+        """
+        return sorted(map(prefix_to_str, self._keys))
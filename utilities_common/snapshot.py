@@ -0,0 +1,272 @@
+"""
+Binary snapshot store for the counter "clear" baselines.
+
+The counter CLIs save the current counters on "clear" and later show the
+difference against them. Instead of one JSON document per port or per
+table, the baselines of a tool are kept in a single file that is replaced
+atomically on every save and memory-mapped on load. Showing the counters
+then opens one file and only decodes the objects that are looked up.
+
+A snapshot is indexed by section, object and counter:
+
+    {section: {object: {counter: value}}}
+
+Sections are usually namespaces, but a tool may use any top level grouping.
+An object may also hold a single value instead of counters, like the 'time'
+entry of the counter dictionaries.
+
+File layout, all integers are native unsigned 32 bit:
+
+    header    magic, version, #strings, #sections, #objects, #records
+    strings   #strings + 1 offsets into the string blob
+    sections  (name, first object, end object) per section
+    objects   (name, first record, end record, value) per object
+    records   (counter, value) per counter
+    blob      utf-8 strings, every distinct string is stored once
+
+Strings are stored with a one letter tag, 's' for a string and 'j' for any
+other value encoded as JSON, so values read back as json.load would return
+them.
+"""
+
+import array
+import json
+import mmap
+import struct
+
+from collections.abc import Mapping
+
+from utilities_common.general import atomic_write
+
+SNAPSHOT_MAGIC = b'SNAP'
+SNAPSHOT_VERSION = 1
+DEFAULT_SECTION = ''
+
+_HEADER = struct.Struct('=4sIIIII')
+_NO_VALUE = 0xffffffff
+_STR_TAG = 's'
+_JSON_TAG = 'j'
+
+
+class _StringTable(object):
+    def __init__(self, default=None):
+        self.ids = {}
+        self.offsets = array.array('I', [0])
+        self.blob = bytearray()
+        self.default = default
+
+    def add(self, value):
+        if isinstance(value, str):
+            encoded = _STR_TAG + value
+        else:
+            encoded = _JSON_TAG + json.dumps(value, default=self.default)
+        sid = self.ids.get(encoded)
+        if sid is None:
+            sid = self.ids[encoded] = len(self.offsets) - 1
+            self.blob += encoded.encode()
+            self.offsets.append(len(self.blob))
+        return sid
+
+
+def _encode(sections, default=None):
+    strings = _StringTable(default)
+    section_table = array.array('I')
+    object_table = array.array('I')
+    record_table = array.array('I')
+
+    for section, objects in sections.items():
+        obj_start = len(object_table) // 4
+        for name, value in objects.items():
+            rec_start = len(record_table) // 2
+            if isinstance(value, Mapping):
+                for counter, counter_value in value.items():
+                    record_table.extend((strings.add(str(counter)), strings.add(counter_value)))
+                value_id = _NO_VALUE
+            else:
+                value_id = strings.add(value)
+            object_table.extend((strings.add(str(name)), rec_start, len(record_table) // 2, value_id))
+        section_table.extend((strings.add(str(section)), obj_start, len(object_table) // 4))
+
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(strings.offsets) - 1,
+                          len(section_table) // 3, len(object_table) // 4, len(record_table) // 2)
+    return b''.join((header, strings.offsets.tobytes(), section_table.tobytes(),
+                     object_table.tobytes(), record_table.tobytes(), bytes(strings.blob)))
+
+
+class Snapshot(Mapping):
+    """
+    Read-only view of a snapshot: maps section names to SnapshotSection.
+    """
+
+    def __init__(self, buf):
+        if len(buf) < _HEADER.size:
+            raise ValueError("Truncated snapshot")
+        magic, version, n_strings, n_sections, n_objects, n_records = _HEADER.unpack_from(buf)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("Not a snapshot")
+
+        self._buf = buf
+        view = memoryview(buf)
+        pos = _HEADER.size
+        tables = []
+        for count in (n_strings + 1, 3 * n_sections, 4 * n_objects, 2 * n_records):
+            end = pos + 4 * count
+            if end > len(buf):
+                raise ValueError("Truncated snapshot")
+            tables.append(view[pos:end].cast('I'))
+            pos = end
+        self._offsets, self._sections, self._objects, self._records = tables
+        self._blob = view[pos:]
+        if self._offsets[-1] > len(self._blob):
+            raise ValueError("Truncated snapshot")
+
+        self._names = {}
+        self._index = {}
+        for i in range(n_sections):
+            self._index[self._string(self._sections[3 * i])] = i
+
+    def _string(self, sid):
+        """
+        Decode a string, names are cached as they are looked up repeatedly.
+        """
+        name = self._names.get(sid)
+        if name is not None:
+            return name
+        raw = bytes(self._blob[self._offsets[sid]:self._offsets[sid + 1]]).decode()
+        if raw[0] == _STR_TAG:
+            self._names[sid] = raw[1:]
+            return raw[1:]
+        return json.loads(raw[1:])
+
+    def _object(self, idx):
+        base = 4 * idx
+        rec_start, rec_end, value_id = self._objects[base + 1:base + 4]
+        if value_id != _NO_VALUE:
+            return self._string(value_id)
+        records = self._records
+        return {self._string(records[2 * i]): self._string(records[2 * i + 1]) for i in range(rec_start, rec_end)}
+
+    def _object_name(self, idx):
+        return self._string(self._objects[4 * idx])
+
+    def __getitem__(self, section):
+        i = self._index[section]
+        return SnapshotSection(self, self._sections[3 * i + 1], self._sections[3 * i + 2])
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+
+class SnapshotSection(Mapping):
+    """
+    Read-only view of one section: maps object names to their counters.
+    """
+
+    def __init__(self, snapshot, start, end):
+        self._snapshot = snapshot
+        self._start = start
+        self._end = end
+        self._index = None
+
+    def _lookup(self):
+        if self._index is None:
+            self._index = {self._snapshot._object_name(i): i for i in range(self._start, self._end)}
+        return self._index
+
+    def __getitem__(self, name):
+        return self._snapshot._object(self._lookup()[name])
+
+    def __contains__(self, name):
+        return name in self._lookup()
+
+    def __iter__(self):
+        return iter(self._lookup())
+
+    def __len__(self):
+        return self._end - self._start
+
+
+def read_snapshot(path):
+    """
+    Memory-map a snapshot file.
+    :param path: snapshot file path
+    :return Snapshot, or None if the file does not exist or is not a valid snapshot
+    """
+    try:
+        with open(path, 'rb') as fp:
+            buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        # Empty file, mmap refuses it
+        return None
+
+    try:
+        return Snapshot(buf)
+    except (ValueError, TypeError, struct.error):
+        return None
+
+
+def write_snapshot(path, sections, default=None):
+    """
+    Atomically replace the snapshot file.
+    :param path: snapshot file path
+    :param sections: dict of section to dict of object to counters dict or value
+    :param default: called for values JSON can not serialize, as in json.dump
+    """
+    data = _encode(sections, default)
+    with atomic_write(path, 'wb') as fp:
+        fp.write(data)
+
+
+class SnapshotStore(object):
+    """
+    Snapshot file of a tool, loaded once and on first use.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._snapshot = None
+        self._loaded = False
+
+    def load(self):
+        """
+        :return Snapshot, or None if nothing was saved
+        """
+        if not self._loaded:
+            self._snapshot = read_snapshot(self.path)
+            self._loaded = True
+        return self._snapshot
+
+    def get(self, section=DEFAULT_SECTION):
+        """
+        :return SnapshotSection, or None if the section was not saved
+        """
+        snapshot = self.load()
+        if snapshot is None:
+            return None
+        return snapshot.get(section)
+
+    def save(self, sections, default=None):
+        """
+        Replace the whole snapshot with sections.
+        """
+        write_snapshot(self.path, sections, default)
+        self._snapshot = None
+        self._loaded = False
+
+    def update(self, sections, default=None):
+        """
+        Replace the given sections and keep the other saved ones.
+        """
+        merged = {}
+        snapshot = self.load()
+        if snapshot is not None:
+            for name, section in snapshot.items():
+                if name not in sections:
+                    merged[name] = section
+        merged.update(sections)
+        self.save(merged, default)
@@ -1,11 +1,16 @@
 import os
+import json
 import pkgutil
 import importlib
+import importlib.util
 
-from sonic_py_common import logger
+from sonic_py_common import device_info, logger
+from utilities_common.general import atomic_write
 
 # Constants ====================================================================
 PDDF_SUPPORT_FILE = '/usr/share/sonic/platform/pddf_support'
+# The manifest tells which plugin modules are imported for a command, it is kept where only root writes
+PLUGINS_MANIFEST_DIR = '/var/cache/sonic-utilities/cli-plugins'
 
 # Helper class
 
@@ -94,4 +99,163 @@ class UtilHelper(object):
         """ Load plugins and register them """
 
         for plugin in self.load_plugins(plugins):
-            self.register_plugin(plugin, cli)
\ No newline at end of file
+            self.register_plugin(plugin, cli)
+
+    def iter_plugins(self, plugins_namespace):
+        """ Discover CLI plugins without loading them. Yield a plugin module name and file. """
+
+        for _, module_name, ispkg in pkgutil.iter_modules(plugins_namespace.__path__,
+                                                          plugins_namespace.__name__ + "."):
+            if ispkg:
+                yield from self.iter_plugins(importlib.import_module(module_name))
+                continue
+            spec = importlib.util.find_spec(module_name)
+            yield module_name, spec.origin if spec is not None else None
+
+    def load_and_register_plugins_lazily(self, plugins, cli):
+        """ Register plugins in cli, a lazy group, so that a plugin is loaded only
+        when a command it adds or extends is used.
+
+        What a plugin adds or extends is learned by loading it once, and kept in a
+        manifest until the plugin file changes. A plugin that neither adds nor
+        extends a command then is loaded every time.
+        """
+
+        if not hasattr(cli.commands, 'add_loader'):
+            self.load_and_register_plugins(plugins, cli)
+            return
+
+        manifest_dir, writable = self.get_plugins_manifest_dir()
+        manifest_path = None
+        if manifest_dir is not None:
+            manifest_path = os.path.join(manifest_dir, self.get_plugins_manifest_name(plugins))
+
+        manifest = {}
+        if manifest_path is not None and os.path.exists(manifest_path):
+            try:
+                with open(manifest_path) as manifest_file:
+                    manifest = json.load(manifest_file)
+            except (OSError, ValueError) as err:
+                log.log_warning('failed to read plugins manifest {}: {}'.format(manifest_path, err))
+
+        new_manifest = {}
+        for module_name, path in self.iter_plugins(plugins):
+            try:
+                stat = os.stat(path)
+                stamp = [stat.st_mtime_ns, stat.st_size]
+            except (OSError, TypeError):
+                stamp = None
+
+            entry = manifest.get(module_name)
+            if (entry and stamp and entry.get('stamp') == stamp and (entry['commands'] or entry['extends'])
+                    and not any(name in cli.commands for name in entry['commands'])):
+                self.register_plugin_lazily(module_name, entry, cli)
+                new_manifest[module_name] = entry
+                continue
+
+            entry = self.load_and_record_plugin(module_name, cli)
+            if entry is not None and stamp is not None:
+                entry['stamp'] = stamp
+                new_manifest[module_name] = entry
+
+        if manifest_path is not None and writable and new_manifest != manifest:
+            try:
+                with atomic_write(manifest_path) as manifest_file:
+                    json.dump(new_manifest, manifest_file)
+            except OSError as err:
+                log.log_warning('failed to write plugins manifest {}: {}'.format(manifest_path, err))
+
+    def import_plugin(self, module_name):
+        """ Import a plugin module, return None if it fails. """
+
+        log.log_debug('importing plugin: {}'.format(module_name))
+        try:
+            return importlib.import_module(module_name)
+
+        except ModuleNotFoundError as err:
+            log.log_warning('failed to import plugin {}: {}'.format(module_name, err),
+                            also_print_to_console=True)
+
+        except Exception as err:
+            log.log_error('failed to import plugin {}: {}'.format(module_name, err),
+                          also_print_to_console=True)
+
+        return None
+
+    def load_and_record_plugin(self, module_name, cli):
+        """ Load and register a plugin in cli, a lazy group.
+        Return what it did: the names of the commands it added and extended. """
+
+        plugin = self.import_plugin(module_name)
+        if plugin is None:
+            return None
+
+        log.log_debug('registering plugin: {}'.format(module_name))
+        existing = set(cli.commands)
+        with cli.commands.recording() as accessed:
+            try:
+                plugin.register(cli)
+            except Exception as err:
+                log.log_error('failed to import plugin {}: {}'.format(module_name, err),
+                              also_print_to_console=True)
+                return None
+        added = set(cli.commands) - existing
+        return {'commands': sorted(added), 'extends': sorted(accessed - added)}
+
+    def register_plugin_lazily(self, module_name, entry, cli):
+        """ Register a plugin in cli, a lazy group, as recorded by load_and_record_plugin(). """
+
+        loaded = []
+
+        def load():
+            if loaded:
+                return None
+            loaded.append(module_name)
+            # The plugin adds its commands itself
+            for name in entry['commands']:
+                cli.commands.discard_loader(name)
+            plugin = self.import_plugin(module_name)
+            if plugin is not None:
+                self.register_plugin(plugin, cli)
+            return None
+
+        for name in entry['commands']:
+            cli.commands.add_loader(name, load)
+        for name in entry['extends']:
+            cli.commands.add_extension(name, load)
+
+    @staticmethod
+    def get_plugins_manifest_dir():
+        """ Return the plugins manifest directory, None if it cannot be trusted, and whether
+        this user writes the manifest.
+
+        The directory is trusted if only its owner, root or this user, can write it. Root
+        creates it, the other users only read the manifest root wrote. """
+
+        manifest_dir = os.environ.get('SONIC_CLI_PLUGINS_MANIFEST_DIR', PLUGINS_MANIFEST_DIR)
+        euid = os.geteuid()
+        try:
+            os.makedirs(manifest_dir, mode=0o755, exist_ok=True)
+            stat = os.stat(manifest_dir)
+        except OSError as err:
+            if euid == 0:
+                log.log_warning('failed to create plugins manifest directory: {}'.format(err))
+            return None, False
+
+        if stat.st_uid not in (0, euid) or stat.st_mode & 0o022:
+            log.log_warning('ignoring plugins manifest directory {}: not owned by root or writable by others'.format(
+                manifest_dir))
+            return None, False
+        return manifest_dir, stat.st_uid == euid
+
+    @staticmethod
+    def get_plugins_manifest_name(plugins):
+        """ Return the manifest file name of a plugins namespace, for the platform and ASIC type,
+        which plugins may check to decide what they register. """
+
+        try:
+            platform = device_info.get_platform()
+            asic_type = (device_info.get_sonic_version_info() or {}).get('asic_type')
+        except Exception:
+            platform = asic_type = None
+        return '{}.{}.{}.json'.format(plugins.__name__, platform or 'unknown', asic_type or 'unknown')
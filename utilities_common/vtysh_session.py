@@ -0,0 +1,186 @@
+"""
+Persistent vtysh sessions.
+
+Every 'vtysh -c' forks a shell that connects to all the FRR daemons to run a
+single command. A VtyshSession keeps one vtysh open per namespace for the life
+of the CLI invocation and writes the commands to its stdin, each followed by
+an 'echo' of a marker that tells where its output ends.
+"""
+
+import atexit
+import os
+import select
+import subprocess
+import threading
+import uuid
+
+# vtysh must not wait for a password on the stdin the commands are written to
+VTYSH_SESSION_SUDO = ['sudo', '-n']
+# Time to wait for a new vtysh to answer, a vtysh that cannot echo a marker
+# does not, and the commands are then run with 'vtysh -c'
+VTYSH_SESSION_START_TIMEOUT = 5
+# Time to wait for more output of a command before giving up on the session
+VTYSH_SESSION_TIMEOUT = 60
+VTYSH_SESSION_READ_SIZE = 1024 * 1024
+
+
+class VtyshSessionError(Exception):
+    pass
+
+
+class VtyshSession(object):
+    """
+    A vtysh process running the commands written to its stdin, one at a time.
+    """
+    def __init__(self, cmd):
+        self._cmd = cmd
+        self._process = None
+        self._failed = False
+        self._buffer = b''
+        self._prompt = ''
+        self._count = 0
+        self._id = uuid.uuid4().hex
+        self._lock = threading.Lock()
+
+    def _marker(self):
+        self._count += 1
+        return 'vtysh-session-{}-{}'.format(self._id, self._count)
+
+    def _start(self):
+        try:
+            self._process = subprocess.Popen(self._cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                             stderr=subprocess.DEVNULL, bufsize=0)
+        except OSError as e:
+            raise VtyshSessionError('Unable to start {}: {}'.format(' '.join(self._cmd), e))
+        marker = self._marker()
+        self._write(['echo ' + marker])
+        self._read_until(marker, VTYSH_SESSION_START_TIMEOUT)
+
+    def _write(self, lines):
+        try:
+            self._process.stdin.write(''.join(line + '\n' for line in lines).encode())
+        except OSError as e:
+            raise VtyshSessionError('vtysh exited: {}'.format(e))
+
+    def _read_until(self, marker, timeout):
+        """
+        Returns the lines of output up to the marker line, without the echo of the
+        'echo' commands vtysh prints with its prompt when reading from a pipe.
+        """
+        fd = self._process.stdout.fileno()
+        output = []
+        while True:
+            *lines, self._buffer = self._buffer.split(b'\n')
+            for index, line in enumerate(lines):
+                line = line.decode(errors='replace').rstrip('\r\n\t ')
+                if marker not in line:
+                    output.append(line)
+                elif line.lstrip().startswith('%'):
+                    # FRR errors start with '%', this vtysh cannot 'echo'
+                    raise VtyshSessionError(line.strip())
+                elif line.endswith('echo ' + marker):
+                    # The echo of the input, after the prompt
+                    continue
+                elif line.endswith(marker):
+                    # The output of 'echo', after the prompt if vtysh does not echo the input
+                    self._prompt = line[:-len(marker)]
+                    self._buffer = b'\n'.join(lines[index + 1:] + [self._buffer])
+                    return output
+                else:
+                    raise VtyshSessionError(line.strip())
+
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                raise VtyshSessionError('vtysh did not answer in {} seconds'.format(timeout))
+            data = os.read(fd, VTYSH_SESSION_READ_SIZE)
+            if not data:
+                raise VtyshSessionError('vtysh exited')
+            self._buffer += data
+
+    def _command_output(self, command, lines):
+        if lines and self._prompt and lines[0].startswith(self._prompt):
+            lines[0] = lines[0][len(self._prompt):]
+        # Drop the echo of the command vtysh prints after its prompt
+        while lines and lines[0].endswith(command):
+            lines = lines[1:]
+        return ''.join(line + '\n' for line in lines)
+
+    def run_command(self, command):
+        """
+        Run the command, returns its output.
+
+        Raises VtyshSessionError if vtysh cannot be used, the session is then
+        closed and fails again without trying to start vtysh anew.
+        """
+        with self._lock:
+            if self._failed:
+                raise VtyshSessionError('vtysh session failed')
+            try:
+                if self._process is None:
+                    self._start()
+                marker = self._marker()
+                self._write([command, 'echo ' + marker])
+                return self._command_output(command, self._read_until(marker, VTYSH_SESSION_TIMEOUT))
+            except VtyshSessionError:
+                self._failed = True
+                self._close()
+                raise
+
+    def _close(self):
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(shell_cmd, instance_args=()):
+    """
+    Returns the session of the vtysh shell_cmd for the instance_args, '-n <asic id>'
+    in a multi-ASIC namespace, started on its first use.
+    """
+    cmd = VTYSH_SESSION_SUDO + [shell_cmd] + list(instance_args)
+    with _sessions_lock:
+        if not _sessions:
+            atexit.register(close_sessions)
+        session = _sessions.get(tuple(cmd))
+        if session is None:
+            session = _sessions[tuple(cmd)] = VtyshSession(cmd)
+        return session
+
+
+def close_sessions():
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def run_json_command(shell_cmd, instance_args, command):
+    """
+    Run a JSON show command through the session of the vtysh, returns its output, or None
+    if it has to be run with 'vtysh -c' for its exit status: errors, which FRR prints
+    starting with '%', or any output that is not JSON. None too if the session cannot be used.
+    """
+    try:
+        output = get_session(shell_cmd, instance_args).run_command(command)
+    except VtyshSessionError:
+        return None
+    return output if output.lstrip()[:1] in ('{', '[') else None
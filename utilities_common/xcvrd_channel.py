@@ -0,0 +1,137 @@
+"""
+Command channel to xcvrd for the muxcable CLIs.
+
+A muxcable command is written for a port to an APPL_DB CMD table, with its
+parameters in a CMD_ARG table, and xcvrd writes the response of the port to a
+STATE_DB RSP table. An XcvrdCommandChannel issues a command for many ports at
+once and matches the responses to the ports by their key, from one subscriber
+per namespace, instead of waiting for each port in turn.
+"""
+
+import time
+from collections import namedtuple
+
+from sonic_py_common import multi_asic
+from swsscommon import swsscommon
+
+REDIS_TIMEOUT_MSECS = 0
+XCVRD_CHANNEL_SELECT_TIMEOUT_MSECS = 100
+# The responses of all the ports are awaited at most this many per port timeouts,
+# whatever the number of ports
+XCVRD_CHANNEL_DEADLINE_TIMEOUTS = 5
+
+# Status of the response of a port
+XCVRD_RSP_OK = 'ok'
+# xcvrd responded without the expected field
+XCVRD_RSP_INVALID = 'invalid'
+# xcvrd did not respond in time
+XCVRD_RSP_TIMEOUT = 'timeout'
+
+XcvrdResponse = namedtuple('XcvrdResponse', ['status', 'value'])
+
+
+def db_connect(db_name, namespace):
+    return swsscommon.DBConnector(db_name, REDIS_TIMEOUT_MSECS, True, namespace)
+
+
+class XcvrdCommandChannel(object):
+    """
+    The CMD, CMD_ARG and RSP tables of an xcvrd command in the front-end namespaces.
+    """
+    def __init__(self, cmd_table_name, rsp_table_name, cmd_arg_table_name=None, db_connect=db_connect):
+        self._cmd_table_name = cmd_table_name
+        self._rsp_table_name = rsp_table_name
+        self._cmd_arg_table_name = cmd_arg_table_name
+        self._db_connect = db_connect
+
+    def run(self, port_asics, cmd_name, rsp_name, arg=None, param_dict=None, timeout=1, deadline=None):
+        """
+        Issue the command for the ports of port_asics, {port: asic index}, and wait
+        for their responses. Returns {port: XcvrdResponse} with the value of the
+        rsp_name field of the response.
+
+        xcvrd may handle the commands one at a time, so each port keeps its own
+        timeout: the ports still waiting time out once no response came for timeout
+        seconds for each of them, or deadline seconds after the commands were issued,
+        XCVRD_CHANNEL_DEADLINE_TIMEOUTS timeouts by default, whatever the number of ports.
+        """
+        responses = {port: XcvrdResponse(XCVRD_RSP_TIMEOUT, 'unknown') for port in port_asics}
+        if not port_asics:
+            return responses
+        if deadline is None:
+            deadline = timeout * XCVRD_CHANNEL_DEADLINE_TIMEOUTS
+
+        asic_ports = {}
+        for port, asic_index in port_asics.items():
+            asic_ports.setdefault(asic_index, set()).add(port)
+        pending = {asic_index: set(ports) for asic_index, ports in asic_ports.items()}
+
+        appl_db, state_db = {}, {}
+        cmd_tbl, cmd_arg_tbl, rsp_tbl, rsp_sub_tbl = {}, {}, {}, {}
+        sel = swsscommon.Select()
+        for namespace in multi_asic.get_front_end_namespaces():
+            asic_id = multi_asic.get_asic_index_from_namespace(namespace)
+            if asic_id not in asic_ports:
+                continue
+            appl_db[asic_id] = self._db_connect("APPL_DB", namespace)
+            state_db[asic_id] = self._db_connect("STATE_DB", namespace)
+            cmd_tbl[asic_id] = swsscommon.Table(appl_db[asic_id], self._cmd_table_name)
+            if self._cmd_arg_table_name is not None:
+                cmd_arg_tbl[asic_id] = swsscommon.Table(appl_db[asic_id], self._cmd_arg_table_name)
+            rsp_tbl[asic_id] = swsscommon.Table(state_db[asic_id], self._rsp_table_name)
+            # Drop the responses left by earlier commands before subscribing
+            for port in asic_ports[asic_id]:
+                rsp_tbl[asic_id]._del(port)
+            rsp_sub_tbl[asic_id] = swsscommon.SubscriberStateTable(state_db[asic_id], self._rsp_table_name)
+            sel.addSelectable(rsp_sub_tbl[asic_id])
+
+        cmd_arg = "null" if arg is None else str(arg)
+        for asic_id in cmd_tbl:
+            for port in asic_ports[asic_id]:
+                if param_dict is not None:
+                    for key, value in param_dict.items():
+                        fvs = swsscommon.FieldValuePairs([(str(key), str(value))])
+                        cmd_arg_tbl[asic_id].set(port, fvs)
+                fvs = swsscommon.FieldValuePairs([(cmd_name, cmd_arg)])
+                cmd_tbl[asic_id].set(port, fvs)
+
+        time_start = time_response = time.time()
+        while True:
+            pending_count = sum(len(pending[asic_id]) for asic_id in cmd_tbl)
+            if pending_count == 0:
+                break
+            # A port xcvrd does not answer holds up the ones after it, which still
+            # get their own timeout once xcvrd gives up on it
+            time_now = time.time()
+            if time_now - time_start >= deadline or time_now - time_response >= timeout * pending_count:
+                break
+
+            (state, selectableObj) = sel.select(XCVRD_CHANNEL_SELECT_TIMEOUT_MSECS)
+            if state != swsscommon.Select.OBJECT:
+                continue
+
+            # Get the namespace of the response from the redisselect db connector object
+            redisSelectObj = swsscommon.CastSelectableToRedisSelectObj(selectableObj)
+            namespace = redisSelectObj.getDbConnector().getNamespace()
+            asic_index = multi_asic.get_asic_index_from_namespace(namespace)
+
+            (port, op, fvp) = rsp_sub_tbl[asic_index].pop()
+            if port not in pending[asic_index] or op != swsscommon.SET_COMMAND:
+                continue
+
+            pending[asic_index].discard(port)
+            time_response = time.time()
+            fvp_dict = dict(fvp)
+            if rsp_name in fvp_dict:
+                responses[port] = XcvrdResponse(XCVRD_RSP_OK, fvp_dict[rsp_name])
+            else:
+                responses[port] = XcvrdResponse(XCVRD_RSP_INVALID, 'unknown')
+
+        for asic_id in cmd_tbl:
+            for port in asic_ports[asic_id]:
+                cmd_tbl[asic_id]._del(port)
+                if asic_id in cmd_arg_tbl:
+                    cmd_arg_tbl[asic_id]._del(port)
+                rsp_tbl[asic_id]._del(port)
+
+        return responses